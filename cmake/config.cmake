@@ -36,6 +36,9 @@ set(RAF_CUDA_ARCH 70)
 # RAF_USE_CUBLAS. Option: [ON/OFF]
 set(RAF_USE_CUBLAS OFF)
 
+# RAF_USE_CPU_BLAS. Option: [ON/OFF/mkl/openblas/blis]. ON picks the first one found in this order.
+set(RAF_USE_CPU_BLAS OFF)
+
 # RAF_USE_CUDNN. Option: [ON/OFF/Path-To-CUDNN]. You may use environment variables, like $ENV{CUDNN_HOME}
 set(RAF_USE_CUDNN OFF)
 
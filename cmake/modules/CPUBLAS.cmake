@@ -0,0 +1,68 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+##############################################################################
+# Provide:
+#  - RAF_CPU_BLAS_VENDOR
+#  - RAF_CPU_BLAS_INCLUDE
+#  - RAF_CPU_BLAS_LIBRARY
+
+if (${RAF_USE_CPU_BLAS} STREQUAL "OFF")
+  message(STATUS "Build without CPU BLAS support")
+  set(RAF_CPU_BLAS_VENDOR "OFF")
+  set(RAF_CPU_BLAS_INCLUDE "")
+  set(RAF_CPU_BLAS_LIBRARY "")
+else()
+  if (${RAF_USE_CPU_BLAS} STREQUAL "ON")
+    set(__vendors mkl openblas blis)
+  else()
+    set(__vendors ${RAF_USE_CPU_BLAS})
+  endif()
+
+  set(RAF_CPU_BLAS_VENDOR "")
+  foreach(__vendor ${__vendors})
+    if (${__vendor} STREQUAL "mkl")
+      find_path(RAF_MKL_INCLUDE mkl_cblas.h
+        HINTS $ENV{MKLROOT}
+        PATH_SUFFIXES include include/mkl)
+      find_library(RAF_MKL_LIBRARY mkl_rt
+        HINTS $ENV{MKLROOT}
+        PATH_SUFFIXES lib lib/intel64 lib64)
+      set(__include ${RAF_MKL_INCLUDE})
+      set(__library ${RAF_MKL_LIBRARY})
+    elseif (${__vendor} STREQUAL "openblas")
+      find_path(RAF_OPENBLAS_INCLUDE cblas.h
+        HINTS $ENV{OPENBLAS_HOME}
+        PATH_SUFFIXES include/openblas include/x86_64-linux-gnu/openblas-pthread include)
+      find_library(RAF_OPENBLAS_LIBRARY openblas
+        HINTS $ENV{OPENBLAS_HOME}
+        PATH_SUFFIXES lib lib64)
+      set(__include ${RAF_OPENBLAS_INCLUDE})
+      set(__library ${RAF_OPENBLAS_LIBRARY})
+    elseif (${__vendor} STREQUAL "blis")
+      find_path(RAF_BLIS_INCLUDE cblas.h
+        HINTS $ENV{BLIS_HOME}
+        PATH_SUFFIXES include/blis include)
+      find_library(RAF_BLIS_LIBRARY blis
+        HINTS $ENV{BLIS_HOME}
+        PATH_SUFFIXES lib lib64)
+      set(__include ${RAF_BLIS_INCLUDE})
+      set(__library ${RAF_BLIS_LIBRARY})
+    else()
+      message(FATAL_ERROR "Unknown CPU BLAS vendor ${__vendor}, which should be mkl, openblas or blis")
+    endif()
+    if (__include AND __library)
+      set(RAF_CPU_BLAS_VENDOR ${__vendor})
+      set(RAF_CPU_BLAS_INCLUDE ${__include})
+      set(RAF_CPU_BLAS_LIBRARY ${__library})
+      break()
+    endif()
+  endforeach()
+
+  if (RAF_CPU_BLAS_VENDOR STREQUAL "")
+    message(FATAL_ERROR "Cannot find any of the CPU BLAS libraries: ${__vendors}")
+  endif()
+  message(STATUS "Found RAF_CPU_BLAS_VENDOR = ${RAF_CPU_BLAS_VENDOR}")
+  message(STATUS "Found RAF_CPU_BLAS_INCLUDE = ${RAF_CPU_BLAS_INCLUDE}")
+  message(STATUS "Found RAF_CPU_BLAS_LIBRARY = ${RAF_CPU_BLAS_LIBRARY}")
+endif()
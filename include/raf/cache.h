@@ -9,9 +9,17 @@
  */
 #pragma once
 
+#include <algorithm>
 #include <chrono>
+#include <fstream>
+#include <memory>
+#include <mutex>
+#include <set>
+#include <tuple>
+#include <dirent.h>
 #include <dmlc/memory_io.h>
 #include <sys/stat.h>
+#include <unistd.h>
 #include "./op.h"
 #include "./value.h"
 
@@ -148,6 +156,43 @@ class HashKey {
 #undef RAF_DEF_PRIMITIVE
 #undef RAF_APPEND_BYTES
 
+/*! \brief The eviction policy of a bounded cache. */
+enum class CacheEvictPolicy : int {
+  /*! \brief Evict the least recently used entry. */
+  kLRU = 0,
+  /*! \brief Evict the least frequently used entry. Ties are broken by recency. */
+  kLFU = 1,
+};
+
+inline CacheEvictPolicy StringToCacheEvictPolicy(const std::string& policy) {
+  if (policy == "lru" || policy == "LRU") {
+    return CacheEvictPolicy::kLRU;
+  } else if (policy == "lfu" || policy == "LFU") {
+    return CacheEvictPolicy::kLFU;
+  }
+  LOG(FATAL) << "ValueError: Unknown cache eviction policy " << policy
+             << ". Supported policies: lru, lfu";
+  throw;
+}
+
+namespace cache_utils {
+
+/*! \brief Read a size from the environment variable, or return the default value. */
+inline size_t GetEnvSize(const char* name, size_t default_value) {
+  const char* value = getenv(name);
+  if (value == nullptr || strlen(value) == 0) {
+    return default_value;
+  }
+  return static_cast<size_t>(std::stoull(value));
+}
+
+}  // namespace cache_utils
+
+/*!
+ * \brief A thread-safe key-value cache. The cache is unbounded by default. Call SetLimit to
+ * bound the number of entries, in which case entries are evicted by the given policy when a new
+ * entry is added. Values are returned by shared pointers, so they stay valid after eviction.
+ */
 template <typename T>
 class MetaCache {
  public:
@@ -163,18 +208,19 @@ class MetaCache {
     return cached_.count(key);
   }
 
-  const T* Get(const std::vector<uint8_t>& key) {
+  std::shared_ptr<const T> Get(const std::vector<uint8_t>& key) {
     const std::string key_str(key.begin(), key.end());
     return Get(key_str);
   }
 
-  const T* Get(const std::string& key) {
+  std::shared_ptr<const T> Get(const std::string& key) {
     std::lock_guard<std::mutex> lock(mu_);
     auto iter = cached_.find(key);
     if (iter == cached_.end()) {
       return nullptr;
     }
-    return &iter->second;
+    Touch(iter);
+    return iter->second.value;
   }
 
   void Set(const std::vector<uint8_t>& key, T val) {
@@ -183,18 +229,151 @@ class MetaCache {
   }
 
   void Set(const std::string& key, T val) {
+    bool added = false;
+    Add(key, std::move(val), &added);
+    if (!added) {
+      LOG(FATAL) << "KeyError: The key is already cached!";
+      throw;
+    }
+  }
+
+  std::shared_ptr<const T> Add(const std::vector<uint8_t>& key, T val, bool* added = nullptr) {
+    const std::string key_str(key.begin(), key.end());
+    return Add(key_str, std::move(val), added);
+  }
+
+  /*!
+   * \brief Add an entry if the key is not cached yet, e.g., when several threads build the same
+   * value concurrently.
+   * \param key The key.
+   * \param val The value.
+   * \param added Whether the entry is added, if not null.
+   * \return The cached value, which is the existing one if the key is already cached.
+   */
+  std::shared_ptr<const T> Add(const std::string& key, T val, bool* added = nullptr) {
     std::lock_guard<std::mutex> lock(mu_);
     auto iter = cached_.find(key);
+    if (added != nullptr) {
+      *added = iter == cached_.end();
+    }
     if (iter != cached_.end()) {
-      LOG(FATAL) << "KeyError: The key is already cached!";
-      throw;
+      Touch(iter);
+      return iter->second.value;
+    }
+    iter = cached_.emplace(key, Entry{std::make_shared<const T>(std::move(val)), 0, 0}).first;
+    Touch(iter);
+    Evict(&iter->first);
+    return iter->second.value;
+  }
+
+  /*!
+   * \brief Bound the cache. Existing entries are evicted immediately if they exceed the limit.
+   * \param max_entries The maximum number of entries. 0 means unlimited.
+   * \param policy The eviction policy.
+   */
+  void SetLimit(size_t max_entries, CacheEvictPolicy policy = CacheEvictPolicy::kLRU) {
+    std::lock_guard<std::mutex> lock(mu_);
+    max_entries_ = max_entries;
+    policy_ = policy;
+    // Rebuild the eviction order, as the ranks depend on the policy.
+    order_.clear();
+    if (IsBounded()) {
+      for (auto iter = cached_.begin(); iter != cached_.end(); ++iter) {
+        order_.emplace(Rank(iter->second), iter->second.tick, &iter->first);
+      }
     }
-    cached_.emplace(key, val);
+    Evict(nullptr);
+  }
+
+  /*! \brief Remove all entries. */
+  void Clear() {
+    std::lock_guard<std::mutex> lock(mu_);
+    order_.clear();
+    cached_.clear();
+  }
+
+  /*! \brief The number of cached entries. */
+  size_t Size() {
+    std::lock_guard<std::mutex> lock(mu_);
+    return cached_.size();
+  }
+
+  /*! \brief The number of evicted entries since the cache was created. */
+  size_t NumEvicted() {
+    std::lock_guard<std::mutex> lock(mu_);
+    return num_evicted_;
   }
 
  private:
+  struct Entry {
+    /*! \brief The cached value, which is shared with the callers of Get. */
+    std::shared_ptr<const T> value;
+    /*! \brief The number of accesses. */
+    uint64_t freq;
+    /*! \brief The logical time of the last access. */
+    uint64_t tick;
+  };
+
+  /*! \brief (rank, tick, key). Entries with the smallest rank and tick are evicted first. */
+  using OrderKey = std::tuple<uint64_t, uint64_t, const std::string*>;
+
+  using Iterator = typename std::unordered_map<std::string, Entry>::iterator;
+
+  inline bool IsBounded() const {
+    return max_entries_ > 0;
+  }
+
+  inline uint64_t Rank(const Entry& entry) const {
+    return policy_ == CacheEvictPolicy::kLFU ? entry.freq : 0;
+  }
+
+  /*! \brief Record an access of the entry. Must be called with the lock held. */
+  inline void Touch(Iterator iter) {
+    Entry& entry = iter->second;
+    if (IsBounded() && entry.freq > 0) {
+      order_.erase(OrderKey(Rank(entry), entry.tick, &iter->first));
+    }
+    entry.freq++;
+    entry.tick = ++clock_;
+    if (IsBounded()) {
+      order_.emplace(Rank(entry), entry.tick, &iter->first);
+    }
+  }
+
+  /*!
+   * \brief Evict entries until the limit is satisfied. Must be called with the lock held.
+   * \param keep The key of the entry that must not be evicted, or nullptr.
+   */
+  inline void Evict(const std::string* keep) {
+    if (!IsBounded()) {
+      return;
+    }
+    auto order_iter = order_.begin();
+    while (cached_.size() > max_entries_ && order_iter != order_.end()) {
+      const std::string* key = std::get<2>(*order_iter);
+      if (key == keep) {
+        ++order_iter;
+        continue;
+      }
+      auto iter = cached_.find(*key);
+      order_iter = order_.erase(order_iter);
+      cached_.erase(iter);
+      num_evicted_++;
+    }
+  }
+
   /*! \brief The cache mapping from string key to value. */
-  std::unordered_map<std::string, T> cached_;
+  std::unordered_map<std::string, Entry> cached_;
+  /*! \brief The eviction order of entries. Only maintained when the cache is bounded. */
+  std::set<OrderKey> order_;
+  /*! \brief The maximum number of entries. 0 means unlimited. */
+  size_t max_entries_ = 0;
+  /*! \brief The eviction policy. */
+  CacheEvictPolicy policy_ = CacheEvictPolicy::kLRU;
+  /*! \brief The number of evicted entries. */
+  size_t num_evicted_ = 0;
+  /*! \brief The logical clock for recency. */
+  uint64_t clock_ = 0;
   /*! \brief The thread-safe lock. */
   std::mutex mu_;
 };
@@ -202,12 +381,41 @@ class MetaCache {
 class MetaCacheMetric {
  public:
   virtual std::unordered_map<std::string, size_t> GetMetric() = 0;
+  /*!
+   * \brief Bound the cache. 0 means unlimited.
+   * \param max_entries The maximum number of in-memory entries.
+   * \param max_disk_bytes The maximum bytes of the persistent cache directory.
+   * \param policy The in-memory eviction policy ("lru" or "lfu").
+   */
+  virtual void SetLimit(size_t max_entries, size_t max_disk_bytes,
+                        const std::string& policy) = 0;
+  /*!
+   * \brief Remove the oldest persistent entries until the directory fits the disk budget.
+   * \return The number of removed entries.
+   */
+  virtual size_t CollectGarbage() = 0;
 };
 
+/*!
+ * \brief A MetaCache that optionally persists entries to the disk. The following environment
+ * variables configure the cache:
+ * - RAF_PERSIST_CACHE: Set to 1 to enable persistence.
+ * - RAF_PERSIST_CACHE_PATH: The cache root directory. Default ~/.raf_cache.
+ * - RAF_PERSIST_CACHE_MAX_MB: The disk budget of each persistent cache. When exceeded, entries
+ *   with the oldest timestamps are removed. Default 0 (unlimited).
+ * - RAF_CACHE_MAX_ENTRIES: The maximum number of in-memory entries. Default 0 (unlimited).
+ * - RAF_CACHE_EVICT_POLICY: The in-memory eviction policy, "lru" (default) or "lfu".
+ */
 template <typename T>
 class MetaPersistCache : public MetaCache<T>, public MetaCacheMetric {
  public:
   MetaPersistCache(const std::string persist_name) : persist_name_(persist_name) {
+    // The in-memory limit.
+    const char* policy = getenv("RAF_CACHE_EVICT_POLICY");
+    MetaCache<T>::SetLimit(cache_utils::GetEnvSize("RAF_CACHE_MAX_ENTRIES", 0),
+                           policy == nullptr ? CacheEvictPolicy::kLRU
+                                             : StringToCacheEvictPolicy(policy));
+
     // Enable persistent by users.
     const char* enable_persist = getenv("RAF_PERSIST_CACHE");
     if (enable_persist != nullptr && strcmp(enable_persist, "1") == 0) {
@@ -232,14 +440,22 @@ class MetaPersistCache : public MetaCache<T>, public MetaCacheMetric {
 
     // Create the directory for this cache.
     CreateDir(path_);
+
+    // Account the existing entries and apply the disk budget.
+    max_disk_bytes_ = cache_utils::GetEnvSize("RAF_PERSIST_CACHE_MAX_MB", 0) << 20;
+    disk_bytes_ = 0;
+    for (const auto& name : ListDir(path_)) {
+      disk_bytes_ += DirBytes(path_ + "/" + name);
+    }
+    CollectGarbage();
   }
 
-  const T* Get(const std::vector<uint8_t>& key) {
+  std::shared_ptr<const T> Get(const std::vector<uint8_t>& key) {
     const std::string key_str(key.begin(), key.end());
     return Get(key_str);
   }
 
-  const T* Get(const std::string& key) {
+  std::shared_ptr<const T> Get(const std::string& key) {
     AddMetric("CacheGet", 1);
 
     // Cache hit.
@@ -265,8 +481,11 @@ class MetaPersistCache : public MetaCache<T>, public MetaCacheMetric {
     AddMetric("PersistCacheHit", 1);
 
     try {
-      MetaCache<T>::Set(key, T::Load(persist_path));
-      return MetaCache<T>::Get(key);
+      // Another thread may have added the entry after the in-memory lookup.
+      auto val = MetaCache<T>::Add(key, T::Load(persist_path));
+      // Refresh the timestamp so that the garbage collection keeps recently used entries.
+      WriteTimestamp(persist_path);
+      return val;
     } catch (dmlc::Error& e) {
       AddMetric("PersistCacheLoadFailure", 1);
       LOG(WARNING) << "Failed to load persist entry " << path_ << ": " << e.what();
@@ -281,10 +500,29 @@ class MetaPersistCache : public MetaCache<T>, public MetaCacheMetric {
   }
 
   void Set(const std::string& key, T val) {
+    bool added = false;
+    Add(key, std::move(val), &added);
+    if (!added) {
+      LOG(FATAL) << "KeyError: The key is already cached!";
+      throw;
+    }
+  }
+
+  std::shared_ptr<const T> Add(const std::vector<uint8_t>& key, T val, bool* added = nullptr) {
+    const std::string key_str(key.begin(), key.end());
+    return Add(key_str, std::move(val), added);
+  }
+
+  /*! \brief Add and persist an entry if the key is not cached yet. See MetaCache::Add. */
+  std::shared_ptr<const T> Add(const std::string& key, T val, bool* added = nullptr) {
     AddMetric("CacheSet", 1);
-    MetaCache<T>::Set(key, val);
-    if (!persist_) {
-      return;
+    bool is_added = false;
+    auto ret = MetaCache<T>::Add(key, std::move(val), &is_added);
+    if (added != nullptr) {
+      *added = is_added;
+    }
+    if (!persist_ || !is_added) {
+      return ret;
     }
 
     std::lock_guard<std::mutex> lock(mu_);
@@ -294,23 +532,53 @@ class MetaPersistCache : public MetaCache<T>, public MetaCacheMetric {
 
     // Persist the cache value.
     try {
-      if (!val.Save(persist_path)) {
+      if (!ret->Save(persist_path)) {
         throw;
       }
     } catch (dmlc::Error& e) {
       AddMetric("PersistCacheSaveFailure", 1);
       LOG(WARNING) << "Failed to persist cache entry to " << path_ << ": " << e.what();
-      return;
+      return ret;
     }
 
-    std::ofstream metadata_file(persist_path + "/timestamp");
-    metadata_file << std::chrono::system_clock::to_time_t(std::chrono::system_clock::now())
-                  << std::endl;
-    metadata_file.close();
+    WriteTimestamp(persist_path);
+    disk_bytes_ += DirBytes(persist_path);
+    if (max_disk_bytes_ > 0 && disk_bytes_ > max_disk_bytes_) {
+      CollectGarbageImpl();
+    }
+    return ret;
   }
 
   std::unordered_map<std::string, size_t> GetMetric() override {
-    return metrics_;
+    std::unordered_map<std::string, size_t> ret;
+    {
+      std::lock_guard<std::mutex> lock(metric_mu_);
+      ret = metrics_;
+    }
+    ret["Entries"] = MetaCache<T>::Size();
+    ret["Evict"] = MetaCache<T>::NumEvicted();
+    if (persist_) {
+      std::lock_guard<std::mutex> lock(mu_);
+      ret["DiskBytes"] = disk_bytes_;
+    }
+    return ret;
+  }
+
+  void SetLimit(size_t max_entries, size_t max_disk_bytes, const std::string& policy) override {
+    MetaCache<T>::SetLimit(max_entries, StringToCacheEvictPolicy(policy));
+    {
+      std::lock_guard<std::mutex> lock(mu_);
+      max_disk_bytes_ = max_disk_bytes;
+    }
+    CollectGarbage();
+  }
+
+  size_t CollectGarbage() override {
+    if (!persist_) {
+      return 0;
+    }
+    std::lock_guard<std::mutex> lock(mu_);
+    return CollectGarbageImpl();
   }
 
  private:
@@ -335,10 +603,97 @@ class MetaPersistCache : public MetaCache<T>, public MetaCacheMetric {
     return ret;
   }
 
+  /*! \brief List the names of the entries in a directory, excluding "." and "..". */
+  inline std::vector<std::string> ListDir(const std::string& path) {
+    std::vector<std::string> ret;
+    DIR* dir = opendir(path.c_str());
+    if (dir == nullptr) {
+      return ret;
+    }
+    while (struct dirent* ent = readdir(dir)) {
+      std::string name(ent->d_name);
+      if (name != "." && name != "..") {
+        ret.push_back(name);
+      }
+    }
+    closedir(dir);
+    return ret;
+  }
+
+  /*! \brief The total bytes of the regular files in an entry directory. */
+  inline size_t DirBytes(const std::string& path) {
+    size_t ret = 0;
+    struct stat st;
+    for (const auto& name : ListDir(path)) {
+      if (stat((path + "/" + name).c_str(), &st) == 0 && S_ISREG(st.st_mode)) {
+        ret += st.st_size;
+      }
+    }
+    return ret;
+  }
+
+  /*! \brief Remove an entry directory, which only contains regular files. */
+  inline void RemoveDir(const std::string& path) {
+    for (const auto& name : ListDir(path)) {
+      unlink((path + "/" + name).c_str());
+    }
+    if (rmdir(path.c_str()) == -1) {
+      LOG(WARNING) << "Failed to remove persist entry " << path << ": " << strerror(errno);
+    }
+  }
+
+  inline void WriteTimestamp(const std::string& persist_path) {
+    std::ofstream metadata_file(persist_path + "/" + TIMESTAMP_FILE);
+    metadata_file << std::chrono::system_clock::to_time_t(std::chrono::system_clock::now())
+                  << std::endl;
+    metadata_file.close();
+  }
+
+  /*! \brief Read the timestamp of an entry. Entries without a valid timestamp are the oldest. */
+  inline int64_t ReadTimestamp(const std::string& persist_path) {
+    std::ifstream ifs(persist_path + "/" + TIMESTAMP_FILE);
+    int64_t timestamp = 0;
+    if (!(ifs >> timestamp)) {
+      return 0;
+    }
+    return timestamp;
+  }
+
+  /*! \brief Remove the oldest entries until the disk budget is met. Must hold the lock. */
+  inline size_t CollectGarbageImpl() {
+    // Re-scan the directory, as other processes may share it.
+    std::vector<std::tuple<int64_t, size_t, std::string>> entries;
+    disk_bytes_ = 0;
+    for (const auto& name : ListDir(path_)) {
+      auto persist_path = path_ + "/" + name;
+      size_t nbytes = DirBytes(persist_path);
+      disk_bytes_ += nbytes;
+      entries.emplace_back(ReadTimestamp(persist_path), nbytes, persist_path);
+    }
+    if (max_disk_bytes_ == 0 || disk_bytes_ <= max_disk_bytes_) {
+      return 0;
+    }
+    std::sort(entries.begin(), entries.end());
+    size_t num_removed = 0;
+    for (const auto& entry : entries) {
+      if (disk_bytes_ <= max_disk_bytes_) {
+        break;
+      }
+      RemoveDir(std::get<2>(entry));
+      disk_bytes_ -= std::get<1>(entry);
+      num_removed++;
+    }
+    AddMetric("PersistCacheEvict", num_removed);
+    return num_removed;
+  }
+
   inline void AddMetric(const std::string name, size_t val) {
+    std::lock_guard<std::mutex> lock(metric_mu_);
     metrics_[name] += val;
   }
 
+  /*! \brief The persist timestamp file name. */
+  static constexpr const char* TIMESTAMP_FILE = "timestamp";
   /*! \brief The cache metrics for analysis. */
   std::unordered_map<std::string, size_t> metrics_;
   /*! \brief Persist directory name. */
@@ -347,8 +702,14 @@ class MetaPersistCache : public MetaCache<T>, public MetaCacheMetric {
   std::string path_;
   /*! \brief Whether to presist values. */
   bool persist_ = false;
+  /*! \brief The maximum bytes of the persist directory. 0 means unlimited. */
+  size_t max_disk_bytes_ = 0;
+  /*! \brief The current bytes of the persist directory. */
+  size_t disk_bytes_ = 0;
   /*! \brief The thread-safe lock. */
   std::mutex mu_;
+  /*! \brief The lock of metrics, which are updated with or without holding mu_. */
+  std::mutex metric_mu_;
 };
 
 PackedMetricMap DumpMetric(const std::string& cache_name);
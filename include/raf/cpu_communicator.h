@@ -0,0 +1,79 @@
+/*
+ * Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+ * SPDX-License-Identifier: Apache-2.0
+ */
+
+/*!
+ * \file cpu_communicator.h
+ * \brief CPU Communicator, which implements the collectives among the processes on one host over
+ * POSIX shared memory, or over TCP loopback sockets as a fallback.
+ */
+#pragma once
+#include <memory>
+#include <string>
+#include "raf/communicator.h"
+#include "raf/device.h"
+
+namespace raf {
+namespace distributed {
+namespace communicator {
+
+/*! \brief The reduction of a CPU collective. */
+enum class CPUReduceOp { kSum, kProd, kMin, kMax, kAvg };
+
+/*!
+ * \brief Parse the computation attribute of a collective op.
+ * \param computation One of "sum", "prod", "min", "max" and "avg".
+ * \return The reduction.
+ */
+CPUReduceOp ParseCPUReduceOp(const std::string& computation);
+
+/*! \brief The transport that moves the data among the ranks of a CPU communicator. */
+class CPUTransport;
+
+class CPUCommunicatorObj final : public CommunicatorObj {
+ public:
+  /*! \brief The name of the transport, "shm", "tcp" or "local" if the communicator has 1 rank. */
+  std::string transport;
+  /*! \brief The transport implementation. */
+  std::unique_ptr<CPUTransport> impl;
+  /*! \brief Prevent the global communicator from being released in advance. */
+  Communicator parent_comm;
+
+  /*! \brief Block until all ranks reach the barrier. */
+  void Barrier();
+  /*! \brief Reduce count elements of all ranks, and write the result to out of all ranks. */
+  void AllReduce(const void* in, void* out, int64_t count, DType dtype, CPUReduceOp op);
+  /*!
+   * \brief Reduce count elements of all ranks to the root. The non-root ranks may also receive
+   * the result in out, which has to be as large as in.
+   */
+  void Reduce(const void* in, void* out, int64_t count, DType dtype, CPUReduceOp op, int root);
+  /*! \brief Concatenate nbytes of all ranks in the rank order to out of all ranks. */
+  void AllGather(const void* in, void* out, int64_t nbytes);
+  /*!
+   * \brief Reduce size x count elements of all ranks, and write the count elements of the i-th
+   * part of the result to out of rank i.
+   */
+  void ReduceScatter(const void* in, void* out, int64_t count, DType dtype, CPUReduceOp op);
+  /*! \brief Copy nbytes of in of the root to out of all ranks. */
+  void Broadcast(const void* in, void* out, int64_t nbytes, int root);
+  /*! \brief Send nbytes to the peer. */
+  void Send(const void* buf, int64_t nbytes, int peer);
+  /*! \brief Receive nbytes from the peer. */
+  void Recv(void* buf, int64_t nbytes, int peer);
+
+  ~CPUCommunicatorObj();
+  static constexpr const char* _type_key = "raf.distributed.CPUCommunicator";
+  RAF_FINAL_OBJECT(CPUCommunicatorObj, CommunicatorObj);
+};
+
+class CPUCommunicator final : public Communicator {
+ public:
+  static CPUCommunicator make(Value rank_list);
+  RAF_OBJECT_REF(CPUCommunicator, Communicator, CPUCommunicatorObj);
+};
+
+}  // namespace communicator
+}  // namespace distributed
+}  // namespace raf
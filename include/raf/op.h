@@ -203,6 +203,18 @@ std::shared_ptr<OpEnv> Dispatch(const CallValues& call);
  */
 CallValues CreateDummyCallValues(Call call, Device device);
 
+/*!
+ * \brief Make a byte string key of a call, which covers the op, the attributes, the types of the
+ * input and output tensors, the device and the dialect preference.
+ * \param call The call values.
+ * \param key The key.
+ * \param args The argument values of the call, if not null.
+ * \return Whether the call can be keyed. It cannot if the op has no FRAFSchemaToValues, or an
+ * argument is not a tensor or an attribute, e.g., a closure.
+ */
+bool MakeCallValuesKey(const CallValues& call, std::string* key,
+                       ir::Array<value::Value>* args = nullptr);
+
 // Operator pattern
 using tvm::relay::kBroadcast;
 using tvm::relay::kCommReduce;
@@ -244,6 +256,9 @@ using FRAFAnnotateTarget =
 
 using FRAFSchemaFieldIndex = registry::TypedPackedFunc<int(const std::string&)>;
 
+/*! \brief Convert the schema of an op back to its argument values, the inverse of FRAFSchema. */
+using FRAFSchemaToValues = registry::TypedPackedFunc<ir::Array<value::Value>(const ir::Attrs&)>;
+
 using FPrimalGradient = registry::TypedPackedFunc<
     // returns: op's contribution to igrads
     ir::Array<ir::Expr>(
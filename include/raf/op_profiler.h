@@ -13,6 +13,7 @@
 #include "raf/cache.h"
 #include "op.h"
 #include "op_utils.h"
+#include <mutex>
 #include <unordered_map>
 
 #ifdef RAF_USE_CUDA
@@ -31,6 +32,12 @@ using LatencyAndWorkspaceMapT =
     std::unordered_map<std::string, std::pair<std::vector<float>, int64_t>>;
 using OpEnvMapT = std::unordered_map<std::string, OpEnvPtr>;
 
+/*!
+ * \brief The version of the on-disk latency database. Bump it whenever the cache key or the
+ * measurement changes, so that databases produced by older versions are invalidated.
+ */
+constexpr int kOpProfilerDBVersion = 2;
+
 /*! \brief A class to JIT op, create dummy input data, and allocate memory buffers for profiling. */
 class OpWithData {
  public:
@@ -118,10 +125,41 @@ class OpProfiler {
     op_env_cache_.clear();
   }
 
+  /*!
+   * \brief Load the profiled latencies from an on-disk database into the latency cache.
+   * Databases with a different version are ignored.
+   * \param path The path of the database.
+   * \param overwrite Whether to overwrite the entries that are already in the cache.
+   * \return The number of loaded entries.
+   */
+  int ImportDB(const std::string& path, bool overwrite = false);
+
+  /*!
+   * \brief Write all entries in the latency cache to an on-disk database. The database can be
+   * shared with other processes and machines, because the entries are keyed by the device.
+   * \param path The path of the database.
+   * \return The number of written entries.
+   */
+  int ExportDB(const std::string& path);
+
+  /*!
+   * \brief Warm load the given database and append newly profiled entries to it afterward.
+   * A database with a different version is invalidated and overwritten.
+   * \param path The path of the database. An empty path detaches the current database.
+   * \return The number of loaded entries.
+   */
+  int AttachDB(const std::string& path);
+
  protected:
   OpProfiler(const Device& device) : device_(device) {
   }
 
+  /*!
+   * \brief The signature of the target device, which is a part of the cache key so that
+   * entries profiled on different hardware can be merged into one database.
+   */
+  virtual std::string DeviceSignature() = 0;
+
   /*! \brief The target device. */
   Device device_;
   /*! \brief A cache to store the latency of profiled ops in microseconds. Cache key is
@@ -129,11 +167,38 @@ class OpProfiler {
   LatencyAndWorkspaceMapT latency_and_workspace_size_cache_;
   /*! \brief A cache to store built OpEnv. */
   OpEnvMapT op_env_cache_;
+  /*! \brief The attached database that newly profiled entries are appended to. */
+  std::string db_path_;
+  /*! \brief The lock of the attached database. */
+  std::mutex db_mu_;
 
  private:
   /*!
-   * \brief Generate a byte string hash for the given call node using its op as well as
-   * argument and return types.
+   * \brief Append one entry of the latency cache to the attached database, if any.
+   * \param key The cache key.
+   */
+  void AppendToDB(const std::string& key);
+
+  /*!
+   * \brief Hash a constant. Tensors are hashed by their dtypes, shapes and bytes, because the
+   * structural hash of a tensor value hashes its data pointer.
+   * \param key The hash key to be updated.
+   * \param value The value of the constant.
+   */
+  static void HashConstant(HashKey* key, const ObjectRef& value);
+
+  /*!
+   * \brief Hash a fused function by its structure and its constants. The constants are hashed by
+   * HashConstant instead of the structural hash.
+   * \param key The hash key to be updated.
+   * \param func The function to be hashed.
+   */
+  static void HashFunction(HashKey* key, const Function& func);
+
+  /*!
+   * \brief Generate a byte string hash for the given call node using its op, attributes as well
+   * as argument and return types. Constants, including the ones in fused functions, are hashed by
+   * their values, so the hash is stable across processes.
    *
    * \param call The call node to be hashed.
    * \return The hashed key.
@@ -141,20 +206,24 @@ class OpProfiler {
   HashKey HashCall(const Call& call) {
     HashKey key;
 
-    // Hash op name. Note that we directly use the object address as the key
-    // because all fused op closures have the same name at this stage.
+    // Hash op name. Note that we hash the structure of fused op closures
+    // because they all have the same name at this stage.
     if (auto op_node = call->op.as<OpNode>()) {
       key << op_node->name;
     } else if (auto fn_node = call->op.as<FunctionNode>()) {
-      key << uint64_t(ObjectPtrHash()(GetRef<Function>(fn_node)));
+      HashFunction(&key, GetRef<Function>(fn_node));
     } else {
       LOG(FATAL) << "OpProfiler does not deal with " << call->op->GetTypeKey();
       throw;
     }
 
-    // Hash argument and return types.
+    // Hash argument and return types, as well as the values of constant arguments
+    // (i.e., op attributes).
     for (auto arg : call->args) {
       key << raf::ir::AsText(arg->checked_type(), false);
+      if (auto const_node = arg.as<RelayConstantNode>()) {
+        HashConstant(&key, const_node->value);
+      }
     }
     key << raf::ir::AsText(call->checked_type(), false);
     return key;
@@ -231,6 +300,9 @@ class CPUOpProfiler : public OpProfiler {
   virtual ~CPUOpProfiler() {
   }
 
+ protected:
+  virtual std::string DeviceSignature();
+
  private:
   /*!
    * \brief The function that actually executes the op on the device.
@@ -254,6 +326,9 @@ class CPUOpProfiler : public OpProfiler {
   virtual std::vector<float> RunOpGroup(const std::vector<OpWithDataPtr>& op_with_datas,
                                         int32_t warmup = 10, int32_t exec_number = 10,
                                         int32_t repeat = 1);
+
+  /*! \brief The cached device signature. */
+  std::string device_signature_;
 };
 
 #ifdef RAF_USE_CUDA
@@ -279,6 +354,9 @@ class CUDAOpProfiler : public OpProfiler {
     }
   }
 
+ protected:
+  virtual std::string DeviceSignature();
+
  private:
   /*!
    * \brief The function that actually executes the op on the device.
@@ -310,6 +388,8 @@ class CUDAOpProfiler : public OpProfiler {
   std::unordered_map<int, cudaStream_t> streams_;
   /*! \brief CUDA device API. */
   tvm::runtime::DeviceAPI* cuda_api_;
+  /*! \brief The cached device signature. */
+  std::string device_signature_;
 };
 #endif
 
@@ -0,0 +1,163 @@
+/*
+ * Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+ * SPDX-License-Identifier: Apache-2.0
+ */
+
+/*!
+ * \file op_stats.h
+ * \brief Aggregated per-op statistics. Unlike the trace profiler, which emits a begin/end event
+ * for every op invocation, this profiler only keeps counters and a latency histogram for each
+ * (op, shape key) pair, so its memory footprint does not grow with the number of invocations.
+ */
+#pragma once
+#include <array>
+#include <atomic>
+#include <cstdint>
+#include <memory>
+#include <mutex>
+#include <string>
+#include <unordered_map>
+#include <vector>
+
+namespace raf {
+namespace profiler {
+
+/*!
+ * \brief A streaming log-linear latency histogram in nanoseconds. Each power of two is split into
+ * 2^kSubBucketBits linear sub-buckets, so a percentile has a relative error of at most
+ * 1 / 2^kSubBucketBits.
+ */
+class LatencyHistogram {
+ public:
+  static constexpr int kSubBucketBits = 4;
+  static constexpr int kSubBuckets = 1 << kSubBucketBits;
+  /*! \brief Latencies from 2^kMaxExponent ns (~18 minutes) go to the last bucket. */
+  static constexpr int kMaxExponent = 40;
+  static constexpr int kNumBuckets = (kMaxExponent - kSubBucketBits + 1) * kSubBuckets;
+
+  /*! \brief Add a latency in nanoseconds. */
+  void Add(uint64_t latency_ns);
+  /*!
+   * \brief Get the approximated percentile.
+   * \param p The percentile in [0, 100].
+   * \return The midpoint of the bucket that contains the percentile, in nanoseconds.
+   */
+  uint64_t Percentile(double p) const;
+
+ private:
+  static int BucketIndex(uint64_t latency_ns);
+  static uint64_t BucketLowerBound(int index);
+
+  std::array<uint64_t, kNumBuckets> counts_{};
+  uint64_t total_count_ = 0;
+};
+
+/*! \brief The aggregated statistics of an (op, shape key) pair. */
+struct OpStatsEntry {
+  /*! \brief The op name. */
+  std::string name;
+  /*! \brief The shapes and dtypes of the inputs and outputs. */
+  std::string shape_key;
+  /*! \brief The number of invocations. */
+  uint64_t count = 0;
+  /*! \brief The total, min and max latency in nanoseconds. */
+  uint64_t total_ns = 0;
+  uint64_t min_ns = UINT64_MAX;
+  uint64_t max_ns = 0;
+  /*! \brief The bytes of the outputs and workspace of one invocation. */
+  int64_t bytes_per_call = 0;
+  /*! \brief The latency histogram. */
+  LatencyHistogram histogram;
+};
+
+/*!
+ * \brief The aggregated op statistics profiler. Executors call Register once per OpEnv to get an
+ * entry ID, and then Record for every invocation. Record only writes a fixed-size record to a
+ * preallocated lock-free ring buffer, which is aggregated into the entries when it is full or
+ * when the statistics are queried, so the hot path performs no heap allocation and takes no lock
+ * unless the ring buffer is full.
+ */
+class OpStats {
+ public:
+  /*! \brief The capacity of the ring buffer in records. Must be a power of two. */
+  static constexpr size_t kCapacity = 1 << 16;
+
+  static OpStats* Get();
+
+  /*! \brief Whether the statistics are being collected. */
+  inline bool IsEnabled() const {
+    return enabled_.load(std::memory_order_acquire);
+  }
+
+  /*!
+   * \brief Enable or disable the collection. The ring buffer is allocated when the collection is
+   * enabled for the first time.
+   */
+  void SetEnabled(bool enabled);
+
+  /*!
+   * \brief Get the entry ID of an (op, shape key) pair, creating the entry if it does not exist.
+   * \param name The op name.
+   * \param shape_key The shapes and dtypes of the inputs and outputs.
+   * \param bytes_per_call The bytes of the outputs and workspace of one invocation.
+   * \return The entry ID.
+   */
+  int Register(const std::string& name, const std::string& shape_key, int64_t bytes_per_call);
+
+  /*!
+   * \brief Record an invocation of an entry.
+   * \param entry_id The entry ID returned by Register.
+   * \param latency_ns The latency of the invocation in nanoseconds.
+   */
+  void Record(int entry_id, uint64_t latency_ns);
+
+  /*! \brief Clear all entries and records. Entry IDs obtained before are invalidated. */
+  void Reset();
+
+  /*! \brief The generation of the entries, which is bumped by Reset. */
+  inline uint64_t generation() const {
+    return generation_.load(std::memory_order_acquire);
+  }
+
+  /*! \brief The number of records whose entries were cleared by Reset before aggregation. */
+  inline uint64_t num_dropped() const {
+    return num_dropped_.load(std::memory_order_relaxed);
+  }
+
+  /*! \brief Get the statistics of all entries in JSON. */
+  std::string GetStats();
+
+ private:
+  /*! \brief A slot of the ring buffer. */
+  struct Slot {
+    std::atomic<uint64_t> seq;
+    int32_t entry_id;
+    uint64_t latency_ns;
+  };
+
+  OpStats();
+  /*! \brief Aggregate all committed records in the ring buffer. Requires mu_. */
+  void Drain();
+
+  /*! \brief Whether the statistics are being collected. */
+  std::atomic<bool> enabled_{false};
+  /*! \brief The generation of the entries. */
+  std::atomic<uint64_t> generation_{0};
+  /*! \brief The number of dropped records. */
+  std::atomic<uint64_t> num_dropped_{0};
+  /*! \brief The ring buffer. */
+  std::unique_ptr<Slot[]> ring_;
+  /*! \brief The position of the next record to write. */
+  std::atomic<uint64_t> head_{0};
+  /*! \brief The position of the next record to aggregate. */
+  uint64_t tail_ = 0;
+  /*! \brief The aggregated entries. */
+  std::vector<OpStatsEntry> entries_;
+  /*! \brief The map from "name|shape_key" to the entry ID. */
+  std::unordered_map<std::string, int> entry_ids_;
+  /*! \brief The mutex for the entries and draining. */
+  std::mutex mu_;
+};
+
+}  // namespace profiler
+}  // namespace raf
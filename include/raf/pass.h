@@ -112,6 +112,14 @@ Pass CanonicalizeOps();
  */
 Pass InferType();
 
+/*!
+ * \brief Create a type inference pass.
+ * \param incremental Whether to keep the checked types of the unchanged let bindings and only
+ * re-infer the changed ones (i.e., the ones without checked types) and their dependants.
+ * \return The created pass.
+ */
+Pass InferType(bool incremental);
+
 /*!
  * \brief Create a type erasing pass.
  * \return The created pass.
@@ -248,6 +256,13 @@ Pass FuseTVM();
  */
 Pass DispatchDialect();
 
+/*!
+ * \brief Pre-pack the constant weights of the TVM ops to the layouts requested by their tuned
+ * auto-scheduler schedules, which should be applied in the current dispatch context.
+ * \return The created pass.
+ */
+Pass AutoSchedulerLayoutRewrite();
+
 /*!
  * \brief A pass that eliminates dead code.
  * \return The created pass.
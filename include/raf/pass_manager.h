@@ -10,6 +10,9 @@
 
 #pragma once
 
+#include <mutex>
+#include <string>
+#include <vector>
 #include <tvm/ir/transform.h>
 
 #include "raf/op.h"
@@ -21,6 +24,7 @@ namespace pass {
 
 using namespace raf::ir;
 using tvm::transform::Pass;
+using tvm::transform::PassContext;
 using tvm::transform::PassInfo;
 
 class RAFSequentialNode;
@@ -53,5 +57,62 @@ class RAFSequential : public Pass {
   using ContainerType = RAFSequential;
 };
 
+/*! \brief The profiled statistics of one pass executed by RAFSequential. */
+struct PassProfileEntry {
+  /*! \brief The pass name. */
+  std::string name;
+  /*! \brief The nesting depth of the RAFSequential that runs the pass. */
+  int depth;
+  /*! \brief The start and end timestamps in microseconds. */
+  uint64_t start_us, end_us;
+  /*! \brief The number of let-bindings in the module before and after the pass. */
+  int64_t lets_before, lets_after;
+  /*! \brief The number of calls in the module before and after the pass. */
+  int64_t calls_before, calls_after;
+  /*! \brief The resident set size and the peak resident set size after the pass in KB. */
+  int64_t rss_kb, peak_rss_kb;
+};
+
+/*!
+ * \brief A profiler that records the wall time, the IR size and the memory usage of every pass
+ * executed by RAFSequential. It is enabled either globally, or by the PassContext config
+ * "raf.pass_manager.profile". The passes are also emitted to the base profiler under the category
+ * "Pass" if it is profiling.
+ */
+class PassProfiler {
+ public:
+  static PassProfiler* Get();
+
+  /*! \brief Whether to profile the passes executed in the given pass context. */
+  bool IsProfiling(const PassContext& pass_ctx);
+
+  void SetEnabled(bool enabled) {
+    enabled_ = enabled;
+  }
+
+  void AddEntry(PassProfileEntry entry) {
+    std::lock_guard<std::mutex> lock(mu_);
+    entries_.push_back(std::move(entry));
+  }
+
+  void Reset() {
+    std::lock_guard<std::mutex> lock(mu_);
+    entries_.clear();
+  }
+
+  /*! \brief Dump the profiled entries to a JSON array in the execution order. */
+  std::string GetProfile();
+
+ private:
+  PassProfiler() = default;
+
+  /*! \brief Whether the profiler is enabled globally. */
+  bool enabled_ = false;
+  /*! \brief The profiled entries. */
+  std::vector<PassProfileEntry> entries_;
+  /*! \brief The lock of the entries. */
+  std::mutex mu_;
+};
+
 }  // namespace pass
 }  // namespace raf
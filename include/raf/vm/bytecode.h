@@ -237,6 +237,11 @@ struct Instruction {
       Index output_size;
       /*! \brief The arguments to pass to the packed function. */
       RegName* args;
+      /*!
+       * \brief Whether the shapes and dtypes of all arguments are known at compile time. If so,
+       * the VM binds the OpEnv to this instruction once and skips the cache key computation.
+       */
+      bool is_static;
     } invoke_jit;
     struct /* InferType Operands */ {
       /*! \brief The register containing the OpValue to invoke OpType. */
@@ -419,10 +424,11 @@ struct Instruction {
    * \param arity The arity of the function.
    * \param output_size The number of outputs of the packed function.
    * \param args The argument registers.
+   * \param is_static Whether the shapes of all arguments are static.
    * \return The invoke JIT operator instruction.
    */
   static Instruction InvokeJit(RegName op_reg, Index arity, Index output_size,
-                               const std::vector<RegName>& args);
+                               const std::vector<RegName>& args, bool is_static = false);
   /*!
    * \brief Construct an InferType instruction.
    * \param op_reg The register containing the OpValue to invoke OpType.
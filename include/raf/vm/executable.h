@@ -10,6 +10,7 @@
 #pragma once
 
 #include <string>
+#include <tuple>
 #include <unordered_map>
 #include <utility>
 #include <vector>
@@ -33,10 +34,12 @@ struct VMFunction;
  * to run in a virtual machine.
  *
  *  - Global section, containing all globals.
- *  - Constant section, storing the constant pool.
+ *  - Constant section, storing the constant pool. The tensor data of the constants can be
+ *  stored in a separate constant file instead, see Save.
  *  - Primitive name section, containing the function name of the primitive ops
  *  used by the virtual machine.
  *  - Code section, handling the VM functions and bytecode.
+ *  - Kernel section (optional), recording the cache keys of the kernels packaged in `lib`.
  */
 class Executable : public tvm::runtime::ModuleNode {
  public:
@@ -54,19 +57,27 @@ class Executable : public tvm::runtime::ModuleNode {
    * \brief Serialize the executable into global section, constant section, and
    * code section.
    *
+   * \param const_path The path of the constant file. If it is not empty, the tensor data of the
+   * constants is written to this file, each at a page-aligned offset, and the constant section
+   * only records the offsets, so that Load can map the file instead of copying it.
+   *
    * \return The binary representation of the VM.
    */
-  TVMByteArray Save();
+  TVMByteArray Save(const std::string& const_path = "");
 
   /*!
    * \brief Load the saved VM executable.
    *
    * \param code The bytecode in string.
    * \param lib The compiled runtime library.
+   * \param const_path The path of the constant file, which is required if the executable was
+   * saved with one. The file is memory-mapped copy-on-write and the constants refer to the mapped
+   * pages without a copy, so processes loading the same file share the pages in the page cache.
    *
    * \return exe The constructed executable.
    */
-  static tvm::runtime::Module Load(const std::string& code, const tvm::runtime::Module lib);
+  static tvm::runtime::Module Load(const std::string& code, const tvm::runtime::Module lib,
+                                   const std::string& const_path = "");
 
   /*!
    * \brief Get the serialized form of the `functions`. This is
@@ -118,6 +129,17 @@ class Executable : public tvm::runtime::ModuleNode {
     return lib;
   }
 
+  /*!
+   * \brief Package the kernels into `lib`, so that a loaded executable can run them without JIT.
+   * Kernels whose names conflict with the packaged ones are skipped.
+   *
+   * \param kernels The kernels recorded by raf.cache.StopKernelRecording, each of which is
+   * (cache name, cache key, module, function name).
+   *
+   * \return The number of packaged kernels.
+   */
+  int64_t AddKernels(const Array<Array<ObjectRef>>& kernels);
+
   /*!
    * \brief Get the arity of the VM Fucntion.
    * \param func Function name.
@@ -153,6 +175,13 @@ class Executable : public tvm::runtime::ModuleNode {
   std::unordered_map<std::string, Index> primitive_map;
   /*! \brief The virtual machine's function table. */
   std::vector<VMFunction> functions;
+  /*! \brief The kernels packaged in `lib`, each of which is (cache name, cache key, func name). */
+  std::vector<std::tuple<std::string, std::string, std::string>> kernels;
+  /*!
+   * \brief The number of packaged kernels put to the kernel caches when loading. The kernels that
+   * are already cached, e.g., built by JIT or loaded by another executable, are not counted.
+   */
+  int64_t num_preloaded_kernels = 0;
 
  private:
   /*!
@@ -166,8 +195,9 @@ class Executable : public tvm::runtime::ModuleNode {
    * \brief Save the constant pool.
    *
    * \param strm The input stream.
+   * \param const_path The path of the constant file, or empty to save the tensor data in strm.
    */
-  void SaveConstantSection(dmlc::Stream* strm);
+  void SaveConstantSection(dmlc::Stream* strm, const std::string& const_path);
 
   /*!
    * \brief Save primitive op names.
@@ -183,6 +213,13 @@ class Executable : public tvm::runtime::ModuleNode {
    */
   void SaveCodeSection(dmlc::Stream* strm);
 
+  /*!
+   * \brief Save the cache keys of the packaged kernels.
+   *
+   * \param strm The input stream.
+   */
+  void SaveKernelSection(dmlc::Stream* strm);
+
   /*!
    * \brief Load the globals.
    *
@@ -194,8 +231,9 @@ class Executable : public tvm::runtime::ModuleNode {
    * \brief Load the constant pool.
    *
    * \param strm The input stream.
+   * \param const_path The path of the constant file, or empty if the tensor data is in strm.
    */
-  void LoadConstantSection(dmlc::Stream* strm);
+  void LoadConstantSection(dmlc::Stream* strm, const std::string& const_path);
 
   /*!
    * \brief Load primitive op names.
@@ -211,8 +249,18 @@ class Executable : public tvm::runtime::ModuleNode {
    */
   void LoadCodeSection(dmlc::Stream* strm);
 
+  /*!
+   * \brief Load the cache keys of the packaged kernels, and put the kernels in `lib` to the
+   * kernel caches. The section is absent in the executables without packaged kernels.
+   *
+   * \param strm The input stream.
+   */
+  void LoadKernelSection(dmlc::Stream* strm);
+
   /*! \brief The serialized bytecode. */
   std::string code_;
+  /*! \brief The modules of the packaged kernels, indexed by function name. */
+  std::unordered_map<std::string, tvm::runtime::Module> kernel_modules_;
 };
 
 }  // namespace vm
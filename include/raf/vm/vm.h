@@ -110,6 +110,20 @@ struct VMFrame {
   }
 };
 
+/*! \brief An op to be dispatched, which is collected by the walk in VirtualMachine::Warmup. */
+struct WarmupTask {
+  /*! \brief The index of the VM function. */
+  Index func_index;
+  /*! \brief The program counter of the InvokeJit instruction. */
+  Index pc;
+  /*! \brief Whether the instruction has static shapes. */
+  bool is_static;
+  /*! \brief The OpEnv cache key of an instruction with dynamic shapes. */
+  std::string key;
+  /*! \brief The call values to dispatch. */
+  CallValues call;
+};
+
 /*!
  * \brief VMContextObj holds the runtime data for an execution in the VM.
  */
@@ -143,6 +157,48 @@ class VMContextObj : public ValueObj {
   Index current_device_id{0};
   /*! \brief The index of current working stream into cuda_streams. 0 indicates default stream. */
   Index current_stream_id{0};
+  /*! \brief A CPU buffer allocated by an AllocStorage instruction in a previous run. */
+  struct CachedStorage {
+    /*! \brief The requested size in bytes. */
+    int64_t nbytes;
+    /*! \brief The requested alignment. */
+    int64_t alignment;
+    /*! \brief The buffer. */
+    std::shared_ptr<Memory> buffer;
+  };
+  /*! \brief Whether AllocStorage reuses the buffers allocated by the previous runs. */
+  bool reuse_storage{false};
+  /*! \brief The buffers of the previous runs, keyed by the function index and pc. */
+  std::unordered_map<uint64_t, CachedStorage> storage_cache;
+  /*! \brief The op stats entry of an OpEnv invoked by this context. */
+  struct OpStatsId {
+    /*! \brief The OpEnv, to detect a new OpEnv allocated at the same address. */
+    std::weak_ptr<OpEnv> op_env;
+    /*! \brief The entry ID. */
+    int entry_id;
+    /*! \brief The generation of the op stats when the entry was registered. */
+    uint64_t generation;
+  };
+  /*! \brief The op stats entries of the OpEnvs invoked by this context. */
+  std::unordered_map<const OpEnv*, OpStatsId> op_stats_ids;
+  /*! \brief The OpEnv of this context in place of a cached OpEnv that requests a workspace. */
+  struct ContextOpEnv {
+    /*! \brief The cached OpEnv, to detect a new OpEnv allocated at the same address. */
+    std::weak_ptr<OpEnv> shared;
+    /*! \brief The OpEnv used by this context. */
+    OpEnvPtr op_env;
+  };
+  /*!
+   * \brief The OpEnvs used by this context in place of the cached OpEnvs that request a workspace.
+   * The workspace is written into the OpEnv on every call, so such OpEnvs are not shared by the
+   * contexts running concurrently.
+   */
+  std::unordered_map<const OpEnv*, ContextOpEnv> context_op_envs;
+  /*!
+   * \brief The ops to be dispatched, which is only set during the collection walk of Warmup. The
+   * ops are not executed in the walk.
+   */
+  std::vector<WarmupTask>* warmup_tasks{nullptr};
 
   void VisitAttrs(tvm::AttrVisitor* v) {
     v->Visit("func_index", &func_index);
@@ -212,9 +268,18 @@ class VMContext : public Value {
 
 using OpEnvCache = MetaCache<OpEnvPtr>;
 
+class CpuStreamPool;
+
 /*! \brief The OpEnv cache for a VM function. */
 class VMFuncOpEnvCache {
  public:
+  /*!
+   * \brief Create the OpEnv cache for a VM function.
+   * \param num_instructions The number of instructions in the function.
+   */
+  explicit VMFuncOpEnvCache(size_t num_instructions = 0) : static_op_envs_(num_instructions) {
+  }
+
   /*!
    * \brief Get the OpEnv cache for a given instruction.
    * \param pc The program counter
@@ -222,6 +287,20 @@ class VMFuncOpEnvCache {
    */
   std::shared_ptr<OpEnvCache> Get(Index pc);
 
+  /*!
+   * \brief Get the OpEnv bound to an instruction with static shapes.
+   * \param pc The program counter
+   * \return The OpEnv, or nullptr if it has not been bound yet.
+   */
+  OpEnvPtr GetStatic(Index pc) const;
+
+  /*!
+   * \brief Bind an OpEnv to an instruction with static shapes.
+   * \param pc The program counter
+   * \param op_env The OpEnv to be bound.
+   */
+  void SetStatic(Index pc, OpEnvPtr op_env);
+
   /*!
    * \brief Clear the OpEnv cache.
    */
@@ -230,6 +309,11 @@ class VMFuncOpEnvCache {
  private:
   /*! \brief Cache map from instruction index to OpEnv cache. */
   std::unordered_map<Index, std::shared_ptr<OpEnvCache>> cache_map_;
+  /*!
+   * \brief The OpEnvs bound to instructions with static shapes, indexed by pc. The elements are
+   * accessed atomically so that the lookup needs neither the lock nor the cache key.
+   */
+  std::vector<OpEnvPtr> static_op_envs_;
   /*! \brief The mutex for the cache_map_. */
   std::mutex mu_;
 };
@@ -299,6 +383,14 @@ class VirtualMachine : public tvm::runtime::ModuleNode {
    * \return The VM context.
    */
   VMContext PrepareVMContext(const std::string& func_name, const std::vector<Value>& inputs);
+  /*!
+   * \brief Reset a VM runtime context so that it can be run again with new inputs. The context
+   * then reuses the CPU buffers allocated by its AllocStorage instructions across runs, unless
+   * they are still referred to by the outputs of previous runs.
+   * \param ctx The VM context.
+   * \param inputs The new inputs to the function. The current inputs are kept if it is empty.
+   */
+  void ResetVMContext(VMContext ctx, const std::vector<Value>& inputs);
   /*!
    * \brief Run the virtual machine.
    * \param ctx The runtime context.
@@ -334,10 +426,26 @@ class VirtualMachine : public tvm::runtime::ModuleNode {
    * \return A list of latency numbers in milliseconds (length of the list equals 'repeat').
    */
   Array<FloatValue> Profile(VMContext ctx, int warmup, int number, int repeat);
+  /*!
+   * \brief Compile the kernels of a function before its first run. The function is walked without
+   * executing the ops to collect the ops to be dispatched, which are then dispatched concurrently
+   * by a thread pool. The dispatched OpEnvs are put into the OpEnv cache of this virtual machine,
+   * and the built kernels are put into the kernel caches. Only the executables with static shapes
+   * are supported, because the walk does not execute the ops that compute the shapes of the
+   * others, e.g., the shape functions of the dynamic-shape ops.
+   * \param ctx The runtime context.
+   * \param num_threads The number of compilation threads. Non-positive means the number of cores.
+   * \return The number of dispatched ops.
+   */
+  int64_t Warmup(VMContext ctx, int num_threads);
 
  protected:
   /*! \brief Get device for params. */
   Device GetParamsDevice() const;
+  /*! \brief Whether to skip the op execution, i.e., in dryrun mode or the walk of Warmup. */
+  bool IsDryrun(const VMContext& ctx) const {
+    return dryrun_ || ctx->warmup_tasks != nullptr;
+  }
   /*!
    * \brief Allocate memory on given device. For cuda device, it would allocate asynchronously on
    * current stream.
@@ -352,9 +460,28 @@ class VirtualMachine : public tvm::runtime::ModuleNode {
                                        bool alloc_async = true) const;
   /*! \brief Run VM dispatch loop. */
   virtual void RunLoop(VMContext& ctx);
-  /*! \brief Prepare an OpEnv with its inputs and output */
-  virtual std::tuple<OpEnvPtr, std::vector<Value>, Value, std::string> PrepareOpEnv(
-      const VMContext& ctx, const Instruction& instr);
+  /*!
+   * \brief Prepare an OpEnv with its inputs and output. In the collection walk of Warmup, the OpEnv
+   * is nullptr if it has not been dispatched.
+   */
+  virtual std::tuple<OpEnvPtr, std::vector<Value>, Value> PrepareOpEnv(const VMContext& ctx,
+                                                                       const Instruction& instr);
+  /*! \brief Make the call values of an InvokeJit instruction to dispatch. */
+  CallValues MakeCallValues(const VMContext& ctx, const Instruction& instr, const Value& output);
+  /*!
+   * \brief Get the OpEnv of the context in place of a cached OpEnv that requests a workspace. The
+   * op is dispatched again on the first call of the context.
+   */
+  OpEnvPtr GetContextOpEnv(const VMContext& ctx, const Instruction& instr, const OpEnvPtr& op_env,
+                           const Value& output);
+  /*! \brief Fulfill the distributed and stream requests of a dispatched OpEnv. */
+  void FulfillRequests(const VMContext& ctx, const OpEnvPtr& op_env);
+  /*! \brief Fulfill the requests of a dispatched OpEnv, and put it into the OpEnv cache. */
+  void CacheOpEnv(const VMContext& ctx, Index func_index, Index pc, bool is_static,
+                  const std::string& key, const OpEnvPtr& op_env);
+  /*! \brief Get the op stats entry ID of an OpEnv, registering it on the first invocation. */
+  int GetOpStatsId(VMContext& ctx, const Instruction& instr, const OpEnvPtr& op_env,
+                   const Value& output);
   /*! \brief Handle Move instruction*/
   virtual void HandleMove(VMContext& ctx, const Instruction& instr);
   /*! \brief Handle LoadConst instruction*/
@@ -423,6 +550,12 @@ class VirtualMachine : public tvm::runtime::ModuleNode {
   bool use_cuda_ = false;
   /*! \brief Indicates whether CUDA Graph is enabled when VM is initialized. */
   bool enable_cuda_graph_ = false;
+  /*!
+   * \brief The worker threads to execute the stream instructions on CPU. It is only created when
+   * the executable is compiled with a stream schedule policy and runs on CPU, in which case the
+   * ops on different streams are executed concurrently.
+   */
+  std::shared_ptr<CpuStreamPool> cpu_stream_pool_;
 
 #ifdef RAF_USE_CUDA
   /*!
@@ -5,7 +5,8 @@
 
 __version__ = "0.0.2.dev"
 
-from ._core.ndarray import array, ndarray
+from . import _lib
+from ._core.ndarray import array, ndarray, from_dlpack
 from ._op.imp import *  # pylint: disable=redefined-builtin
 from . import frontend
 from . import amp
@@ -14,10 +15,13 @@ from . import build
 from . import ir
 from . import model
 from . import _tvm_op
-from . import optim
 from . import utils
 from . import _core
 from ._core.device import device, cpu, cuda, Device
 from .model.model import Model
 from .hybrid import hybrid
 from .distributed import *
+
+# The submodules that are imported on first access, because they are not needed by
+# the processes that only run compiled models.
+__getattr__ = _lib.lazy_getattr(__name__, submodules=[".optim"])
@@ -5,12 +5,20 @@
 # pylint: disable=no-else-return,unidiomatic-typecheck,undefined-variable,invalid-name
 # pylint: disable=protected-access
 import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+import numpy as np
 import tvm
 from tvm import auto_scheduler, autotvm
 from tvm.auto_scheduler.dispatcher import ApplyHistoryBest
 from .. import _ffi
 from . import vm
 from .device import Device
+from .ndarray import ndarray
+from .value import TupleValue
 
 
 def interpret(expr, module=None):
@@ -34,7 +42,8 @@ def interpret(expr, module=None):
 class MetaFallbackContext(ApplyHistoryBest):
     """
     The RAF fallback dispatch context, which queries the builtin schedules and outputs
-    the message when missed. This is used as the root context for RAF.
+    the message when missed. This is used as the root context for RAF. The builtin schedules
+    are loaded on the first query, so that the processes compiling no kernel do not parse them.
 
     Parameters
     ----------
@@ -46,26 +55,39 @@ class MetaFallbackContext(ApplyHistoryBest):
     """
 
     def __init__(self, verbose=2):
-        # Load the builtin schedules
+        super().__init__(None, include_compatible=True)
+
+        self.verbose = verbose
+        self.loaded = False
+        self.load_lock = threading.Lock()
+
+        # The schedule missing message memory to avoid duplications.
+        self.memory = set()
+
+    def _load_builtin_schedules(self):
+        """Load the builtin schedules."""
         fallback_sch_log = None
         if "RAF_SCH_FILE" in os.environ and os.path.exists(os.environ["RAF_SCH_FILE"]):
             fallback_sch_log = os.environ["RAF_SCH_FILE"]
 
-        if verbose > 0:
+        if self.verbose > 0:
             if fallback_sch_log is not None:
                 print(f"RAF schedule file is pointed to {fallback_sch_log}")
             else:
                 print('No pretuned schedules because "RAF_SCH_FILE" is not set or does not exist')
 
-        super().__init__(fallback_sch_log, include_compatible=True)
-
-        self.verbose = verbose
-
-        # The schedule missing message memory to avoid duplications.
-        self.memory = set()
+        if fallback_sch_log is not None:
+            self.load(fallback_sch_log)
+        self.loaded = True
 
     def query(self, target, workload_key, has_complex_op, dag, func_name):
         # pylint: disable=too-many-arguments
+        if not self.loaded:
+            # Kernels may be compiled concurrently, e.g., by VirtualMachine.warmup.
+            with self.load_lock:
+                if not self.loaded:
+                    self._load_builtin_schedules()
+
         # Query the builtin schedules.
         ret = self._query_inside(target, workload_key, func_name)
         if ret is not None:
@@ -119,21 +141,63 @@ class VMExecutor:
 
     dryrun: bool
         Whether to create a dryrun VM that skips the op execution.
+
+    params : Optional[Dict[str, raf.ndarray]]
+        The parameters of the main function to be bound as constants, which are no longer the
+        inputs of the executor. They must not change during inference.
+
+    pre_pack_weights : bool
+        Whether to pre-pack the bound weights of the TVM kernels on CPU to the layouts requested
+        by their tuned schedules in sch_file. The weights are packed once at compile time and
+        stored in the constant pool of the executable, instead of being transformed in every run.
+
+    sch_file : Optional[str]
+        The tuned schedule file path to pre-pack the weights with. The executor runs with the same
+        schedules, so the sch_file of the make_* methods is ignored when pre-packing.
     """
 
-    def __init__(self, mod, device, enable_cuda_graph=False, dryrun=False):
+    def __init__(
+        self,
+        mod,
+        device,
+        enable_cuda_graph=False,
+        dryrun=False,
+        *,
+        params=None,
+        pre_pack_weights=False,
+        sch_file=None,
+    ):
         if mod is None:
             raise RuntimeError("Must provide module to get VM executor.")
         if "gpu" not in device and "cuda" not in device:
             enable_cuda_graph = False
         self.device = Device(device)
-        self.executable = vm.compile(mod, self.device)
+        self._dispatch_context = None
+        if params:
+            # The compiler binds the params to the main function in place, so compile a copy.
+            mod = tvm.IRModule(mod.functions, mod.type_definitions)
+        if pre_pack_weights:
+            # The kernels with the pre-packed weights are registered to the dispatch context
+            # when they are queried at compile time, so they have to run with the same context.
+            self._dispatch_context = auto_scheduler.ApplyHistoryBest(
+                sch_file, include_compatible=True
+            )
+            with self._dispatch_context:
+                with tvm.transform.PassContext(
+                    config={
+                        "relay.backend.use_auto_scheduler": True,
+                        "raf.vm.optimize.pre_pack_weights": True,
+                    },
+                ):
+                    self.executable = vm.compile(mod, self.device, params)
+        else:
+            self.executable = vm.compile(mod, self.device, params)
         self.vm = vm.VirtualMachine(
             self.executable, self.device, enable_cuda_graph=enable_cuda_graph, dryrun=dryrun
         )
 
     @staticmethod
-    def _make_vm_helper(maker, sch_file=None):
+    def _make_vm_helper(maker, sch_file=None, dispatch_context=None):
         """
         Get a wrapper that runs given maker function. The wrapper would configure the relay auto
         scheduler to use the tuning records in given schedule file.
@@ -146,12 +210,15 @@ class VMExecutor:
         sch_file : str
             The schedule file that contains the tuning records.
 
+        dispatch_context : Optional[auto_scheduler.DispatchContext]
+            The dispatch context to use instead of the one loaded from sch_file.
+
         Returns
         -------
         result: Callable
             The wrapped function.
         """
-        auto_scheduler_dispatch_context = auto_scheduler.ApplyHistoryBest(
+        auto_scheduler_dispatch_context = dispatch_context or auto_scheduler.ApplyHistoryBest(
             sch_file, include_compatible=True
         )
 
@@ -223,7 +290,36 @@ class VMExecutor:
         def _maker(*args, **kwargs):
             return self.vm.profile(*args, **kwargs, warmup=warmup, number=number, repeat=repeat)
 
-        return self._make_vm_helper(_maker, sch_file)
+        return self._make_vm_helper(_maker, sch_file, self._dispatch_context)
+
+    def precompile(self, *args, num_threads=0, sch_file=None, **kwargs):
+        """Compile the kernels of the model concurrently before the first run. Only the models with
+        static shapes are supported.
+
+        Parameters
+        ----------
+        args : list[raf.ndarray] or list[np.ndarray]
+            The arguments to the model, which determine the shapes of the kernels.
+
+        num_threads : int
+            The number of compilation threads. Non-positive means the number of CPU cores.
+
+        sch_file: Optional[str]
+            The tuned schedule file path. It should be the same as the one used by the executor.
+
+        kwargs: dict of str to raf.ndarray or np.ndarray
+            Named arguments to the model.
+
+        Returns
+        -------
+        result : int
+            The number of dispatched ops.
+        """
+
+        def _maker(*args, **kwargs):
+            return self.vm.warmup(*args, **kwargs, num_threads=num_threads)
+
+        return self._make_vm_helper(_maker, sch_file, self._dispatch_context)(*args, **kwargs)
 
     def make_executor(self, sch_file=None):
         """Create a VM executor.
@@ -242,4 +338,264 @@ class VMExecutor:
         def _maker(*args, **kwargs):
             return self.vm.run(*args, **kwargs)
 
-        return self._make_vm_helper(_maker, sch_file)
+        return self._make_vm_helper(_maker, sch_file, self._dispatch_context)
+
+
+# The item put to the queue of a BatchingExecutor by close().
+_CLOSE = object()
+
+
+class _BatchRequest:
+    """A request to the batching executor."""
+
+    def __init__(self, args):
+        self.args = args
+        self.rows = args[0].shape[0]
+        self.signature = tuple((arg.shape[1:], str(arg.dtype)) for arg in args)
+        self.future = Future()
+        self.submit_time = time.time()
+
+
+class BatchingExecutor:
+    """An inference executor that batches the requests on the fly. Requests that arrive within a
+    latency window are concatenated along the first (batch) axis and run by one VM executor. The
+    outputs are split back to the callers. The executor for each batch size bucket is compiled
+    lazily and cached. All inputs and outputs of the model must have the batch axis at axis 0.
+
+    Parameters
+    ----------
+    model : raf.Model
+        The model in inference mode.
+
+    device : str
+        The runtime context to run the model on.
+
+    max_batch_size : int
+        The maximum number of samples in a batch.
+
+    max_wait_ms : float
+        The maximum time in milliseconds that the first request in a batch waits for more
+        requests.
+
+    buckets : Optional[List[int]]
+        The batch sizes to compile the model for. A batch is padded to the smallest bucket that
+        fits it. The default buckets are the powers of 2 up to max_batch_size.
+
+    sch_file: Optional[str]
+        The tuned schedule file path.
+    """
+
+    # pylint: disable=too-many-instance-attributes, too-many-arguments
+
+    def __init__(
+        self, model, device, max_batch_size=32, max_wait_ms=2.0, buckets=None, sch_file=None
+    ):
+        if buckets is None:
+            buckets = [
+                1 << i for i in range(max_batch_size.bit_length()) if 1 << i < max_batch_size
+            ]
+            buckets.append(max_batch_size)
+        buckets = sorted(set(buckets))
+        if buckets[-1] < max_batch_size:
+            raise ValueError(
+                "The largest bucket %d is smaller than max_batch_size %d"
+                % (buckets[-1], max_batch_size)
+            )
+        self.model = model
+        self.device = device
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1e3
+        self.buckets = buckets
+        self.sch_file = sch_file
+        self._executors = {}
+        self._executor_lock = threading.Lock()
+        self._queue = queue.Queue()
+        self._pending = None
+        # Guards _closed, so that no request is put into the queue after _CLOSE.
+        self._close_lock = threading.Lock()
+        self._closed = False
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            "num_requests": 0,
+            "num_batches": 0,
+            "total_queue_ms": 0.0,
+            "max_queue_ms": 0.0,
+            "num_samples": 0,
+            "num_padded_samples": 0,
+        }
+        self._worker = threading.Thread(target=self._loop, daemon=True)
+        self._worker.start()
+
+    def submit(self, *args):
+        """Submit a request.
+
+        Parameters
+        ----------
+        args : list[raf.ndarray] or list[np.ndarray]
+            The inputs of the request, whose first axis is the batch axis.
+
+        Returns
+        -------
+        ret : concurrent.futures.Future
+            The future of the outputs, which are raf.ndarray or a tuple of raf.ndarray.
+        """
+        args = [arg.numpy() if isinstance(arg, ndarray) else np.asarray(arg) for arg in args]
+        if not args or any(arg.ndim == 0 or arg.shape[0] != args[0].shape[0] for arg in args):
+            raise ValueError("All inputs must have the same size of the batch axis (axis 0)")
+        request = _BatchRequest(args)
+        if request.rows > self.max_batch_size:
+            raise ValueError(
+                "The batch size %d of the request exceeds max_batch_size %d"
+                % (request.rows, self.max_batch_size)
+            )
+        with self._close_lock:
+            if self._closed:
+                raise RuntimeError("The batching executor has been closed")
+            self._queue.put(request)
+        return request.future
+
+    def __call__(self, *args):
+        return self.submit(*args).result()
+
+    def close(self):
+        """Stop the executor after serving the submitted requests."""
+        with self._close_lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put(_CLOSE)
+        self._worker.join()
+        self._worker = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def stats(self):
+        """Get the statistics of the served requests.
+
+        Returns
+        -------
+        ret : Dict[str, float]
+            The number of requests and batches, the average and maximum time in milliseconds that
+            requests wait in the queue, and the average fill ratio of the batches, i.e., the
+            number of samples over the padded batch size.
+        """
+        with self._stats_lock:
+            stats = dict(self._stats)
+        num_requests = max(stats["num_requests"], 1)
+        num_padded = max(stats["num_padded_samples"], 1)
+        return {
+            "num_requests": stats["num_requests"],
+            "num_batches": stats["num_batches"],
+            "avg_queue_ms": stats["total_queue_ms"] / num_requests,
+            "max_queue_ms": stats["max_queue_ms"],
+            "fill_ratio": stats["num_samples"] / num_padded,
+        }
+
+    def _get_executor(self, bucket, args, args_signature):
+        """Get the executor of a bucket and the input signature, which is compiled on first use."""
+        # pylint: disable=import-outside-toplevel
+        from raf.model.trace import _get_func_inputs
+
+        key = (bucket,) + args_signature
+        with self._executor_lock:
+            if key not in self._executors:
+                example = [
+                    ndarray(
+                        np.zeros((bucket,) + arg.shape[1:], dtype=arg.dtype), device=self.device
+                    )
+                    for arg in args
+                ]
+                record = self.model._internal(*example)
+                executor = VMExecutor(record.mod, self.device).make_executor(self.sch_file)
+                self._executors[key] = (record, executor)
+            record, executor = self._executors[key]
+
+        def run(batch_args):
+            return executor(*_get_func_inputs(record, batch_args, {}, get_handle=False))
+
+        return run
+
+    def _next_batch(self):
+        """Collect the requests of the next batch. Return None if the executor is closed."""
+        first = self._pending if self._pending is not None else self._queue.get()
+        self._pending = None
+        if first is _CLOSE:
+            return None
+        batch = [first]
+        rows = first.rows
+        deadline = first.submit_time + self.max_wait
+        while rows < self.max_batch_size:
+            timeout = deadline - time.time()
+            try:
+                request = (
+                    self._queue.get(timeout=timeout) if timeout > 0 else self._queue.get_nowait()
+                )
+            except queue.Empty:
+                break
+            if (
+                request is _CLOSE
+                or request.signature != first.signature
+                or rows + request.rows > self.max_batch_size
+            ):
+                # Serve it in the next batch.
+                self._pending = request
+                break
+            batch.append(request)
+            rows += request.rows
+        return batch
+
+    def _loop(self):
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                self._drain()
+                return
+            start = time.time()
+            rows = sum(request.rows for request in batch)
+            bucket = next(size for size in self.buckets if size >= rows)
+            try:
+                self._run_batch(batch, rows, bucket)
+            except Exception as err:  # pylint: disable=broad-except
+                for request in batch:
+                    if not request.future.done():
+                        request.future.set_exception(err)
+            queue_ms = [(start - request.submit_time) * 1e3 for request in batch]
+            with self._stats_lock:
+                self._stats["num_requests"] += len(batch)
+                self._stats["num_batches"] += 1
+                self._stats["total_queue_ms"] += sum(queue_ms)
+                self._stats["max_queue_ms"] = max(self._stats["max_queue_ms"], max(queue_ms))
+                self._stats["num_samples"] += rows
+                self._stats["num_padded_samples"] += bucket
+
+    def _drain(self):
+        """Fail the requests left in the queue after the executor is closed."""
+        while True:
+            try:
+                request = self._queue.get_nowait()
+            except queue.Empty:
+                return
+            if request is not _CLOSE:
+                request.future.set_exception(RuntimeError("The batching executor has been closed"))
+
+    def _run_batch(self, batch, rows, bucket):
+        """Run a batch of requests and set their results."""
+        batch_args = []
+        for idx, arg in enumerate(batch[0].args):
+            parts = [request.args[idx] for request in batch]
+            if bucket > rows:
+                parts.append(np.zeros((bucket - rows,) + arg.shape[1:], dtype=arg.dtype))
+            batch_args.append(ndarray(np.concatenate(parts), device=self.device))
+        outputs = self._get_executor(bucket, batch[0].args, batch[0].signature)(batch_args)
+        is_tuple = isinstance(outputs, TupleValue)
+        outputs = [out.numpy() for out in (outputs if is_tuple else [outputs])]
+        begin = 0
+        for request in batch:
+            end = begin + request.rows
+            rets = [ndarray(out[begin:end], device=self.device) for out in outputs]
+            request.future.set_result(tuple(rets) if is_tuple else rets[0])
+            begin = end
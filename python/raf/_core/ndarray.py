@@ -18,7 +18,7 @@ from raf._ffi.binding import (
 )
 from raf._ffi.tensor import MarkNumpy
 from raf._ffi.value import ToTVM
-from raf._lib import _register_func, relay, tvm_ndarray
+from raf._lib import _register_func, relay, tvm_ndarray, tvm_from_dlpack
 from raf._lib import TensorContainer as _DLManagedTensor
 
 
@@ -115,13 +115,31 @@ class ndarray:  # pylint: disable=invalid-name,too-many-instance-attributes
     def __str__(self):
         fmt = "{}\n<NDArray [{}] @ {}, dtype={}>"
         shape = " x ".join(map(str, self.shape))
-        npa = ToTVM(self.__value).numpy()
+        npa = self.numpy(copy=False)
         return fmt.format(str(npa), shape, self.device, self.dtype)
 
     def __repr__(self):
         return str(self)
 
-    def numpy(self):
+    def numpy(self, copy=True):
+        """Convert the array to a NumPy array.
+
+        Parameters
+        ----------
+        copy : bool
+            Whether to copy the data. If False and the array is on CPU, the data is not copied
+            but shared through DLPack, so the returned NumPy array reflects the later in-place
+            updates of this array. Otherwise, the data is copied to a new NumPy array.
+
+        Returns
+        -------
+        ret : numpy.ndarray
+            The NumPy array.
+        """
+        import numpy as np  # pylint: disable=import-outside-toplevel
+
+        if not copy and self.device == "cpu" and hasattr(np, "from_dlpack"):
+            return np.from_dlpack(self)
         return ToTVM(self.__value).numpy()  # pylint: disable=protected-access
 
     @property
@@ -173,15 +191,44 @@ class ndarray:  # pylint: disable=invalid-name,too-many-instance-attributes
         self.__byte_offset = byte_offset
 
     def to(self, *, device=None, dtype=None):  # pylint: disable=invalid-name
-        npa = self.numpy()
-        if dtype is not None:
-            npa = npa.astype(dtype)
-        if device is None:
-            device = self.device
-        ret = ndarray(BindNDArray(_np_to_tensor_value(npa, device=device), None, ""))
+        # pylint: disable=import-outside-toplevel,cyclic-import
+        from raf._op.imp import cast, device_copy
+
+        src_device = dev2str(str2dev(self.device))
+        dst_device = src_device if device is None else dev2str(str2dev(device))
+        ret = self
+        if dtype is not None and str(dtype) != self.dtype:
+            # Cast on the source device, then move the casted data if needed.
+            ret = cast(ret, str(dtype))
+        if dst_device != src_device or ret is self:
+            # Copying on the same device keeps the semantics that `to` returns a new array.
+            ret = device_copy(ret, src_device, dst_device)
+        # Detach the result from the autodiff tape of the ops above.
+        ret = ndarray.from_tensor_value(ret.__value)
         ret.requires_grad = self.requires_grad
         return ret
 
+    def __dlpack__(self, stream=None):
+        """Export the array as a DLPack capsule without copying the data.
+
+        Parameters
+        ----------
+        stream : Optional[int]
+            The stream of the consumer. Only the default stream is supported.
+
+        Returns
+        -------
+        ret : PyCapsule
+            The capsule of a DLManagedTensor, which keeps this array alive.
+        """
+        if stream not in (None, 0, 1):
+            raise NotImplementedError("Exporting DLPack on a non-default stream is not supported")
+        return ToTVM(self.__value).to_dlpack()
+
+    def __dlpack_device__(self):
+        dev = str2dev(self.device)
+        return (int(dev.device_type), int(dev.device_id))
+
     def backward(self, gradient=None):
         if gradient is not None:
             assert isinstance(gradient, ndarray)
@@ -372,6 +419,36 @@ def array(
     return ndarray(BindNDArray(_np_to_tensor_value(npa, device=device), None, name))
 
 
+@set_module("raf")
+def from_dlpack(ext_tensor, name=""):
+    """Create an array that shares the data with an external tensor, e.g., a NumPy array or a
+    PyTorch tensor, without copying.
+
+    Parameters
+    ----------
+    ext_tensor : object
+        A NumPy array, an object supporting the DLPack protocol (i.e., `__dlpack__`), or a DLPack
+        capsule.
+
+    name : str
+        The name of the array.
+
+    Returns
+    -------
+    ret : ndarray
+        The array sharing the data with the external tensor.
+    """
+    import numpy as np  # pylint: disable=import-outside-toplevel
+
+    if isinstance(ext_tensor, np.ndarray):
+        # The array is kept alive by the tensor, see `_np_del`.
+        value = _np_to_tensor_value(ext_tensor, device=None)
+    else:
+        capsule = ext_tensor.__dlpack__() if hasattr(ext_tensor, "__dlpack__") else ext_tensor
+        value = TensorValue.from_tvm(tvm_from_dlpack(capsule))
+    return ndarray(BindNDArray(value, None, name))
+
+
 _DL_MANAGED_TENSOR_PTR = ctypes.POINTER(_DLManagedTensor)
 
 
@@ -3,6 +3,8 @@
 
 """RAF virtual machine and utility functions."""
 # pylint: disable=no-self-use
+import queue
+
 import numpy as np
 import tvm
 
@@ -27,10 +29,21 @@ class Executable:
         self._get_stats = self.mod["get_stats"]
         self._get_function_arity = self.mod["get_function_arity"]
         self._get_function_param_name = self.mod["get_function_param_name"]
+        self._add_kernels = self.mod["add_kernels"]
+        self._get_num_preloaded_kernels = self.mod["get_num_preloaded_kernels"]
 
-    def save(self):
+    def save(self, const_path=None):
         """Save the RAF VM Executable.
 
+        Parameters
+        ----------
+        const_path : Optional[str]
+            The path of the constant file. If given, the tensor data of the constants is written
+            to this file, each at a page-aligned offset, instead of the bytecode. It has to be
+            passed to ``load_exec`` along with the bytecode, which maps the file without copying
+            the constants, so that processes loading the same executable share the constants in
+            the page cache.
+
         Returns
         -------
         code : bytearray
@@ -58,6 +71,9 @@ class Executable:
          - Code section. The VM functions, including bytecode, are sitting in
          this section.
 
+         - Kernel section (optional). The cache keys of the kernels packaged in
+         lib by package_kernels.
+
         Examples
         --------
 
@@ -91,11 +107,48 @@ class Executable:
             res = des_vm.run(x_data)
             print(res.numpy())
         """
+        if const_path is not None:
+            return self._save(const_path), self._get_lib()
         return self._save(), self._get_lib()
 
+    def package_kernels(self, device, *args, func_name="main", **kwargs):
+        """Build the kernels of all InvokeJit instructions ahead of time and package them into
+        lib. The kernels are dispatched by a dryrun of the function with the given arguments, so
+        the arguments must have the shapes used at inference time. A loaded executable puts the
+        packaged kernels to the kernel cache, so that its first inference runs without JIT.
+        Note that only the kernels of TVM dialect ops are packaged.
+
+        Parameters
+        ----------
+        device : Union[str, Device]
+            The device to build the kernels for.
+
+        args : list[raf.ndarray] or list[np.ndarray]
+            The arguments to the function.
+
+        func_name : str
+            The name of the function.
+
+        kwargs: dict of str to raf.ndarray or np.ndarray
+            Named arguments to the function.
+
+        Returns
+        -------
+        ret : int
+            The number of packaged kernels.
+        """
+        vm = VirtualMachine(self, device, dryrun=True)
+        _ffi.cache.StartKernelRecording()
+        try:
+            vm.run(*args, func_name=func_name, **kwargs)
+        finally:
+            kernels = _ffi.cache.StopKernelRecording()
+        return self._add_kernels(kernels)
+
     @staticmethod
-    def load_exec(bytecode, lib):
-        """Construct an executable from saved artifacts.
+    def load_exec(bytecode, lib, const_path=None):
+        """Construct an executable from saved artifacts. If the executable has packaged
+        kernels, they are loaded from lib to the kernel cache.
 
         Parameters
         ----------
@@ -105,6 +158,10 @@ class Executable:
         lib : :py:class:`~tvm.runtime.Module`
             The runtime module that contains the generated code.
 
+        const_path : Optional[str]
+            The path of the constant file, which is required if the executable was saved with
+            one. The file is memory-mapped, and the constants refer to the mapped pages.
+
         Returns
         -------
         exec: Executable
@@ -124,7 +181,7 @@ class Executable:
                 + ", but received {}".format(type(lib))
             )
 
-        return Executable(_ffi.vm.Load_Executable(bytecode, lib))
+        return Executable(_ffi.vm.Load_Executable(bytecode, lib, const_path or ""))
 
     @property
     def lib(self):
@@ -148,6 +205,19 @@ class Executable:
         """
         return self._get_stats()
 
+    @property
+    def num_preloaded_kernels(self):
+        """Get the number of packaged kernels put to the kernel cache when the executable was
+        loaded. The kernels that were already cached, e.g., built by JIT or loaded by another
+        executable, are not counted.
+
+        Returns
+        -------
+        ret : int
+            The number of preloaded kernels.
+        """
+        return self._get_num_preloaded_kernels()
+
     @property
     def primitive_ops(self):
         """Get the name of the primitive ops contained in the executable.
@@ -447,8 +517,10 @@ class VirtualMachine:
         self._exec = exe
         self._set_devices = self.module["set_devices"]
         self._prepare_context = self.module["prepare_context"]
+        self._reset_context = self.module["reset_context"]
         self._run = self.module["run"]
         self._profile = self.module["profile"]
+        self._warmup = self.module["warmup"]
         self._set_devices(device)
 
     def prepare_context(self, func_name, *args, **kwargs):
@@ -470,6 +542,11 @@ class VirtualMachine:
         result : VMContext
             The initialized VM context.
         """
+        return self._prepare_context(func_name, *self._convert_args(func_name, args, kwargs))
+
+    def _convert_args(self, func_name, args, kwargs):
+        """Order the positional and named arguments by the function parameters, and convert them
+        to values."""
         if kwargs:
             func_params = self._exec.get_function_params(func_name)
             new_args = [None] * len(func_params)
@@ -483,8 +560,7 @@ class VirtualMachine:
                     new_args[i] = args[idx]
                     idx += 1
             args = new_args
-        cargs = _convert_args(args)
-        return self._prepare_context(func_name, *cargs)
+        return _convert_args(args)
 
     def run(self, *args, func_name="main", **kwargs):
         """Run the virtual machine.
@@ -543,3 +619,127 @@ class VirtualMachine:
         ctx = self.prepare_context(func_name, *args, **kwargs)
         result = [v.value for v in self._profile(ctx, warmup, number, repeat)]
         return result
+
+    def warmup(self, *args, func_name="main", num_threads=0, **kwargs):
+        """Compile the kernels of the function before its first run. The ops to be dispatched are
+        collected by walking the function without executing them, and then dispatched concurrently.
+        The dispatched ops are cached in this virtual machine, so the first run with arguments of
+        the same shapes does not compile any kernel. Only the executables with static shapes are
+        supported, because the walk does not execute the ops that compute the dynamic shapes.
+
+        Parameters
+        ----------
+        args : list[raf.ndarray] or list[np.ndarray]
+            The arguments to the function.
+
+        func_name : str
+            The name of function to compile.
+
+        num_threads : int
+            The number of compilation threads. Non-positive means the number of CPU cores.
+
+        kwargs: dict of str to raf.ndarray or np.ndarray
+            Named arguments to the function.
+
+        Returns
+        -------
+        result : int
+            The number of dispatched ops.
+        """
+        ctx = self.prepare_context(func_name, *args, **kwargs)
+        return self._warmup(ctx, num_threads)
+
+    def create_pool(self, size, *args, func_name="main", **kwargs):
+        """Create a pool of reusable VM contexts for serving requests from multiple threads.
+        Each context keeps its register files and the CPU buffers of its AllocStorage
+        instructions across runs, so a request neither creates a new context nor allocates
+        the planned storage again. The GIL is released when a context is running, so requests
+        on different contexts run in parallel.
+
+        Parameters
+        ----------
+        size : int
+            The number of contexts, i.e., the maximum number of concurrent requests.
+
+        args : list[raf.ndarray] or list[np.ndarray]
+            The example arguments to the function. If given, every context is run once with them
+            so that the storage is allocated when the pool is created.
+
+        func_name : str
+            The name of function to run.
+
+        kwargs: dict of str to raf.ndarray or np.ndarray
+            Named example arguments to the function.
+
+        Returns
+        -------
+        pool : VMContextPool
+            The pool of VM contexts.
+        """
+        return VMContextPool(self, size, func_name, args, kwargs)
+
+
+class VMContextPool:
+    """A pool of reusable VM contexts. Use VirtualMachine.create_pool to create a pool.
+
+    Parameters
+    ----------
+    vm : VirtualMachine
+        The virtual machine to run the contexts.
+
+    size : int
+        The number of contexts.
+
+    func_name : str
+        The name of function to run.
+
+    args : list[raf.ndarray] or list[np.ndarray]
+        The example arguments to the function, which can be empty.
+
+    kwargs: dict of str to raf.ndarray or np.ndarray
+        Named example arguments to the function, which can be empty.
+    """
+
+    def __init__(self, vm, size, func_name, args, kwargs):
+        if size <= 0:
+            raise ValueError("The pool size must be positive, but got {}".format(size))
+        self._vm = vm
+        self._func_name = func_name
+        self._free = queue.LifoQueue()
+        for _ in range(size):
+            ctx = None
+            if args or kwargs:
+                ctx = vm.prepare_context(func_name, *args, **kwargs)
+                vm._reset_context(ctx)
+                vm._run(ctx)
+            self._free.put(ctx)
+
+    def run(self, *args, **kwargs):
+        """Run the function with a free context in the pool. It blocks if all contexts are in use.
+        This method is thread-safe.
+
+        Parameters
+        ----------
+        args : list[raf.ndarray] or list[np.ndarray]
+            The arguments to the function.
+
+        kwargs: dict of str to raf.ndarray or np.ndarray
+            Named arguments to the function.
+
+        Returns
+        -------
+        result : Object
+            The output.
+        """
+        vm = self._vm
+        cargs = vm._convert_args(self._func_name, args, kwargs)
+        ctx = self._free.get()
+        try:
+            if ctx is None:
+                ctx = vm._prepare_context(self._func_name, *cargs)
+                vm._reset_context(ctx)
+            else:
+                vm._reset_context(ctx, *cargs)
+            return vm._run(ctx)
+        finally:
+            self._free.put(ctx)
@@ -5,11 +5,10 @@
 """
 # pylint: disable=unused-import
 import ctypes
+import importlib
 import os
-import readline
 import sys
 
-import tvm.topi as topi
 import tvm
 import tvm.relay as relay
 from tvm._ffi.base import TVMError as _TVMError
@@ -37,6 +36,7 @@ from tvm.ir.container import Array
 from tvm.ir import IRModule
 from tvm.ir.transform import PassContext
 from tvm.runtime.ndarray import array as tvm_ndarray
+from tvm.runtime.ndarray import from_dlpack as tvm_from_dlpack
 from tvm.relay import op as _op
 from tvm.relay.op import OpPattern, register_compute, register_pattern, strategy
 from tvm.relay.op.op import (
@@ -184,3 +184,44 @@ class TensorContainer(ctypes.Structure):
     # pylint: disable=too-few-public-methods
     """Python interface for NDArray::Container in tvm"""
     _fields_ = [("dltensor", _DLTensor), ("manager_ctx", ctypes.c_void_p)]
+
+
+def lazy_getattr(module_name, submodules=(), attrs=None):
+    """Make a module-level __getattr__ (PEP 562) that imports the given modules on first access.
+
+    Parameters
+    ----------
+    module_name : str
+        The name of the module to define __getattr__ for.
+
+    submodules : Iterable[str]
+        The modules accessed as the attributes named by their last components. A path starting
+        with a dot is relative to the module.
+
+    attrs : Optional[Dict[str, str]]
+        The map from the attribute names to the paths of the modules that define them.
+
+    Returns
+    -------
+    ret : Callable[[str], Any]
+        The __getattr__ function.
+    """
+    lazy_attrs = {path.rsplit(".", 1)[-1]: (path, None) for path in submodules}
+    lazy_attrs.update({name: (path, name) for name, path in (attrs or {}).items()})
+
+    def _getattr(name):
+        if name not in lazy_attrs:
+            raise AttributeError("module {!r} has no attribute {!r}".format(module_name, name))
+        path, attr = lazy_attrs[name]
+        ret = importlib.import_module(path, module_name)
+        if attr is not None:
+            ret = getattr(ret, attr)
+        # Later accesses find the attribute without calling __getattr__.
+        setattr(sys.modules[module_name], name, ret)
+        return ret
+
+    return _getattr
+
+
+# TOPI is only needed to define the TVM ops, so it is imported on first access.
+__getattr__ = lazy_getattr(__name__, submodules=["tvm.topi"])
@@ -76,3 +76,115 @@ class DialectPreference(Object):
 
     def __exit__(self, ptype, value, traceback):
         _ffi.DialectPrefExitScope(self)
+
+
+def set_dispatch_mode(mode):
+    """Set how an op is dispatched to a dialect op at runtime. The default mode is "cache", or the
+    value of the environment variable RAF_DISPATCH_MODE.
+
+    Parameters
+    ----------
+    mode : str
+        One of "off", "cache" and "measure". "off" tries the dialect ops in the order of their
+        priority levels for every call. "cache" memoizes the first valid dialect op of each call,
+        which is keyed by the op, the attributes, the input and output types and the device, as
+        well as the invalid dialect ops tried before it. "measure" measures all valid dialect ops
+        with the op profiler and memoizes the fastest one.
+    """
+    _ffi.SetDispatchMode(mode)
+
+
+def get_dispatch_mode():
+    """Get how an op is dispatched to a dialect op at runtime.
+
+    Returns
+    -------
+    ret : str
+        One of "off", "cache" and "measure".
+    """
+    return _ffi.GetDispatchMode()
+
+
+def get_dispatch_decisions():
+    """Get the memoized dispatch decisions.
+
+    Returns
+    -------
+    ret : List[Dict[str, object]]
+        The decisions. Each has the hex "key" of the call, the base "op", the "device", the
+        "dialect_op" it is dispatched to, the "failed" dialect ops, whether the dialect ops have
+        been "measured", and the "latency" of each measured dialect op in microseconds. The failed
+        dialect ops are only memoized in this process, and are not written to files.
+    """
+    ret = []
+    for decision in _ffi.GetDispatchDecisions():
+        ret.append(
+            {
+                "key": str(decision["key"]),
+                "op": str(decision["op"]),
+                "device": str(decision["device"]),
+                "dialect_op": str(decision["dialect_op"]),
+                "failed": [str(x) for x in decision["failed"]],
+                "measured": bool(decision["measured"]),
+                "latency": {str(k): v.value for k, v in decision["latency"].items()},
+            }
+        )
+    return ret
+
+
+def clear_dispatch_decisions():
+    """Clear the memoized dispatch decisions."""
+    _ffi.ClearDispatchDecisions()
+
+
+def export_dispatch_decisions(path):
+    """Write the memoized dispatch decisions to a file.
+
+    Parameters
+    ----------
+    path : str
+        The path of the file.
+
+    Returns
+    -------
+    ret : int
+        The number of written decisions.
+    """
+    return _ffi.ExportDispatchDecisions(path)
+
+
+def import_dispatch_decisions(path, overwrite=False):
+    """Load the dispatch decisions from a file written by export_dispatch_decisions.
+
+    Parameters
+    ----------
+    path : str
+        The path of the file.
+
+    overwrite : bool
+        Whether to overwrite the decisions that are already memoized.
+
+    Returns
+    -------
+    ret : int
+        The number of loaded decisions.
+    """
+    return _ffi.ImportDispatchDecisions(path, overwrite)
+
+
+def attach_dispatch_db(path):
+    """Load the dispatch decisions from a file, and append the new decisions to it afterward, so
+    that the measured decisions persist across processes. The environment variable
+    RAF_DISPATCH_DB attaches a file at startup.
+
+    Parameters
+    ----------
+    path : str
+        The path of the file. An empty path detaches the current file.
+
+    Returns
+    -------
+    ret : int
+        The number of loaded decisions.
+    """
+    return _ffi.AttachDispatchDB(path)
@@ -73,6 +73,11 @@ def _cutlass_matmul_fusion(matmul_ops, dtype=None):
     return with_act | with_bias
 
 
+def _cpu_blas_gemm(ops):
+    # BLAS only supports float32 and float64, so leave the other dtypes to TVM.
+    return call_binary_ops(ops, "float32") | call_binary_ops(ops, "float64")
+
+
 def _call_conv2d(dtype=None):
     if dtype is None:
         x, w = wildcard(), wildcard()
@@ -135,8 +140,10 @@ register_pattern(_call_conv2d(), "cudnn", 29, "conv2d")
 register_pattern(_cutlass_matmul_fusion(BATCH_MATMUL_OPS), "cutlass", 20, "batch_matmul_fusion")
 register_pattern(call_binary_ops(BATCH_MATMUL_OPS), "cublas", 19, "batch_matmul")
 register_pattern(call_binary_ops(BATCH_MATMUL_OPS), "cutlass", 18, "batch_matmul")
+register_pattern(_cpu_blas_gemm(BATCH_MATMUL_OPS), "cpu_blas", 17, "batch_matmul")
 
 # matmul / dense
 register_pattern(_cutlass_matmul_fusion(MATMUL_OPS), "cutlass", 10, "matmul_fusion")
 register_pattern(call_binary_ops(MATMUL_OPS), "cublas", 9, "matmul")
 register_pattern(call_binary_ops(MATMUL_OPS), "cutlass", 8, "matmul")
+register_pattern(_cpu_blas_gemm(MATMUL_OPS), "cpu_blas", 7, "matmul")
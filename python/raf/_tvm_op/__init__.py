@@ -3,5 +3,5 @@
 
 """Compute definition and schedules for TVM operators"""
 from . import loss, sgd, reduce, transform, broadcast, unary, nn, vision
-from . import algorithm, init, random, argwhere
+from . import algorithm, init, random, argwhere, memory
 from . import utils
@@ -0,0 +1,135 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+# pylint: disable=invalid-name, no-member
+"""Schedule for the operators that normalize along an axis on CPU, e.g., softmax and layer_norm"""
+from collections import defaultdict
+
+import tvm
+from tvm import te
+import tvm.topi.utils as utils
+
+# The bytes of a cache line, which is also the widest vector register of x86 (AVX-512).
+CACHE_LINE_BYTES = 64
+
+
+def _const_extent(iter_var):
+    """Return the extent of the loop, or 0 if it is not a constant."""
+    try:
+        return utils.get_const_int(iter_var.dom.extent)
+    except ValueError:
+        return 0
+
+
+def _vectorize_innermost(stage, iter_var, lanes):
+    """Split the loop by lanes and vectorize the inner one, if the lanes divide the extent."""
+    extent = _const_extent(iter_var)
+    if extent >= lanes and extent % lanes == 0:
+        _, inner = stage.split(iter_var, factor=lanes)
+        stage.vectorize(inner)
+
+
+def _schedule_root_reduce(sch, op, lanes):
+    """Parallelize a reduction that is computed at the root over its spatial axes. If the
+    innermost spatial axis is long enough, it is vectorized under the reduction loops, so that
+    a reduction over the rows, e.g., the gradient of the scale of layer_norm, reads the rows
+    contiguously instead of striding over them per output element.
+    """
+    axes = list(op.axis)
+    if not axes:
+        return
+    inner = None
+    extent = _const_extent(axes[-1])
+    if extent >= lanes and extent % lanes == 0:
+        axes[-1], inner = sch[op].split(axes[-1], factor=lanes)
+    fused = sch[op].fuse(*axes)
+    sch[op].parallel(fused)
+    if inner is not None:
+        sch[op].reorder(fused, *op.reduce_axis, inner)
+        sch[op].vectorize(inner)
+
+
+def _schedule_root_elemwise(sch, op):
+    """Parallelize an element-wise stage that is computed at the root."""
+    if op.axis:
+        sch[op].parallel(sch[op].fuse(*op.axis))
+
+
+def schedule_row_reduce(outs, axis):
+    """Schedule the operators that reduce along an axis and then update each element with the
+    reductions, e.g., softmax, layer_norm and their gradients.
+
+    The rows, i.e., the axes before the reduced axis, of the first output are fused and
+    parallelized. The reductions and the intermediate tensors read more than once, e.g., the
+    exponentials of softmax, are computed per row, so that a row is read from the memory once
+    and then stays in the cache. The other element-wise stages are inlined, and the innermost
+    loops are vectorized. The stages that the other outputs depend on, e.g., the mean of
+    layer_norm_train and the gradient of the scale of layer_norm_dx, cannot be computed per row
+    of the first output, so they are parallelized at the root.
+
+    Parameters
+    ----------
+    outs: Array of Tensor
+        The computation graph description of the operator in the format of an array of tensors.
+    axis: int
+        The reduced axis of the first output.
+
+    Returns
+    -------
+    sch: Schedule
+        The computation schedule for the operator.
+    """
+    outs = [outs] if isinstance(outs, te.tensor.Tensor) else list(outs)
+    out = outs[0]
+    out_ops = [x.op for x in outs]
+    ndim = len(out.shape)
+    axis = axis + ndim if axis < 0 else axis
+    sch = te.create_schedule(out_ops)
+    lanes = max(CACHE_LINE_BYTES * 8 // tvm.runtime.DataType(out.dtype).bits, 1)
+
+    # Collect the consumers of each stage, and the stages that the other outputs depend on.
+    consumers = defaultdict(set)
+
+    def collect(tensor, stages):
+        for inp in tensor.op.input_tensors:
+            consumers[inp.op].add(tensor.op)
+            if inp.op not in stages:
+                stages.add(inp.op)
+                collect(inp, stages)
+
+    row_stages, shared_stages = set(), set()
+    collect(out, row_stages)
+    for other in outs[1:]:
+        collect(other, shared_stages)
+
+    row = None
+    if axis > 0:
+        row = sch[out].fuse(*out.op.axis[:axis])
+        sch[out].parallel(row)
+    if out.op.axis:
+        _vectorize_innermost(sch[out], out.op.axis[-1], lanes)
+
+    for op in row_stages | shared_stages:
+        if not isinstance(op, te.ComputeOp) or op in out_ops:
+            continue
+        is_reduce = isinstance(op.body[0], tvm.tir.expr.Reduce)
+        if op in shared_stages or row is None:
+            if is_reduce:
+                _schedule_root_reduce(sch, op, lanes)
+            elif len(consumers[op]) > 1:
+                _schedule_root_elemwise(sch, op)
+            else:
+                sch[op].compute_inline()
+        elif is_reduce or len(consumers[op]) > 1:
+            sch[op].compute_at(sch[out], row)
+            if not is_reduce and op.axis:
+                _vectorize_innermost(sch[op], op.axis[-1], lanes)
+        else:
+            sch[op].compute_inline()
+
+    for op in out_ops[1:]:
+        if isinstance(op.body[0], tvm.tir.expr.Reduce):
+            _schedule_root_reduce(sch, op, lanes)
+        else:
+            _schedule_root_elemwise(sch, op)
+    return sch
@@ -0,0 +1,41 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+# pylint: disable=missing-function-docstring, unused-argument
+"""Compute definition and schedules for tensor fusion and defusion operators."""
+from .._lib import register_compute
+from .._lib import tvm as _tvm
+from .._lib import _reg
+
+_topi = _tvm.topi  # pylint: disable=invalid-name,no-member
+
+
+def _num_elements(shape):
+    size = 1
+    for dim in _topi.utils.get_const_tuple(shape):
+        size *= dim
+    return size
+
+
+@register_compute("raf.op.tvm.fuse_tensor")
+def fuse_tensor_compute(attrs, inputs, output_type):
+    flat = [_topi.reshape(x, [_num_elements(x.shape)]) for x in inputs]
+    return [_topi.concatenate(flat, 0)]
+
+
+@register_compute("raf.op.tvm.defuse_tensor")
+def defuse_tensor_compute(attrs, inputs, output_type):
+    x = inputs[0]
+    out = []
+    offset = 0
+    for field in output_type.fields:
+        shape = _topi.utils.get_const_tuple(field.shape)
+        size = _num_elements(field.shape)
+        part = _topi.strided_slice(x, [offset], [offset + size])
+        out.append(_topi.reshape(part, shape))
+        offset += size
+    return out
+
+
+_reg.register_injective_schedule("raf.op.tvm.fuse_tensor")
+_reg.register_injective_schedule("raf.op.tvm.defuse_tensor")
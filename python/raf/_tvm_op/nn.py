@@ -6,6 +6,7 @@
 from functools import reduce
 import operator
 
+from . import cpu
 from . import cuda
 from .._lib import register_compute
 from .._lib import generic_func
@@ -109,6 +110,19 @@ def schedule_softmax(attrs, outs, target):
         return _topi.generic.schedule_injective(outs)
 
 
+def schedule_row_reduce_cpu(attrs, outs, target):
+    """The CPU schedule of the ops that normalize along attrs.axis, e.g., softmax."""
+    axis = attrs.axis
+    axis = int(axis) if axis is not None else -1
+    with target:
+        return cpu.reduction.schedule_row_reduce(outs, axis)
+
+
+@schedule_softmax.register(["cpu"])
+def schedule_softmax_cpu(attrs, outs, target):
+    return schedule_row_reduce_cpu(attrs, outs, target)
+
+
 @schedule_softmax.register(["cuda", "gpu"])
 def schedule_softmax_cuda(attrs, outs, _):
     out = outs[0]
@@ -171,6 +185,11 @@ def schedule_softmax_dx(attrs, outs, target):
         return _topi.generic.schedule_injective(outs)
 
 
+@schedule_softmax_dx.register(["cpu"])
+def schedule_softmax_dx_cpu(attrs, outs, target):
+    return schedule_row_reduce_cpu(attrs, outs, target)
+
+
 @schedule_softmax_dx.register(["cuda", "gpu"])
 def schedule_softmax_dx_cuda(attrs, outs, _):
     out = outs[0]
@@ -254,6 +273,11 @@ def schedule_log_softmax(attrs, outs, target):
         return _topi.generic.schedule_softmax(outs)
 
 
+@schedule_log_softmax.register(["cpu"])
+def schedule_log_softmax_cpu(attrs, outs, target):
+    return schedule_row_reduce_cpu(attrs, outs, target)
+
+
 @schedule_log_softmax.register(["cuda", "gpu"])
 def schedule_log_softmax_cuda(attrs, outs, _):
     """Override the CUDA schedule for better performance and fusion support."""
@@ -550,6 +574,11 @@ def schedule_layer_norm(attrs, outs, target):
         return _topi.generic.schedule_injective(outs)
 
 
+@schedule_layer_norm.register(["cpu"])
+def schedule_layer_norm_cpu(attrs, outs, target):
+    return schedule_row_reduce_cpu(attrs, outs, target)
+
+
 @schedule_layer_norm.register(["cuda", "gpu"])
 def schedule_layer_norm_cuda(attrs, outs, target):
     out = outs[0]
@@ -589,9 +618,20 @@ def schedule_layer_norm_cuda(attrs, outs, target):
     return sch
 
 
-# Layer norm train is currently being offloaded to the CUDA kernel, so we don't craft
-# an efficient schedule for it now.
-_reg.register_schedule("raf.op.tvm.layer_norm_train", schedule_generic)
+@generic_func
+def schedule_layer_norm_train(attrs, outs, target):
+    # The schedule of layer_norm_train and the gradients of layer_norm, which have multiple
+    # outputs. Layer norm train is currently being offloaded to the CUDA kernel, so we don't
+    # craft an efficient schedule for it on other targets now.
+    return schedule_generic(attrs, outs, target)
+
+
+@schedule_layer_norm_train.register(["cpu"])
+def schedule_layer_norm_train_cpu(attrs, outs, target):
+    return schedule_row_reduce_cpu(attrs, outs, target)
+
+
+_reg.register_schedule("raf.op.tvm.layer_norm_train", schedule_layer_norm_train)
 
 _reg.register_schedule("raf.op.tvm.layer_norm", schedule_layer_norm)
 
@@ -677,7 +717,7 @@ def compute_layer_norm_dx(attr, inputs, output_type):
     return compute_layer_norm_dx_common(attr, inputs, recompute_mean_var=True)
 
 
-_reg.register_schedule("raf.op.tvm.layer_norm_dx", schedule_generic)
+_reg.register_schedule("raf.op.tvm.layer_norm_dx", schedule_layer_norm_train)
 
 
 @register_compute("raf.op.tvm.layer_norm_train_dx")
@@ -685,7 +725,7 @@ def compute_layer_norm_train_dx(attr, inputs, output_type):
     return compute_layer_norm_dx_common(attr, inputs, recompute_mean_var=False)
 
 
-_reg.register_schedule("raf.op.tvm.layer_norm_train_dx", schedule_generic)
+_reg.register_schedule("raf.op.tvm.layer_norm_train_dx", schedule_layer_norm_train)
 
 _reg.register_strategy("raf.op.tvm.conv2d", strategy.conv2d_strategy)
 
@@ -6,6 +6,8 @@
 import os
 
 import tvm
+from tvm import te, topi
+from tvm.topi.utils import get_const_tuple
 
 
 @tvm._ffi.register_func("raf._tvm_op.utils.export_library")
@@ -45,3 +47,32 @@ def load_module(path):
     if not os.path.exists(path):
         raise RuntimeError("Module file does not exist {}".format(path))
     return tvm.runtime.module.load_module(path)
+
+
+@tvm._ffi.register_func("raf._tvm_op.utils.auto_scheduler_layout_transform")
+def auto_scheduler_layout_transform(data, src_layout, dst_layout):
+    """Transform a constant weight on the host to the layout requested by a tuned auto-scheduler
+    schedule, so that the weight is packed once at compile time instead of in every run.
+
+    Parameters
+    ----------
+    data : tvm.nd.NDArray
+        The weight in the original layout on CPU.
+
+    src_layout : str
+        The original layout of the weight.
+
+    dst_layout : str
+        The layout requested by the schedule.
+
+    Returns
+    -------
+    tvm.nd.NDArray
+        The packed weight on CPU.
+    """
+    src = te.placeholder(data.shape, data.dtype, "src")
+    dst = topi.auto_scheduler_layout_transform(src, src_layout, dst_layout)
+    func = tvm.build(te.create_schedule(dst.op), [src, dst], "llvm")
+    out = tvm.nd.empty(get_const_tuple(dst.shape), dst.dtype, tvm.cpu())
+    func(data, out)
+    return out
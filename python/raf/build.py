@@ -22,6 +22,14 @@ def with_cublas():
     return build_info.use_cublas() != "OFF"
 
 
+def with_cpu_blas():
+    """Whether build with a CPU BLAS library. if true, return the library, or None otherwise."""
+    vendor = build_info.use_cpu_blas()
+    if vendor != "OFF":
+        return vendor
+    return None
+
+
 def with_cudnn():
     """Whether build with CUDNN. if true, return the CUDNN version, or None otherwise."""
     if build_info.use_cudnn() != "OFF":
@@ -68,7 +76,7 @@ def build_with(backend):  # pylint: disable=too-many-return-statements
     -------
     Whether the backend is built with RAF.
     """
-    assert backend in ["tvm", "cuda", "cudnn", "cutlass", "cublas", "nccl"], (
+    assert backend in ["tvm", "cuda", "cudnn", "cutlass", "cublas", "cpu_blas", "nccl"], (
         "Invalid backend: %s" % backend
     )
     if backend == "tvm":
@@ -77,6 +85,8 @@ def build_with(backend):  # pylint: disable=too-many-return-statements
         return with_cuda() is not None
     if backend == "cublas":
         return with_cublas()
+    if backend == "cpu_blas":
+        return with_cpu_blas() is not None
     if backend == "cudnn":
         return with_cudnn() is not None
     if backend == "cutlass":
@@ -15,4 +15,4 @@ from .op import (
     group_reduce_scatter,
 )
 from .config import DistConfig, get_config
-from .communicator import get_communicator, set_default_communicator
+from .communicator import get_communicator, set_default_communicator, set_cpu_comm_transport
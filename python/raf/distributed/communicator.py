@@ -73,6 +73,11 @@ class VoidCommunicator(Communicator):
             setattr(self, attr, context_dict[attr])
 
 
+@register_node("raf.distributed.CPUCommunicator")
+class CPUCommunicator(Communicator):
+    pass
+
+
 def get_communicator():
     return ffi.GetGlobalCommunicator()
 
@@ -80,3 +85,17 @@ def get_communicator():
 def set_default_communicator(name):
     assert name in ["mpi", "void"], "Invalid name to set global communicator!"
     ffi.SetDefaultCommunicator(name)
+
+
+def set_cpu_comm_transport(name):
+    """Set the transport of the CPU communicators created afterwards, which overrides the
+    environment variable RAF_CPU_COMM_TRANSPORT.
+
+    Parameters
+    ----------
+    name : str
+        "shm" for POSIX shared memory, "tcp" for TCP loopback sockets, or "auto" to use
+        RAF_CPU_COMM_TRANSPORT, which defaults to "shm".
+    """
+    assert name in ["auto", "shm", "tcp"], "Invalid CPU communicator transport!"
+    ffi.SetCPUCommTransport("" if name == "auto" else name)
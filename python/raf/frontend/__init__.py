@@ -2,6 +2,8 @@
 # SPDX-License-Identifier: Apache-2.0
 
 """Framework frontend module"""
+from .._lib import lazy_getattr as _lazy_getattr
 from .model import FrameworkModel
-from .mxnet import from_mxnet
-from .pytorch import from_pytorch
+
+# The frontends are imported on first access, because they import the frameworks.
+__getattr__ = _lazy_getattr(__name__, attrs={"from_mxnet": ".mxnet", "from_pytorch": ".pytorch"})
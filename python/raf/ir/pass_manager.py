@@ -5,6 +5,9 @@
 # pylint: disable=missing-class-docstring, missing-function-docstring
 # pylint: disable=too-few-public-methods, too-many-arguments
 
+import json
+import os
+
 from tvm.ir.transform import Pass
 from raf._core.core_utils import register_node
 from raf._ffi import pass_
@@ -52,3 +55,128 @@ class RAFSequential(Pass):
 @register_node("raf.pass_.RAFFunctionPass")
 class RAFFunctionPass(Pass):
     """A pass that works on each tvm.relay.Function in a module."""
+
+
+class PassProfiler:
+    """A context manager that profiles the passes executed by RAFSequential, such as the ones in
+    the VM compiler. For every pass, it records the wall time, the number of let-bindings and calls
+    in the module before and after the pass, and the resident set size of the process.
+
+    If the runtime profiler (raf.utils.profiler) is also started, the passes are emitted to it
+    under the category "Pass", so they show up in the trace dumped by raf.utils.profiler.dump().
+
+    Example
+    -------
+    .. code-block:: python
+
+        with raf.ir.PassProfiler() as prof:
+            executor = VMExecutor(mod, "cpu")
+        print(prof.table())
+    """
+
+    def __init__(self):
+        self.records = []
+
+    def __enter__(self):
+        pass_.ResetPassProfiler()
+        pass_.EnablePassProfiler(True)
+        return self
+
+    def __exit__(self, ptype, value, trace):
+        pass_.EnablePassProfiler(False)
+        self.records = json.loads(pass_.GetPassProfile())
+        for record in self.records:
+            record["time_ms"] = (record["end_us"] - record["start_us"]) / 1000.0
+
+    def table(self, sort_by=None):
+        """Format the profiled passes as a table.
+
+        Parameters
+        ----------
+        sort_by: Optional[str]
+            The field to sort the passes in the descending order, e.g., "time_ms". None keeps
+            the execution order.
+
+        Returns
+        -------
+        ret: str
+            The table.
+        """
+        records = self.records
+        if sort_by is not None:
+            records = sorted(records, key=lambda record: record[sort_by], reverse=True)
+        lines = [
+            "%-40s %10s %18s %18s %12s" % ("Pass", "Time (ms)", "Lets", "Calls", "Peak RSS (MB)")
+        ]
+        for record in records:
+            lines.append(
+                "%-40s %10.2f %18s %18s %12.1f"
+                % (
+                    "  " * record["depth"] + record["name"],
+                    record["time_ms"],
+                    "%d -> %d" % (record["lets_before"], record["lets_after"]),
+                    "%d -> %d" % (record["calls_before"], record["calls_after"]),
+                    record["peak_rss_kb"] / 1024.0,
+                )
+            )
+        return "\n".join(lines)
+
+    def to_json(self, filename=None):
+        """Return the profiled passes in JSON, and optionally write it to a file.
+
+        Parameters
+        ----------
+        filename: Optional[str]
+            The file to write the JSON to.
+
+        Returns
+        -------
+        ret: str
+            The profiled passes in JSON.
+        """
+        ret = json.dumps(self.records, indent=4)
+        if filename is not None:
+            with open(filename, "w") as out_file:
+                out_file.write(ret)
+        return ret
+
+    def chrome_trace(self, merge_with=None):
+        """Return the profiled passes in the Chrome trace event format.
+
+        Parameters
+        ----------
+        merge_with: Optional[Dict[str, Any]]
+            The trace to merge the pass events into, such as the one returned by
+            raf.utils.profiler.get().
+
+        Returns
+        -------
+        ret: Dict[str, Any]
+            The trace with the pass events.
+        """
+        trace = merge_with if merge_with is not None else {"traceEvents": []}
+        pid = os.getpid()
+        for record in self.records:
+            trace["traceEvents"].append(
+                {
+                    "name": record["name"],
+                    "cat": "Pass",
+                    "ph": "X",
+                    "ts": record["start_us"],
+                    "dur": record["end_us"] - record["start_us"],
+                    "pid": pid,
+                    "tid": "Pass",
+                    "args": {
+                        key: record[key]
+                        for key in (
+                            "lets_before",
+                            "lets_after",
+                            "calls_before",
+                            "calls_after",
+                            "rss_kb",
+                            "peak_rss_kb",
+                        )
+                    },
+                }
+            )
+        return trace
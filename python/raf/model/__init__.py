@@ -3,6 +3,6 @@
 
 """Model block definition."""
 from .model import Model
-from .trace import trace, trace_mutate_attr
+from .trace import trace, trace_mutate_attr, pow2_bucket, set_trace_cache_size
 from .nn import BatchNorm, Conv2d, Linear
 from .structure import Sequential
@@ -10,7 +10,7 @@ from raf._core import cacher
 from raf._core.core_utils import bfs, get_attr, get_named_attr, set_module
 from raf._core.device import Device
 from raf._core.ndarray import ndarray
-from raf.model.trace import _get_trace_record
+from raf.model.trace import _CompileOptions, _get_trace_record, _run_compiled
 
 
 @set_module("raf")
@@ -45,17 +45,75 @@ class Model(BaseModel, cacher.Cacher):
     def __init__(self, *args, **kwargs):
         super(Model, self).__init__()
         build, self.__fwd_train, self.__fwd_infer = _extract_methods(self)
+        self.__compile_options = None
         build(*args, **kwargs)
         cacher.enable(self)  # Cache is set up after the model is built
 
     def __call__(self, *args, **kwargs):
-        forward = (
-            self.__fwd_train
-            if self._BaseModel__is_train  # pylint: disable=no-member
-            else self.__fwd_infer
-        )
+        is_train = self._BaseModel__is_train  # pylint: disable=no-member
+        forward = self.__fwd_train if is_train else self.__fwd_infer
+        if self.__compile_options is not None and not is_train:
+            return _run_compiled(forward, self.__compile_options, [self] + list(args), kwargs)
         return forward(*args, **kwargs)
 
+    def compile(
+        self,
+        device=None,
+        *,
+        sch_file=None,
+        enable_cuda_graph=False,
+        pre_pack_weights=False,
+        enable=True,
+    ):
+        """Run the model in inference mode with the VM instead of the interpreter. The model is
+        compiled to a VM executable once per input signature on its first call, and later calls
+        with the same signature run the executable directly with the resident parameters.
+        The executables are invalidated by the same events as the traces, e.g., setting an
+        attribute, switching the mode, or moving the model with ``to``.
+        Training mode always runs with the interpreter, because it records the tape for autodiff.
+
+        Parameters
+        ----------
+        device : Optional[str]
+            The device to run the model on. The model parameters and inputs are expected to be
+            on this device. None means the device of the model parameters.
+
+        sch_file : Optional[str]
+            The tuned schedule file path.
+
+        enable_cuda_graph : bool
+            Whether to use CUDA graph.
+
+        pre_pack_weights : bool
+            Whether to bind the parameters as constants and pre-pack the weights of the tuned CPU
+            kernels to the layouts requested by the schedules in sch_file at compile time. The
+            executables then no longer read the parameters, so updating a parameter in place is
+            not reflected until the executables are invalidated.
+
+        enable : bool
+            Whether to enable the compiled execution. False restores the interpreter.
+
+        Returns
+        -------
+        model : Model
+            The model itself.
+        """
+        if not enable:
+            self.__compile_options = None
+            return self
+        if getattr(self.__fwd_infer, "__trace_options__", None) is None:
+            raise ValueError("Only a model whose forward methods are traced can be compiled")
+        if device is None:
+            params = list(self.state().values())
+            device = params[0].device if params else "cpu"
+        self.__compile_options = _CompileOptions(
+            device=device,
+            sch_file=sch_file,
+            enable_cuda_graph=enable_cuda_graph,
+            pre_pack_weights=pre_pack_weights,
+        )
+        return self
+
     def train_mode(self, recursive=True):
         super(Model, self).train_mode(recursive=recursive)
         cacher.invalidate(self, include_self=True, recursive=True)
@@ -93,7 +151,10 @@ class Model(BaseModel, cacher.Cacher):
         # TODO(hgt312): varargs and kwargs
         args = [self] + list(args)
 
-        record = _get_trace_record(pyfunc, args, kwargs)
+        # Note that shape bucketing is not applied here, as callers feed the original
+        # inputs to the traced function.
+        options = getattr(fwd_func, "__trace_options__", None)
+        record = _get_trace_record(pyfunc, args, kwargs, options)
         m_mod = record.mod
         r_func = m_mod["main"]
         # already cached
@@ -10,7 +10,9 @@ from raf._core import cacher
 from raf._core.core_utils import get_bound_args, get_func_name
 from raf._core.global_scope import SCOPE
 from raf._core.module import IRModule
+from raf._core.executor import VMExecutor
 from raf._core.ndarray import Symbol, ndarray
+from raf._core.value import TupleValue
 from raf._ffi.pass_ import ExtractBinding, RenameVars
 from raf._ffi.model import RunModel
 from raf._lib import relay, Array
@@ -45,17 +47,52 @@ def trace_mutate_attr(obj, attr_name, symbol):
     object.__setattr__(obj, attr_name, symbol)
 
 
-def trace(pyfunc):
+def trace(pyfunc=None, *, cache_size=None, bucket=None):
+    """Trace a model method into a RAF function.
+
+    Traced functions are cached per input signature (shape, dtype and nesting of the inputs),
+    so calling the model with a new input shape traces it again instead of reusing a stale
+    function. The cache is bounded and evicts the least recently used trace.
+
+    Parameters
+    ----------
+    pyfunc : Optional[Callable]
+        The method to be traced. It is None when the decorator is used with arguments,
+        e.g., ``@raf.model.trace(cache_size=4)``.
+
+    cache_size : Optional[int]
+        The maximum number of traces kept for this method. None means using
+        the value set by ``set_trace_cache_size``.
+
+    bucket : Optional[Callable[[Tuple[int]], Tuple[int]]]
+        A function that maps the shape of each input tensor to its bucketed shape.
+        Inputs are zero-padded on their device to the bucketed shape before tracing and running,
+        so inputs falling into the same bucket share one trace. Output tensors are sliced back
+        along each padded axis (counted from the first axis) whose size equals the bucketed size,
+        so callers get the outputs of their real batch. The model must not mix the padded
+        entries into the others, e.g., by reducing over a padded axis. See ``pow2_bucket`` for an
+        example.
+    """
+    if pyfunc is None:
+        return functools.partial(trace, cache_size=cache_size, bucket=bucket)
+
+    options = _TraceOptions(cache_size=cache_size, bucket=bucket)
+
     @functools.wraps(pyfunc)
     def new_pyfunc(*args, **kwargs):
         if len(args) == 0 or not isinstance(args[0], cacher.Cacher):
             raise ValueError("Decorator trace should only be applied to a model")
         if _scope_last_name() == "trace":
             return pyfunc(*args, **kwargs)
-        record = _get_trace_record(pyfunc, args, kwargs)
+        sizes = {}
+        if options.bucket is not None:
+            args, kwargs, sizes = _bucket_inputs(args, kwargs, options.bucket)
+        record = _get_trace_record(pyfunc, args, kwargs, options)
         bound_args = get_bound_args(pyfunc, args, kwargs)
-        return _run_trace_record(record, bound_args.args, bound_args.kwargs)
+        result = _run_trace_record(record, bound_args.args, bound_args.kwargs)
+        return _unbucket_outputs(result, sizes)
 
+    new_pyfunc.__trace_options__ = options
     return new_pyfunc
 
 
@@ -73,6 +110,59 @@ def _run_trace_record(record, args, kwargs):
     return _unflatten_from_struct(result, record.o_struct)
 
 
+# The logic of running a tracing record with the VM
+_CompileOptions = namedtuple(
+    "_CompileOptions", ["device", "sch_file", "enable_cuda_graph", "pre_pack_weights"]
+)
+
+
+def _run_compiled(fwd_func, compile_options, args, kwargs):
+    """Run a traced method with a VM executable. The executable is compiled once per input
+    signature and cached along with the trace record, so it is invalidated with the record."""
+    pyfunc = fwd_func.__wrapped__
+    options = getattr(fwd_func, "__trace_options__", None)
+    sizes = {}
+    if options is not None and options.bucket is not None:
+        args, kwargs, sizes = _bucket_inputs(args, kwargs, options.bucket)
+    cache = _get_trace_cache(pyfunc, args[0], options)
+    key = _get_input_signature(pyfunc, args, kwargs)
+    record = _get_cached_record(cache, key, pyfunc, args, kwargs)
+    executor = cache.executors.get(key, None)
+    pre_pack_weights = compile_options.pre_pack_weights
+    if executor is None:
+        if pre_pack_weights and record.mutations:
+            raise ValueError("Cannot pre-pack the weights of a model that mutates its parameters")
+        executor = VMExecutor(
+            record.mod,
+            compile_options.device,
+            enable_cuda_graph=compile_options.enable_cuda_graph,
+            params=dict(record.named_params) if pre_pack_weights else None,
+            pre_pack_weights=pre_pack_weights,
+            sch_file=compile_options.sch_file,
+        ).make_executor(compile_options.sch_file)
+        cache.executors[key] = executor
+    bound_args = get_bound_args(pyfunc, args, kwargs)
+    func_inputs = _get_func_inputs(record, bound_args.args[1:], bound_args.kwargs, False)
+    if pre_pack_weights:
+        # The parameters are bound to the executable as constants.
+        func_inputs = func_inputs[: len(func_inputs) - len(record.named_params)]
+    result = _unwrap_value(executor(*func_inputs))
+    if not isinstance(result, list):
+        result = [result]
+    for obj, attr in reversed(record.mutations):
+        object.__setattr__(obj, attr, result[-1])
+        if attr in record.named_params.keys():
+            record.named_params[attr] = result[-1]
+        result.pop()
+    return _unbucket_outputs(_unflatten_from_struct(result, record.o_struct), sizes)
+
+
+def _unwrap_value(value):
+    if isinstance(value, TupleValue):
+        return [_unwrap_value(x) for x in value]
+    return ndarray.from_tensor_value(value)
+
+
 def _get_handle_or_origin(arg, get_handle=True):
     if isinstance(arg, ndarray):
         return arg._ndarray__handle if get_handle else arg
@@ -118,17 +208,191 @@ def _unwrap(result):
     return result
 
 
-def _get_trace_record(pyfunc, args, kwargs):
-    model = args[0]
+# Trace cache
+
+_TraceOptions = namedtuple("_TraceOptions", ["cache_size", "bucket"])
+
+_DEFAULT_TRACE_CACHE_SIZE = [8]
+
+
+def set_trace_cache_size(size):
+    """Set the default maximum number of traces cached per traced method.
+
+    Parameters
+    ----------
+    size : int
+        The maximum number of traces. Must be positive.
+    """
+    if size <= 0:
+        raise ValueError("Trace cache size must be positive, but got %d" % size)
+    _DEFAULT_TRACE_CACHE_SIZE[0] = size
+
+
+def get_trace_cache_size():
+    """Get the default maximum number of traces cached per traced method."""
+    return _DEFAULT_TRACE_CACHE_SIZE[0]
+
+
+def pow2_bucket(axes=(0,)):
+    """Make a bucketing function that pads the given axes to the next power of two.
+
+    Parameters
+    ----------
+    axes : Tuple[int]
+        The axes to be bucketed, e.g., (0,) for batch size or (0, 1) for batch size and
+        sequence length. Axes that a tensor does not have are ignored.
+
+    Returns
+    -------
+    bucket : Callable[[Tuple[int]], Tuple[int]]
+        The bucketing function to be passed to ``trace``.
+    """
+
+    def bucket(shape):
+        shape = list(shape)
+        for axis in axes:
+            if -len(shape) <= axis < len(shape) and shape[axis] > 0:
+                shape[axis] = 1 << (shape[axis] - 1).bit_length()
+        return tuple(shape)
+
+    return bucket
+
+
+class _TraceCache:
+    """An LRU cache of trace records of one method, keyed by the input signature."""
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.records = OrderedDict()
+        # The compiled VM executors of the records, see Model.compile.
+        self.executors = {}
+        # Whether any cached record mutates model attributes. If so, the parameters
+        # captured by other records may be stale and have to be refreshed before use.
+        self.has_mutations = False
+
+    def get(self, key):
+        record = self.records.get(key, None)
+        if record is not None:
+            self.records.move_to_end(key)
+        return record
+
+    def put(self, key, record):
+        self.records[key] = record
+        self.records.move_to_end(key)
+        while len(self.records) > self.capacity:
+            evicted, _ = self.records.popitem(last=False)
+            self.executors.pop(evicted, None)
+        self.has_mutations = self.has_mutations or bool(record.mutations)
+
+    def __len__(self):
+        return len(self.records)
+
+
+def _get_signature(arg):
+    if isinstance(arg, ndarray):
+        return ("ndarray", tuple(arg.shape), arg.dtype)
+    if isinstance(arg, Symbol):
+        return ("Symbol", str(arg._Symbol__handle.type_annotation))
+    if isinstance(arg, (tuple, list)):
+        return (type(arg).__name__,) + tuple(_get_signature(x) for x in arg)
+    raise NotImplementedError("Type is not supported: ", type(arg))
+
+
+def _get_input_signature(pyfunc, args, kwargs):
+    bound_args = get_bound_args(pyfunc, args, kwargs)
+    return tuple(
+        (name, _get_signature(value)) for name, value in list(bound_args.arguments.items())[1:]
+    )
+
+
+def _bucket_inputs(args, kwargs, bucket):
+    """Pad the input tensors to their bucketed shapes on their devices. Return the padded
+    arguments, and a map from each padded axis to a map from the bucketed size to the real size,
+    which is used by _unbucket_outputs."""
+    from raf._op import imp  # pylint: disable=import-outside-toplevel,cyclic-import
+
+    sizes = {}
+
+    def pad(arg):
+        if isinstance(arg, (tuple, list)):
+            return type(arg)(pad(x) for x in arg)
+        if not isinstance(arg, ndarray):
+            return arg
+        shape = tuple(arg.shape)
+        new_shape = tuple(bucket(shape))
+        if new_shape == shape:
+            return arg
+        if len(new_shape) != len(shape) or any(n < o for n, o in zip(new_shape, shape)):
+            raise ValueError("Cannot bucket shape %s to %s" % (shape, new_shape))
+        for axis, (new, old) in enumerate(zip(new_shape, shape)):
+            if new != old and sizes.setdefault(axis, {}).setdefault(new, old) != old:
+                raise ValueError(
+                    "Inputs of sizes %d and %d at axis %d are padded to the same size %d, so the "
+                    "outputs cannot be sliced back" % (sizes[axis][new], old, axis, new)
+                )
+        pad_width = []
+        for new, old in zip(new_shape, shape):
+            pad_width += [0, new - old]
+        ret = imp.pad(arg, pad_width)
+        ret.requires_grad = arg.requires_grad
+        return ret
+
+    args = [args[0]] + [pad(arg) for arg in args[1:]]
+    kwargs = {name: pad(arg) for name, arg in kwargs.items()}
+    return args, kwargs, sizes
+
+
+def _unbucket_outputs(output, sizes):
+    """Slice the output tensors back along the padded axes, see _bucket_inputs."""
+    from raf._op import imp  # pylint: disable=import-outside-toplevel,cyclic-import
+
+    if not sizes:
+        return output
+    if isinstance(output, (tuple, list)):
+        return type(output)(_unbucket_outputs(x, sizes) for x in output)
+    if not isinstance(output, ndarray):
+        return output
+    shape = list(output.shape)
+    end = [sizes.get(axis, {}).get(size, size) for axis, size in enumerate(shape)]
+    if end == shape:
+        return output
+    return imp.strided_slice(output, [0] * len(shape), end)
+
+
+def _get_trace_cache(pyfunc, model, options):
     func_name = get_func_name(pyfunc)
-    record = cacher.get_cache(model, "trace@" + func_name, None)
+    capacity = options.cache_size if options and options.cache_size else get_trace_cache_size()
+    cache = cacher.get_cache(model, "trace@" + func_name, None)
+    if cache is None:
+        cache = _TraceCache(capacity)
+        cacher.set_cache(model, "trace@" + func_name, cache)
+    return cache
+
+
+def _get_cached_record(cache, key, pyfunc, args, kwargs):
+    record = cache.get(key)
     if record is not None:
+        if cache.has_mutations:
+            _refresh_named_params(args[0], record)
         return record
     record = _do_tracing(pyfunc, args, kwargs)
-    cacher.set_cache(model, "trace@" + func_name, record)
+    cache.put(key, record)
     return record
 
 
+def _get_trace_record(pyfunc, args, kwargs, options=None):
+    cache = _get_trace_cache(pyfunc, args[0], options)
+    key = _get_input_signature(pyfunc, args, kwargs)
+    return _get_cached_record(cache, key, pyfunc, args, kwargs)
+
+
+def _refresh_named_params(model, record):
+    state = model.state()
+    for name in record.named_params.keys():
+        if name in state:
+            record.named_params[name] = state[name]
+
+
 # The logic of tracing
 def _do_tracing(pyfunc, args, kwargs):
     # Step 1. switch input arguments to symbols
@@ -11,11 +11,13 @@ from raf.model import trace, Model, trace_mutate_attr
 from raf.model.trace import _get_func_inputs
 from raf._op import imp
 from raf._op.sym import multiply, add, subtract, strided_slice, cast
+from raf._op.sym import sgd, fuse_tensor, zeros_like
 from .. import distributed as dist
 from .data_parallel import with_data_parallel
 from ..distributed.op import allgather
 from .optim import with_autodiff
 from .utils import has_grad, split_ndarray_with_padding
+from .utils import bucket_ndarrays, create_views
 
 
 # pylint: disable=too-few-public-methods
@@ -32,9 +34,20 @@ class SGD:
 
     momentum: float (optional)
         momentum factor
+
+    fused: bool (optional)
+        Whether to pack the parameters and momenta into contiguous flat buffers, so that
+        each step updates all parameters on the same device with the same dtype by a few
+        kernels over the flat buffers instead of one kernel per parameter. The parameters
+        are rebound to views of the flat buffer once, and each step updates the flat buffers
+        in place.
+
+    bucket_size: Optional[int]
+        The maximum number of elements in a flat buffer when fused is enabled.
+        None means unlimited.
     """
 
-    def __init__(self, params, learning_rate, momentum=0):
+    def __init__(self, params, learning_rate, momentum=0, fused=False, bucket_size=None):
         if learning_rate < 0.0:
             raise ValueError("Invalid learning rate: {}".format(learning_rate))
         if momentum < 0.0:
@@ -42,14 +55,27 @@ class SGD:
         self.params = []
         self._lr = learning_rate
         self._momentum = momentum
-        for i, x in enumerate(params):
+        self._buckets = []
+        params = list(params)
+        for x in params:
             assert isinstance(x, ndarray), "Only `raf.ndarray' can be optimized!"
+        if fused:
+            for k, indices in enumerate(bucket_ndarrays(params, bucket_size)):
+                self._buckets.append(_SGDBucket(k, [params[i] for i in indices]))
+            for bucket in self._buckets:
+                self.params += list(zip(bucket.xs, bucket.v_views))
+            return
+        for i, x in enumerate(params):
             npa = np.zeros(x.shape, dtype=x.dtype)
             v_i = ndarray(npa, device=x.device, name=f"sgd.{i}.v")
             self.params.append((x, v_i))
 
     def step(self):
         """Update the parameters with gradients."""
+        if self._buckets:
+            for bucket in self._buckets:
+                bucket.step(self._lr, self._momentum)
+            return
         for x0, v0 in self.params:
             if x0.grad is None:
                 continue
@@ -58,7 +84,73 @@ class SGD:
             v0.update(v1)
 
 
-def with_sgd(learning_rate=0.1, momentum=0.01):
+class _SGDBucket:
+    """The parameters and momenta of SGD packed in contiguous flat buffers. The parameters and
+    momenta are views of the buffers, which are updated in place, so a step neither rebinds the
+    parameters nor creates views."""
+
+    def __init__(self, idx, xs):
+        self.xs = xs
+        self.shapes = [x.shape for x in xs]
+        device = xs[0].device
+        npa = np.concatenate([x.numpy(copy=False).ravel() for x in xs])
+        self.w = ndarray(npa, device=device, name=f"sgd.bucket{idx}.w")
+        self.v = ndarray(np.zeros_like(npa), device=device, name=f"sgd.bucket{idx}.v")
+        self.w_views = []
+        self.v_views = create_views(self.v, self.shapes)
+        self._learning_rate = None
+        self._momentum = None
+        self._rebind_weights()
+
+    def _rebind_weights(self):
+        self.w_views = create_views(self.w, self.shapes)
+        for x, view in zip(self.xs, self.w_views):
+            x.update(view)
+
+    def _is_packed(self):
+        """Whether the parameters still share the flat weight buffer. It may not be the case
+        if parameters are rebound by users after the last step."""
+        for x, view in zip(self.xs, self.w_views):
+            # pylint: disable=protected-access
+            if not x._ndarray__value.same_as(view._ndarray__value):
+                return False
+        return True
+
+    def _get_scalars(self, learning_rate, momentum):
+        """Get the learning rate and the momentum as scalar tensors on the device."""
+        if self._learning_rate is None or self._learning_rate[0] != learning_rate:
+            scalar = array(learning_rate, dtype=self.w.dtype, device=self.w.device)
+            self._learning_rate = (learning_rate, scalar)
+        if self._momentum is None or self._momentum[0] != momentum:
+            scalar = array(momentum, dtype=self.w.dtype, device=self.w.device)
+            self._momentum = (momentum, scalar)
+        return self._learning_rate[1], self._momentum[1]
+
+    @staticmethod
+    def _update(x, dx, v, learning_rate, momentum):
+        """Update x and v in place, i.e., v = momentum * v + dx, x = x - learning_rate * v."""
+        imp.add(imp.multiply(momentum, v), dx, out=v)
+        imp.subtract(x, imp.multiply(learning_rate, v), out=x)
+
+    def step(self, learning_rate, momentum):
+        """Update all parameters in this bucket."""
+        if not self._is_packed():
+            # Copy the rebound parameters into the flat buffer and bind them to it again.
+            self.w = imp.fuse_tensor(self.xs)
+            self._rebind_weights()
+        learning_rate, momentum = self._get_scalars(learning_rate, momentum)
+        grads = [x.grad for x in self.xs]
+        if any(g is None for g in grads):
+            # Update the parameters with gradients one by one. They are views of the flat
+            # buffers, so the buffers are updated as well.
+            for x, v, dx in zip(self.w_views, self.v_views, grads):
+                if dx is not None:
+                    self._update(x, dx, v, learning_rate, momentum)
+            return
+        self._update(self.w, imp.fuse_tensor(grads), self.v, learning_rate, momentum)
+
+
+def with_sgd(learning_rate=0.1, momentum=0.01, fused=False, bucket_size=None):
     """Optimizer : stochastic gradient descent
 
     Parameters:
@@ -69,6 +161,16 @@ def with_sgd(learning_rate=0.1, momentum=0.01):
     momentum: float (optional)
         momentum factor
 
+    fused: bool (optional)
+        Whether to pack the SGD weights, gradients and variants into flat buffers and update
+        them with a single SGD op per bucket. The model parameters are rebound to views of the
+        flat buffers once, and each step updates the buffers in place with the VM. It is ignored
+        when the optimizer status is partitioned (ZeRO).
+
+    bucket_size: Optional[int]
+        The maximum number of elements in a flat buffer when fused is enabled.
+        None means unlimited.
+
     Returns
     ret : function
         The wrapper which wraps a model with sgd
@@ -117,6 +219,7 @@ def with_sgd(learning_rate=0.1, momentum=0.01):
 
                 dcfg = dist.get_config()
                 comm = dist.get_communicator()
+                self.fused = fused and not dcfg.zero_opt_level
                 self.params = {}
                 for name, param in self.model.state().items():
                     # For each tensor "param" that requires gradient (i.e., training weights),
@@ -162,18 +265,59 @@ def with_sgd(learning_rate=0.1, momentum=0.01):
                             self.has_sgd_w = True
 
                         # Maintain a weight copy if it is differernt as the model parameter.
-                        if self.has_sgd_w:
+                        # In the fused mode, weight copies are kept in flat buffers created below.
+                        if self.has_sgd_w and not self.fused:
                             setattr(self, f"{name}.sgd_w", v_w)
 
-                        # Initialize variants according to the status shape.
-                        v_i = ndarray(
-                            np.zeros(status_shape, dtype="float32"),
-                            device=param.device,
-                            name=f"{name}.sgd_v",
-                        )
-                        setattr(self, f"{name}.sgd_v", v_i)
+                        # Initialize variants according to the status shape. In the fused mode,
+                        # variants are kept in flat buffers created below.
+                        v_i = None
+                        if not self.fused:
+                            v_i = ndarray(
+                                np.zeros(status_shape, dtype="float32"),
+                                device=param.device,
+                                name=f"{name}.sgd_v",
+                            )
+                            setattr(self, f"{name}.sgd_v", v_i)
                         self.params[param._ndarray__handle] = (name, param, v_w, v_i)
 
+                # Each bucket is a list of parameter handles, whose SGD weights, variants and model
+                # parameters are kept in flat buffers. The model parameters are rebound to views of
+                # the flat buffer once, so the SGD op updates them in place at each step.
+                self.buckets = []
+                if self.fused:
+                    handles = list(self.params.keys())
+                    weights = [self.params[handle][1] for handle in handles]
+                    for k, indices in enumerate(bucket_ndarrays(weights, bucket_size)):
+                        bucket = [handles[idx] for idx in indices]
+                        params = [self.params[handle][1] for handle in bucket]
+                        shapes = [param.shape for param in params]
+                        device = params[0].device
+                        npa = np.concatenate(
+                            [self.params[handle][2].numpy(copy=False).ravel() for handle in bucket]
+                        )
+                        flat_sgd_w = ndarray(npa, device=device, name=f"sgd_bucket{k}.sgd_w")
+                        flat_v = ndarray(
+                            np.zeros_like(npa), device=device, name=f"sgd_bucket{k}.sgd_v"
+                        )
+                        setattr(self, f"sgd_bucket{k}.sgd_w", flat_sgd_w)
+                        setattr(self, f"sgd_bucket{k}.sgd_v", flat_v)
+                        flat_w = flat_sgd_w
+                        if self.has_sgd_w:
+                            # The model parameters are kept in a separate flat buffer of their
+                            # dtype, and the SGD weights become views of the float32 flat buffer.
+                            npa = np.concatenate(
+                                [param.numpy(copy=False).ravel() for param in params]
+                            )
+                            flat_w = ndarray(npa, device=device, name=f"sgd_bucket{k}.w")
+                            setattr(self, f"sgd_bucket{k}.w", flat_w)
+                            for handle, view in zip(bucket, create_views(flat_sgd_w, shapes)):
+                                name, param, _, _ = self.params[handle]
+                                self.params[handle] = (name, param, view, None)
+                        for param, view in zip(params, create_views(flat_w, shapes)):
+                            param.update(view)
+                        self.buckets.append(bucket)
+
                 if self.has_sgd_w:
                     # TODO(issue 758): Remove this and in-place update parameters.
                     self.zero = array(0, dtype=self.dtype)
@@ -186,6 +330,7 @@ def with_sgd(learning_rate=0.1, momentum=0.01):
                 inputs = inputs[1:]  # remove dy
                 dcfg = dist.get_config()
                 comm = dist.get_communicator()
+                grads = {}
                 for i, param in enumerate(inputs):
                     dxi = dxs[i] if len(inputs) > 1 else dxs
                     if param in self.params and has_grad(dxi):
@@ -196,6 +341,10 @@ def with_sgd(learning_rate=0.1, momentum=0.01):
                         if self.dtype != "float32":
                             dxi = cast(dxi, "float32")
 
+                        if self.fused:
+                            grads[param] = dxi
+                            continue
+
                         # Inplace update the local SGD variant and weight (float32).
                         new_sgd_v = add(multiply(self.momentum, sgd_v), dxi, out=sgd_v)
                         new_sgd_w = subtract(
@@ -222,6 +371,29 @@ def with_sgd(learning_rate=0.1, momentum=0.01):
                         # Put the updated weight to the model output to avoid being dead code.
                         param_model = get_chained_attr(self.model, name.split(".")[:-1])
                         trace_mutate_attr(param_model, name.split(".")[-1], new_weight)
+
+                for k, handles in enumerate(self.buckets):
+                    dxs_k = []
+                    for handle in handles:
+                        # Parameters without gradients are never updated so their variants
+                        # are always zeros. Zero gradients keep them unchanged in the fused update.
+                        if handle in grads:
+                            dxs_k.append(grads[handle])
+                        else:
+                            zero = zeros_like(self.params[handle][1])
+                            dxs_k.append(cast(zero, "float32") if self.dtype != "float32" else zero)
+                    # The SGD weights and variants are updated in place, and so are the model
+                    # parameters that are views of the SGD weights.
+                    flat_sgd_w = getattr(self, f"sgd_bucket{k}.sgd_w")
+                    flat_v = getattr(self, f"sgd_bucket{k}.sgd_v")
+                    ret = sgd(flat_sgd_w, fuse_tensor(dxs_k), flat_v, learning_rate, momentum)
+                    trace_mutate_attr(self, f"sgd_bucket{k}.sgd_v", ret[0])
+                    trace_mutate_attr(self, f"sgd_bucket{k}.sgd_w", ret[1])
+                    if self.has_sgd_w:
+                        # Cast the updated SGD weights to the flat buffer of the model parameters.
+                        flat_w = getattr(self, f"sgd_bucket{k}.w")
+                        new_w = add(cast(ret[1], self.dtype), self.zero, out=flat_w)
+                        trace_mutate_attr(self, f"sgd_bucket{k}.w", new_w)
                 return y
 
         return SGDWrapper(model)
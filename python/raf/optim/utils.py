@@ -9,6 +9,7 @@ import numpy as np
 from raf._lib import relay
 from raf._ffi.ir.constant import ExtractValue
 from raf._ffi.binding import LookupBoundExpr
+from raf._ffi.value import CreateTensorView
 from raf._core.value import NoGradValue
 from raf._core.ndarray import ndarray, get_symbol_handle
 
@@ -50,3 +51,84 @@ def split_ndarray_with_padding(inp, n_part):
         pad_width[0] = (0, pad_first_dim_size - inp.shape[0])
         inp = np.pad(inp, pad_width)
     return np.split(inp, n_part)
+
+
+def bucket_ndarrays(arrays, bucket_size=None):
+    """Group arrays that can share a contiguous flat buffer, i.e., arrays on the same device
+    with the same dtype. Arrays keep their relative order in each bucket.
+
+    Parameters
+    ----------
+    arrays: List[Union[ndarray, Symbol]]
+        The arrays to be grouped. Each of them should have `device`, `dtype` and `shape`.
+
+    bucket_size: Optional[int]
+        The maximum number of elements in a bucket. A single array larger than this size
+        forms a bucket by itself. None means unlimited.
+
+    Returns
+    -------
+    ret: List[List[int]]
+        The indices of the arrays in each bucket.
+    """
+    buckets = []
+    open_buckets = {}
+    for idx, arr in enumerate(arrays):
+        key = (arr.device, arr.dtype)
+        size = int(np.prod(arr.shape))
+        if key in open_buckets:
+            bucket, bucket_numel = open_buckets[key]
+            if bucket_size is None or bucket_numel + size <= bucket_size:
+                bucket.append(idx)
+                open_buckets[key] = (bucket, bucket_numel + size)
+                continue
+        buckets.append([idx])
+        open_buckets[key] = (buckets[-1], size)
+    return buckets
+
+
+def get_defuse_args(shapes):
+    """Get the sizes, flattened shapes and shape indices used by `defuse_tensor` to split a flat
+    buffer back to tensors of the given shapes.
+
+    Parameters
+    ----------
+    shapes: List[Tuple[int]]
+        The shapes of the tensors packed in the flat buffer.
+
+    Returns
+    -------
+    ret: Tuple[List[int], List[int], List[int]]
+        The sizes, flattened shapes and shape indices.
+    """
+    sizes, flat_shapes, shape_indices = [], [], []
+    for shape in shapes:
+        sizes.append(int(np.prod(shape)))
+        flat_shapes.extend(shape)
+        shape_indices.append(len(flat_shapes))
+    return sizes, flat_shapes, shape_indices
+
+
+def create_views(flat, shapes):
+    """Create arrays that share the memory of a flat buffer.
+
+    Parameters
+    ----------
+    flat: ndarray
+        The flat buffer.
+
+    shapes: List[Tuple[int]]
+        The shapes of the views, which are laid out contiguously in the flat buffer.
+
+    Returns
+    -------
+    ret: List[ndarray]
+        The views.
+    """
+    value = flat._ndarray__value  # pylint: disable=protected-access
+    views = []
+    offset = 0
+    for shape in shapes:
+        views.append(ndarray.from_tensor_value(CreateTensorView(value, list(shape), offset)))
+        offset += int(np.prod(shape))
+    return views
@@ -74,10 +74,12 @@ def _get_vm_executor(mod, device, opt_level=2, disable_fusion=False, **options):
     options.setdefault("anf_only", False)
     options.setdefault("sch_file", None)
     options.setdefault("pass_seq", None)
+    options.setdefault("memory_arena", False)
 
     config = {
         "raf.stream_schedule.policy": options["stream_schedule_policy"],
         "raf.vm.optimize.anf_only": options["anf_only"],
+        "raf.memory_plan.arena": options["memory_arena"],
     }
     pass_seq = options["pass_seq"]
     disabled_pass = []
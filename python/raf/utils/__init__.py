@@ -2,5 +2,10 @@
 # SPDX-License-Identifier: Apache-2.0
 
 """Utilities"""
+from .._lib import lazy_getattr as _lazy_getattr
 from .memory_profiler import *
+from .op_profiler import *
 from .profiler import *
+
+# The submodules that are imported on first access, because they import heavy dependencies.
+__getattr__ = _lazy_getattr(__name__, submodules=[".tuner", ".visualizer"])
@@ -0,0 +1,79 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+"""Op latency database of the op profiler used by compilation passes.
+
+The latencies profiled by passes such as stream scheduling and rematerialization can be saved to
+a database file, and loaded by other processes or machines to skip profiling. Entries are keyed
+by the op, its attributes, argument types and the device, so databases can be merged by importing
+them one by one. Set the environment variable RAF_OP_PROFILER_DB to a file path to warm load the
+database and append newly profiled entries to it automatically.
+"""
+from raf._ffi.op_profiler import ImportDB, ExportDB, AttachDB
+from raf._core.device import Device
+
+
+def _to_device(device):
+    return device if isinstance(device, Device) else Device(device)
+
+
+def export_latency_db(path, device="cpu"):
+    """Export all profiled latencies on the device to a database file.
+
+    Parameters
+    ----------
+    path: str
+        The path of the database file.
+
+    device: Union[str, Device]
+        The device of the op profiler.
+
+    Returns
+    -------
+    ret: int
+        The number of exported entries.
+    """
+    return ExportDB(_to_device(device), path)
+
+
+def import_latency_db(path, device="cpu", overwrite=False):
+    """Import the latencies from a database file. Databases produced by an incompatible version
+    are ignored.
+
+    Parameters
+    ----------
+    path: str
+        The path of the database file.
+
+    device: Union[str, Device]
+        The device of the op profiler.
+
+    overwrite: bool
+        Whether to overwrite the latencies that have been profiled.
+
+    Returns
+    -------
+    ret: int
+        The number of imported entries.
+    """
+    return ImportDB(_to_device(device), path, overwrite)
+
+
+def attach_latency_db(path, device="cpu"):
+    """Warm load a database file and append newly profiled latencies to it. A database produced
+    by an incompatible version is invalidated and overwritten.
+
+    Parameters
+    ----------
+    path: Optional[str]
+        The path of the database file. None detaches the current database.
+
+    device: Union[str, Device]
+        The device of the op profiler.
+
+    Returns
+    -------
+    ret: int
+        The number of loaded entries.
+    """
+    return AttachDB(_to_device(device), path or "")
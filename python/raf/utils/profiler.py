@@ -6,6 +6,7 @@ import json
 from raf import build
 from raf._ffi.profiler import EnableProfiler, DisableProfiler
 from raf._ffi.profiler import CollectBaseProfile, CollectCudaProfile, GetProfile
+from raf._ffi.profiler import EnableOpStats, DisableOpStats, ResetOpStats, GetOpStats
 
 
 def start(prof_level=1):
@@ -89,3 +90,76 @@ def get_duration(data, event, category=None):
     if start_time_stamp is None or end_time_stamp is None:
         raise ValueError(f"The start or end time stamp of event {event} does not exist")
     return float((end_time_stamp - start_time_stamp) / 1000.0)
+
+
+def start_op_stats():
+    """Start to collect the aggregated statistics of each (op, shape key) pair executed by VM.
+    Unlike start(), which records a trace event for every op invocation, this only maintains
+    the call count, the latency histogram and the allocated bytes of each op, so it is suitable
+    for long runs. The statistics are accumulated until reset_op_stats() is called."""
+    EnableOpStats()
+
+
+def stop_op_stats():
+    """Stop collecting the aggregated op statistics. The collected statistics are kept."""
+    DisableOpStats()
+
+
+def reset_op_stats():
+    """Clear the collected aggregated op statistics."""
+    ResetOpStats()
+
+
+def get_op_stats():
+    """Get the aggregated op statistics.
+
+    Returns
+    -------
+    ret : List[Dict[str, Any]]
+        The statistics of each (op, shape key) pair, with keys "name", "shape_key", "count",
+        "total_us", "mean_us", "min_us", "max_us", "p50_us", "p99_us" and "bytes". The
+        percentiles are approximated by a log-linear histogram with 1/16 relative error.
+    """
+    return json.loads(GetOpStats())["entries"]
+
+
+def op_stats_summary(sort_by="total_us", top=None):
+    """Format the aggregated op statistics as a table.
+
+    Parameters
+    ----------
+    sort_by : str
+        The field to sort the ops in the descending order. Default: "total_us".
+
+    top : Optional[int]
+        Only show the first `top` ops. None shows all ops. Default: None.
+
+    Returns
+    -------
+    ret : str
+        The table.
+    """
+    stats = sorted(get_op_stats(), key=lambda entry: entry[sort_by], reverse=True)
+    if top is not None:
+        stats = stats[:top]
+    lines = [
+        "%-40s %8s %12s %10s %10s %10s %10s %10s %12s"
+        % ("Op", "Count", "Total (us)", "Mean", "Min", "Max", "P50", "P99", "Bytes")
+    ]
+    for entry in stats:
+        lines.append(
+            "%-40s %8d %12.1f %10.1f %10.1f %10.1f %10.1f %10.1f %12d"
+            % (
+                entry["name"],
+                entry["count"],
+                entry["total_us"],
+                entry["mean_us"],
+                entry["min_us"],
+                entry["max_us"],
+                entry["p50_us"],
+                entry["p99_us"],
+                entry["bytes"],
+            )
+        )
+        lines.append("  " + entry["shape_key"])
+    return "\n".join(lines)
@@ -13,6 +13,7 @@ from copy import copy
 import tvm
 
 import raf
+from raf._core.device import Device
 from raf._core.executor import MetaFallbackContext
 from raf._core.ndarray import array
 from raf._core.executor import VMExecutor
@@ -86,7 +87,7 @@ def extract_tuning_tasks(mod_or_executor, args, device, *, fusion=False, pass_se
     autotvm.GLOBAL_SCOPE.silent = old_autotvm_silent
     auto_scheduler.DispatchContext.current = old_auto_scheduler_fallback_context
 
-    tvm_target = tvm.target.Target(device)
+    tvm_target = Device(device).tvm_target()
 
     tasks = []
     weights = []
@@ -0,0 +1,82 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+"""Benchmark the GEMMs of BERT-base on CPU with the cpu_blas dialect against the TVM fallback,
+which uses the injective schedule without a tuned schedule file.
+
+Example:
+    python3 scripts/benchmark/cpu_blas_gemm.py --batch-size 8 --seq-len 128
+"""
+import argparse
+import time
+
+import numpy as np
+
+import raf
+from raf._op.dialect import DialectPreference
+
+
+def bert_base_gemms(batch_size, seq_len, hidden=768, heads=12, intermediate=3072):
+    """Return (name, op, shape_a, shape_b) of the GEMMs in a BERT-base layer."""
+    tokens = batch_size * seq_len
+    head_dim = hidden // heads
+    bh = batch_size * heads
+    return [
+        ("qkv", raf.dense, (tokens, hidden), (hidden, hidden)),
+        ("ffn1", raf.dense, (tokens, hidden), (intermediate, hidden)),
+        ("ffn2", raf.dense, (tokens, intermediate), (hidden, intermediate)),
+        ("scores", raf.batch_matmul_nt, (bh, seq_len, head_dim), (bh, seq_len, head_dim)),
+        ("context", raf.batch_matmul, (bh, seq_len, seq_len), (bh, seq_len, head_dim)),
+        ("ffn1_dw", raf.matmul_tn, (tokens, intermediate), (tokens, hidden)),
+    ]
+
+
+def measure(op, shape_a, shape_b, dialect, iters, warmup):
+    """Return the seconds per call of the op dispatched to the dialect."""
+    m_a = raf.array(np.random.randn(*shape_a).astype("float32"))
+    m_b = raf.array(np.random.randn(*shape_b).astype("float32"))
+    with DialectPreference([dialect]):
+        for _ in range(warmup):
+            op(m_a, m_b)
+        start = time.time()
+        for _ in range(iters):
+            out = op(m_a, m_b)
+        out.numpy()
+    return (time.time() - start) / iters, out.shape
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--batch-size", type=int, default=8)
+    parser.add_argument("--seq-len", type=int, default=128)
+    parser.add_argument("--iters", type=int, default=10)
+    parser.add_argument("--warmup", type=int, default=2)
+    args = parser.parse_args()
+    assert raf.build.with_cpu_blas(), "RAF is not built with a CPU BLAS library"
+
+    print(
+        "%8s %24s %12s %12s %12s %12s %8s"
+        % ("gemm", "output", "tvm (ms)", "blas (ms)", "tvm GFLOPS", "blas GFLOPS", "speedup")
+    )
+    for name, op, shape_a, shape_b in bert_base_gemms(args.batch_size, args.seq_len):
+        tvm_sec, shape = measure(op, shape_a, shape_b, "tvm", args.iters, args.warmup)
+        blas_sec, _ = measure(op, shape_a, shape_b, "cpu_blas", args.iters, args.warmup)
+        # The reduction axis is the one of a that is not in the output.
+        k = shape_a[0] if op is raf.matmul_tn else shape_a[-1]
+        flops = 2.0 * np.prod(shape) * k
+        print(
+            "%8s %24s %12.2f %12.2f %12.1f %12.1f %7.1fx"
+            % (
+                name,
+                "x".join(str(x) for x in shape),
+                tvm_sec * 1e3,
+                blas_sec * 1e3,
+                flops / tvm_sec / 1e9,
+                flops / blas_sec / 1e9,
+                tvm_sec / blas_sec,
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+"""Benchmark the bandwidth of the CPU collectives among N processes on this host per message
+size, with the shared memory and TCP loopback transports. The algorithm bandwidth is the message
+size over the time, and the bus bandwidth scales it by the data each rank has to move, as in
+nccl-tests, so that it is comparable among the collectives and the numbers of ranks.
+
+Example:
+    python3 scripts/benchmark/cpu_collective_bandwidth.py --ranks 2 4 --transports shm tcp
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+
+WORKER = """
+import sys
+import time
+import numpy as np
+import raf
+from raf import distributed as dist
+
+rank, size, transport = int(sys.argv[1]), int(sys.argv[2]), sys.argv[3]
+sizes, iters, warmup = [int(x) for x in sys.argv[4].split(",")], int(sys.argv[5]), int(sys.argv[6])
+comm = dist.get_communicator()
+comm.size = size
+comm.rank = rank
+comm.local_size = size
+comm.local_rank = rank
+dist.set_cpu_comm_transport(transport)
+
+
+class Allreduce(raf.Model):
+    def build(self):
+        pass
+
+    @raf.model.trace
+    def forward(self, x):
+        return raf.allreduce(x)
+
+
+class Allgather(raf.Model):
+    def build(self):
+        pass
+
+    @raf.model.trace
+    def forward(self, x):
+        return raf.allgather(x, axis=0)
+
+
+class Broadcast(raf.Model):
+    def build(self):
+        pass
+
+    @raf.model.trace
+    def forward(self, x):
+        return raf.broadcast(x, root=0)
+
+
+for name, model in [("allreduce", Allreduce()), ("allgather", Allgather()),
+                    ("broadcast", Broadcast())]:
+    for nbytes in sizes:
+        # The message of allgather is the output, as in nccl-tests.
+        count = nbytes // 4 // (size if name == "allgather" else 1)
+        x = raf.array(np.ones((max(count, 1),), dtype="float32"))
+        for _ in range(warmup):
+            model(x)
+        start = time.time()
+        for _ in range(iters):
+            out = model(x)
+        out.numpy()
+        print(name, nbytes, (time.time() - start) / iters, flush=True)
+"""
+
+
+def bus_factor(name, size):
+    """The ratio of the data each rank moves to the message size."""
+    if name == "allreduce":
+        return 2.0 * (size - 1) / size
+    if name == "allgather":
+        return (size - 1) / size
+    return 1.0
+
+
+def measure(transport, size, sizes, iters, warmup):
+    """Launch the ranks and return the time of rank 0 per collective and message size."""
+    env = dict(os.environ)
+    env["RAF_CPU_COMM_ID"] = "bench_%d_%s_%d" % (os.getpid(), transport, size)
+    with tempfile.TemporaryDirectory() as tmp:
+        env["RAF_FILE_STORE_PATH"] = tmp
+        procs = [
+            subprocess.Popen(
+                [sys.executable, "-c", WORKER, str(rank), str(size), transport]
+                + [",".join(str(x) for x in sizes), str(iters), str(warmup)],
+                env=env,
+                stdout=subprocess.PIPE,
+                universal_newlines=True,
+            )
+            for rank in range(size)
+        ]
+        outs = [proc.communicate()[0] for proc in procs]
+    for rank, proc in enumerate(procs):
+        assert proc.returncode == 0, "rank %d failed" % rank
+    results = []
+    for line in outs[0].splitlines():
+        name, nbytes, sec = line.split()
+        results.append((name, int(nbytes), float(sec)))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--ranks", type=int, nargs="+", default=[2, 4])
+    parser.add_argument("--transports", type=str, nargs="+", default=["shm", "tcp"])
+    parser.add_argument("--min-bytes", type=int, default=1 << 10)
+    parser.add_argument("--max-bytes", type=int, default=1 << 28)
+    parser.add_argument("--iters", type=int, default=20)
+    parser.add_argument("--warmup", type=int, default=5)
+    args = parser.parse_args()
+
+    sizes = []
+    nbytes = args.min_bytes
+    while nbytes <= args.max_bytes:
+        sizes.append(nbytes)
+        nbytes *= 4
+
+    print(
+        "%6s %10s %10s %12s %12s %14s %14s"
+        % ("ranks", "transport", "op", "size (B)", "time (us)", "algbw (GB/s)", "busbw (GB/s)")
+    )
+    for size in args.ranks:
+        for transport in args.transports:
+            for name, nbytes, sec in measure(transport, size, sizes, args.iters, args.warmup):
+                algbw = nbytes / sec / 1e9
+                print(
+                    "%6d %10s %10s %12d %12.1f %14.3f %14.3f"
+                    % (
+                        size,
+                        transport,
+                        name,
+                        nbytes,
+                        sec * 1e6,
+                        algbw,
+                        algbw * bus_factor(name, size),
+                    )
+                )
+
+
+if __name__ == "__main__":
+    main()
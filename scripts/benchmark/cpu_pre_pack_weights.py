@@ -0,0 +1,83 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+"""Benchmark the inference latency of ResNet-50 and BERT on CPU with the VM, with the weights
+passed as inputs and with the weights bound as constants and pre-packed to the layouts requested by
+the tuned schedules. The schedules of each model are tuned to <sch-prefix>_<model>.json first if
+the file does not exist.
+
+Example:
+    python3 scripts/benchmark/cpu_pre_pack_weights.py --models resnet50 bert --batch-size 8
+"""
+# pylint: disable=protected-access
+import argparse
+import os
+import time
+
+import numpy as np
+
+import raf
+from raf._core.executor import VMExecutor
+from raf.testing import resnet
+from raf.utils.tuner import run_tuning
+
+
+def get_workload(name, batch_size, seq_len):
+    """Return the model and its inputs in inference mode."""
+    if name == "resnet50":
+        model, _ = resnet.get_model([3, 4, 6, 3], train=False)
+        return model, [resnet.get_input(batch_size, "cpu", train=False)[0][0]]
+    from raf.testing.pt_models import get_transformer_model
+
+    model, _ = get_transformer_model("bert-base-uncased", batch_size, seq_len)
+    model.infer_mode()
+    return model, [raf.array(np.random.randint(0, 10000, (batch_size, seq_len)).astype("int64"))]
+
+
+def measure(executor, args, iters, warmup):
+    """Return the milliseconds per run."""
+    for _ in range(warmup):
+        executor(*args)
+    start = time.time()
+    for _ in range(iters):
+        out = executor(*args)
+    out = out[0] if isinstance(out, (list, tuple)) else out
+    out.numpy()
+    return (time.time() - start) / iters * 1e3
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--models", type=str, nargs="+", default=["resnet50", "bert"])
+    parser.add_argument("--batch-size", type=int, default=1)
+    parser.add_argument("--seq-len", type=int, default=128)
+    parser.add_argument("--sch-prefix", type=str, default="cpu_pre_pack_weights")
+    parser.add_argument("--trials", type=int, default=2000)
+    parser.add_argument("--iters", type=int, default=20)
+    parser.add_argument("--warmup", type=int, default=3)
+    args = parser.parse_args()
+
+    print("%10s %14s %14s %10s" % ("model", "inputs (ms)", "packed (ms)", "speedup"))
+    for name in args.models:
+        model, inputs = get_workload(name, args.batch_size, args.seq_len)
+        sch_file = "%s_%s.json" % (args.sch_prefix, name)
+        if not os.path.exists(sch_file):
+            run_tuning(model, "cpu", inputs, sch_file, fusion=True, n_trials=args.trials)
+        record = model._internal(*inputs)
+        params = list(record.named_params.values())
+
+        executor = VMExecutor(record.mod, "cpu").make_executor(sch_file)
+        base_ms = measure(executor, inputs + params, args.iters, args.warmup)
+        executor = VMExecutor(
+            record.mod,
+            "cpu",
+            params=dict(record.named_params),
+            pre_pack_weights=True,
+            sch_file=sch_file,
+        ).make_executor()
+        packed_ms = measure(executor, inputs, args.iters, args.warmup)
+        print("%10s %14.3f %14.3f %9.2fx" % (name, base_ms, packed_ms, base_ms / packed_ms))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+"""Benchmark softmax, log_softmax, layer_norm and their gradients on CPU with the TVM dialect.
+The attention ops run on the scores of (batch x heads x seq x seq), and the layer_norm ops run on
+the hidden states of (batch x seq, hidden). The bandwidth is the bytes of the inputs and outputs
+over the time, as these ops are memory bound, and NumPy is the reference.
+
+Example:
+    python3 scripts/benchmark/cpu_softmax_layernorm.py --batch-size 1 8 --seq-len 128 384
+"""
+import argparse
+import itertools
+import time
+
+import numpy as np
+
+import raf
+from raf._op.dialect import DialectPreference
+
+
+def np_softmax(x):
+    e = np.exp(x - np.max(x, axis=-1, keepdims=True))
+    return e / np.sum(e, axis=-1, keepdims=True)
+
+
+def np_log_softmax(x):
+    shifted = x - np.max(x, axis=-1, keepdims=True)
+    return shifted - np.log(np.sum(np.exp(shifted), axis=-1, keepdims=True))
+
+
+def np_softmax_dx(y, dy):
+    return (dy - np.sum(dy * y, axis=-1, keepdims=True)) * y
+
+
+def np_layer_norm(x, scale, bias, eps=1e-5):
+    mean = np.mean(x, axis=-1, keepdims=True)
+    var = np.var(x, axis=-1, keepdims=True)
+    return (x - mean) / np.sqrt(var + eps) * scale + bias
+
+
+def np_layer_norm_dx(x, scale, dy, eps=1e-5):
+    std = np.sqrt(np.var(x, axis=-1, keepdims=True) + eps)
+    bar_x = (x - np.mean(x, axis=-1, keepdims=True)) / std
+    w = dy * scale / std
+    dx = w - np.mean(w, axis=-1, keepdims=True) - bar_x * np.mean(w * bar_x, -1, keepdims=True)
+    return dx, np.sum(dy * bar_x, axis=0), np.sum(dy, axis=0)
+
+
+def workloads(batch_size, seq_len, heads, hidden):
+    """Return (name, shape, raf function, numpy function, #tensors of the shape read or written)
+    of the ops in a transformer layer.
+    """
+    scores = (batch_size, heads, seq_len, seq_len)
+    states = (batch_size * seq_len, hidden)
+    return [
+        ("softmax", scores, lambda x, _: raf.softmax(x, axis=-1), lambda x, _: np_softmax(x), 2),
+        (
+            "log_softmax",
+            scores,
+            lambda x, _: raf.log_softmax(x, axis=-1),
+            lambda x, _: np_log_softmax(x),
+            2,
+        ),
+        ("softmax_dx", scores, lambda y, dy: raf.softmax_dx(y, dy, axis=-1), np_softmax_dx, 3),
+        (
+            "layer_norm",
+            states,
+            lambda x, w: raf.layer_norm(x, w, w, axis=-1, eps=1e-5),
+            lambda x, w: np_layer_norm(x, w, w),
+            2,
+        ),
+        (
+            "layer_norm_dx",
+            states,
+            lambda x, w: raf.layer_norm_dx(x, w, x, axis=-1, eps=1e-5),
+            lambda x, w: np_layer_norm_dx(x, w, x),
+            3,
+        ),
+    ]
+
+
+def measure(func, args, iters, warmup, sync):
+    """Return the seconds per call."""
+    for _ in range(warmup):
+        func(*args)
+    start = time.time()
+    for _ in range(iters):
+        out = func(*args)
+    sync(out)
+    return (time.time() - start) / iters
+
+
+def sync_raf(out):
+    out = out[0] if isinstance(out, (list, tuple)) else out
+    out.numpy()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--batch-size", type=int, nargs="+", default=[1, 8])
+    parser.add_argument("--seq-len", type=int, nargs="+", default=[128, 384])
+    parser.add_argument("--heads", type=int, default=12)
+    parser.add_argument("--hidden", type=int, default=768)
+    parser.add_argument("--iters", type=int, default=20)
+    parser.add_argument("--warmup", type=int, default=3)
+    args = parser.parse_args()
+
+    print(
+        "%14s %20s %10s %12s %12s %12s"
+        % ("op", "shape", "raf (ms)", "numpy (ms)", "raf GB/s", "speedup")
+    )
+    for batch_size, seq_len in itertools.product(args.batch_size, args.seq_len):
+        for name, shape, raf_func, np_func, n_tensors in workloads(
+            batch_size, seq_len, args.heads, args.hidden
+        ):
+            n_x = np.random.randn(*shape).astype("float32")
+            # The second argument is dy of softmax_dx, and the scale of layer_norm.
+            n_y = np.random.randn(*(shape if name == "softmax_dx" else shape[-1:]))
+            n_y = n_y.astype("float32")
+            m_x, m_y = raf.array(n_x), raf.array(n_y)
+            with DialectPreference(["tvm"]):
+                raf_sec = measure(raf_func, (m_x, m_y), args.iters, args.warmup, sync_raf)
+            np_sec = measure(np_func, (n_x, n_y), args.iters, args.warmup, lambda _: None)
+            nbytes = n_tensors * n_x.nbytes
+            print(
+                "%14s %20s %10.3f %12.3f %12.2f %11.1fx"
+                % (
+                    name,
+                    "x".join(str(x) for x in shape),
+                    raf_sec * 1e3,
+                    np_sec * 1e3,
+                    nbytes / raf_sec / 1e9,
+                    np_sec / raf_sec,
+                )
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+"""Benchmark the imperative matmul and dense ops on CPU with the dispatch modes. The interpreter
+OpEnv cache is disabled, so that every call is dispatched, and the ops run on a few shapes
+repeatedly. "off" tries the dialect ops in the plevel order for every call, "cache" memoizes the
+first valid one of each shape, and "measure" measures the valid ones of each shape once and
+memoizes the fastest one.
+
+Example:
+    python3 scripts/benchmark/dispatch_decisions.py --sizes 64 256 1024 --db decisions.db
+"""
+# pylint: disable=protected-access
+import argparse
+import time
+
+import numpy as np
+
+import raf
+from raf._op import dialect
+
+
+def run(ops, iters):
+    """Return the milliseconds per call."""
+    start = time.time()
+    for _ in range(iters):
+        for func, args in ops:
+            out = func(*args)
+    out.numpy()
+    return (time.time() - start) / iters / len(ops) * 1e3
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[64, 256, 1024])
+    parser.add_argument("--modes", type=str, nargs="+", default=["off", "cache", "measure"])
+    parser.add_argument("--iters", type=int, default=10)
+    parser.add_argument("--db", type=str, default="", help="The file to persist the decisions")
+    args = parser.parse_args()
+
+    ops = []
+    for size in args.sizes:
+        m_x = raf.array(np.random.randn(size, size).astype("float32"))
+        m_y = raf.array(np.random.randn(size, size).astype("float32"))
+        ops.append((raf.matmul, (m_x, m_y)))
+        ops.append((raf.dense, (m_x, m_y)))
+
+    raf._ffi.executor.SetInterpreterOpEnvCacheSize(0)
+    print("%10s %16s %16s" % ("mode", "first (ms)", "steady (ms)"))
+    for mode in args.modes:
+        dialect.clear_dispatch_decisions()
+        dialect.set_dispatch_mode(mode)
+        if mode == "measure" and args.db:
+            dialect.attach_dispatch_db(args.db)
+        first_ms = run(ops, 1)
+        steady_ms = run(ops, args.iters)
+        dialect.attach_dispatch_db("")
+        print("%10s %16.3f %16.3f" % (mode, first_ms, steady_ms))
+
+    for decision in dialect.get_dispatch_decisions():
+        print(decision["op"], decision["dialect_op"], decision["latency"])
+
+
+if __name__ == "__main__":
+    main()
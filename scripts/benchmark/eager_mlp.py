@@ -0,0 +1,52 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+"""Benchmark the eager training steps per second of the MLP in raf.testing with the interpreter,
+with and without the OpEnv cache.
+
+Example:
+    python3 scripts/benchmark/eager_mlp.py --batch-size 32 --steps 100
+"""
+# pylint: disable=protected-access
+import argparse
+import time
+
+import raf
+from raf.testing import mlp
+
+
+def measure(device, batch_size, steps, warmup, cache_size):
+    """Return the steps per second of eager training."""
+    raf._ffi.executor.SetInterpreterOpEnvCacheSize(cache_size)
+    config = (784, 10, 256, 256)
+    model, _ = mlp.get_model(config, train=True)
+    model.to(device=device)
+    (m_x, m_y), _ = mlp.get_input(config, batch_size=batch_size, device=device)
+    for _ in range(warmup):
+        loss = model(m_x, m_y)
+        loss.backward()
+    start = time.time()
+    for _ in range(steps):
+        loss = model(m_x, m_y)
+        loss.backward()
+    loss.numpy()
+    return steps / (time.time() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--device", type=str, default="cpu")
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--steps", type=int, default=100)
+    parser.add_argument("--warmup", type=int, default=5)
+    parser.add_argument("--cache-size", type=int, default=1024)
+    args = parser.parse_args()
+
+    no_cache = measure(args.device, args.batch_size, args.steps, args.warmup, 0)
+    cache = measure(args.device, args.batch_size, args.steps, args.warmup, args.cache_size)
+    print("%16s %16s %8s" % ("no cache (it/s)", "cache (it/s)", "speedup"))
+    print("%16.2f %16.2f %7.2fx" % (no_cache, cache, cache / no_cache))
+
+
+if __name__ == "__main__":
+    main()
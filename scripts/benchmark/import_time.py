@@ -0,0 +1,84 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+"""Benchmark the time of `import raf` with `python -X importtime`. The lazy mode only runs
+`import raf`, and the eager mode also accesses the lazily imported submodules right after, which
+is what `import raf` used to cost before they were made lazy.
+
+Example:
+    python3 scripts/benchmark/import_time.py --repeat 5 --top 10
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+
+# The submodules and attributes that `import raf` does not import until they are accessed.
+LAZY_ATTRS = [
+    "raf.optim",
+    "raf.utils.tuner",
+    "raf.utils.visualizer",
+    "raf.frontend.from_pytorch",
+    "raf.frontend.from_mxnet",
+    "raf._lib.topi",
+]
+
+
+def make_stmt(eager):
+    """Make the statement to be run. Attributes whose frameworks are missing are skipped."""
+    stmt = "import raf"
+    if eager:
+        for attr in LAZY_ATTRS:
+            stmt += "\ntry:\n    %s\nexcept ImportError:\n    pass" % attr
+    return stmt
+
+
+def measure(stmt):
+    """Run the statement in a fresh process, and return the cumulative microseconds of each
+    top-level import since `import raf`."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", stmt],
+        stderr=subprocess.PIPE,
+        check=True,
+        universal_newlines=True,
+    )
+    times = {}
+    started = False
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        # Nested imports are indented, so that only top-level imports are counted.
+        if name.startswith(" ") and not name.startswith("  "):
+            name = name.strip()
+            started = started or name == "raf"
+            if started:
+                times[name] = times.get(name, 0) + int(cumulative)
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    print("%8s %12s %12s" % ("mode", "median (ms)", "min (ms)"))
+    results = {}
+    for mode in ["lazy", "eager"]:
+        runs = [measure(make_stmt(mode == "eager")) for _ in range(args.repeat)]
+        totals = [sum(times.values()) / 1e3 for times in runs]
+        results[mode] = runs[-1]
+        print("%8s %12.2f %12.2f" % (mode, statistics.median(totals), min(totals)))
+
+    # The top-level imports that the lazy mode saves, from the last run of each mode.
+    saved = {
+        name: elapsed for name, elapsed in results["eager"].items() if name not in results["lazy"]
+    }
+    print("\nThe slowest imports deferred by `import raf`:")
+    for name, elapsed in sorted(saved.items(), key=lambda item: -item[1])[: args.top]:
+        print("%40s %12.2f" % (name, elapsed / 1e3))
+
+
+if __name__ == "__main__":
+    main()
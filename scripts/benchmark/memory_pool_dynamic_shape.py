@@ -0,0 +1,72 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+"""Benchmark the memory pools with an MLP that runs on varying batch sizes, which is
+allocation-heavy because buffers of different sizes are requested and released on every run.
+
+Example:
+    python3 scripts/benchmark/memory_pool_dynamic_shape.py --hiddens 256 --runs 20
+"""
+import argparse
+import time
+
+import numpy as np
+
+import raf
+from raf._core.device import Device
+from raf._ffi.memory_pool import GetPoolSize, InitPool, RemovePool
+from raf.testing import randn
+
+
+class MLP(raf.Model):
+    # pylint: disable=attribute-defined-outside-init
+    def build(self, num_hiddens):
+        self.w1, _ = randn((num_hiddens, num_hiddens))
+        self.w2, _ = randn((num_hiddens, num_hiddens))
+
+    @raf.model.trace
+    def forward(self, x):
+        y = raf.relu(raf.matmul(x, self.w1))
+        y = raf.relu(raf.matmul(y, self.w2))
+        return raf.add(y, x)
+
+
+def measure(device, pool_name, num_hiddens, batch_sizes):
+    """Return the milliseconds of the runs and the pool size in MBs."""
+    InitPool(Device(device), pool_name)
+    try:
+        model = MLP(num_hiddens)
+        model.to(device=device)
+        model.infer_mode()
+        inputs = [randn((batch_size, num_hiddens), device=device)[0] for batch_size in batch_sizes]
+        model(inputs[0]).numpy()
+        start = time.time()
+        for m_x in inputs:
+            m_y = model(m_x)
+        m_y.numpy()
+        elapsed = time.time() - start
+        return elapsed * 1e3, GetPoolSize(Device(device))[1].value
+    finally:
+        RemovePool(Device(device))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--device", type=str, default="cpu")
+    parser.add_argument("--hiddens", type=int, default=256)
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--max-batch-size", type=int, default=64)
+    parser.add_argument(
+        "--pools", type=str, nargs="+", default=["no_pool", "page_unit_pool", "caching_pool"]
+    )
+    args = parser.parse_args()
+
+    batch_sizes = np.random.RandomState(0).randint(1, args.max_batch_size, size=args.runs)
+    print("%16s %12s %12s" % ("pool", "time (ms)", "pool (MB)"))
+    for pool_name in args.pools:
+        elapsed, pool_size = measure(args.device, pool_name, args.hiddens, batch_sizes)
+        print("%16s %12.2f %12.2f" % (pool_name, elapsed, pool_size))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+"""Benchmark the time of optimizing the models in raf.testing with the VM compiler, with and
+without incremental type inference.
+
+Example:
+    python3 scripts/benchmark/vm_compile_time.py --models mlp resnet --repeat 3
+"""
+# pylint: disable=protected-access
+import argparse
+import time
+
+import raf
+from raf._core.vm import VMCompiler
+from raf.testing import mlp, resnet_cifar10
+
+
+def get_mod(name, device):
+    """Trace the model in the inference mode and return the IR module."""
+    if name == "mlp":
+        config = (784, 10, 256, 256)
+        model, _ = mlp.get_model(config, train=False)
+        (m_x,), _ = mlp.get_input(config, device=device, train=False)
+    elif name == "resnet":
+        model, _ = resnet_cifar10.get_model([3, 4, 6, 3])
+        model.infer_mode()
+        (m_x, _), _ = resnet_cifar10.get_input(device=device)
+    else:
+        raise ValueError("Unknown model: %s" % name)
+    model.to(device=device)
+    return model._internal(m_x).mod
+
+
+def measure(mod, device, incremental, repeat):
+    """Return the minimal time in seconds of optimizing the module."""
+    costs = []
+    config = {"raf.vm.optimize.incremental_type_infer": incremental}
+    for _ in range(repeat):
+        with raf.ir.PassContext(config=config):
+            start = time.time()
+            VMCompiler().optimize(mod, device)
+            costs.append(time.time() - start)
+    return min(costs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--models", type=str, nargs="+", default=["mlp", "resnet"])
+    parser.add_argument("--device", type=str, default="cpu")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print("%8s %16s %16s %8s" % ("model", "full (s)", "incremental (s)", "speedup"))
+    for name in args.models:
+        mod = get_mod(name, args.device)
+        full = measure(mod, args.device, False, args.repeat)
+        incremental = measure(mod, args.device, True, args.repeat)
+        print("%8s %16.3f %16.3f %7.2fx" % (name, full, incremental, full / incremental))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+"""Benchmark the serving throughput (requests/s) of the VM with and without a context pool.
+
+Example:
+    python3 scripts/benchmark/vm_context_pool.py --threads 1 2 4 8 --requests 2000
+"""
+# pylint: disable=protected-access
+import argparse
+import threading
+import time
+
+import raf
+from raf._core.executor import VMExecutor
+from raf.model.trace import _get_func_inputs
+from raf.testing import mlp
+
+
+def measure(serve, inputs, num_threads, num_requests):
+    """Serve the requests from the given number of threads, and return the requests/s."""
+    counter = iter(range(num_requests))
+    lock = threading.Lock()
+
+    def worker():
+        while True:
+            with lock:
+                if next(counter, None) is None:
+                    return
+            serve(*inputs)
+
+    threads = [threading.Thread(target=worker) for _ in range(num_threads)]
+    start = time.time()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return num_requests / (time.time() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--batch-size", type=int, default=1)
+    args = parser.parse_args()
+
+    config = (784, 10, 256, 256)
+    model, _ = mlp.get_model(config, train=False)
+    (m_x,), _ = mlp.get_input(config, batch_size=args.batch_size, train=False)
+    record = model._internal(m_x)
+    inputs = _get_func_inputs(record, [m_x], {}, get_handle=False)
+    executor = VMExecutor(record.mod, "cpu")
+    executor.vm.warmup(*inputs)
+
+    print("%8s %16s %16s" % ("threads", "run (req/s)", "pool (req/s)"))
+    for num_threads in args.threads:
+        pool = executor.vm.create_pool(num_threads, *inputs)
+        baseline = measure(executor.vm.run, inputs, num_threads, args.requests)
+        pooled = measure(pool.run, inputs, num_threads, args.requests)
+        print("%8d %16.1f %16.1f" % (num_threads, baseline, pooled))
+
+
+if __name__ == "__main__":
+    main()
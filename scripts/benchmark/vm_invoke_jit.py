@@ -0,0 +1,57 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+"""Benchmark the per-instruction overhead of the VM. The kernels operate on tiny tensors, so the
+latency is dominated by the OpEnv lookup. The fusion is disabled, so that every op is an InvokeJit
+instruction.
+
+Example:
+    python3 scripts/benchmark/vm_invoke_jit.py --ops 64 --number 100
+"""
+# pylint: disable=protected-access
+import argparse
+import time
+
+import numpy as np
+
+import raf
+from raf._core.executor import VMExecutor
+from raf.testing import randn
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--ops", type=int, default=64)
+    parser.add_argument("--number", type=int, default=100)
+    args = parser.parse_args()
+
+    num_ops = args.ops
+
+    class Model(raf.Model):
+        def build(self):
+            pass
+
+        @raf.model.trace
+        def forward(self, x):  # pylint: disable=no-self-use
+            for _ in range(num_ops):
+                x = raf.add(x, x)
+            return x
+
+    model = Model()
+    m_x, _ = randn((1,), device="cpu")
+    mod = model._internal(m_x).mod
+    with raf.ir.PassContext(disabled_pass=["FuseTVM", "FuseDialect"]):
+        executor = VMExecutor(mod, "cpu")
+    vm = executor.make_executor()
+    ref_y = vm(m_x).numpy()
+
+    start = time.time()
+    for _ in range(args.number):
+        m_y = vm(m_x)
+    elapsed = time.time() - start
+    np.testing.assert_allclose(m_y.numpy(), ref_y)
+    print("%.2f us per invoke_jit" % (elapsed * 1e6 / args.number / num_ops))
+
+
+if __name__ == "__main__":
+    main()
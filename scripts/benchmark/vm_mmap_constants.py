@@ -0,0 +1,117 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+"""Benchmark the load time and memory of N worker processes that load the same VM executable,
+with the constants in the bytecode or in a memory-mapped constant file.
+RSS counts the shared pages in every process, while PSS splits them among the processes.
+
+Example:
+    python3 scripts/benchmark/vm_mmap_constants.py --workers 1 4 8 --size-mb 512
+"""
+# pylint: disable=protected-access
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+
+import numpy as np
+
+import raf
+from raf._core.executor import VMExecutor
+from raf._lib import relay
+
+WORKER = """
+import sys
+import time
+import numpy as np
+from raf._core.vm import Executable, VirtualMachine
+
+code_path, const_path, dim = sys.argv[1], sys.argv[2] or None, int(sys.argv[3])
+
+
+def read_kb(path, key):
+    with open(path) as f:
+        for line in f:
+            if line.startswith(key):
+                return int(line.split()[1])
+    return 0
+
+
+start = time.time()
+with open(code_path, "rb") as f:
+    code = bytearray(f.read())
+exe = Executable.load_exec(code, None, const_path)
+del code
+load_ms = (time.time() - start) * 1000
+VirtualMachine(exe, "cpu").run(np.ones((1, dim), dtype="float32"))
+print("ready", flush=True)
+# Measure after all workers are loaded, so that the shared pages are split among them.
+sys.stdin.readline()
+rss = read_kb("/proc/self/status", "VmRSS:") / 1024
+pss = read_kb("/proc/self/smaps_rollup", "Pss:") / 1024
+print("%f %f %f" % (load_ms, rss, pss), flush=True)
+"""
+
+
+def build(size_mb):
+    """Build an executable whose constant is a dim x dim float32 matrix of about size_mb MB."""
+    dim = int((size_mb * 1024 * 1024 / 4) ** 0.5)
+    weight = raf.ir.const(np.random.randn(dim, dim).astype("float32"))
+    x = raf.ir.var("x", shape=(1, dim))
+    mod = raf.ir.IRModule()
+    mod["main"] = relay.Function([x], raf.ir.op.matmul(x, weight))
+    mod = raf._ffi.pass_.ToANormalForm()(mod)
+    return VMExecutor(mod, "cpu").executable, dim
+
+
+def measure(code_path, const_path, dim, num_workers):
+    """Launch the workers and return their average load time, RSS and PSS."""
+    procs = [
+        subprocess.Popen(
+            [sys.executable, "-c", WORKER, code_path, const_path or "", str(dim)],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            universal_newlines=True,
+        )
+        for _ in range(num_workers)
+    ]
+    for proc in procs:
+        assert proc.stdout.readline().strip() == "ready"
+    results = []
+    for proc in procs:
+        proc.stdin.write("\n")
+        proc.stdin.flush()
+        results.append([float(x) for x in proc.stdout.readline().split()])
+        proc.wait()
+    return np.mean(results, axis=0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4])
+    parser.add_argument("--size-mb", type=int, default=256)
+    args = parser.parse_args()
+
+    exe, dim = build(args.size_mb)
+    with tempfile.TemporaryDirectory() as tmp:
+        inline_code = os.path.join(tmp, "inline.ro")
+        mmap_code = os.path.join(tmp, "mmap.ro")
+        const_path = os.path.join(tmp, "mmap.const")
+        with open(inline_code, "wb") as f:
+            f.write(exe.save()[0])
+        with open(mmap_code, "wb") as f:
+            f.write(exe.save(const_path)[0])
+
+        print("%8s %8s %12s %12s %12s" % ("workers", "format", "load (ms)", "RSS (MB)", "PSS (MB)"))
+        for num_workers in args.workers:
+            for name, code_path, path in [
+                ("inline", inline_code, None),
+                ("mmap", mmap_code, const_path),
+            ]:
+                load_ms, rss, pss = measure(code_path, path, dim, num_workers)
+                print("%8d %8s %12.1f %12.1f %12.1f" % (num_workers, name, load_ms, rss, pss))
+
+
+if __name__ == "__main__":
+    main()
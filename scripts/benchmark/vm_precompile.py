@@ -0,0 +1,58 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+"""Benchmark compiling the kernels of a model before its first run with VMExecutor.precompile,
+with different numbers of threads. Each measurement uses a distinct input shape, so that the
+kernels are not in the kernel caches yet.
+
+Example:
+    python3 scripts/benchmark/vm_precompile.py --layers 8 --threads 1 2 4 8
+"""
+# pylint: disable=protected-access
+import argparse
+import time
+
+import raf
+from raf._core.executor import VMExecutor
+from raf.testing import randn
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--layers", type=int, default=8)
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--size", type=int, default=64)
+    args = parser.parse_args()
+
+    num_layers = args.layers
+
+    class Model(raf.Model):
+        # pylint: disable=attribute-defined-outside-init
+        def build(self):
+            pass
+
+        @raf.model.trace
+        def forward(self, x):
+            for _ in range(num_layers):
+                x = raf.softmax(raf.relu(raf.matmul(x, x)))
+            return x
+
+    model = Model()
+    print("%8s %8s %16s %16s" % ("threads", "ops", "precompile (ms)", "first run (ms)"))
+    for idx, num_threads in enumerate(args.threads):
+        size = args.size + idx
+        m_x, _ = randn((size, size))
+        mod = model._internal(m_x).mod
+        with raf.ir.PassContext(disabled_pass=["FuseTVM", "FuseDialect"]):
+            executor = VMExecutor(mod, "cpu")
+            start = time.time()
+            num_ops = executor.precompile(m_x, num_threads=num_threads)
+            precompile_ms = (time.time() - start) * 1e3
+            start = time.time()
+            executor.make_executor()(m_x).numpy()
+            run_ms = (time.time() - start) * 1e3
+        print("%8d %8d %16.2f %16.2f" % (num_threads, num_ops, precompile_ms, run_ms))
+
+
+if __name__ == "__main__":
+    main()
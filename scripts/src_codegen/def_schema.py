@@ -881,6 +881,7 @@ SCHEMAS = {
             py_default="None",
         ),
         Arg(name="own", cxx_type="bool", cxx_default=True),
+        Arg(name="offset", cxx_type="int64_t", cxx_default=0),
     ],
     "vm.h::free": [
         Arg(name="memory", cxx_type="value::BaseTensorValue"),
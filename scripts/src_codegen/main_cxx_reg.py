@@ -46,6 +46,7 @@ using namespace raf::registry;
 using namespace raf::binding;
 using raf::op::FRAFSchema;
 using raf::op::FRAFSchemaFieldIndex;
+using raf::op::FRAFSchemaToValues;
 using raf::executor::interpreter::InvokePrimitive;
 
 // Part 0. Op names
@@ -101,7 +102,14 @@ namespace names {{
 
 {SCHEMA_FIELD_IDX_EPILOG}
 
-// Part 3.3. FRAFSchema API, uses Part 3.1 and Part 3.2
+// Part 3.3. Schema to Array<Value> (for each schema)
+{SCHEMA_TO_VALUES_PRELUDE}
+
+{SCHEMA_TO_VALUES}
+
+{SCHEMA_TO_VALUES_EPILOG}
+
+// Part 3.4. FRAFSchema API, uses Part 3.1, Part 3.2 and Part 3.3
 {F_RAF_SCHEMA_PRELUDE}
 
 {F_RAF_SCHEMAS}
@@ -144,7 +152,9 @@ RAF_REGISTER_OBJECT_REFLECT(ListArgs);
     value2schemas = "\n\n".join(map(gen_value_to_schema, schemas))
     # Part 3.2. Schema field index (for each schema)
     schema_field_idx = "\n\n".join(map(gen_schema_field_idx, schemas))
-    # Part 3.2. FRAFSchema API, uses "Part 3.1. Array<Value> to schema"
+    # Part 3.3. Schema to Array<Value> (for each schema)
+    schema_to_values = "\n\n".join(map(gen_schema_to_values, schemas))
+    # Part 3.4. FRAFSchema API, uses "Part 3.1. Array<Value> to schema"
     f_raf_schemas = "\n".join(map(gen_f_raf_schema, ops))
     # The last part: registering schemas
     schema_regs = "\n".join(map(gen_schema_reg, schemas))
@@ -160,6 +170,7 @@ RAF_REGISTER_OBJECT_REFLECT(ListArgs);
         SYMBOLIC_APIS=symbolic_apis,
         VALUE_TO_SCHEMAS=value2schemas,
         SCHEMA_FIELD_IDX=schema_field_idx,
+        SCHEMA_TO_VALUES=schema_to_values,
         F_RAF_SCHEMAS=f_raf_schemas,
         SCHEMA_REGS=schema_regs,
         **globals()
@@ -595,7 +606,51 @@ int {SCHEMA_NAME}(const std::string& field) {{
     return VALUE_TO_SCHEMA.format(SCHEMA_NAME=schema_name, ARGS=args)
 
 
-# Part 3.3. FRAFSchema API, uses Part 3.1 and Part 3.2
+# Part 3.3. Schema to Array<Value> (for each schema)
+
+
+SCHEMA_TO_VALUES_PRELUDE = """
+namespace raf {
+namespace op {
+namespace regs {
+namespace schema2values {
+""".strip()
+
+SCHEMA_TO_VALUES_EPILOG = """
+}  // namespace schema2values
+}  // namespace regs
+}  // namespace op
+}  // namespace raf
+""".strip()
+
+
+def gen_schema_to_values(_schema):
+    SCHEMA_TO_VALUES = """
+Array<Value> {SCHEMA_NAME}(const Attrs& attrs) {{
+  const auto* schema = attrs.as<schema::{SCHEMA_NAME}Args>();
+  CHECK(schema != nullptr);
+  Array<Value> values;
+{ARGS}
+  return values;
+}}
+""".strip()
+    ARG = (
+        " " * 2
+        + """
+values.push_back(schema2value::{NORM}(schema->{ARG_NAME}));
+""".strip()
+    )
+    schema_name, schema = _schema
+    schema_name = snake_to_pascal(schema_name)
+    args = []
+    for entry in schema:
+        norm = NORM_CONVERTER[NORM_MAP[entry.cxx_normalizer or entry.cxx_type]]
+        args.append(ARG.format(NORM=norm, ARG_NAME=entry.name))
+    args = "\n".join(map(add_no_lint, args))
+    return SCHEMA_TO_VALUES.format(SCHEMA_NAME=schema_name, ARGS=args)
+
+
+# Part 3.4. FRAFSchema API, uses Part 3.1, Part 3.2 and Part 3.3
 
 F_RAF_SCHEMA_PRELUDE = """
 namespace raf {
@@ -608,11 +663,15 @@ namespace f_raf_schema {
 
 #define RAF_BIND_SCHEMA_FIELD_INDEX(op_str, op_name, schema) \\
   RAF_REGISTER_OP(op_str).set_attr<FRAFSchemaFieldIndex>("FRAFSchemaFieldIndex", schema<op_name>);
+
+#define RAF_BIND_SCHEMA_TO_VALUES(op_str, schema) \\
+  RAF_REGISTER_OP(op_str).set_attr<FRAFSchemaToValues>("FRAFSchemaToValues", schema);
 """.strip()
 
 F_RAF_SCHEMA_EPILOG = """
 #undef RAF_BIND_SCHEMA
 #undef RAF_BIND_SCHEMA_FIELD_INDEX
+#undef RAF_BIND_SCHEMA_TO_VALUES
 
 }  // namespace f_raf_schema
 }  // namespace regs
@@ -625,6 +684,7 @@ def gen_f_raf_schema(op):
     FRAFSchema = """
 RAF_BIND_SCHEMA("raf.op.{OP_NAME}", names::{OP_VAR}, value2schema::{SCHEMA_NAME});  // NOLINT(whitespace/line_length)
 RAF_BIND_SCHEMA_FIELD_INDEX("raf.op.{OP_NAME}", names::{OP_VAR}, schema_field_idx::{SCHEMA_NAME});  // NOLINT(whitespace/line_length)
+RAF_BIND_SCHEMA_TO_VALUES("raf.op.{OP_NAME}", schema2values::{SCHEMA_NAME});  // NOLINT(whitespace/line_length)
 """.strip()
     schema_name = snake_to_pascal(op.schema_name)
     return FRAFSchema.format(
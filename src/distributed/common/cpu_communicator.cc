@@ -0,0 +1,781 @@
+/*
+ * Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+ * SPDX-License-Identifier: Apache-2.0
+ */
+
+/*!
+ * \file src/distributed/common/cpu_communicator.cc
+ * \brief CPU Communicator.
+ */
+#include <arpa/inet.h>
+#include <fcntl.h>
+#include <netinet/in.h>
+#include <netinet/tcp.h>
+#include <sys/mman.h>
+#include <sys/socket.h>
+#include <sys/stat.h>
+#include <unistd.h>
+
+#include <algorithm>
+#include <atomic>
+#include <cerrno>
+#include <chrono>
+#include <cstring>
+#include <fstream>
+#include <mutex>
+#include <thread>
+#include <unordered_map>
+#include <vector>
+
+#include "raf/cpu_communicator.h"
+#include "raf/op_utils.h"
+
+namespace raf {
+namespace distributed {
+namespace communicator {
+
+/*! \brief The transport overridden by SetCPUCommTransport, or empty to use the env variable. */
+static std::string cpu_comm_transport = "";  // NOLINT(runtime/string)
+
+/*! \brief The seconds to wait for the other ranks when a communicator is created. */
+static constexpr int kConnectTimeoutSec = 300;
+
+inline std::string GetEnvString(const char* name, const std::string& default_value) {
+  const char* value = getenv(name);
+  return value == nullptr ? default_value : std::string(value);
+}
+
+/*! \brief Spin on cond, and yield the CPU after a while, since the ranks may oversubscribe it. */
+template <typename F>
+inline void SpinWait(F cond) {
+  for (int i = 0; !cond(); ++i) {
+    if (i >= 1024) {
+      std::this_thread::yield();
+    }
+  }
+}
+
+CPUReduceOp ParseCPUReduceOp(const std::string& computation) {
+  if (computation == "sum") {
+    return CPUReduceOp::kSum;
+  } else if (computation == "prod") {
+    return CPUReduceOp::kProd;
+  } else if (computation == "min") {
+    return CPUReduceOp::kMin;
+  } else if (computation == "max") {
+    return CPUReduceOp::kMax;
+  } else if (computation == "avg") {
+    return CPUReduceOp::kAvg;
+  }
+  LOG(FATAL) << "Invalid computation " << computation;
+  throw;
+}
+
+template <typename T>
+void AccumulateImpl(T* dst, const T* src, int64_t n, CPUReduceOp op) {
+  switch (op) {
+    case CPUReduceOp::kSum:
+    case CPUReduceOp::kAvg:
+      for (int64_t i = 0; i < n; ++i) dst[i] += src[i];
+      break;
+    case CPUReduceOp::kProd:
+      for (int64_t i = 0; i < n; ++i) dst[i] *= src[i];
+      break;
+    case CPUReduceOp::kMin:
+      for (int64_t i = 0; i < n; ++i) dst[i] = std::min(dst[i], src[i]);
+      break;
+    case CPUReduceOp::kMax:
+      for (int64_t i = 0; i < n; ++i) dst[i] = std::max(dst[i], src[i]);
+      break;
+  }
+}
+
+template <typename T>
+void DivideImpl(T* dst, int64_t n, int divisor) {
+  for (int64_t i = 0; i < n; ++i) dst[i] /= divisor;
+}
+
+#define CPU_COMM_DTYPE_SWITCH(dtype, T, ...)                                                 \
+  if (dtype.code == kDLFloat && dtype.bits == 32) {                                          \
+    using T = float;                                                                         \
+    __VA_ARGS__;                                                                             \
+  } else if (dtype.code == kDLFloat && dtype.bits == 64) {                                   \
+    using T = double;                                                                        \
+    __VA_ARGS__;                                                                             \
+  } else if (dtype.code == kDLInt && dtype.bits == 8) {                                      \
+    using T = int8_t;                                                                        \
+    __VA_ARGS__;                                                                             \
+  } else if (dtype.code == kDLInt && dtype.bits == 32) {                                     \
+    using T = int32_t;                                                                       \
+    __VA_ARGS__;                                                                             \
+  } else if (dtype.code == kDLInt && dtype.bits == 64) {                                     \
+    using T = int64_t;                                                                       \
+    __VA_ARGS__;                                                                             \
+  } else if (dtype.code == kDLUInt && dtype.bits == 8) {                                     \
+    using T = uint8_t;                                                                       \
+    __VA_ARGS__;                                                                             \
+  } else {                                                                                   \
+    LOG(FATAL) << "NotImplementedError: CPU collectives on " << ::raf::DType(dtype).c_str(); \
+    throw;                                                                                   \
+  }
+
+/*! \brief dst = op(dst, src) element-wise. */
+void Accumulate(void* dst, const void* src, int64_t n, DLDataType dtype, CPUReduceOp op) {
+  CPU_COMM_DTYPE_SWITCH(dtype, T, {
+    AccumulateImpl(static_cast<T*>(dst), static_cast<const T*>(src), n, op);
+  });
+}
+
+/*! \brief Turn the sum into the average if op is avg. */
+void Finalize(void* dst, int64_t n, DLDataType dtype, CPUReduceOp op, int size) {
+  if (op != CPUReduceOp::kAvg || size == 1) {
+    return;
+  }
+  CPU_COMM_DTYPE_SWITCH(dtype, T, { DivideImpl(static_cast<T*>(dst), n, size); });
+}
+
+class CPUTransport {
+ public:
+  CPUTransport(int rank, int size) : rank_(rank), size_(size) {
+  }
+  virtual ~CPUTransport() = default;
+
+  virtual void Barrier() = 0;
+  virtual void AllReduce(const void* in, void* out, int64_t count, DType dtype,
+                         CPUReduceOp op) = 0;
+  virtual void AllGather(const void* in, void* out, int64_t nbytes) = 0;
+  virtual void ReduceScatter(const void* in, void* out, int64_t count, DType dtype,
+                             CPUReduceOp op) = 0;
+  virtual void Broadcast(const void* in, void* out, int64_t nbytes, int root) = 0;
+  virtual void Send(const void* buf, int64_t nbytes, int peer) = 0;
+  virtual void Recv(void* buf, int64_t nbytes, int peer) = 0;
+
+ protected:
+  int rank_;
+  int size_;
+};
+
+/*! \brief The transport of a communicator with a single rank. */
+class LocalTransport final : public CPUTransport {
+ public:
+  LocalTransport() : CPUTransport(0, 1) {
+  }
+
+  void Barrier() final {
+  }
+
+  void AllReduce(const void* in, void* out, int64_t count, DType dtype, CPUReduceOp op) final {
+    Copy(in, out, count * GetSizeInBytes(dtype));
+  }
+
+  void AllGather(const void* in, void* out, int64_t nbytes) final {
+    Copy(in, out, nbytes);
+  }
+
+  void ReduceScatter(const void* in, void* out, int64_t count, DType dtype,
+                     CPUReduceOp op) final {
+    Copy(in, out, count * GetSizeInBytes(dtype));
+  }
+
+  void Broadcast(const void* in, void* out, int64_t nbytes, int root) final {
+    Copy(in, out, nbytes);
+  }
+
+  void Send(const void* buf, int64_t nbytes, int peer) final {
+    LOG(FATAL) << "Cannot send in a communicator with a single rank";
+  }
+
+  void Recv(void* buf, int64_t nbytes, int peer) final {
+    LOG(FATAL) << "Cannot receive in a communicator with a single rank";
+  }
+
+ private:
+  void Copy(const void* in, void* out, int64_t nbytes) {
+    if (in != out) {
+      std::memcpy(out, in, nbytes);
+    }
+  }
+};
+
+/*!
+ * \brief The shared memory transport. The segment has a header, a collective slot per rank and a
+ * point-to-point slot per rank. A message is split into chunks that fit the slots. For each chunk
+ * of the reductions, every rank copies its data to its slot, and then reduces a 1/size slice of
+ * all slots, which is the reduce-scatter and allgather scheme of the ring algorithm, except that
+ * every rank reads the other slots directly instead of passing the data around the ring.
+ */
+class ShmTransport final : public CPUTransport {
+ public:
+  static constexpr int kMaxRanks = 256;
+  static constexpr uint64_t kMagic = 0x52414653484D3031;  // RAFSHM01
+
+  struct P2PState {
+    std::atomic<int32_t> dst;
+    std::atomic<uint64_t> ready;
+    std::atomic<uint64_t> ack;
+  };
+
+  struct Header {
+    std::atomic<uint64_t> magic;
+    int64_t size;
+    int64_t slot_bytes;
+    std::atomic<uint32_t> barrier_count;
+    std::atomic<uint32_t> barrier_generation;
+    P2PState p2p[kMaxRanks];
+  };
+
+  ShmTransport(int rank, int size, const std::string& key, int64_t slot_bytes)
+      : CPUTransport(rank, size), name_("/" + key), slot_bytes_(slot_bytes) {
+    CHECK_LE(size, kMaxRanks) << "The shared memory transport supports at most " << kMaxRanks
+                              << " ranks";
+    header_bytes_ = (sizeof(Header) + 4095) / 4096 * 4096;
+    total_bytes_ = header_bytes_ + 2 * size * slot_bytes_;
+    int fd;
+    if (rank == 0) {
+      // Remove the segment left by a crashed run with the same key.
+      shm_unlink(name_.c_str());
+      fd = shm_open(name_.c_str(), O_CREAT | O_EXCL | O_RDWR, 0600);
+      CHECK_GE(fd, 0) << "Failed to create the shared memory " << name_ << ": " << strerror(errno);
+      CHECK_EQ(ftruncate(fd, total_bytes_), 0)
+          << "Failed to allocate " << total_bytes_ << " bytes of shared memory: "
+          << strerror(errno);
+    } else {
+      auto start = std::chrono::steady_clock::now();
+      while (true) {
+        fd = shm_open(name_.c_str(), O_RDWR, 0600);
+        struct stat st;
+        if (fd >= 0 && fstat(fd, &st) == 0 && st.st_size == total_bytes_) {
+          break;
+        }
+        if (fd >= 0) {
+          close(fd);
+        }
+        CHECK(std::chrono::steady_clock::now() - start < std::chrono::seconds(kConnectTimeoutSec))
+            << "Timed out waiting for rank 0 to create the shared memory " << name_;
+        std::this_thread::sleep_for(std::chrono::milliseconds(1));
+      }
+    }
+    void* addr = mmap(nullptr, total_bytes_, PROT_READ | PROT_WRITE, MAP_SHARED, fd, 0);
+    close(fd);
+    CHECK(addr != MAP_FAILED) << "Failed to map the shared memory " << name_ << ": "
+                              << strerror(errno);
+    base_ = static_cast<char*>(addr);
+    header_ = reinterpret_cast<Header*>(base_);
+    if (rank == 0) {
+      // The segment is zero-filled, so only the sizes have to be set before publishing it.
+      header_->size = size;
+      header_->slot_bytes = slot_bytes_;
+      header_->magic.store(kMagic, std::memory_order_release);
+    } else {
+      SpinWait([this]() { return header_->magic.load(std::memory_order_acquire) == kMagic; });
+      CHECK_EQ(header_->size, size) << "Mismatched communicator size in " << name_;
+      CHECK_EQ(header_->slot_bytes, slot_bytes_)
+          << "RAF_CPU_COMM_BUFFER_SIZE has to be the same on all ranks";
+    }
+    Barrier();
+    if (rank == 0) {
+      // All ranks have mapped the segment, so its name is no longer needed.
+      shm_unlink(name_.c_str());
+    }
+  }
+
+  ~ShmTransport() {
+    munmap(base_, total_bytes_);
+  }
+
+  void Barrier() final {
+    uint32_t generation = header_->barrier_generation.load(std::memory_order_acquire);
+    if (header_->barrier_count.fetch_add(1, std::memory_order_acq_rel) + 1 == size_) {
+      header_->barrier_count.store(0, std::memory_order_relaxed);
+      header_->barrier_generation.fetch_add(1, std::memory_order_acq_rel);
+    } else {
+      SpinWait([this, generation]() {
+        return header_->barrier_generation.load(std::memory_order_acquire) != generation;
+      });
+    }
+  }
+
+  void AllReduce(const void* in, void* out, int64_t count, DType dtype, CPUReduceOp op) final {
+    int64_t elem_bytes = GetSizeInBytes(dtype);
+    int64_t chunk = slot_bytes_ / elem_bytes;
+    for (int64_t offset = 0; offset < count; offset += chunk) {
+      int64_t n = std::min(chunk, count - offset);
+      std::memcpy(Slot(rank_), Offset(in, offset * elem_bytes), n * elem_bytes);
+      Barrier();
+      // Reduce a slice of the chunk to the slot of rank 0.
+      int64_t slice = (n + size_ - 1) / size_;
+      int64_t begin = std::min(rank_ * slice, n);
+      int64_t end = std::min(begin + slice, n);
+      if (begin < end) {
+        char* dst = Slot(0) + begin * elem_bytes;
+        for (int r = 1; r < size_; ++r) {
+          Accumulate(dst, Slot(r) + begin * elem_bytes, end - begin, dtype, op);
+        }
+        Finalize(dst, end - begin, dtype, op, size_);
+      }
+      Barrier();
+      std::memcpy(Offset(out, offset * elem_bytes), Slot(0), n * elem_bytes);
+      Barrier();
+    }
+  }
+
+  void AllGather(const void* in, void* out, int64_t nbytes) final {
+    for (int64_t offset = 0; offset < nbytes; offset += slot_bytes_) {
+      int64_t n = std::min(slot_bytes_, nbytes - offset);
+      std::memcpy(Slot(rank_), Offset(in, offset), n);
+      Barrier();
+      for (int r = 0; r < size_; ++r) {
+        std::memcpy(Offset(out, r * nbytes + offset), Slot(r), n);
+      }
+      Barrier();
+    }
+  }
+
+  void ReduceScatter(const void* in, void* out, int64_t count, DType dtype,
+                     CPUReduceOp op) final {
+    int64_t elem_bytes = GetSizeInBytes(dtype);
+    int64_t chunk = slot_bytes_ / elem_bytes / size_;
+    CHECK_GT(chunk, 0) << "RAF_CPU_COMM_BUFFER_SIZE is too small";
+    for (int64_t offset = 0; offset < count; offset += chunk) {
+      int64_t n = std::min(chunk, count - offset);
+      int64_t part_bytes = n * elem_bytes;
+      for (int q = 0; q < size_; ++q) {
+        std::memcpy(Slot(rank_) + q * part_bytes, Offset(in, (q * count + offset) * elem_bytes),
+                    part_bytes);
+      }
+      Barrier();
+      void* dst = Offset(out, offset * elem_bytes);
+      std::memcpy(dst, Slot(0) + rank_ * part_bytes, part_bytes);
+      for (int r = 1; r < size_; ++r) {
+        Accumulate(dst, Slot(r) + rank_ * part_bytes, n, dtype, op);
+      }
+      Finalize(dst, n, dtype, op, size_);
+      Barrier();
+    }
+  }
+
+  void Broadcast(const void* in, void* out, int64_t nbytes, int root) final {
+    for (int64_t offset = 0; offset < nbytes; offset += slot_bytes_) {
+      int64_t n = std::min(slot_bytes_, nbytes - offset);
+      if (rank_ == root) {
+        std::memcpy(Slot(root), Offset(in, offset), n);
+      }
+      Barrier();
+      if (rank_ != root) {
+        std::memcpy(Offset(out, offset), Slot(root), n);
+      } else if (in != out) {
+        std::memcpy(Offset(out, offset), Offset(in, offset), n);
+      }
+      Barrier();
+    }
+  }
+
+  void Send(const void* buf, int64_t nbytes, int peer) final {
+    P2PState& state = header_->p2p[rank_];
+    for (int64_t offset = 0; offset < nbytes; offset += slot_bytes_) {
+      int64_t n = std::min(slot_bytes_, nbytes - offset);
+      // Wait for the receiver to consume the previous chunk.
+      uint64_t seq = state.ready.load(std::memory_order_relaxed);
+      SpinWait([&state, seq]() { return state.ack.load(std::memory_order_acquire) == seq; });
+      std::memcpy(P2PSlot(rank_), Offset(buf, offset), n);
+      state.dst.store(peer, std::memory_order_relaxed);
+      state.ready.store(seq + 1, std::memory_order_release);
+    }
+  }
+
+  void Recv(void* buf, int64_t nbytes, int peer) final {
+    P2PState& state = header_->p2p[peer];
+    for (int64_t offset = 0; offset < nbytes; offset += slot_bytes_) {
+      int64_t n = std::min(slot_bytes_, nbytes - offset);
+      uint64_t seq = 0;
+      SpinWait([this, &state, &seq]() {
+        seq = state.ready.load(std::memory_order_acquire);
+        return seq != state.ack.load(std::memory_order_relaxed) &&
+               state.dst.load(std::memory_order_relaxed) == rank_;
+      });
+      std::memcpy(Offset(buf, offset), P2PSlot(peer), n);
+      state.ack.store(seq, std::memory_order_release);
+    }
+  }
+
+ private:
+  static inline char* Offset(void* ptr, int64_t offset) {
+    return static_cast<char*>(ptr) + offset;
+  }
+
+  static inline const char* Offset(const void* ptr, int64_t offset) {
+    return static_cast<const char*>(ptr) + offset;
+  }
+
+  inline char* Slot(int rank) {
+    return base_ + header_bytes_ + rank * slot_bytes_;
+  }
+
+  inline char* P2PSlot(int rank) {
+    return base_ + header_bytes_ + (size_ + rank) * slot_bytes_;
+  }
+
+  std::string name_;
+  int64_t slot_bytes_;
+  int64_t header_bytes_;
+  int64_t total_bytes_;
+  char* base_ = nullptr;
+  Header* header_ = nullptr;
+};
+
+/*!
+ * \brief The TCP loopback transport, which connects every pair of ranks. The reductions and
+ * allgather use the ring algorithm, and broadcast uses the binomial tree algorithm.
+ */
+class TCPTransport final : public CPUTransport {
+ public:
+  TCPTransport(int rank, int size, const std::string& key) : CPUTransport(rank, size) {
+    sockets_.resize(size, -1);
+    int listener = socket(AF_INET, SOCK_STREAM, 0);
+    CHECK_GE(listener, 0) << "Failed to create a socket: " << strerror(errno);
+    sockaddr_in addr;
+    std::memset(&addr, 0, sizeof(addr));
+    addr.sin_family = AF_INET;
+    addr.sin_addr.s_addr = htonl(INADDR_LOOPBACK);
+    addr.sin_port = 0;
+    socklen_t addr_len = sizeof(addr);
+    CHECK_EQ(bind(listener, reinterpret_cast<sockaddr*>(&addr), addr_len), 0)
+        << "Failed to bind a socket: " << strerror(errno);
+    CHECK_EQ(listen(listener, size), 0) << "Failed to listen: " << strerror(errno);
+    CHECK_EQ(getsockname(listener, reinterpret_cast<sockaddr*>(&addr), &addr_len), 0);
+
+    // Publish the port through the file store, which is the same as the one used to sync the
+    // NCCL unique ID.
+    std::string dir = GetEnvString("RAF_FILE_STORE_PATH", "/tmp/.raf_file_store");
+    mkdir(dir.c_str(), S_IRWXU | S_IRWXG | S_IRWXO);
+    std::string prefix = dir + "/" + key + ".";
+    std::string path = prefix + std::to_string(rank);
+    {
+      std::ofstream file(path + ".tmp");
+      file << ntohs(addr.sin_port);
+    }
+    CHECK_EQ(rename((path + ".tmp").c_str(), path.c_str()), 0)
+        << "Failed to write " << path << ": " << strerror(errno);
+
+    // Connect to the lower ranks and accept the connections from the higher ranks.
+    for (int peer = 0; peer < rank; ++peer) {
+      int port = ReadPort(prefix + std::to_string(peer));
+      int fd = socket(AF_INET, SOCK_STREAM, 0);
+      sockaddr_in peer_addr = addr;
+      peer_addr.sin_port = htons(port);
+      auto start = std::chrono::steady_clock::now();
+      while (connect(fd, reinterpret_cast<sockaddr*>(&peer_addr), sizeof(peer_addr)) != 0) {
+        CHECK(std::chrono::steady_clock::now() - start < std::chrono::seconds(kConnectTimeoutSec))
+            << "Timed out connecting to rank " << peer << ": " << strerror(errno);
+        close(fd);
+        std::this_thread::sleep_for(std::chrono::milliseconds(10));
+        fd = socket(AF_INET, SOCK_STREAM, 0);
+      }
+      int32_t my_rank = rank;
+      SendAll(fd, &my_rank, sizeof(my_rank));
+      sockets_[peer] = fd;
+    }
+    for (int i = rank + 1; i < size; ++i) {
+      int fd = accept(listener, nullptr, nullptr);
+      CHECK_GE(fd, 0) << "Failed to accept a connection: " << strerror(errno);
+      int32_t peer;
+      RecvAll(fd, &peer, sizeof(peer));
+      CHECK(peer > rank && peer < size && sockets_[peer] < 0) << "Invalid peer rank " << peer;
+      sockets_[peer] = fd;
+    }
+    close(listener);
+    int one = 1;
+    for (int fd : sockets_) {
+      if (fd >= 0) {
+        setsockopt(fd, IPPROTO_TCP, TCP_NODELAY, &one, sizeof(one));
+      }
+    }
+    Barrier();
+    unlink(path.c_str());
+  }
+
+  ~TCPTransport() {
+    for (int fd : sockets_) {
+      if (fd >= 0) {
+        close(fd);
+      }
+    }
+  }
+
+  void Barrier() final {
+    char token = 0;
+    if (rank_ == 0) {
+      for (int r = 1; r < size_; ++r) RecvAll(sockets_[r], &token, 1);
+      for (int r = 1; r < size_; ++r) SendAll(sockets_[r], &token, 1);
+    } else {
+      SendAll(sockets_[0], &token, 1);
+      RecvAll(sockets_[0], &token, 1);
+    }
+  }
+
+  void AllReduce(const void* in, void* out, int64_t count, DType dtype, CPUReduceOp op) final {
+    int64_t elem_bytes = GetSizeInBytes(dtype);
+    if (in != out) {
+      std::memcpy(out, in, count * elem_bytes);
+    }
+    std::vector<int64_t> begins, counts;
+    Partition(count, &begins, &counts);
+    char* data = static_cast<char*>(out);
+    RingReduceScatter(data, begins, counts, dtype, op);
+    Finalize(data + begins[rank_] * elem_bytes, counts[rank_], dtype, op, size_);
+    RingAllGather(data, begins, counts, elem_bytes);
+  }
+
+  void AllGather(const void* in, void* out, int64_t nbytes) final {
+    char* data = static_cast<char*>(out);
+    std::memcpy(data + rank_ * nbytes, in, nbytes);
+    std::vector<int64_t> begins(size_), counts(size_, nbytes);
+    for (int r = 0; r < size_; ++r) begins[r] = r * nbytes;
+    RingAllGather(data, begins, counts, 1);
+  }
+
+  void ReduceScatter(const void* in, void* out, int64_t count, DType dtype,
+                     CPUReduceOp op) final {
+    int64_t elem_bytes = GetSizeInBytes(dtype);
+    std::vector<char> buffer(static_cast<const char*>(in),
+                             static_cast<const char*>(in) + size_ * count * elem_bytes);
+    std::vector<int64_t> begins(size_), counts(size_, count);
+    for (int r = 0; r < size_; ++r) begins[r] = r * count;
+    RingReduceScatter(buffer.data(), begins, counts, dtype, op);
+    Finalize(buffer.data() + rank_ * count * elem_bytes, count, dtype, op, size_);
+    std::memcpy(out, buffer.data() + rank_ * count * elem_bytes, count * elem_bytes);
+  }
+
+  void Broadcast(const void* in, void* out, int64_t nbytes, int root) final {
+    if (rank_ == root && in != out) {
+      std::memcpy(out, in, nbytes);
+    }
+    int vrank = (rank_ - root + size_) % size_;
+    int mask = 1;
+    while (mask < size_) {
+      if (vrank & mask) {
+        RecvAll(sockets_[(vrank - mask + root) % size_], out, nbytes);
+        break;
+      }
+      mask <<= 1;
+    }
+    for (mask >>= 1; mask > 0; mask >>= 1) {
+      if (vrank + mask < size_) {
+        SendAll(sockets_[(vrank + mask + root) % size_], out, nbytes);
+      }
+    }
+  }
+
+  void Send(const void* buf, int64_t nbytes, int peer) final {
+    SendAll(sockets_[peer], buf, nbytes);
+  }
+
+  void Recv(void* buf, int64_t nbytes, int peer) final {
+    RecvAll(sockets_[peer], buf, nbytes);
+  }
+
+ private:
+  static int ReadPort(const std::string& path) {
+    auto start = std::chrono::steady_clock::now();
+    while (true) {
+      std::ifstream file(path);
+      int port = 0;
+      if (file >> port) {
+        return port;
+      }
+      CHECK(std::chrono::steady_clock::now() - start < std::chrono::seconds(kConnectTimeoutSec))
+          << "Timed out waiting for " << path;
+      std::this_thread::sleep_for(std::chrono::milliseconds(10));
+    }
+  }
+
+  static void SendAll(int fd, const void* buf, int64_t nbytes) {
+    const char* ptr = static_cast<const char*>(buf);
+    while (nbytes > 0) {
+      ssize_t n = send(fd, ptr, nbytes, MSG_NOSIGNAL);
+      if (n < 0 && errno == EINTR) continue;
+      CHECK_GT(n, 0) << "Failed to send: " << strerror(errno);
+      ptr += n;
+      nbytes -= n;
+    }
+  }
+
+  static void RecvAll(int fd, void* buf, int64_t nbytes) {
+    char* ptr = static_cast<char*>(buf);
+    while (nbytes > 0) {
+      ssize_t n = recv(fd, ptr, nbytes, 0);
+      if (n < 0 && errno == EINTR) continue;
+      CHECK_GT(n, 0) << "Failed to receive: " << (n == 0 ? "connection closed" : strerror(errno));
+      ptr += n;
+      nbytes -= n;
+    }
+  }
+
+  /*! \brief Send to the next rank while receiving from the previous rank in the ring. */
+  void SendRecv(const void* send_buf, int64_t send_bytes, void* recv_buf, int64_t recv_bytes) {
+    int next = (rank_ + 1) % size_;
+    int prev = (rank_ - 1 + size_) % size_;
+    std::thread sender([this, next, send_buf, send_bytes]() {
+      SendAll(sockets_[next], send_buf, send_bytes);
+    });
+    RecvAll(sockets_[prev], recv_buf, recv_bytes);
+    sender.join();
+  }
+
+  void Partition(int64_t count, std::vector<int64_t>* begins, std::vector<int64_t>* counts) {
+    for (int r = 0; r < size_; ++r) {
+      int64_t begin = count * r / size_;
+      int64_t end = count * (r + 1) / size_;
+      begins->push_back(begin);
+      counts->push_back(end - begin);
+    }
+  }
+
+  /*! \brief Reduce the segments around the ring, after which segment rank_ is fully reduced. */
+  void RingReduceScatter(char* data, const std::vector<int64_t>& begins,
+                         const std::vector<int64_t>& counts, DType dtype, CPUReduceOp op) {
+    int64_t elem_bytes = GetSizeInBytes(dtype);
+    std::vector<char> buffer(*std::max_element(counts.begin(), counts.end()) * elem_bytes);
+    for (int step = 0; step < size_ - 1; ++step) {
+      int send_idx = ((rank_ - step - 1) % size_ + size_) % size_;
+      int recv_idx = ((rank_ - step - 2) % size_ + size_) % size_;
+      SendRecv(data + begins[send_idx] * elem_bytes, counts[send_idx] * elem_bytes, buffer.data(),
+               counts[recv_idx] * elem_bytes);
+      Accumulate(data + begins[recv_idx] * elem_bytes, buffer.data(), counts[recv_idx], dtype, op);
+    }
+  }
+
+  /*! \brief Pass the segments around the ring, starting from segment rank_. */
+  void RingAllGather(char* data, const std::vector<int64_t>& begins,
+                     const std::vector<int64_t>& counts, int64_t elem_bytes) {
+    for (int step = 0; step < size_ - 1; ++step) {
+      int send_idx = ((rank_ - step) % size_ + size_) % size_;
+      int recv_idx = ((rank_ - step - 1) % size_ + size_) % size_;
+      SendRecv(data + begins[send_idx] * elem_bytes, counts[send_idx] * elem_bytes,
+               data + begins[recv_idx] * elem_bytes, counts[recv_idx] * elem_bytes);
+    }
+  }
+
+  std::vector<int> sockets_;
+};
+
+CPUCommunicatorObj::~CPUCommunicatorObj() {
+}
+
+void CPUCommunicatorObj::Barrier() {
+  impl->Barrier();
+}
+
+void CPUCommunicatorObj::AllReduce(const void* in, void* out, int64_t count, DType dtype,
+                                   CPUReduceOp op) {
+  impl->AllReduce(in, out, count, dtype, op);
+}
+
+void CPUCommunicatorObj::Reduce(const void* in, void* out, int64_t count, DType dtype,
+                                CPUReduceOp op, int root) {
+  // Both transports are bandwidth-bound by the reduce-scatter phase, which reduce also needs, so
+  // the result is gathered on all ranks.
+  impl->AllReduce(in, out, count, dtype, op);
+}
+
+void CPUCommunicatorObj::AllGather(const void* in, void* out, int64_t nbytes) {
+  impl->AllGather(in, out, nbytes);
+}
+
+void CPUCommunicatorObj::ReduceScatter(const void* in, void* out, int64_t count, DType dtype,
+                                       CPUReduceOp op) {
+  impl->ReduceScatter(in, out, count, dtype, op);
+}
+
+void CPUCommunicatorObj::Broadcast(const void* in, void* out, int64_t nbytes, int root) {
+  impl->Broadcast(in, out, nbytes, root);
+}
+
+void CPUCommunicatorObj::Send(const void* buf, int64_t nbytes, int peer) {
+  impl->Send(buf, nbytes, peer);
+}
+
+void CPUCommunicatorObj::Recv(void* buf, int64_t nbytes, int peer) {
+  impl->Recv(buf, nbytes, peer);
+}
+
+/*!
+ * \brief Make the rendezvous key of a communicator, which is unique for the group and the number
+ * of communicators of the group created before in this process.
+ */
+std::string MakeCPUCommKey(const CommunicatorObj* obj, const Value rank_list) {
+  static std::mutex mu;
+  static std::unordered_map<std::string, int> counts;
+  std::string key = "raf_cpu_comm_" + GetEnvString("RAF_CPU_COMM_ID", std::to_string(getuid()));
+  key += "_w" + std::to_string(obj->world_size);
+  if (rank_list.defined() && obj->group_id >= 0) {
+    auto group = Downcast<TupleValue>(Downcast<TupleValue>(rank_list)->fields[obj->group_id]);
+    for (auto rank : group->fields) {
+      key += "_" + std::to_string(Downcast<IntValue>(rank)->value);
+    }
+  }
+  std::lock_guard<std::mutex> lock(mu);
+  return key + "_" + std::to_string(counts[key]++);
+}
+
+CPUCommunicator CPUCommunicator::make(Value rank_list) {
+  auto global_comm = GetGlobalCommunicator();
+  auto obj = make_object<CPUCommunicatorObj>();
+  if (!rank_list.defined()) {
+    obj->local_size = global_comm->local_size;
+    obj->local_rank = global_comm->local_rank;
+    obj->size = global_comm->size;
+    obj->rank = global_comm->rank;
+    obj->world_size = global_comm->world_size;
+    obj->world_rank = global_comm->world_rank;
+    obj->root_rank = global_comm->root_rank;
+    obj->group_id = -1;
+    obj->group_size = 0;
+    obj->host_ids = global_comm->host_ids;
+  } else {
+    InitSubCommunicator(obj.get(), rank_list, global_comm);
+  }
+  obj->parent_comm = global_comm;
+
+  if (obj->size == 1) {
+    obj->transport = "local";
+    obj->impl = std::make_unique<LocalTransport>();
+    return CPUCommunicator(obj);
+  }
+  for (auto host_id : obj->host_ids) {
+    CHECK_EQ(host_id, obj->host_ids[0]) << "The CPU communicator only supports ranks on one host";
+  }
+  std::string transport = cpu_comm_transport.empty()
+                              ? GetEnvString("RAF_CPU_COMM_TRANSPORT", "shm")
+                              : cpu_comm_transport;
+  std::string key = MakeCPUCommKey(obj.get(), rank_list);
+  if (transport == "shm") {
+    int64_t slot_bytes = std::stoll(GetEnvString("RAF_CPU_COMM_BUFFER_SIZE", "1048576"));
+    // Keep the slots aligned for any element type.
+    slot_bytes = std::max<int64_t>(slot_bytes / 64 * 64, 64);
+    obj->impl = std::make_unique<ShmTransport>(obj->rank, obj->size, key, slot_bytes);
+  } else if (transport == "tcp") {
+    obj->impl = std::make_unique<TCPTransport>(obj->rank, obj->size, key);
+  } else {
+    LOG(FATAL) << "Unknown CPU communicator transport " << transport
+               << ", which should be shm or tcp";
+  }
+  obj->transport = transport;
+  return CPUCommunicator(obj);
+}
+
+void SetCPUCommTransport(std::string transport) {
+  CHECK(transport.empty() || transport == "shm" || transport == "tcp")
+      << "Unknown CPU communicator transport " << transport << ", which should be shm or tcp";
+  cpu_comm_transport = transport;
+}
+
+RAF_REGISTER_GLOBAL("raf.distributed.communicator._make.cpu_comm")
+    .set_body_typed(CPUCommunicator::make);
+RAF_REGISTER_GLOBAL("raf.distributed.SetCPUCommTransport").set_body_typed(SetCPUCommTransport);
+
+RAF_REGISTER_OBJECT_REFLECT(CPUCommunicatorObj);
+
+}  // namespace communicator
+}  // namespace distributed
+}  // namespace raf
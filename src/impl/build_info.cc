@@ -31,6 +31,10 @@ std::string UseCuBLAS() {
   return RAF_USE_CUBLAS;
 }
 
+std::string UseCPUBLAS() {
+  return RAF_USE_CPU_BLAS;
+}
+
 std::string UseCuDNN() {
   return RAF_USE_CUDNN;
 }
@@ -82,6 +86,7 @@ RAF_REGISTER_GLOBAL("raf.build_info.git_version").set_body_typed(GitVersion);
 RAF_REGISTER_GLOBAL("raf.build_info.cuda_version").set_body_typed(CudaVersion);
 RAF_REGISTER_GLOBAL("raf.build_info.use_cuda").set_body_typed(UseCUDA);
 RAF_REGISTER_GLOBAL("raf.build_info.use_cublas").set_body_typed(UseCuBLAS);
+RAF_REGISTER_GLOBAL("raf.build_info.use_cpu_blas").set_body_typed(UseCPUBLAS);
 RAF_REGISTER_GLOBAL("raf.build_info.use_cudnn").set_body_typed(UseCuDNN);
 RAF_REGISTER_GLOBAL("raf.build_info.cudnn_version").set_body_typed(CudnnVersion);
 RAF_REGISTER_GLOBAL("raf.build_info.cmake_build_type").set_body_typed(CmakeBuildType);
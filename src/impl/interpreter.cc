@@ -16,6 +16,8 @@
 #include "raf/tensor.h"
 #include "raf/value.h"
 #include "raf/binding.h"
+#include "raf/cache.h"
+#include "raf/dialect.h"
 #include "raf/profiler.h"
 #include "raf/communicator.h"
 #include "dmlc/thread_local.h"
@@ -106,15 +108,44 @@ class SymbolTable {
   }
 };
 
+/*! \brief The default maximum number of OpEnvs cached by the interpreter of each thread. */
+constexpr size_t kDefaultOpEnvCacheSize = 1024;
+
 class Interpreter final : public ExprFunctor<Value(const Expr& n)>, public Executor {
  public:
   SymbolTable st;
   IRModule mod{nullptr};
 
  public:
-  Interpreter() = default;
+  Interpreter() {
+    SetOpEnvCacheSize(cache_utils::GetEnvSize("RAF_INTERPRETER_OP_ENV_CACHE_SIZE",
+                                              kDefaultOpEnvCacheSize));
+  }
   ~Interpreter() = default;
 
+  /*!
+   * \brief Bound the number of cached OpEnvs. 0 disables the cache.
+   * \param size The maximum number of cached OpEnvs.
+   */
+  void SetOpEnvCacheSize(size_t size) {
+    op_env_cache_size_ = size;
+    if (size == 0) {
+      op_env_cache_.Clear();
+    } else {
+      op_env_cache_.SetLimit(size);
+    }
+  }
+
+  /*! \brief The number of cached OpEnvs. */
+  size_t OpEnvCacheSize() {
+    return op_env_cache_.Size();
+  }
+
+  /*! \brief The maximum number of cached OpEnvs. 0 means the cache is disabled. */
+  size_t OpEnvCacheLimit() const {
+    return op_env_cache_size_;
+  }
+
   Value Eval(const Expr& expr) {
     return ExprFunctor<Value(const Expr& n)>::VisitExpr(expr);
   }
@@ -259,9 +290,30 @@ class Interpreter final : public ExprFunctor<Value(const Expr& n)>, public Execu
     ICHECK(call->out.defined()) << "ValueError: Tensor compute of " << op->name
                                 << " is not implemented.";
     AllocOutputBuffer(call->out);
+    // Look up the OpEnv cache first, as dispatching builds a new OpEnv and walks the dialects.
+    std::string key;
+    Array<Value> args;
+    if (op_env_cache_size_ > 0 && MakeCallValuesKey(call, &key, &args)) {
+      if (auto cached = op_env_cache_.Get(key)) {
+        std::shared_ptr<OpEnv> op_env = *cached;
+        std::vector<Value> inputs;
+        inputs.reserve(op_env->arg_indices.size());
+        for (int i : op_env->arg_indices) {
+          CHECK_GE(i, 0) << "Invalid input index: " << i;
+          inputs.push_back(args[i]);
+        }
+        InvokePrimitiveOpEnv(std::move(op_env), call, use_upper_bound, true, &inputs);
+        return call->out;
+      }
+    }
     std::shared_ptr<OpEnv> op_env = Dispatch(call);
     if (op_env != nullptr) {
-      InvokePrimitiveOpEnv(std::move(op_env), call, use_upper_bound);
+      // OpEnvs holding communicators are not cached, as the communicators may be destroyed.
+      bool cache = !key.empty() && op_env->GetRequests()->distributed.empty();
+      if (cache) {
+        op_env_cache_.Add(key, op_env);
+      }
+      InvokePrimitiveOpEnv(std::move(op_env), call, use_upper_bound, cache);
     } else {
       LOG(FATAL) << "ValueError: Cannot dispatch " << op->name << "@" << call->device.c_str();
       throw;
@@ -276,11 +328,23 @@ class Interpreter final : public ExprFunctor<Value(const Expr& n)>, public Execu
     f(call);
   }
 
+  /*!
+   * \brief Execute a dispatched OpEnv.
+   * \param op_env The OpEnv.
+   * \param call The call values.
+   * \param use_upper_bound Whether the op is replaced by its upper bound op.
+   * \param cached Whether the OpEnv is in the OpEnv cache. The requests of a cached OpEnv are
+   * kept after the execution, so that its workspace is reused by the next call.
+   * \param inputs The inputs of a cached OpEnv whose requests have been fulfilled by a previous
+   * call, or nullptr. As such an OpEnv was built for other call values, it is executed with the
+   * inputs instead of the call values.
+   */
   void InvokePrimitiveOpEnv(std::shared_ptr<OpEnv> op_env, const CallValues& call,
-                            bool use_upper_bound) {
+                            bool use_upper_bound, bool cached,
+                            const std::vector<Value>* inputs = nullptr) {
     const Op& op = Downcast<OpValue>(call->callee)->op;
     std::shared_ptr<Requests> req = op_env->GetRequests();
-    {
+    if (inputs == nullptr) {
       // note: Request workspace, workspace is kind of special memory which will be freed once
       // this op is done.
       WITH_BASE_PROFILER(call->device, op->name, "WorkspaceRequest",
@@ -311,21 +375,29 @@ class Interpreter final : public ExprFunctor<Value(const Expr& n)>, public Execu
     }
 
     // note: Execute the Operator.
-    WITH_BASE_PROFILER(call->device, op->name, "CUDA_CALL", {}, { op_env->Execute(call); });
+    if (inputs == nullptr) {
+      WITH_BASE_PROFILER(call->device, op->name, "CUDA_CALL", {}, { op_env->Execute(call); });
+    } else {
+      WITH_BASE_PROFILER(call->device, op->name, "CUDA_CALL", {},
+                         { op_env->Execute(*inputs, call->out); });
+    }
 
     {
       // note: Force op to run synchronously.
       for (int i = 0, n = req->stream.size(); i < n; ++i) {
         req->stream[i].stream->Wait();
       }
-      // note: Free the workspace of this op.
-      WITH_BASE_PROFILER(call->device, op->name, "WorkspaceClear", {}, {
-        req->workspace.clear();
-        req->workspace.shrink_to_fit();
-      });
-
-      req->stream.clear();
-      req->stream.shrink_to_fit();
+      // note: Free the workspace of this op, unless it is reused by the next call of the cached
+      // OpEnv. This is safe because the op has finished.
+      if (!cached) {
+        WITH_BASE_PROFILER(call->device, op->name, "WorkspaceClear", {}, {
+          req->workspace.clear();
+          req->workspace.shrink_to_fit();
+        });
+
+        req->stream.clear();
+        req->stream.shrink_to_fit();
+      }
     }
 
     // note: The next op holds a reference to this op. It will make sure that the memories requested
@@ -394,6 +466,11 @@ class Interpreter final : public ExprFunctor<Value(const Expr& n)>, public Execu
   }
 
  private:
+  /*! \brief The cache of dispatched OpEnvs. */
+  MetaCache<std::shared_ptr<OpEnv>> op_env_cache_;
+  /*! \brief The maximum number of cached OpEnvs. 0 means the cache is disabled. */
+  size_t op_env_cache_size_ = 0;
+
   void AllocOutputBuffer(Value& out) {
     std::vector<DLTensor*> out_tensors;
     std::vector<TensorValue> out_tvs;
@@ -467,6 +544,16 @@ ObjectRef _Interpret(Expr expr, Optional<IRModule> mod) {
 }
 
 RAF_REGISTER_GLOBAL("raf.executor.Interpret").set_body_typed(_Interpret);
+RAF_REGISTER_GLOBAL("raf.executor.SetInterpreterOpEnvCacheSize").set_body_typed([](int64_t size) {
+  CHECK_GE(size, 0) << "ValueError: The OpEnv cache size must be non-negative";
+  IntrpThreadEntry::ThreadLocal()->SetOpEnvCacheSize(size);
+});
+RAF_REGISTER_GLOBAL("raf.executor.GetInterpreterOpEnvCacheSize").set_body_typed([]() {
+  return static_cast<int64_t>(IntrpThreadEntry::ThreadLocal()->OpEnvCacheSize());
+});
+RAF_REGISTER_GLOBAL("raf.executor.GetInterpreterOpEnvCacheLimit").set_body_typed([]() {
+  return static_cast<int64_t>(IntrpThreadEntry::ThreadLocal()->OpEnvCacheLimit());
+});
 }  // namespace interpreter
 }  // namespace executor
 }  // namespace raf
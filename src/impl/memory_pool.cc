@@ -8,6 +8,7 @@
  * \brief RAF memory pool manager
  */
 #include <unordered_map>
+#include <tvm/ir/expr.h>
 #include "raf/device.h"
 #include "raf/memory_pool.h"
 #include "raf/registry.h"
@@ -169,5 +170,11 @@ RAF_REGISTER_GLOBAL("raf.memory_pool.ResetPool").set_body_typed([](const Device&
   return ResetPool(dev);
 });
 
+RAF_REGISTER_GLOBAL("raf.memory_pool.GetPoolSize").set_body_typed([](const Device& dev) {
+  auto pool_size = Memory::GetPoolSize(dev);
+  return tvm::Array<tvm::FloatImm>{tvm::FloatImm(tvm::DataType::Float(32), pool_size.first),
+                                   tvm::FloatImm(tvm::DataType::Float(32), pool_size.second)};
+});
+
 }  // namespace memory_pool
 }  // namespace raf
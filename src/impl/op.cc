@@ -7,11 +7,20 @@
  * \file src/impl/op.cc
  * \brief RAF operator interface underlying implementation
  */
+#include <atomic>
+#include <fstream>
+#include <iomanip>
+#include <map>
+#include <mutex>
+#include <set>
+#include <sstream>
 #include <tvm/runtime/device_api.h>
 #include "dmlc/registry.h"
+#include "raf/cache.h"
 #include "raf/executor.h"
 #include "raf/ir.h"
 #include "raf/op.h"
+#include "raf/op_profiler.h"
 #include "raf/dialect.h"
 #include "raf/registry.h"
 #include "raf/pass.h"
@@ -19,6 +28,7 @@
 #include "raf/device_api.h"
 #include "../requests.h"
 #include "../op/schema/list_args.h"
+#include "../op/ty/utils.h"
 
 namespace dmlc {
 DMLC_REGISTRY_ENABLE(::raf::op::OpEnvMaker);
@@ -124,6 +134,436 @@ OpEnvPtr OpEnvMaker::Make(const std::string& op_name, const CallValues& call) {
 
 // Implementation : helper functions
 
+/*! \brief Hash the type of a tensor or the value of an attribute. */
+static bool HashValue(HashKey* hash, const Value& value) {
+  if (!value.defined()) {
+    *hash << static_cast<uint8_t>(0);
+  } else if (value->IsInstance<TensorValueObj>()) {
+    DLTensor* t = Downcast<TensorValue>(value);
+    *hash << static_cast<uint8_t>(1) << static_cast<int32_t>(t->ndim) << *t;
+  } else if (const auto* v = value.as<IntValueObj>()) {
+    *hash << static_cast<uint8_t>(2) << v->value;
+  } else if (const auto* v = value.as<FloatValueObj>()) {
+    *hash << static_cast<uint8_t>(3) << v->value;
+  } else if (const auto* v = value.as<BoolValueObj>()) {
+    *hash << static_cast<uint8_t>(4) << v->value;
+  } else if (const auto* v = value.as<StringValueObj>()) {
+    *hash << static_cast<uint8_t>(5) << v->value;
+  } else if (const auto* v = value.as<TupleValueObj>()) {
+    *hash << static_cast<uint8_t>(6) << static_cast<int64_t>(v->fields.size());
+    for (const auto& field : v->fields) {
+      if (!HashValue(hash, field)) {
+        return false;
+      }
+    }
+  } else if (value->IsInstance<VoidValueObj>()) {
+    *hash << static_cast<uint8_t>(7);
+  } else {
+    // E.g., closures.
+    return false;
+  }
+  return true;
+}
+
+bool MakeCallValuesKey(const CallValues& call, std::string* key, Array<Value>* args) {
+  const auto* callee = call->callee.as<OpValueObj>();
+  if (callee == nullptr) {
+    return false;
+  }
+  const Op& op = callee->op;
+  auto fschema_to_values =
+      GetOpAttrOrDefault<FRAFSchemaToValues>(op, "FRAFSchemaToValues", nullptr);
+  if (fschema_to_values == nullptr) {
+    return false;
+  }
+  Array<Value> values = fschema_to_values(call->args);
+  HashKey hash;
+  hash << op->name << static_cast<int32_t>(call->device.device_type())
+       << static_cast<int32_t>(call->device.device_id());
+  for (const auto& value : values) {
+    if (!HashValue(&hash, value)) {
+      return false;
+    }
+  }
+  if (!HashValue(&hash, call->out)) {
+    return false;
+  }
+  if (const auto* pref = DialectPreference::Current()) {
+    for (const auto& dialect : (*pref)->preferred_dialects) {
+      hash << std::string(dialect);
+    }
+  }
+  key->assign(hash.byte_vector.begin(), hash.byte_vector.end());
+  if (args != nullptr) {
+    *args = std::move(values);
+  }
+  return true;
+}
+
+// Implementation: dispatch decisions
+
+/*! \brief How DispatchSingleOp picks a dialect op for a call. */
+enum class DispatchMode : int {
+  /*! \brief Try the dialect ops in the plevel order for every call. */
+  kOff = 0,
+  /*! \brief Memoize the first valid dialect op in the plevel order, and the invalid ones. */
+  kCache = 1,
+  /*! \brief Measure all valid dialect ops and memoize the fastest one. */
+  kMeasure = 2,
+};
+
+static const char* kDispatchModeNames[] = {"off", "cache", "measure"};
+
+static DispatchMode ParseDispatchMode(const std::string& name) {
+  for (int i = 0; i < 3; ++i) {
+    if (name == kDispatchModeNames[i]) {
+      return static_cast<DispatchMode>(i);
+    }
+  }
+  LOG(FATAL) << "ValueError: Unknown dispatch mode " << name
+             << ". Expected one of off, cache and measure";
+  throw;
+}
+
+/*! \brief The header of the on-disk dispatch decision database. */
+static const char* kDispatchDBHeader = "raf-dispatch-decision-db";
+
+/*!
+ * \brief The version of the on-disk dispatch decision database. Bump it whenever the key or the
+ * format changes, so that databases produced by older versions are invalidated.
+ */
+constexpr int kDispatchDBVersion = 2;
+
+/*! \brief The expected header line of the on-disk dispatch decision database. */
+static std::string DispatchDBHeader() {
+  return std::string(kDispatchDBHeader) + " " + std::to_string(kDispatchDBVersion);
+}
+
+/*! \brief The number of warmup and measured runs of each dialect op in the measure mode. */
+constexpr int32_t kMeasureWarmup = 3;
+constexpr int32_t kMeasureNumber = 10;
+
+/*! \brief The dispatch decision of a call. */
+struct DispatchDecision {
+  /*! \brief The op and the device of the call, which are only for inspection. */
+  std::string op, device;
+  /*! \brief The dialect op that the call is dispatched to, or empty if none is valid. */
+  std::string dialect_op;
+  /*!
+   * \brief The dialect ops that failed to make an OpEnv for the call. They are not persisted,
+   * because a failure may be transient or specific to the build of this process.
+   */
+  std::set<std::string> failed;
+  /*!
+   * \brief Whether the valid dialect ops have been measured. It is set even if none of them could
+   * be measured, so that the measurement is not retried on every call.
+   */
+  bool measured{false};
+  /*! \brief The measured latencies of the valid dialect ops in microseconds. */
+  std::map<std::string, float> latency;
+};
+
+/*! \brief Encode a byte string key to a hex string. */
+static std::string EncodeKey(const std::string& key) {
+  std::ostringstream os;
+  os << std::hex << std::setfill('0');
+  for (unsigned char c : key) {
+    os << std::setw(2) << static_cast<int>(c);
+  }
+  return os.str();
+}
+
+/*! \brief Decode a hex string to a byte string key. Return false if it is malformed. */
+static bool DecodeKey(const std::string& hex, std::string* key) {
+  if (hex.size() % 2 != 0) {
+    return false;
+  }
+  key->clear();
+  for (size_t i = 0; i < hex.size(); i += 2) {
+    char* end = nullptr;
+    std::string byte = hex.substr(i, 2);
+    long val = strtol(byte.c_str(), &end, 16);  // NOLINT(runtime/int)
+    if (*end != '\0') {
+      return false;
+    }
+    key->push_back(static_cast<char>(val));
+  }
+  return true;
+}
+
+/*!
+ * \brief Format one dispatch decision. Each line is "<hex key>\t<op>\t<device>\t<dialect op>\t
+ * <measured (0 or 1)>\t<dialect op 0>:<latency 0>,...". The failed dialect ops are not included.
+ */
+static std::string FormatDecision(const std::string& key, const DispatchDecision& decision) {
+  std::ostringstream os;
+  os << EncodeKey(key) << "\t" << decision.op << "\t" << decision.device << "\t"
+     << decision.dialect_op << "\t" << (decision.measured ? 1 : 0) << "\t" << std::setprecision(9);
+  int i = 0;
+  for (const auto& kv : decision.latency) {
+    os << (i++ > 0 ? "," : "") << kv.first << ":" << kv.second;
+  }
+  return os.str();
+}
+
+/*! \brief Parse one dispatch decision. Return false if it is malformed. */
+static bool ParseDecision(const std::string& line, std::string* key, DispatchDecision* decision) {
+  std::vector<std::string> fields;
+  size_t begin = 0;
+  while (true) {
+    size_t end = line.find('\t', begin);
+    fields.push_back(line.substr(begin, end - begin));
+    if (end == std::string::npos) {
+      break;
+    }
+    begin = end + 1;
+  }
+  if (fields.size() != 6 || !DecodeKey(fields[0], key) || (fields[4] != "0" && fields[4] != "1")) {
+    return false;
+  }
+  *decision = DispatchDecision();
+  decision->op = fields[1];
+  decision->device = fields[2];
+  decision->dialect_op = fields[3];
+  decision->measured = fields[4] == "1";
+  std::istringstream latency_is(fields[5]);
+  std::string item;
+  try {
+    while (std::getline(latency_is, item, ',')) {
+      auto pos = item.rfind(':');
+      if (pos == std::string::npos) {
+        return false;
+      }
+      decision->latency[item.substr(0, pos)] = std::stof(item.substr(pos + 1));
+    }
+  } catch (const std::exception& e) {
+    return false;
+  }
+  return true;
+}
+
+/*!
+ * \brief The process-wide table of the dispatch decisions, keyed by MakeCallValuesKey. The mode
+ * and an on-disk database that new decisions are appended to can be specified by the environment
+ * variables RAF_DISPATCH_MODE and RAF_DISPATCH_DB.
+ */
+class DispatchDecisionTable {
+ public:
+  static DispatchDecisionTable* Get() {
+    static DispatchDecisionTable* inst = new DispatchDecisionTable();
+    return inst;
+  }
+
+  DispatchMode GetMode() const {
+    return static_cast<DispatchMode>(mode_.load());
+  }
+
+  void SetMode(DispatchMode mode) {
+    mode_.store(static_cast<int>(mode));
+  }
+
+  bool Lookup(const std::string& key, DispatchDecision* decision) {
+    std::lock_guard<std::mutex> lock(mu_);
+    auto it = table_.find(key);
+    if (it == table_.end()) {
+      return false;
+    }
+    *decision = it->second;
+    return true;
+  }
+
+  void Update(const std::string& key, const DispatchDecision& decision) {
+    std::lock_guard<std::mutex> lock(mu_);
+    table_[key] = decision;
+    if (!db_path_.empty()) {
+      std::ofstream ofs(db_path_, std::ios::out | std::ios::app);
+      if (ofs.good()) {
+        ofs << FormatDecision(key, decision) << "\n";
+      }
+    }
+  }
+
+  void Clear() {
+    std::lock_guard<std::mutex> lock(mu_);
+    table_.clear();
+  }
+
+  Array<Map<String, ObjectRef>> List() {
+    std::lock_guard<std::mutex> lock(mu_);
+    Array<Map<String, ObjectRef>> ret;
+    for (const auto& kv : table_) {
+      const DispatchDecision& decision = kv.second;
+      Array<String> failed;
+      for (const auto& name : decision.failed) {
+        failed.push_back(name);
+      }
+      Map<String, FloatImm> latency;
+      for (const auto& lat : decision.latency) {
+        latency.Set(lat.first, FloatImm(DataType::Float(32), lat.second));
+      }
+      ret.push_back({{"key", String(EncodeKey(kv.first))},
+                     {"op", String(decision.op)},
+                     {"device", String(decision.device)},
+                     {"dialect_op", String(decision.dialect_op)},
+                     {"failed", failed},
+                     {"measured", Bool(decision.measured)},
+                     {"latency", latency}});
+    }
+    return ret;
+  }
+
+  int Import(const std::string& path, bool overwrite) {
+    std::ifstream ifs(path);
+    std::string header;
+    if (!ifs.good() || !std::getline(ifs, header)) {
+      return 0;
+    }
+    std::string expected = DispatchDBHeader();
+    if (header != expected) {
+      LOG(WARNING) << "The dispatch decision database " << path << " has header \"" << header
+                   << "\", but expected \"" << expected << "\". It is ignored.";
+      return 0;
+    }
+    // Decisions appended later to the database override the earlier ones of the same key.
+    std::unordered_map<std::string, DispatchDecision> loaded;
+    std::string line, key;
+    DispatchDecision decision;
+    while (std::getline(ifs, line)) {
+      if (line.empty()) {
+        continue;
+      }
+      if (!ParseDecision(line, &key, &decision)) {
+        // A partially written line, e.g., the process was killed while appending.
+        LOG(WARNING) << "Skip a malformed entry in the dispatch decision database " << path;
+        continue;
+      }
+      loaded[key] = decision;
+    }
+    std::lock_guard<std::mutex> lock(mu_);
+    int num_loaded = 0;
+    for (auto& kv : loaded) {
+      if (overwrite || table_.count(kv.first) == 0) {
+        table_[kv.first] = std::move(kv.second);
+        num_loaded++;
+      }
+    }
+    return num_loaded;
+  }
+
+  int Export(const std::string& path) {
+    std::lock_guard<std::mutex> lock(mu_);
+    std::ofstream ofs(path, std::ios::out | std::ios::trunc);
+    CHECK(ofs.good()) << "Failed to open " << path << " to export the dispatch decisions";
+    ofs << DispatchDBHeader() << "\n";
+    for (const auto& kv : table_) {
+      ofs << FormatDecision(kv.first, kv.second) << "\n";
+    }
+    return table_.size();
+  }
+
+  int Attach(const std::string& path) {
+    int num_loaded = path.empty() ? 0 : Import(path, false);
+    std::lock_guard<std::mutex> lock(mu_);
+    std::ifstream ifs(path);
+    std::string header;
+    if (!path.empty() &&
+        (!ifs.good() || !std::getline(ifs, header) || header != DispatchDBHeader())) {
+      // Create the database, or overwrite the one with a mismatched version.
+      std::ofstream ofs(path, std::ios::out | std::ios::trunc);
+      CHECK(ofs.good()) << "Failed to create the dispatch decision database " << path;
+      ofs << DispatchDBHeader() << "\n";
+    }
+    db_path_ = path;
+    return num_loaded;
+  }
+
+ private:
+  DispatchDecisionTable() {
+    const char* mode = getenv("RAF_DISPATCH_MODE");
+    if (mode != nullptr && strlen(mode) > 0) {
+      SetMode(ParseDispatchMode(mode));
+    }
+    const char* path = getenv("RAF_DISPATCH_DB");
+    if (path != nullptr && strlen(path) > 0) {
+      Attach(path);
+    }
+  }
+
+  /*! \brief The dispatch mode. */
+  std::atomic<int> mode_{static_cast<int>(DispatchMode::kCache)};
+  /*! \brief The dispatch decisions. */
+  std::unordered_map<std::string, DispatchDecision> table_;
+  /*! \brief The attached database that new decisions are appended to. */
+  std::string db_path_;
+  /*! \brief The lock of the table and the attached database. */
+  std::mutex mu_;
+};
+
+/*!
+ * \brief Make the OpEnv of a dialect op for the call. Return nullptr and collect the error
+ * messages if the dialect op has no OpEnv maker or its OpEnv has errors.
+ */
+static OpEnvPtr MakeDialectOpEnv(const Op& dialect_op, const CallValues& call,
+                                 std::vector<std::string>* error_msgs) {
+  auto maker = OpEnvMaker::Get(dialect_op->name);
+  if (maker == nullptr) {
+    return nullptr;
+  }
+  auto env = OpEnvPtr((*maker)(call));
+  if (env && !env->HasError()) {
+    return env;
+  } else if (env) {
+    for (auto msg : env->error_msgs) {
+      error_msgs->push_back(msg);
+    }
+  }
+  return nullptr;
+}
+
+/*!
+ * \brief Measure the latency of a dialect op for the call in microseconds with the op profiler,
+ * which runs the dialect op on dummy inputs of the same types. Return a negative value if the
+ * dialect op cannot be measured.
+ */
+static float MeasureDialectOp(const Op& dialect_op, const CallValues& call,
+                              const Array<Value>& args) {
+  // The op profiler is not thread-safe, and dispatches the dialect op again.
+  static std::mutex mu;
+  static thread_local bool measuring = false;
+  if (measuring) {
+    return -1;
+  }
+  std::lock_guard<std::mutex> lock(mu);
+  measuring = true;
+  float latency = -1;
+  try {
+    Array<Expr> arg_exprs;
+    for (const auto& arg : args) {
+      Expr expr;
+      if (!arg.defined()) {
+        expr = MakeNull();
+        expr->checked_type_ = VoidType();
+      } else if (arg->IsInstance<BaseTensorValueObj>() || arg->IsInstance<TupleValueObj>()) {
+        // Tensors are replaced with the dummy ones created by the op profiler.
+        expr = MakeVar("x", GetType(arg));
+        expr->checked_type_ = GetType(arg);
+      } else {
+        expr = MakeConstant(arg);
+        expr->checked_type_ = GetType(arg);
+      }
+      arg_exprs.push_back(expr);
+    }
+    Call expr = Call(dialect_op, arg_exprs);
+    expr->checked_type_ = GetType(call->out);
+    auto profiler = op_profiler::OpProfiler::Get(call->device);
+    latency = profiler->ProfileOp(expr, kMeasureWarmup, kMeasureNumber).first[0];
+  } catch (const dmlc::Error& e) {
+    LOG(WARNING) << "Failed to measure " << dialect_op->name << ": " << e.what();
+  }
+  measuring = false;
+  return latency;
+}
+
 OpEnvPtr DispatchSingleOp(const CallValues& call) {
   std::vector<std::string> dispatch_error_msgs;
 
@@ -148,27 +588,93 @@ OpEnvPtr DispatchSingleOp(const CallValues& call) {
     base_op->op_type = op->op_type;
     op = base_op;
   }
-  // Iterate over all dialect ops based on plevel.
-  auto dialect_list = OpDialect::GetDispatchList(op, call->device.device_type());
-  for (const auto& entry : dialect_list) {
+  // Collect all dialect ops based on plevel.
+  std::vector<Op> dialect_ops;
+  for (const auto& entry : OpDialect::GetDispatchList(op, call->device.device_type())) {
     if (entry.dialect == skip_dialect) {
       continue;
     }
     auto dialect_op = Op::Get(entry.dialect_op);
     dialect_op->op_type = op->op_type;
-    auto maker = OpEnvMaker::Get(dialect_op->name);
-    if (maker != nullptr) {
-      auto env = OpEnvPtr((*maker)(call));
-      if (env && !env->HasError()) {
-        DLOG(INFO) << "Dispatch to " << dialect_op->name;
-        return env;
-      } else if (env) {
-        for (auto msg : env->error_msgs) {
-          dispatch_error_msgs.push_back(msg);
-        }
+    dialect_ops.push_back(dialect_op);
+  }
+
+  // Look up the dispatch decision of the call, which skips the dialect ops that are known to be
+  // invalid, and tries the decided one first.
+  auto* table = DispatchDecisionTable::Get();
+  DispatchMode mode = table->GetMode();
+  std::string key;
+  Array<Value> args;
+  if (mode == DispatchMode::kOff || !MakeCallValuesKey(call, &key, &args)) {
+    key.clear();
+  }
+  DispatchDecision decision;
+  bool found = !key.empty() && table->Lookup(key, &decision);
+  // The op profiler only runs on the first device of each type.
+  bool measure = !key.empty() && mode == DispatchMode::kMeasure && !decision.measured &&
+                 call->device.device_id() == 0;
+  if (found) {
+    std::vector<Op> ordered;
+    for (const auto& dialect_op : dialect_ops) {
+      if (decision.failed.count(dialect_op->name)) {
+        continue;
+      }
+      if (dialect_op->name == decision.dialect_op) {
+        ordered.insert(ordered.begin(), dialect_op);
+      } else {
+        ordered.push_back(dialect_op);
+      }
+    }
+    dialect_ops = std::move(ordered);
+  }
+
+  // Make the OpEnv of the first valid dialect op, or of all valid ones to measure them.
+  bool updated = !found;
+  std::vector<std::pair<Op, OpEnvPtr>> valid;
+  for (const auto& dialect_op : dialect_ops) {
+    auto env = MakeDialectOpEnv(dialect_op, call, &dispatch_error_msgs);
+    if (env == nullptr) {
+      updated |= decision.failed.insert(dialect_op->name).second;
+      continue;
+    }
+    valid.emplace_back(dialect_op, env);
+    if (!measure) {
+      break;
+    }
+  }
+  size_t best = 0;
+  if (measure && valid.size() > 1) {
+    float best_latency = -1;
+    for (size_t i = 0; i < valid.size(); ++i) {
+      float latency = MeasureDialectOp(valid[i].first, call, args);
+      if (latency < 0) {
+        continue;
+      }
+      decision.latency[valid[i].first->name] = latency;
+      if (best_latency < 0 || latency < best_latency) {
+        best = i;
+        best_latency = latency;
       }
     }
   }
+  if (measure) {
+    // Measure each call at most once, even if no dialect op could be measured.
+    decision.measured = true;
+    updated = true;
+  }
+  if (!valid.empty() && decision.dialect_op != valid[best].first->name) {
+    decision.dialect_op = valid[best].first->name;
+    updated = true;
+  }
+  if (!key.empty() && updated) {
+    decision.op = op->name;
+    decision.device = call->device.c_str();
+    table->Update(key, decision);
+  }
+  if (!valid.empty()) {
+    DLOG(INFO) << "Dispatch to " << valid[best].first->name;
+    return valid[best].second;
+  }
 
   std::stringstream ss;
   ss << "Cannot find a valid dispatch for op " << op->name << ":";
@@ -262,6 +768,9 @@ Array<Value> GetListArgs(const Attrs& attrs) {
 
 std::string GetUniqueName(std::string name) {
   static std::unordered_map<std::string, int> name_map;
+  // OpEnvs may be created concurrently, e.g., by VirtualMachine::Warmup.
+  static std::mutex mu;
+  std::lock_guard<std::mutex> lock(mu);
   for (size_t i = 0; i < name.length(); ++i) {
     if (name[i] == '.') name[i] = '_';
   }
@@ -296,6 +805,28 @@ Op GetOp(const std::string& op_name) {
 }
 
 RAF_REGISTER_GLOBAL("raf.op.GetOp").set_body_typed(GetOp);
+RAF_REGISTER_GLOBAL("raf.op.SetDispatchMode").set_body_typed([](String mode) {
+  DispatchDecisionTable::Get()->SetMode(ParseDispatchMode(mode));
+});
+RAF_REGISTER_GLOBAL("raf.op.GetDispatchMode").set_body_typed([]() {
+  return String(kDispatchModeNames[static_cast<int>(DispatchDecisionTable::Get()->GetMode())]);
+});
+RAF_REGISTER_GLOBAL("raf.op.GetDispatchDecisions").set_body_typed([]() {
+  return DispatchDecisionTable::Get()->List();
+});
+RAF_REGISTER_GLOBAL("raf.op.ClearDispatchDecisions").set_body_typed([]() {
+  DispatchDecisionTable::Get()->Clear();
+});
+RAF_REGISTER_GLOBAL("raf.op.ImportDispatchDecisions")
+    .set_body_typed([](String path, bool overwrite) {
+      return DispatchDecisionTable::Get()->Import(path, overwrite);
+    });
+RAF_REGISTER_GLOBAL("raf.op.ExportDispatchDecisions").set_body_typed([](String path) {
+  return DispatchDecisionTable::Get()->Export(path);
+});
+RAF_REGISTER_GLOBAL("raf.op.AttachDispatchDB").set_body_typed([](String path) {
+  return DispatchDecisionTable::Get()->Attach(path);
+});
 
 RAF_REGISTER_OBJECT_REFLECT(CallValuesNode);
 
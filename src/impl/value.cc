@@ -301,6 +301,22 @@ TensorValue AssembleTensorValue(const Device& dev, DLDataType dtype, Array<Integ
       Tensor::make(dev, dtype, MakeShape<int64_t>(shape), MakeShape<int64_t>(strides), data));
 }
 
+TensorValue CreateTensorView(TensorValue value, Array<Integer> shape, int64_t offset) {
+  const DLTensor* dlt = value;
+  std::vector<int64_t> view_shape = MakeShape<int64_t>(shape);
+  int64_t numel = 1;
+  for (auto dim : view_shape) {
+    numel *= dim;
+  }
+  CHECK(offset >= 0 && offset + numel <= common::shape_utils::GetNumel(*dlt))
+      << "ValueError: The view [" << offset << ", " << offset + numel
+      << ") is out of the range of the tensor with " << common::shape_utils::GetNumel(*dlt)
+      << " elements";
+  int64_t elem_bytes = (dlt->dtype.bits * dlt->dtype.lanes + 7) / 8;
+  void* data = static_cast<uint8_t*>(dlt->data) + dlt->byte_offset + offset * elem_bytes;
+  return TensorValue::make(value->tensor.CreateView(view_shape, {}, data), value->mem);
+}
+
 TensorValue FromTVM(tvm::runtime::NDArray array) {
   return TensorValue::make(Tensor::FromDLPack(array.ToDLPack()));
 }
@@ -427,6 +443,7 @@ RAF_REGISTER_GLOBAL("raf.value.AssembleTensorValue")
     });
 RAF_REGISTER_GLOBAL("raf.value.DeTuple").set_body_typed(DeTuple);
 RAF_REGISTER_GLOBAL("raf.value.FromTVM").set_body_typed(FromTVM);
+RAF_REGISTER_GLOBAL("raf.value.CreateTensorView").set_body_typed(CreateTensorView);
 RAF_REGISTER_GLOBAL("raf.value.ToTVM").set_body_typed(ToTVM);
 RAF_REGISTER_GLOBAL("raf.value._make.TupleValue").set_body_typed(TupleValue::make);
 RAF_REGISTER_GLOBAL("raf.value._make.IntValue").set_body_typed(IntValue::make);
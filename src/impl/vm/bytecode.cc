@@ -119,6 +119,7 @@ Instruction::Instruction(const Instruction& instr) {
       this->invoke_jit.arity = instr.invoke_jit.arity;
       this->invoke_jit.output_size = instr.invoke_jit.output_size;
       this->invoke_jit.args = Duplicate<RegName>(instr.invoke_jit.args, instr.invoke_jit.arity);
+      this->invoke_jit.is_static = instr.invoke_jit.is_static;
       return;
     case Opcode::InferType:
       this->infer_type.op_reg = instr.infer_type.op_reg;
@@ -225,6 +226,7 @@ Instruction& Instruction::operator=(const Instruction& instr) {
       this->invoke_jit.output_size = instr.invoke_jit.output_size;
       FreeIf(this->invoke_jit.args);
       this->invoke_jit.args = Duplicate<RegName>(instr.invoke_jit.args, instr.invoke_jit.arity);
+      this->invoke_jit.is_static = instr.invoke_jit.is_static;
       return *this;
     case Opcode::InferType:
       this->infer_type.op_reg = instr.infer_type.op_reg;
@@ -511,7 +513,7 @@ Instruction Instruction::Move(RegName src, RegName dst) {
 }
 
 Instruction Instruction::InvokeJit(RegName op_reg, Index arity, Index output_size,
-                                   const std::vector<RegName>& args) {
+                                   const std::vector<RegName>& args, bool is_static) {
   Instruction instr;
   instr.op = Opcode::InvokeJit;
   instr.invoke_jit.op_reg = op_reg;
@@ -521,6 +523,7 @@ Instruction Instruction::InvokeJit(RegName op_reg, Index arity, Index output_siz
   for (Index i = 0; i < arity; ++i) {
     instr.invoke_jit.args[i] = args[i];
   }
+  instr.invoke_jit.is_static = is_static;
   return instr;
 }
 
@@ -712,6 +715,9 @@ void InstructionPrint(std::ostream& os, const Instruction& instr) {
          << StrJoin<RegName>(instr.invoke_jit.args, 0, num_inputs, ", $") << ", out: $"
          << StrJoin<RegName>(instr.invoke_jit.args, num_inputs, instr.invoke_jit.output_size, ", $")
          << ")";
+      if (instr.invoke_jit.is_static) {
+        os << "(static)";
+      }
       break;
     }
     case Opcode::InferType: {
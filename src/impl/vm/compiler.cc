@@ -410,8 +410,9 @@ class VMFunctionCompiler : ExprFunctor<void(const Expr& expr)> {
           .Match("raf.op.vm.alloc_tensor",
                  [this](const Array<Expr>& args, const Attrs& attrs, const Array<Type>& type_arg) {
                    bool own = true;
-                   if (args.size() == 5) {
-                     // The last "own" argument is usually specified by the MemoryPlan pass
+                   Index offset = 0;
+                   if (args.size() >= 5) {
+                     // The "own" argument is usually specified by the MemoryPlan pass
                      // to indicate that this tensor is not the final output so it should not
                      // own the memory pointer.
                      CHECK(args[4].as<ConstantNode>());
@@ -421,6 +422,14 @@ class VMFunctionCompiler : ExprFunctor<void(const Expr& expr)> {
                    } else {
                      CHECK_EQ(args.size(), 4);
                    }
+                   if (args.size() == 6) {
+                     // The byte offset in the storage, which is specified by the MemoryPlan
+                     // pass when the tensor is placed in a memory arena.
+                     CHECK(args[5].as<ConstantNode>());
+                     auto offset_val = args[5].as<ConstantNode>()->value;
+                     CHECK(offset_val->IsInstance<IntValueObj>());
+                     offset = offset_val.as<IntValueObj>()->value;
+                   }
 
                    // The storage will be passed dynamically.
                    this->VisitExpr(args[0]);
@@ -446,12 +455,12 @@ class VMFunctionCompiler : ExprFunctor<void(const Expr& expr)> {
                        raw_shape.push_back(imm->value);
                      }
                      // Add context field.
-                     Emit(Instruction::AllocTensor(storage_register, 0, raw_shape, dtype,
+                     Emit(Instruction::AllocTensor(storage_register, offset, raw_shape, dtype,
                                                    NewRegister(), own));
                    } else {
                      this->VisitExpr(args[1]);
-                     Emit(Instruction::AllocTensorReg(storage_register, 0, last_register_, dtype,
-                                                      NewRegister(), own));
+                     Emit(Instruction::AllocTensorReg(storage_register, offset, last_register_,
+                                                      dtype, NewRegister(), own));
                    }
                  })
           .Match("raf.op.vm.alloc_storage",
@@ -696,7 +705,20 @@ class VMFunctionCompiler : ExprFunctor<void(const Expr& expr)> {
     auto output_tuple = expr_map_[output_var].as<TupleNode>();
     CHECK(output_tuple) << "internal error: invoke_op outputs must be a tuple,"
                         << "please file a bug in the memory manifestation pass";
+    // The OpEnv of this instruction can be bound once if all argument types are static.
+    // Constants are excluded because the VM does not take them into account for the OpEnv key.
+    bool is_static = true;
+    auto check_static = [&is_static](const Expr& arg) {
+      if (arg.as<ConstantNode>()) {
+        return;
+      }
+      const Type& type = arg->checked_type_;
+      if (!type.defined() || tvm::relay::IsDynamic(type)) {
+        is_static = false;
+      }
+    };
     for (auto input : input_tuple->fields) {
+      check_static(input);
       if (input.as<VarNode>()) {
         auto reg = var_register_map_.find(Downcast<Var>(input));
         CHECK(reg != var_register_map_.end())
@@ -712,6 +734,7 @@ class VMFunctionCompiler : ExprFunctor<void(const Expr& expr)> {
     }
 
     for (auto output : output_tuple->fields) {
+      check_static(output);
       auto reg = var_register_map_.find(Downcast<Var>(output));
       CHECK(reg != var_register_map_.end())
           << "internal error: all variables should be in the register mapping";
@@ -721,7 +744,7 @@ class VMFunctionCompiler : ExprFunctor<void(const Expr& expr)> {
     CHECK_EQ(device_map_.size(), 1U)
         << "Currently VM compiler doesn't support heterogeneous compilation";
     Emit(Instruction::InvokeJit(op_reg, argument_registers.size(), output_tuple->fields.size(),
-                                argument_registers));
+                                argument_registers, is_static));
   }
 
   void EmitInferType(const Expr& op, const Expr& inputs, RegName dst) {
@@ -845,6 +868,10 @@ IRModule VMCompiler::OptimizeModule(const IRModule& mod, const DeviceMap& device
   auto dcfg = DistConfig::Global();
   auto device_t = (*it).second.device_type();
   Array<pass::Pass> pass_seqs;
+  // Only re-infer the bindings changed by the previous passes. It is off by default, as it relies
+  // on the passes to drop the checked types of the bindings they change.
+  bool incremental_infer =
+      pass_ctx->GetConfig("raf.vm.optimize.incremental_type_infer", Bool(false)).value();
 
   // optimization passes that work on ANF
   pass_seqs.push_back(pass::GradInputSelect());
@@ -861,17 +888,22 @@ IRModule VMCompiler::OptimizeModule(const IRModule& mod, const DeviceMap& device
     pass_seqs.push_back(pass::ToGraphNormalForm());
     pass_seqs.push_back(pass::ToBasicBlockNormalForm());
     pass_seqs.push_back(pass::SimplifyExpr());
-    pass_seqs.push_back(pass::InferType());
+    pass_seqs.push_back(pass::InferType(incremental_infer));
     pass_seqs.push_back(pass::FuseDialect());
     pass_seqs.push_back(pass::FuseTVM());
     pass_seqs.push_back(pass::DispatchDialect());
+    // Pre-pack the bound weights for the tuned CPU kernels in inference.
+    if (device_t == DevType::kCPU() &&
+        pass_ctx->GetConfig("raf.vm.optimize.pre_pack_weights", Bool(false)).value()) {
+      pass_seqs.push_back(pass::AutoSchedulerLayoutRewrite());
+    }
     // We need to erase the type after dialect dispatching because dialect ops may have different
     // output type than the base ops.
     pass_seqs.push_back(pass::EraseType());
 
     // optimization passes that transform BBNF into ANF
-    if (device_t == DevType::kCUDA()) {
-      if (DistConfig::Global()->enable_data_parallel) {
+    if (device_t == DevType::kCUDA() || device_t == DevType::kCPU()) {
+      if (device_t == DevType::kCUDA() && DistConfig::Global()->enable_data_parallel) {
         // The current design of EnforceSync assumes ops are executed on multiple CUDA streams:
         // all computation ops are executed on a computation stream, and all communication
         // collectives are executed on another communication stream. Memory copy ops added in
@@ -895,7 +927,10 @@ IRModule VMCompiler::OptimizeModule(const IRModule& mod, const DeviceMap& device
         } else if (policy_name == "asap") {
           pass_seqs.push_back(pass::ASAPStreamSchedule());
         } else if (policy_name == "ios") {
-          pass_seqs.push_back(pass::InferType());
+          // On CPU, the streams are executed by the worker threads of the VM, but the IOS cost
+          // model only supports CUDA.
+          CHECK(device_t == DevType::kCUDA()) << "The ios schedule policy only supports CUDA";
+          pass_seqs.push_back(pass::InferType(incremental_infer));
           pass_seqs.push_back(pass::IOSStreamSchedule());
         } else {
           LOG(FATAL) << "Cannot recognize schedule policy: " << policy_name << ", candidates are \n"
@@ -912,13 +947,13 @@ IRModule VMCompiler::OptimizeModule(const IRModule& mod, const DeviceMap& device
 
   // optimization passes that work on ANF
   pass_seqs.push_back(pass::InlinePrimitives());
-  pass_seqs.push_back(pass::InferType());
+  pass_seqs.push_back(pass::InferType(incremental_infer));
   pass_seqs.push_back(pass::InplaceUpdate());
   if (!enable_stream_schedule) {
     // TODO(@comaniac): Support rematerialization with multi-streaming.
-    pass_seqs.push_back(pass::InferType());
+    pass_seqs.push_back(pass::InferType(incremental_infer));
     pass_seqs.push_back(pass::MemorySchedule());
-    pass_seqs.push_back(pass::InferType());
+    pass_seqs.push_back(pass::InferType(incremental_infer));
     pass_seqs.push_back(pass::Rematerialization());
   }
   // TODO(@hzfan): Currently disable the ValidateInplaceUpdate pass because it removes the may_share
@@ -926,9 +961,13 @@ IRModule VMCompiler::OptimizeModule(const IRModule& mod, const DeviceMap& device
   // pass_seqs.push_back(pass::ValidateInplaceUpdate(true));
   // pass_seqs.push_back(pass::InferType());
   pass_seqs.push_back(pass::LambdaLift());
-  pass_seqs.push_back(pass::InferType());
+  pass_seqs.push_back(pass::InferType(incremental_infer));
   pass_seqs.push_back(pass::ManifestAlloc());
-  pass_seqs.push_back(pass::MemoryPlan());
+  if (!enable_stream_schedule || device_t != DevType::kCPU()) {
+    // The memory plan assumes that the ops are executed in the order of the ANF, which does not
+    // hold when the CPU streams run on different threads.
+    pass_seqs.push_back(pass::MemoryPlan());
+  }
 
   pass::RAFSequential seq(pass_seqs);
   return seq(mod);
@@ -991,6 +1030,8 @@ PackedFunc VMCompiler::GetFunction(const std::string& name, const ObjectPtr<Obje
 }
 
 TVM_REGISTER_PASS_CONFIG_OPTION("raf.vm.optimize.anf_only", Bool);
+TVM_REGISTER_PASS_CONFIG_OPTION("raf.vm.optimize.incremental_type_infer", Bool);
+TVM_REGISTER_PASS_CONFIG_OPTION("raf.vm.optimize.pre_pack_weights", Bool);
 
 RAF_REGISTER_GLOBAL("raf.vm.VMCompiler").set_body_typed(CreateVMCompiler);
 
@@ -0,0 +1,150 @@
+/*
+ * Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+ * SPDX-License-Identifier: Apache-2.0
+ */
+
+/*!
+ * \file src/impl/vm/cpu_stream.cc
+ * \brief The streams and events used by the VM to execute independent ops concurrently on CPU.
+ */
+#include <algorithm>
+#include <utility>
+
+#include "./cpu_stream.h"
+
+namespace raf {
+namespace executor {
+namespace vm {
+
+void CpuEvent::Signal(uint64_t seq) {
+  {
+    std::lock_guard<std::mutex> lock(mu_);
+    signaled_ = std::max(signaled_, seq);
+  }
+  cv_.notify_all();
+}
+
+void CpuEvent::Wait(uint64_t seq) {
+  std::unique_lock<std::mutex> lock(mu_);
+  cv_.wait(lock, [this, seq] { return signaled_ >= seq; });
+}
+
+CpuStream::CpuStream() : worker_([this] { Loop(); }) {
+}
+
+CpuStream::~CpuStream() {
+  {
+    std::lock_guard<std::mutex> lock(mu_);
+    stop_ = true;
+  }
+  task_cv_.notify_one();
+  worker_.join();
+}
+
+void CpuStream::Push(std::function<void()> task) {
+  {
+    std::lock_guard<std::mutex> lock(mu_);
+    tasks_.push_back(std::move(task));
+  }
+  task_cv_.notify_one();
+}
+
+void CpuStream::Synchronize() {
+  std::unique_lock<std::mutex> lock(mu_);
+  idle_cv_.wait(lock, [this] { return tasks_.empty() && !busy_; });
+  if (error_) {
+    auto error = error_;
+    error_ = nullptr;
+    std::rethrow_exception(error);
+  }
+}
+
+void CpuStream::Loop() {
+  while (true) {
+    std::function<void()> task;
+    {
+      std::unique_lock<std::mutex> lock(mu_);
+      task_cv_.wait(lock, [this] { return stop_ || !tasks_.empty(); });
+      if (tasks_.empty()) {
+        // stop_ is set and all tasks are drained.
+        return;
+      }
+      task = std::move(tasks_.front());
+      tasks_.pop_front();
+      busy_ = true;
+    }
+    // Keep running the following tasks after an error, because they may signal events that other
+    // streams are waiting for. The error is reported at the next synchronization.
+    std::exception_ptr error = nullptr;
+    try {
+      task();
+    } catch (...) {
+      error = std::current_exception();
+    }
+    // Release the captured values before the stream becomes idle.
+    task = nullptr;
+    {
+      std::lock_guard<std::mutex> lock(mu_);
+      if (error && !error_) {
+        error_ = std::move(error);
+      }
+      error = nullptr;
+      busy_ = false;
+      if (tasks_.empty()) {
+        idle_cv_.notify_all();
+      }
+    }
+  }
+}
+
+CpuStream* CpuStreamPool::GetStream(Index stream_id) {
+  CHECK_GE(stream_id, 0) << "Invalid stream id: " << stream_id;
+  if (stream_id >= streams_.size()) {
+    streams_.resize(stream_id + 1);
+  }
+  if (streams_[stream_id] == nullptr) {
+    streams_[stream_id] = std::make_unique<CpuStream>();
+  }
+  return streams_[stream_id].get();
+}
+
+CpuEvent* CpuStreamPool::GetEvent(Index event_id) {
+  CHECK_GE(event_id, 0) << "Invalid event id: " << event_id;
+  if (event_id >= events_.size()) {
+    events_.resize(event_id + 1);
+  }
+  if (events_[event_id] == nullptr) {
+    events_[event_id] = std::make_unique<CpuEvent>();
+  }
+  return events_[event_id].get();
+}
+
+void CpuStreamPool::DeferRelease(std::shared_ptr<memory_pool::Memory> memory) {
+  if (memory != nullptr) {
+    deferred_.push_back(std::move(memory));
+  }
+}
+
+void CpuStreamPool::Synchronize() {
+  std::exception_ptr error = nullptr;
+  for (auto& stream : streams_) {
+    if (stream == nullptr) {
+      continue;
+    }
+    try {
+      stream->Synchronize();
+    } catch (...) {
+      if (!error) {
+        error = std::current_exception();
+      }
+    }
+  }
+  deferred_.clear();
+  if (error) {
+    std::rethrow_exception(error);
+  }
+}
+
+}  // namespace vm
+}  // namespace executor
+}  // namespace raf
@@ -0,0 +1,171 @@
+/*
+ * Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+ * SPDX-License-Identifier: Apache-2.0
+ */
+
+/*!
+ * \file src/impl/vm/cpu_stream.h
+ * \brief The streams and events used by the VM to execute independent ops concurrently on CPU.
+ */
+#pragma once
+
+#include <condition_variable>
+#include <deque>
+#include <exception>
+#include <functional>
+#include <memory>
+#include <mutex>
+#include <thread>
+#include <vector>
+
+#include "raf/memory_pool.h"
+#include "raf/vm/bytecode.h"
+
+namespace raf {
+namespace executor {
+namespace vm {
+
+/*!
+ * \brief An event on CPU streams, which mirrors the semantics of a CUDA event: waiting on an event
+ * waits for the completion of the most recent record at the time the wait is issued.
+ */
+class CpuEvent {
+ public:
+  /*!
+   * \brief Issue a new record of this event. Called by the VM thread.
+   * \return The sequence number to be signaled when the record is reached by a stream.
+   */
+  uint64_t Record() {
+    return ++recorded_;
+  }
+
+  /*!
+   * \brief The sequence number of the most recent record. Called by the VM thread.
+   * \return The sequence number to wait for.
+   */
+  uint64_t Recorded() const {
+    return recorded_;
+  }
+
+  /*!
+   * \brief Mark a record as completed. Called by a stream worker.
+   * \param seq The sequence number of the record.
+   */
+  void Signal(uint64_t seq);
+
+  /*!
+   * \brief Block until a record is completed. Called by a stream worker.
+   * \param seq The sequence number of the record.
+   */
+  void Wait(uint64_t seq);
+
+ private:
+  /*! \brief The sequence number of the most recent record. Only accessed by the VM thread. */
+  uint64_t recorded_{0};
+  /*! \brief The sequence number of the most recent completed record. */
+  uint64_t signaled_{0};
+  /*! \brief The mutex for signaled_. */
+  std::mutex mu_;
+  /*! \brief The condition variable to notify waiters. */
+  std::condition_variable cv_;
+};
+
+/*!
+ * \brief A stream of tasks executed in order by a dedicated worker thread, which mirrors a CUDA
+ * stream. Tasks on different streams run concurrently.
+ */
+class CpuStream {
+ public:
+  CpuStream();
+
+  ~CpuStream();
+
+  /*!
+   * \brief Append a task to the stream.
+   * \param task The task.
+   */
+  void Push(std::function<void()> task);
+
+  /*!
+   * \brief Block until all pushed tasks are completed. The first error raised by the tasks since
+   * the last synchronization is re-thrown.
+   */
+  void Synchronize();
+
+ private:
+  /*! \brief The loop of the worker thread. */
+  void Loop();
+
+  /*! \brief The pending tasks. */
+  std::deque<std::function<void()>> tasks_;
+  /*! \brief Whether the worker is running a task. */
+  bool busy_{false};
+  /*! \brief Whether the worker should exit. */
+  bool stop_{false};
+  /*! \brief The first error raised by the tasks. */
+  std::exception_ptr error_{nullptr};
+  /*! \brief The mutex for the above states. */
+  std::mutex mu_;
+  /*! \brief Notify the worker of new tasks. */
+  std::condition_variable task_cv_;
+  /*! \brief Notify the synchronizer that the stream is idle. */
+  std::condition_variable idle_cv_;
+  /*! \brief The worker thread. */
+  std::thread worker_;
+};
+
+/*!
+ * \brief The CPU streams and events of a virtual machine. Each stream ID in the bytecode is mapped
+ * to a worker thread, which is created on first use and reused across runs. Events are recorded
+ * and waited inside streams, so a stream blocked on an event never holds up another stream.
+ *
+ * The pool is driven by a single VM thread at a time, which is guaranteed by holding the mutex
+ * returned by GetMutex during a run.
+ */
+class CpuStreamPool {
+ public:
+  /*!
+   * \brief Get the stream of the given ID.
+   * \param stream_id The stream ID.
+   * \return The stream.
+   */
+  CpuStream* GetStream(Index stream_id);
+
+  /*!
+   * \brief Get the event of the given ID.
+   * \param event_id The event ID.
+   * \return The event.
+   */
+  CpuEvent* GetEvent(Index event_id);
+
+  /*!
+   * \brief Keep a memory buffer alive until the next synchronization, because the tasks in flight
+   * may still access it.
+   * \param memory The memory buffer.
+   */
+  void DeferRelease(std::shared_ptr<memory_pool::Memory> memory);
+
+  /*!
+   * \brief Block until the tasks on all streams are completed, and release the deferred memory.
+   */
+  void Synchronize();
+
+  /*! \brief The mutex that serializes the VM runs using this pool. */
+  std::mutex& GetMutex() {
+    return run_mu_;
+  }
+
+ private:
+  /*! \brief The streams indexed by stream ID. */
+  std::vector<std::unique_ptr<CpuStream>> streams_;
+  /*! \brief The events indexed by event ID. */
+  std::vector<std::unique_ptr<CpuEvent>> events_;
+  /*! \brief The memory buffers to be released at the next synchronization. */
+  std::vector<std::shared_ptr<memory_pool::Memory>> deferred_;
+  /*! \brief The mutex held by a VM run. */
+  std::mutex run_mu_;
+};
+
+}  // namespace vm
+}  // namespace executor
+}  // namespace raf
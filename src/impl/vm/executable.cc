@@ -9,15 +9,24 @@
  */
 
 #include <dmlc/memory_io.h>
+#include <fcntl.h>
+#include <sys/mman.h>
+#include <sys/stat.h>
+#include <unistd.h>
 #include <tvm/runtime/memory.h>
+#include <tvm/runtime/ndarray.h>
 #include <tvm/runtime/object.h>
 
 #include <algorithm>
+#include <cerrno>
 #include <chrono>
+#include <cstring>
+#include <fstream>
 #include <iostream>
 #include <sstream>
 #include <vector>
 
+#include "raf/memory_pool.h"
 #include "raf/serialization.h"
 #include "raf/vm/vm.h"
 #include "./serialize_util.h"
@@ -47,8 +56,20 @@ PackedFunc Executable::GetFunction(const std::string& name, const ObjectPtr<Obje
         [sptr_to_self, this](TVMArgs args, TVMRetValue* rv) { *rv = this->GetBytecode(); });
   } else if (name == "get_stats") {
     return PackedFunc([sptr_to_self, this](TVMArgs args, TVMRetValue* rv) { *rv = this->Stats(); });
+  } else if (name == "get_num_preloaded_kernels") {
+    return PackedFunc([sptr_to_self, this](TVMArgs args, TVMRetValue* rv) {
+      *rv = this->num_preloaded_kernels;
+    });
+  } else if (name == "add_kernels") {
+    return PackedFunc([sptr_to_self, this](TVMArgs args, TVMRetValue* rv) {
+      Array<Array<ObjectRef>> kernels = args[0];
+      *rv = this->AddKernels(kernels);
+    });
   } else if (name == "save") {
-    return PackedFunc([sptr_to_self, this](TVMArgs args, TVMRetValue* rv) { *rv = this->Save(); });
+    return PackedFunc([sptr_to_self, this](TVMArgs args, TVMRetValue* rv) {
+      std::string const_path = args.size() > 0 ? args[0].operator std::string() : "";
+      *rv = this->Save(const_path);
+    });
   } else if (name == "get_function_arity") {
     return PackedFunc([sptr_to_self, this](TVMArgs args, TVMRetValue* rv) {
       std::string func_name = args[0];
@@ -171,7 +192,7 @@ void SaveHeader(dmlc::Stream* strm) {
   strm->Write(version);
 }
 
-TVMByteArray Executable::Save() {
+TVMByteArray Executable::Save(const std::string& const_path) {
   // Initialize the stream object.
   code_.clear();
   dmlc::MemoryStringStream strm(&code_);
@@ -183,7 +204,7 @@ TVMByteArray Executable::Save() {
   SaveGlobalSection(&strm);
 
   // Constant section.
-  SaveConstantSection(&strm);
+  SaveConstantSection(&strm, const_path);
 
   // Primitive names.
   SavePrimitiveOpNames(&strm);
@@ -191,6 +212,11 @@ TVMByteArray Executable::Save() {
   // Code section.
   SaveCodeSection(&strm);
 
+  // Kernel section.
+  if (!kernels.empty()) {
+    SaveKernelSection(&strm);
+  }
+
   TVMByteArray arr;
   arr.data = code_.c_str();
   arr.size = code_.length();
@@ -212,11 +238,120 @@ void Executable::SaveGlobalSection(dmlc::Stream* strm) {
   strm->Write(glbs);
 }
 
-void Executable::SaveConstantSection(dmlc::Stream* strm) {
+/*! \brief The kinds of the values in an external constant section. */
+enum ExternalValueKind : uint8_t {
+  /*! \brief A value serialized in the constant section. */
+  kInlineValue = 0,
+  /*! \brief A tensor whose data is in the constant file. */
+  kExternalTensor = 1,
+  /*! \brief A tuple whose fields are external values. */
+  kExternalTuple = 2,
+};
+
+/*! \brief The memory of a mapped constant file, which is unmapped when no tensor refers to it. */
+class MappedConstantFile : public memory_pool::Memory {
+ public:
+  MappedConstantFile(void* addr, size_t size) : size_(size) {
+    data = addr;
+    device = Device(DevType::kCPU(), 0);
+  }
+
+  ~MappedConstantFile() {
+    munmap(data, size_);
+  }
+
+ private:
+  size_t size_;
+};
+
+void SaveExternalValue(dmlc::Stream* strm, const Value& value, std::ofstream* file) {
+  if (auto tup = value.as<TupleValueObj>()) {
+    strm->Write(static_cast<uint8_t>(kExternalTuple));
+    strm->Write(static_cast<uint64_t>(tup->fields.size()));
+    for (const auto& field : tup->fields) {
+      SaveExternalValue(strm, field, file);
+    }
+    return;
+  }
+  if (!value.as<TensorValueObj>()) {
+    strm->Write(static_cast<uint8_t>(kInlineValue));
+    serialization::SerializeValue(strm, value);
+    return;
+  }
+  Value cpu_value = CopyTo(value, Device(DevType::kCPU(), 0));
+  const DLTensor* dlt = Downcast<TensorValue>(cpu_value);
+  CHECK(tvm::runtime::IsContiguous(*dlt)) << "Cannot save a non-contiguous constant";
+  uint64_t nbytes = tvm::runtime::GetDataSize(*dlt);
+  // Pad the file so that the tensor starts at a page boundary.
+  uint64_t offset = file->tellp();
+  uint64_t padding = (kConstantFileAlignment - offset % kConstantFileAlignment) %
+                     kConstantFileAlignment;
+  std::vector<char> zeros(padding, 0);
+  file->write(zeros.data(), padding);
+  offset += padding;
+  file->write(static_cast<const char*>(dlt->data) + dlt->byte_offset, nbytes);
+  CHECK(file->good()) << "Failed to write the constant file";
+
+  strm->Write(static_cast<uint8_t>(kExternalTensor));
+  strm->Write(dlt->dtype);
+  strm->Write(std::vector<int64_t>(dlt->shape, dlt->shape + dlt->ndim));
+  strm->Write(offset);
+  strm->Write(nbytes);
+}
+
+Value LoadExternalValue(dmlc::Stream* strm, const std::shared_ptr<MappedConstantFile>& file,
+                        size_t file_size) {
+  uint8_t kind;
+  STREAM_CHECK(strm->Read(&kind), "constant");
+  switch (kind) {
+    case kInlineValue:
+      return serialization::DeserializeValue(strm);
+    case kExternalTuple: {
+      uint64_t size;
+      STREAM_CHECK(strm->Read(&size), "constant");
+      Array<Value> fields;
+      for (uint64_t i = 0; i < size; ++i) {
+        fields.push_back(LoadExternalValue(strm, file, file_size));
+      }
+      return TupleValue::make(fields);
+    }
+    case kExternalTensor: {
+      DLDataType dtype;
+      std::vector<int64_t> shape;
+      uint64_t offset, nbytes;
+      STREAM_CHECK(strm->Read(&dtype), "constant");
+      STREAM_CHECK(strm->Read(&shape), "constant");
+      STREAM_CHECK(strm->Read(&offset), "constant");
+      STREAM_CHECK(strm->Read(&nbytes), "constant");
+      CHECK_LE(offset + nbytes, file_size) << "The constant file is truncated";
+      void* data = file ? static_cast<char*>(file->data) + offset : nullptr;
+      return TensorValue::Assemble(Device(DevType::kCPU(), 0), DType(dtype), shape, {}, data,
+                                   file);
+    }
+    default:
+      LOG(FATAL) << "Invalid VM file format in the constant section.";
+      throw;
+  }
+}
+
+void Executable::SaveConstantSection(dmlc::Stream* strm, const std::string& const_path) {
+  if (const_path.empty()) {
+    strm->Write(static_cast<uint64_t>(constants.size()));
+    for (const auto& value : this->constants) {
+      serialization::SerializeValue(strm, value);
+    }
+    return;
+  }
+  std::ofstream file(const_path, std::ios::binary | std::ios::trunc);
+  CHECK(file.is_open()) << "Failed to open the constant file " << const_path;
+  // The magic number never collides with the number of constants of an inline section.
+  strm->Write(kExternalConstantMagic);
   strm->Write(static_cast<uint64_t>(constants.size()));
   for (const auto& value : this->constants) {
-    serialization::SerializeValue(strm, value);
+    SaveExternalValue(strm, value, &file);
   }
+  uint64_t file_size = file.tellp();
+  strm->Write(file_size);
 }
 
 void Executable::SavePrimitiveOpNames(dmlc::Stream* strm) {
@@ -404,14 +539,16 @@ VMInstructionSerializer SerializeInstruction(const Instruction& instr) {
       break;
     }
     case Opcode::InvokeJit: {
-      // Number of fields = 3 + instr.arity
+      // Number of fields = 4 + instr.arity
       // Note that arity includes both input arguments and outputs. We will
-      // put all the `arity` number of fields in the end for serialization.
+      // put all the `arity` number of fields after the first three fields, and
+      // the static flag in the end for serialization.
       fields.assign(
           {instr.invoke_jit.op_reg, instr.invoke_jit.arity, instr.invoke_jit.output_size});
       // Save the args.
       fields.insert(fields.end(), instr.invoke_jit.args,
                     instr.invoke_jit.args + instr.invoke_jit.arity);
+      fields.push_back(instr.invoke_jit.is_static);
       break;
     }
     case Opcode::InferType: {
@@ -465,6 +602,45 @@ void Executable::SaveCodeSection(dmlc::Stream* strm) {
   }
 }
 
+void Executable::SaveKernelSection(dmlc::Stream* strm) {
+  std::vector<std::string> cache_names, keys, func_names;
+  for (const auto& kernel : this->kernels) {
+    cache_names.push_back(std::get<0>(kernel));
+    keys.push_back(std::get<1>(kernel));
+    func_names.push_back(std::get<2>(kernel));
+  }
+  strm->Write(cache_names);
+  strm->Write(keys);
+  strm->Write(func_names);
+}
+
+int64_t Executable::AddKernels(const Array<Array<ObjectRef>>& kernels) {
+  if (!lib.defined()) {
+    // An empty module to import the kernels, which are linked together by export_library.
+    static auto f_create = registry::GetPackedFunc("runtime.CSourceModuleCreate");
+    lib = f_create("", "c", Array<String>(), Array<String>());
+  }
+  int64_t num_added = 0;
+  for (const auto& kernel : kernels) {
+    CHECK_EQ(kernel.size(), 4U) << "Invalid kernel record";
+    std::string cache_name = Downcast<String>(kernel[0]);
+    std::string key = Downcast<String>(kernel[1]);
+    auto mod = Downcast<tvm::runtime::Module>(kernel[2]);
+    std::string func_name = Downcast<String>(kernel[3]);
+    auto it = kernel_modules_.find(func_name);
+    if (it == kernel_modules_.end()) {
+      lib.Import(mod);
+      kernel_modules_.emplace(func_name, mod);
+    } else if (it->second.get() != mod.get()) {
+      LOG(WARNING) << "Skip packaging kernel " << func_name << " due to a name conflict";
+      continue;
+    }
+    this->kernels.emplace_back(cache_name, key, func_name);
+    ++num_added;
+  }
+  return num_added;
+}
+
 void LoadHeader(dmlc::Stream* strm) {
   // Check header.
   uint64_t header;
@@ -477,7 +653,8 @@ void LoadHeader(dmlc::Stream* strm) {
   STREAM_CHECK(version == TVM_VERSION, "version");
 }
 
-tvm::runtime::Module Executable::Load(const std::string& code, const tvm::runtime::Module lib) {
+tvm::runtime::Module Executable::Load(const std::string& code, const tvm::runtime::Module lib,
+                                      const std::string& const_path) {
   auto exec = make_object<Executable>();
   exec->lib = lib;
   exec->code_ = code;
@@ -490,7 +667,7 @@ tvm::runtime::Module Executable::Load(const std::string& code, const tvm::runtim
   exec->LoadGlobalSection(&strm);
 
   // Constant section.
-  exec->LoadConstantSection(&strm);
+  exec->LoadConstantSection(&strm, const_path);
 
   // Primitive names that will be invoked by `InvokePacked` instructions.
   exec->LoadPrimitiveOpNames(&strm);
@@ -498,6 +675,9 @@ tvm::runtime::Module Executable::Load(const std::string& code, const tvm::runtim
   // Code section.
   exec->LoadCodeSection(&strm);
 
+  // Kernel section.
+  exec->LoadKernelSection(&strm);
+
   return tvm::runtime::Module(exec);
 }
 
@@ -509,10 +689,38 @@ void Executable::LoadGlobalSection(dmlc::Stream* strm) {
   }
 }
 
-void Executable::LoadConstantSection(dmlc::Stream* strm) {
+void Executable::LoadConstantSection(dmlc::Stream* strm, const std::string& const_path) {
   uint64_t sz;
   // Load the number of constants.
   STREAM_CHECK(strm->Read(&sz, sizeof(sz)), "constant");
+  if (sz == kExternalConstantMagic) {
+    STREAM_CHECK(strm->Read(&sz, sizeof(sz)), "constant");
+    CHECK(!const_path.empty()) << "The executable was saved with a constant file, "
+                               << "but no constant file is given";
+    int fd = open(const_path.c_str(), O_RDONLY);
+    CHECK_GE(fd, 0) << "Failed to open the constant file " << const_path;
+    struct stat st;
+    CHECK_EQ(fstat(fd, &st), 0) << "Failed to stat the constant file " << const_path;
+    size_t file_size = st.st_size;
+    std::shared_ptr<MappedConstantFile> file;
+    if (file_size > 0) {
+      // A private writable mapping shares the clean pages in the page cache among processes,
+      // while a kernel writing a constant in place only copies the page it writes.
+      void* addr = mmap(nullptr, file_size, PROT_READ | PROT_WRITE, MAP_PRIVATE, fd, 0);
+      CHECK(addr != MAP_FAILED) << "Failed to map the constant file " << const_path << ": "
+                                << strerror(errno);
+      file = std::make_shared<MappedConstantFile>(addr, file_size);
+    }
+    close(fd);
+    for (size_t i = 0; i < static_cast<size_t>(sz); i++) {
+      constants.push_back(LoadExternalValue(strm, file, file_size));
+    }
+    uint64_t expected_size;
+    STREAM_CHECK(strm->Read(&expected_size, sizeof(expected_size)), "constant");
+    CHECK_EQ(expected_size, file_size) << "The constant file " << const_path
+                                       << " does not match the executable";
+    return;
+  }
   size_t size = static_cast<size_t>(sz);
   // Load each of the constants.
   for (size_t i = 0; i < size; i++) {
@@ -720,15 +928,18 @@ Instruction DeserializeInstruction(const VMInstructionSerializer& instr) {
       return Instruction::Goto(instr.fields[0]);
     }
     case Opcode::InvokeJit: {
-      // Number of fields = 3 + instr.arity
+      // Number of fields = 4 + instr.arity. Executables serialized before the static flag
+      // was introduced have 3 + instr.arity fields, and are treated as dynamic.
       DCHECK_GE(instr.fields.size(), 3U);
-      DCHECK_EQ(instr.fields.size(), 3U + static_cast<size_t>(instr.fields[1]));
+      size_t num_fields = 3U + static_cast<size_t>(instr.fields[1]);
+      DCHECK(instr.fields.size() == num_fields || instr.fields.size() == num_fields + 1);
 
       RegName op_reg = instr.fields[0];
       Index arity = instr.fields[1];
       Index output_size = instr.fields[2];
       std::vector<RegName> args = ExtractFields(instr.fields, 3, arity);
-      return Instruction::InvokeJit(op_reg, arity, output_size, args);
+      bool is_static = instr.fields.size() > num_fields && instr.fields[num_fields];
+      return Instruction::InvokeJit(op_reg, arity, output_size, args, is_static);
     }
     case Opcode::InferType: {
       // Number of fields = 3 + instr.num_args
@@ -798,6 +1009,38 @@ void Executable::LoadCodeSection(dmlc::Stream* strm) {
   }
 }
 
+void Executable::LoadKernelSection(dmlc::Stream* strm) {
+  std::vector<std::string> cache_names, keys, func_names;
+  if (!strm->Read(&cache_names)) {
+    // The executable has no packaged kernel.
+    return;
+  }
+  STREAM_CHECK(strm->Read(&keys), "kernel");
+  STREAM_CHECK(strm->Read(&func_names), "kernel");
+  STREAM_CHECK(cache_names.size() == keys.size() && keys.size() == func_names.size(), "kernel");
+  for (size_t i = 0; i < cache_names.size(); ++i) {
+    this->kernels.emplace_back(cache_names[i], keys[i], func_names[i]);
+  }
+  if (kernels.empty()) {
+    return;
+  }
+  if (!lib.defined()) {
+    LOG(WARNING) << "The executable has " << kernels.size()
+                 << " packaged kernels but no library is given. They will be built by JIT.";
+    return;
+  }
+  static auto f_preload = registry::GetPackedFunc("raf.cache.PreloadTVMKernels");
+  Array<String> cache_name_arr, key_arr, func_name_arr;
+  for (size_t i = 0; i < cache_names.size(); ++i) {
+    cache_name_arr.push_back(cache_names[i]);
+    key_arr.push_back(keys[i]);
+    func_name_arr.push_back(func_names[i]);
+  }
+  this->num_preloaded_kernels = f_preload(cache_name_arr, key_arr, lib, func_name_arr);
+  DLOG(INFO) << "Loaded " << num_preloaded_kernels << " out of " << kernels.size()
+             << " packaged kernels";
+}
+
 RAF_REGISTER_GLOBAL("raf.vm.GetNumOfGlobals").set_body([](TVMArgs args, TVMRetValue* rv) {
   tvm::runtime::Module mod = args[0];
   const auto* exec = dynamic_cast<Executable*>(mod.operator->());
@@ -844,8 +1087,8 @@ RAF_REGISTER_GLOBAL("raf.vm.GetPrimitiveFields").set_body([](TVMArgs args, TVMRe
 });
 
 RAF_REGISTER_GLOBAL("raf.vm.Load_Executable")
-    .set_body_typed([](std::string code, tvm::runtime::Module lib) {
-      return Executable::Load(code, lib);
+    .set_body_typed([](std::string code, tvm::runtime::Module lib, std::string const_path) {
+      return Executable::Load(code, lib, const_path);
     });
 
 }  // namespace vm
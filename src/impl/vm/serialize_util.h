@@ -25,6 +25,12 @@ namespace vm {
 /*! \brief The magic number for the serialized VM bytecode file  */
 constexpr uint64_t kMetaVMBytecodeMagic = 0xD225DE2F4214151D;
 
+/*! \brief The magic number that starts a constant section whose tensor data is external. */
+constexpr uint64_t kExternalConstantMagic = 0xC0A57F11E5EC7104;
+
+/*! \brief The alignment of the tensors in the constant file, which is the page size. */
+constexpr uint64_t kConstantFileAlignment = 4096;
+
 template <typename T>
 static inline size_t VectorHash(size_t key, const std::vector<T>& values) {
   for (const auto& it : values) {
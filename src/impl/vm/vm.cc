@@ -14,11 +14,15 @@
 #include <tvm/runtime/device_api.h>
 
 #include <algorithm>
+#include <atomic>
 #include <chrono>
 #include <iostream>
 #include <memory>
 #include <mutex>
+#include <sstream>
 #include <stdexcept>
+#include <thread>
+#include <unordered_set>
 #include <vector>
 
 #include "raf/communicator.h"
@@ -34,10 +38,12 @@
 #include "raf/device_api.h"
 #include "raf/profiler.h"
 #include "raf/memory_profiler.h"
+#include "raf/op_stats.h"
 #include "raf/stream_pool.h"
 #include "../../requests.h"
 #include "../../op/ty/utils.h"
 #include "../../common/shape_utils.h"
+#include "./cpu_stream.h"
 
 #include "raf/device_api.h"
 #include "raf/registry.h"
@@ -78,6 +84,35 @@ inline std::shared_ptr<Event> GetEventById(const VMContext& ctx, Index device_id
   return ctx->events[device_id][event_id];
 }
 
+/*!
+ * \brief Whether an instruction has to wait for the kernels launched on the CPU streams. Only
+ * the instructions that neither read tensor data nor leave the current frame can be issued while
+ * the kernels are running.
+ */
+inline bool NeedsCpuStreamSync(const VMContext& ctx, const Instruction& instr) {
+  switch (instr.op) {
+    case Opcode::Move:
+    case Opcode::LoadConst:
+    case Opcode::LoadConsti:
+    case Opcode::GetField:
+    case Opcode::Goto:
+    case Opcode::AllocTensor:
+    case Opcode::AllocTuple:
+    case Opcode::Free:
+    case Opcode::InvokeJit:
+    case Opcode::CudaSetStream:
+    case Opcode::CudaAddEvent:
+    case Opcode::CudaWaitEvent:
+    case Opcode::CudaStreamBarrier:
+      return false;
+    case Opcode::AllocStorage:
+      // The allocation size may be computed by a kernel.
+      return !ctx.IsConst(instr.alloc_storage.allocation_size);
+    default:
+      return true;
+  }
+}
+
 inline std::shared_ptr<Stream> GetStreamById(const VMContext& ctx, Index device_id,
                                              Index stream_id) {
   if (device_id >= ctx->streams.size()) {
@@ -139,6 +174,115 @@ void TensorRepr(std::ostringstream& os, const TensorValueObj* tensor) {
   }
   os << ">";
 }
+
+/*!
+ * \brief Get the human readable OpEnv cache key of an InvokeJit instruction, which includes the
+ * shapes and dtypes of all non-constant inputs and outputs. This is used by the profiler.
+ */
+std::string OpEnvCacheKeyRepr(const VMContext& ctx, const Instruction& instr) {
+  Index num_inputs = instr.invoke_jit.arity - instr.invoke_jit.output_size;
+  std::ostringstream os;
+  for (Index i = 0; i < num_inputs; i++) {
+    Index reg_idx = instr.invoke_jit.args[i];
+    if (ctx.IsConst(reg_idx)) {
+      // Skip constants in the key
+      continue;
+    }
+    auto reg = ctx.ReadRegister(reg_idx);
+    if (auto tensor = reg.as<TensorValueObj>()) {
+      TensorRepr(os, tensor);
+    } else if (auto tup = reg.as<TupleValueObj>()) {
+      os << "(";
+      for (auto field : tup->fields) {
+        auto t = field.as<TensorValueObj>();
+        if (t != nullptr) {
+          TensorRepr(os, t);
+        }
+        os << ",";
+      }
+      os << ")";
+    }
+    os << ",";
+  }
+  os << "|";
+  if (instr.invoke_jit.output_size == 1) {
+    TensorRepr(os, ctx.ReadRegister(instr.invoke_jit.args[num_inputs]).as<TensorValueObj>());
+  } else {
+    os << "(";
+    for (Index i = num_inputs; i < instr.invoke_jit.arity; i++) {
+      TensorRepr(os, ctx.ReadRegister(instr.invoke_jit.args[i]).as<TensorValueObj>());
+      os << ",";
+    }
+    os << ")";
+  }
+  return os.str();
+}
+
+inline void AppendKey(std::string* key, int64_t value) {
+  key->append(reinterpret_cast<const char*>(&value), sizeof(value));
+}
+
+inline void TensorKey(std::string* key, const TensorValueObj* tensor) {
+  const DLTensor* t = tensor->tensor.operator->();
+  AppendKey(key, t->ndim);
+  key->append(reinterpret_cast<const char*>(t->shape), t->ndim * sizeof(int64_t));
+  AppendKey(key, (static_cast<int64_t>(t->dtype.code) << 24) |
+                     (static_cast<int64_t>(t->dtype.bits) << 16) |
+                     static_cast<int64_t>(t->dtype.lanes));
+}
+
+/*!
+ * \brief Get the OpEnv cache key of an InvokeJit instruction. It covers the same information as
+ * OpEnvCacheKeyRepr in a compact binary form. The key is written to a buffer that is reused
+ * across calls, so it does not allocate memory once the buffer is large enough.
+ * \param ctx The VM context.
+ * \param instr The InvokeJit instruction.
+ * \param key The buffer to write the key.
+ */
+void OpEnvCacheKey(const VMContext& ctx, const Instruction& instr, std::string* key) {
+  // Separators to distinguish e.g. a tuple of two tensors from two tensors. They do not collide
+  // with the ndim of a tensor, which starts every tensor in the key.
+  constexpr int64_t kTupleBegin = -1;
+  constexpr int64_t kTupleEnd = -2;
+  constexpr int64_t kOutputBegin = -3;
+  Index num_inputs = instr.invoke_jit.arity - instr.invoke_jit.output_size;
+  key->clear();
+  for (Index i = 0; i < num_inputs; i++) {
+    Index reg_idx = instr.invoke_jit.args[i];
+    if (ctx.IsConst(reg_idx)) {
+      // Skip constants in the key
+      continue;
+    }
+    const auto& reg = ctx.ReadRegister(reg_idx);
+    if (auto tensor = reg.as<TensorValueObj>()) {
+      TensorKey(key, tensor);
+    } else if (auto tup = reg.as<TupleValueObj>()) {
+      AppendKey(key, kTupleBegin);
+      for (const auto& field : tup->fields) {
+        auto t = field.as<TensorValueObj>();
+        if (t != nullptr) {
+          TensorKey(key, t);
+        }
+      }
+      AppendKey(key, kTupleEnd);
+    } else {
+      LOG(FATAL) << "Unsupported non-const register type: " << reg->GetTypeKey();
+    }
+  }
+  AppendKey(key, kOutputBegin);
+  for (Index i = num_inputs; i < instr.invoke_jit.arity; i++) {
+    TensorKey(key, ctx.ReadRegister(instr.invoke_jit.args[i]).as<TensorValueObj>());
+  }
+}
+
+/*! \brief Get the op name or the function text of a callee for error messages. */
+std::string CalleeName(const Value& callee) {
+  if (const auto* op = callee.as<OpValueObj>()) {
+    return op->op->name;
+  }
+  return PrettyPrint(Downcast<ClosureValue>(callee)->func);
+}
+
 }  // namespace utils
 
 RAF_REGISTER_OBJECT_REFLECT(VMContextObj);
@@ -241,9 +385,20 @@ std::shared_ptr<OpEnvCache> VMFuncOpEnvCache::Get(Index pc) {
   return cache;
 }
 
+OpEnvPtr VMFuncOpEnvCache::GetStatic(Index pc) const {
+  return std::atomic_load(&static_op_envs_[pc]);
+}
+
+void VMFuncOpEnvCache::SetStatic(Index pc, OpEnvPtr op_env) {
+  std::atomic_store(&static_op_envs_[pc], std::move(op_env));
+}
+
 void VMFuncOpEnvCache::Clear() {
   std::lock_guard<std::mutex> lock(mu_);
   cache_map_.clear();
+  for (auto& op_env : static_op_envs_) {
+    std::atomic_store(&op_env, OpEnvPtr(nullptr));
+  }
 }
 
 #ifdef RAF_USE_CUDA
@@ -312,6 +467,12 @@ PackedFunc VirtualMachine::GetFunction(const std::string& name,
       int repeat = args[3];
       *rv = Profile(ctx, warmup, number, repeat);
     });
+  } else if (name == "warmup") {
+    return PackedFunc([sptr_to_self, this](registry::TVMArgs args, registry::TVMRetValue* rv) {
+      VMContext ctx = args[0];
+      int num_threads = args[1];
+      *rv = Warmup(ctx, num_threads);
+    });
   } else if (name == "set_devices") {
     return PackedFunc([sptr_to_self, this](registry::TVMArgs args, registry::TVMRetValue* rv) {
       std::vector<Device> devices;
@@ -321,6 +482,15 @@ PackedFunc VirtualMachine::GetFunction(const std::string& name,
       }
       this->SetDevices(devices);
     });
+  } else if (name == "reset_context") {
+    return PackedFunc([sptr_to_self, this](registry::TVMArgs args, registry::TVMRetValue* rv) {
+      VMContext ctx = args[0];
+      std::vector<Value> inputs(args.size() - 1);
+      for (size_t i = 1; i < args.size(); ++i) {
+        inputs[i - 1] = args[i];
+      }
+      ResetVMContext(ctx, inputs);
+    });
   } else if (name == "prepare_context") {
     return PackedFunc([sptr_to_self, this](registry::TVMArgs args, registry::TVMRetValue* rv) {
       CHECK(exec_) << "The executable is not loaded yet.";
@@ -341,7 +511,8 @@ void VirtualMachine::LoadExecutable(const Executable* exec) {
   CHECK(exec) << "The executable is not created yet.";
   exec_ = exec;
   for (int i = 0; i < exec_->functions.size(); ++i) {
-    op_env_cache_.push_back(std::make_shared<VMFuncOpEnvCache>());
+    op_env_cache_.push_back(
+        std::make_shared<VMFuncOpEnvCache>(exec_->functions[i].instructions.size()));
   }
 
   tvm::runtime::Module lib = exec_->lib;
@@ -412,6 +583,25 @@ VMContext VirtualMachine::PrepareVMContext(const std::string& func_name,
   return ctx;
 }
 
+void VirtualMachine::ResetVMContext(VMContext ctx, const std::vector<Value>& inputs) {
+  CHECK(!enable_cuda_graph_) << "Cannot reset the VM context in CUDA graph mode";
+  if (!inputs.empty()) {
+    CHECK_EQ(inputs.size(), ctx->inputs.size())
+        << "The number of inputs doesn't match the number of parameters for function "
+        << exec_->functions[ctx->entry_func_index].name;
+    Device dev = devices_[0];
+    for (size_t i = 0; i < inputs.size(); ++i) {
+      ctx->inputs[i] = CopyTo(inputs[i], dev);
+    }
+  }
+  // The frames may be left by a failed run.
+  ctx->frames.clear();
+  ctx->func_index = -1;
+  ctx->pc = 0;
+  ctx->return_register = Value();
+  ctx->reuse_storage = true;
+}
+
 Value VirtualMachine::Run(VMContext ctx) {
   auto frun = [&]() {
     // ctx->pc will be reset to 0 in the PushFrame
@@ -437,6 +627,22 @@ Value VirtualMachine::Run(VMContext ctx) {
     return ctx->return_register;
   }
 #endif
+  if (cpu_stream_pool_) {
+    // The CPU streams are shared by all contexts, so the runs are serialized.
+    std::lock_guard<std::mutex> lock(cpu_stream_pool_->GetMutex());
+    try {
+      frun();
+    } catch (...) {
+      // Wait for the launched kernels, which may still access the registers of this context.
+      try {
+        cpu_stream_pool_->Synchronize();
+      } catch (...) {
+      }
+      throw;
+    }
+    cpu_stream_pool_->Synchronize();
+    return ctx->return_register;
+  }
   frun();
   if (ctx->current_stream_id != 0) {
     // reset the working stream to default stream.
@@ -494,6 +700,18 @@ void VirtualMachine::SetDevices(const std::vector<Device>& devices) {
   if (!use_cuda_) {
     enable_cuda_graph_ = false;
   }
+  cpu_stream_pool_ = nullptr;
+  if (!use_cuda_ && exec_ != nullptr) {
+    for (const auto& func : exec_->functions) {
+      bool has_stream = std::any_of(
+          func.instructions.begin(), func.instructions.end(),
+          [](const Instruction& instr) { return instr.op == Opcode::CudaSetStream; });
+      if (has_stream) {
+        cpu_stream_pool_ = std::make_shared<CpuStreamPool>();
+        break;
+      }
+    }
+  }
 }
 
 inline std::shared_ptr<Memory> VirtualMachine::Alloc(const VMContext& ctx, Device dev,
@@ -531,6 +749,10 @@ void VirtualMachine::RunLoop(VMContext& ctx) {
   while (true) {
   main_loop:
     auto const& instr = ctx->code[ctx->pc];
+    if (cpu_stream_pool_ && utils::NeedsCpuStreamSync(ctx, instr)) {
+      // The instruction may access the data produced by the kernels in flight.
+      cpu_stream_pool_->Synchronize();
+    }
     switch (instr.op) {
       case Opcode::Move: {
         WITH_BASE_PROFILER_LEVEL(2, host_device_, "Move", "VMInstruction", {},
@@ -715,7 +937,21 @@ void VirtualMachine::HandleAllocStorage(VMContext& ctx, const Instruction& instr
              << " alloc_async=" << alloc_async;
 
   auto dev = Device(instr.alloc_storage.device_type, instr.alloc_storage.device_id);
-  auto buffer = Alloc(ctx, dev, size, alignment, alloc_async);
+  std::shared_ptr<Memory> buffer;
+  if (ctx->reuse_storage && !IsDryrun(ctx) && dev.device_type() == DevType::kCPU()) {
+    uint64_t key = (static_cast<uint64_t>(ctx->func_index) << 32) | static_cast<uint32_t>(ctx->pc);
+    auto& cached = ctx->storage_cache[key];
+    // The buffer cannot be reused if a tensor of the previous runs (e.g., an output) is alive.
+    if (cached.buffer != nullptr && cached.buffer.use_count() == 1 && cached.nbytes == size &&
+        cached.alignment == alignment) {
+      buffer = cached.buffer;
+    } else {
+      buffer = Alloc(ctx, dev, size, alignment, alloc_async);
+      cached = {size, alignment, buffer};
+    }
+  } else {
+    buffer = Alloc(ctx, dev, size, alignment, alloc_async);
+  }
   auto storage = StorageValue::make(buffer);
   ctx.WriteRegister(instr.dst, storage);
   ctx->pc++;
@@ -733,8 +969,9 @@ void VirtualMachine::HandleAllocTensor(VMContext& ctx, const Instruction& instr)
   if (instr.alloc_tensor.own) {
     mem = storage->buffer;
   }
+  auto data = static_cast<char*>(storage->buffer->data) + instr.alloc_tensor.offset;
   auto tensor = TensorValue::Assemble(storage->buffer->device, instr.alloc_tensor.dtype, shape, {},
-                                      storage->buffer->data, mem);
+                                      data, mem);
   ctx.WriteRegister(instr.dst, tensor);
   ctx->pc++;
 }
@@ -753,8 +990,9 @@ void VirtualMachine::HandleAllocTensorReg(VMContext& ctx, const Instruction& ins
   if (instr.alloc_tensor_reg.own) {
     mem = storage->buffer;
   }
+  auto data = static_cast<char*>(storage->buffer->data) + instr.alloc_tensor_reg.offset;
   auto tensor = TensorValue::Assemble(storage->buffer->device, instr.alloc_tensor_reg.dtype, shape,
-                                      {}, storage->buffer->data, mem);
+                                      {}, data, mem);
   ctx.WriteRegister(instr.dst, tensor);
   ctx->pc++;
 }
@@ -781,14 +1019,19 @@ void VirtualMachine::HandleAllocClosure(VMContext& ctx, const Instruction& instr
 void VirtualMachine::HandleFree(VMContext& ctx, const Instruction& instr) {
   RegName reg = instr.free.memory;
   auto reg_val = ctx.ReadRegister(reg);
+  std::shared_ptr<Memory> memory;
   if (reg_val->IsInstance<StorageValueObj>()) {
     auto storage_val = Downcast<StorageValue>(reg_val);
-    storage_val->buffer.reset();
+    memory = std::move(storage_val->buffer);
   } else {
     CHECK(reg_val->IsInstance<TensorValueObj>())
         << "Expected StorageValue or TensorValue, but got " << reg_val->GetTypeKey();
     auto tensor_val = Downcast<TensorValue>(reg_val);
-    tensor_val->mem.reset();
+    memory = std::move(tensor_val->mem);
+  }
+  if (cpu_stream_pool_) {
+    // The kernels in flight may still use the memory.
+    cpu_stream_pool_->DeferRelease(std::move(memory));
   }
   ctx->pc++;
 }
@@ -817,21 +1060,71 @@ void VirtualMachine::HandleInvokeJit(VMContext& ctx, const Instruction& instr) {
   OpEnvPtr op_env;
   std::vector<Value> inputs;
   Value output;
-  std::string op_env_cache_key;
 
-  std::tie(op_env, inputs, output, op_env_cache_key) = PrepareOpEnv(ctx, instr);
-  if (!dryrun_) {  // Skip the execution in dryrun mode
+  std::tie(op_env, inputs, output) = PrepareOpEnv(ctx, instr);
+  if (op_env == nullptr) {
+    // The op is to be dispatched by Warmup.
+    ctx->pc++;
+    return;
+  }
+  std::shared_ptr<Requests> requests = op_env->GetRequests();
+  bool op_stats = profiler::OpStats::Get()->IsEnabled();
+  if (cpu_stream_pool_) {
+    // Launch the kernel on the current CPU stream. The task holds the inputs, the output and the
+    // workspace, so that they are alive until the kernel is finished.
+    std::vector<std::shared_ptr<Memory>> workspace;
+    for (auto& entry : requests->workspace) {
+      if (entry.nbytes > 0 && entry.memory != nullptr) {
+        workspace.push_back(std::move(entry.memory));
+      }
+    }
+    if (!IsDryrun(ctx)) {
+      // The latency is measured in the task, as the kernel runs asynchronously.
+      int stats_id = op_stats ? GetOpStatsId(ctx, instr, op_env, output) : -1;
+      cpu_stream_pool_->GetStream(ctx->current_stream_id)
+          ->Push([op_env, inputs = std::move(inputs), output = std::move(output),
+                  workspace = std::move(workspace), stats_id]() {
+            if (stats_id < 0) {
+              op_env->Execute(inputs, output);
+              return;
+            }
+            auto start = std::chrono::steady_clock::now();
+            op_env->Execute(inputs, output);
+            auto end = std::chrono::steady_clock::now();
+            profiler::OpStats::Get()->Record(
+                stats_id,
+                std::chrono::duration_cast<std::chrono::nanoseconds>(end - start).count());
+          });
+    }
+    PROFILE_MEMORY(devices_[0], op_env->name());
+    ctx->pc++;
+    return;
+  }
+  if (!IsDryrun(ctx) && op_stats) {
+    // Only aggregate the latency, which is much cheaper than a trace event.
+    int stats_id = GetOpStatsId(ctx, instr, op_env, output);
+    auto dev_api = DeviceAPI::Get(devices_[0].device_type());
+    dev_api->WaitDevice(devices_[0]);
+    auto start = std::chrono::steady_clock::now();
+    op_env->Execute(inputs, output);
+    dev_api->WaitDevice(devices_[0]);
+    auto end = std::chrono::steady_clock::now();
+    profiler::OpStats::Get()->Record(
+        stats_id, std::chrono::duration_cast<std::chrono::nanoseconds>(end - start).count());
+  } else if (!IsDryrun(ctx)) {  // Skip the execution in dryrun mode
 #ifdef RAF_USE_CUDA
     if (use_cuda_) {
       WITH_CUDA_PROFILER(
           devices_[0],
           utils::GetStreamById(ctx, ctx->current_device_id, ctx->current_stream_id)->data(),
-          op_env->name(), utils::GetStreamName(ctx->current_stream_id), {op_env_cache_key},
+          op_env->name(), utils::GetStreamName(ctx->current_stream_id),
+          {utils::OpEnvCacheKeyRepr(ctx, instr)},
           { op_env->Execute(inputs, output); });
     } else
 #endif
     {  // cpu
-      WITH_BASE_PROFILER(devices_[0], op_env->name(), "ComputationOperator", {op_env_cache_key},
+      WITH_BASE_PROFILER(devices_[0], op_env->name(), "ComputationOperator",
+                         {utils::OpEnvCacheKeyRepr(ctx, instr)},
                          { op_env->Execute(inputs, output); });
     }
   }
@@ -841,7 +1134,6 @@ void VirtualMachine::HandleInvokeJit(VMContext& ctx, const Instruction& instr) {
   // TODO(yaoyaoding): It seems that we can not release the workspace once we launched the
   //   kernel. Because the kernel may be in the executing status at this point due to
   //   asynchronous execution. This would cause problem for multi-stream execution.
-  std::shared_ptr<Requests> requests = op_env->GetRequests();
   for (size_t i = 0; i < requests->workspace.size(); ++i) {
     Requests::WorkspaceRequest& entry = requests->workspace[i];
     if (entry.nbytes > 0 && entry.memory != nullptr) {
@@ -935,6 +1227,13 @@ void VirtualMachine::HandleInferType(VMContext& ctx, const Instruction& instr) {
 void VirtualMachine::HandleCudaSetStream(VMContext& ctx, const Instruction& instr) {
   Index device_id = instr.cuda_set_stream.device_id;
   Index stream_id = instr.cuda_set_stream.stream_id;
+  if (cpu_stream_pool_) {
+    // The following kernels will be launched on the CPU stream.
+    ctx->current_device_id = device_id;
+    ctx->current_stream_id = stream_id;
+    ctx->pc++;
+    return;
+  }
   Device device(DevType::kCUDA(), static_cast<int>(device_id));
   auto stream = utils::GetStreamById(ctx, device_id, stream_id);
   OpEnv::SetStreamForAllBackends(device, stream->data());
@@ -950,6 +1249,13 @@ void VirtualMachine::HandleCudaAddEvent(VMContext& ctx, const Instruction& instr
     stream_id = ctx->current_stream_id;
   }
   Index event_id = instr.cuda_event.event_id;
+  if (cpu_stream_pool_) {
+    CpuEvent* event = cpu_stream_pool_->GetEvent(event_id);
+    uint64_t seq = event->Record();
+    cpu_stream_pool_->GetStream(stream_id)->Push([event, seq]() { event->Signal(seq); });
+    ctx->pc++;
+    return;
+  }
   auto event = utils::GetEventById(ctx, device_id, event_id);
   auto stream = utils::GetStreamById(ctx, device_id, stream_id);
   auto api = DeviceAPI::Get(DevType::kCUDA());
@@ -965,6 +1271,15 @@ void VirtualMachine::HandleCudaWaitEvent(VMContext& ctx, const Instruction& inst
     stream_id = ctx->current_stream_id;
   }
   Index event_id = instr.cuda_event.event_id;
+  if (cpu_stream_pool_) {
+    CpuEvent* event = cpu_stream_pool_->GetEvent(event_id);
+    uint64_t seq = event->Recorded();
+    if (seq > 0) {
+      cpu_stream_pool_->GetStream(stream_id)->Push([event, seq]() { event->Wait(seq); });
+    }
+    ctx->pc++;
+    return;
+  }
   auto event = utils::GetEventById(ctx, device_id, event_id);
   auto stream = utils::GetStreamById(ctx, device_id, stream_id);
   auto api = DeviceAPI::Get(DevType::kCUDA());
@@ -973,6 +1288,12 @@ void VirtualMachine::HandleCudaWaitEvent(VMContext& ctx, const Instruction& inst
 }
 
 void VirtualMachine::HandleCudaStreamBarrier(VMContext& ctx, const Instruction& instr) {
+  if (cpu_stream_pool_) {
+    // Wait for the kernels on all CPU streams, so the following kernels are launched after them.
+    cpu_stream_pool_->Synchronize();
+    ctx->pc++;
+    return;
+  }
   if (ctx->current_barrier_event_index >= ctx->barrier_events.size()) {
     Device device(DevType::kCUDA(), static_cast<int>(ctx->current_device_id));
     ctx->barrier_events.resize(ctx->current_barrier_event_index + 1);
@@ -995,106 +1316,68 @@ void VirtualMachine::HandleCudaStreamBarrier(VMContext& ctx, const Instruction&
   ctx->pc++;
 }
 
-std::tuple<std::shared_ptr<OpEnv>, std::vector<Value>, Value, std::string>
-VirtualMachine::PrepareOpEnv(const VMContext& ctx, const Instruction& instr) {
+std::tuple<std::shared_ptr<OpEnv>, std::vector<Value>, Value> VirtualMachine::PrepareOpEnv(
+    const VMContext& ctx, const Instruction& instr) {
   Index num_inputs = instr.invoke_jit.arity - instr.invoke_jit.output_size;
-  Array<Value> args;
-  Value output;
-
-  // extract the input args and prepare the hash key to query op env
-  std::ostringstream os;
-  for (Index i = 0; i < num_inputs; i++) {
-    Index reg_idx = instr.invoke_jit.args[i];
-    auto reg = ctx.ReadRegister(reg_idx);
-    args.push_back(reg);
-    if (ctx.IsConst(reg_idx)) {
-      // Skip constatnts in the hash key
-      continue;
-    }
-    if (auto tensor = reg.as<TensorValueObj>()) {
-      utils::TensorRepr(os, tensor);
-    } else if (auto tup = reg.as<TupleValueObj>()) {
-      os << "(";
-      for (auto field : tup->fields) {
-        auto t = field.as<TensorValueObj>();
-        if (t != nullptr) {
-          utils::TensorRepr(os, t);
-        }
-        os << ",";
-      }
-      os << ")";
-    } else {
-      LOG(FATAL) << "Unsupported non-const register type: " << reg->GetTypeKey();
-    }
-    os << ",";
-  }
 
   // extract the output
-  os << "|";
+  Value output;
   if (instr.invoke_jit.output_size == 1) {
     output = ctx.ReadRegister(instr.invoke_jit.args[num_inputs]);
-    utils::TensorRepr(os, output.as<TensorValueObj>());
   } else {
-    os << "(";
     Array<Value> outs;
     for (Index i = num_inputs; i < instr.invoke_jit.arity; i++) {
-      Value val = ctx.ReadRegister(instr.invoke_jit.args[i]);
-      outs.push_back(val);
-      utils::TensorRepr(os, val.as<TensorValueObj>());
-      os << ",";
+      outs.push_back(ctx.ReadRegister(instr.invoke_jit.args[i]));
     }
-    os << ")";
     output = TupleValue::make(outs);
   }
-  std::string op_env_cache_key = os.str();
 
-  // check the OpEnv cache
+  // check the OpEnv cache. The OpEnv of a static instruction is bound to its pc once, so
+  // there is no need to compute the cache key; otherwise the key encodes the shapes and dtypes
+  // of the arguments.
+  const auto& func_op_env_cache = op_env_cache_[ctx->func_index];
   std::shared_ptr<OpEnv> op_env;
-  auto op_env_cache = op_env_cache_[ctx->func_index]->Get(ctx->pc);
-  if (auto p = op_env_cache->Get(op_env_cache_key)) {
-    // Cache hit. Reuse the OpEnv from the cache.
-    op_env = *p;
+  std::shared_ptr<OpEnvCache> op_env_cache;
+  std::string op_env_cache_key;
+  if (instr.invoke_jit.is_static) {
+    op_env = func_op_env_cache->GetStatic(ctx->pc);
   } else {
-    // Create a new OpEnv.
-    auto call_values = CallValues::make();
-    Value callee = ctx.ReadRegister(instr.invoke_jit.op_reg);
-    const auto* op = callee.as<OpValueObj>();
-    const auto* closure = callee.as<ClosureValueObj>();
-    call_values->callee = callee;
-    if (op) {
-      call_values->args = GetOpAttr<FRAFSchema>(op->op, "FRAFSchema")(args);
+    // The full key is compared on lookup, so different shapes never share an OpEnv.
+    static thread_local std::string key_buffer;
+    utils::OpEnvCacheKey(ctx, instr, &key_buffer);
+    op_env_cache = func_op_env_cache->Get(ctx->pc);
+    if (auto p = op_env_cache->Get(key_buffer)) {
+      // Cache hit. Reuse the OpEnv from the cache.
+      op_env = *p;
     } else {
-      call_values->args = MakeListArgs(args);
+      op_env_cache_key = key_buffer;
     }
-    call_values->device = devices_[0];
-    call_values->out = output;
+  }
+
+  if (op_env == nullptr) {
+    if (ctx->warmup_tasks != nullptr) {
+      // Collect the op to be dispatched by the thread pool in Warmup.
+      ctx->warmup_tasks->push_back({ctx->func_index, ctx->pc, instr.invoke_jit.is_static,
+                                    op_env_cache_key, MakeCallValues(ctx, instr, output)});
+      return std::make_tuple(OpEnvPtr(), std::vector<Value>(), std::move(output));
+    }
+    // Create a new OpEnv.
+    auto call_values = MakeCallValues(ctx, instr, output);
     op_env = Dispatch(call_values);
     CHECK(op_env != nullptr) << "ValueError: Cannot dispatch "
-                             << (op ? op->op->name : PrettyPrint(closure->func)) << " @"
+                             << utils::CalleeName(call_values->callee) << " @"
                              << call_values->device.c_str();
-    std::shared_ptr<Requests> requests = op_env->GetRequests();
-    // prepare distributed requests
-    for (size_t i = 0; i < requests->distributed.size(); i++) {
-      Requests::DistributedRequest& entry = requests->distributed[i];
-      *entry.dest = (void*)(Communicator::Get(entry.name, entry.rank_list).as<CommunicatorObj>());
-    }
-#ifdef RAF_USE_CUDA
-    // prepare cuda stream requests
-    for (size_t i = 0; i < requests->stream.size(); i++) {
-      Requests::StreamRequest& entry = requests->stream[i];
-      // currently ignores the stream_idx field in requests, all requests with the same tag_idx will
-      // get the same cuda stream in vm
-      std::shared_ptr<Stream> stream =
-          utils::GetStreamById(ctx, entry.device.device_id(), entry.tag_idx);
-      *entry.dest = stream->data();
-      entry.stream = stream;
-    }
-#endif
-    // add to cache
-    op_env_cache->Set(op_env_cache_key, op_env);
+    CacheOpEnv(ctx, ctx->func_index, ctx->pc, instr.invoke_jit.is_static, op_env_cache_key,
+               op_env);
   }
 
   std::shared_ptr<Requests> requests = op_env->GetRequests();
+  if (!requests->workspace.empty()) {
+    // The workspace pointers are written into the OpEnv on every call, so the contexts running
+    // concurrently must not share an OpEnv that requests a workspace.
+    op_env = GetContextOpEnv(ctx, instr, op_env, output);
+    requests = op_env->GetRequests();
+  }
   for (size_t i = 0; i < requests->workspace.size(); i++) {
     Requests::WorkspaceRequest& entry = requests->workspace[i];
     auto buf = Alloc(ctx, entry.device, entry.nbytes);
@@ -1103,11 +1386,205 @@ VirtualMachine::PrepareOpEnv(const VMContext& ctx, const Instruction& instr) {
   }
 
   std::vector<Value> inputs;
+  inputs.reserve(op_env->arg_indices.size());
   for (int i : op_env->arg_indices) {
     CHECK_GE(i, 0) << "Invalid input index: " << i;
-    inputs.push_back(args[i]);
+    inputs.push_back(ctx.ReadRegister(instr.invoke_jit.args[i]));
+  }
+  return std::make_tuple(op_env, std::move(inputs), std::move(output));
+}
+
+CallValues VirtualMachine::MakeCallValues(const VMContext& ctx, const Instruction& instr,
+                                          const Value& output) {
+  Index num_inputs = instr.invoke_jit.arity - instr.invoke_jit.output_size;
+  Array<Value> args;
+  for (Index i = 0; i < num_inputs; i++) {
+    args.push_back(ctx.ReadRegister(instr.invoke_jit.args[i]));
+  }
+  auto call_values = CallValues::make();
+  Value callee = ctx.ReadRegister(instr.invoke_jit.op_reg);
+  const auto* op = callee.as<OpValueObj>();
+  call_values->callee = callee;
+  if (op) {
+    call_values->args = GetOpAttr<FRAFSchema>(op->op, "FRAFSchema")(args);
+  } else {
+    call_values->args = MakeListArgs(args);
+  }
+  call_values->device = devices_[0];
+  call_values->out = output;
+  return call_values;
+}
+
+OpEnvPtr VirtualMachine::GetContextOpEnv(const VMContext& ctx, const Instruction& instr,
+                                         const OpEnvPtr& op_env, const Value& output) {
+  auto it = ctx->context_op_envs.find(op_env.get());
+  if (it != ctx->context_op_envs.end() && !it->second.shared.expired()) {
+    return it->second.op_env;
+  }
+  // Dispatch the op again for this context. The new OpEnv is not put into the OpEnv cache.
+  auto call_values = MakeCallValues(ctx, instr, output);
+  OpEnvPtr ctx_op_env = Dispatch(call_values);
+  CHECK(ctx_op_env != nullptr) << "ValueError: Cannot dispatch "
+                               << utils::CalleeName(call_values->callee) << " @"
+                               << call_values->device.c_str();
+  FulfillRequests(ctx, ctx_op_env);
+  ctx->context_op_envs[op_env.get()] = {op_env, ctx_op_env};
+  return ctx_op_env;
+}
+
+void VirtualMachine::FulfillRequests(const VMContext& ctx, const OpEnvPtr& op_env) {
+  std::shared_ptr<Requests> requests = op_env->GetRequests();
+  // prepare distributed requests
+  for (size_t i = 0; i < requests->distributed.size(); i++) {
+    Requests::DistributedRequest& entry = requests->distributed[i];
+    *entry.dest = (void*)(Communicator::Get(entry.name, entry.rank_list).as<CommunicatorObj>());
+  }
+#ifdef RAF_USE_CUDA
+  // prepare cuda stream requests
+  for (size_t i = 0; i < requests->stream.size(); i++) {
+    Requests::StreamRequest& entry = requests->stream[i];
+    // currently ignores the stream_idx field in requests, all requests with the same tag_idx will
+    // get the same cuda stream in vm
+    std::shared_ptr<Stream> stream =
+        utils::GetStreamById(ctx, entry.device.device_id(), entry.tag_idx);
+    *entry.dest = stream->data();
+    entry.stream = stream;
+  }
+#endif
+}
+
+void VirtualMachine::CacheOpEnv(const VMContext& ctx, Index func_index, Index pc, bool is_static,
+                                const std::string& key, const OpEnvPtr& op_env) {
+  FulfillRequests(ctx, op_env);
+  // add to cache
+  const auto& func_op_env_cache = op_env_cache_[func_index];
+  OpEnvPtr cached = op_env;
+  if (is_static) {
+    func_op_env_cache->SetStatic(pc, op_env);
+  } else {
+    // Another context may have cached an OpEnv of the same key concurrently.
+    cached = *func_op_env_cache->Get(pc)->Add(key, op_env);
+  }
+  if (!op_env->GetRequests()->workspace.empty()) {
+    // The context that dispatched the op owns the OpEnv, so it does not dispatch the op again.
+    ctx->context_op_envs[cached.get()] = {cached, op_env};
+  }
+}
+
+int VirtualMachine::GetOpStatsId(VMContext& ctx, const Instruction& instr,
+                                 const OpEnvPtr& op_env, const Value& output) {
+  auto* stats = profiler::OpStats::Get();
+  uint64_t generation = stats->generation();
+  auto it = ctx->op_stats_ids.find(op_env.get());
+  if (it != ctx->op_stats_ids.end() && it->second.generation == generation &&
+      !it->second.op_env.expired()) {
+    return it->second.entry_id;
+  }
+  // The first invocation of this OpEnv. Only here the name and the shape key are materialized.
+  int64_t nbytes = 0;
+  auto add_bytes = [&nbytes](const Value& value) {
+    if (const auto* t = value.as<TensorValueObj>()) {
+      nbytes += common::shape_utils::BytesCompactTensor(*t->tensor.operator->());
+    }
+  };
+  if (const auto* tup = output.as<TupleValueObj>()) {
+    for (const auto& field : tup->fields) {
+      add_bytes(field);
+    }
+  } else {
+    add_bytes(output);
+  }
+  for (const auto& entry : op_env->GetRequests()->workspace) {
+    nbytes += entry.nbytes;
+  }
+  int entry_id = stats->Register(op_env->name(), utils::OpEnvCacheKeyRepr(ctx, instr), nbytes);
+  ctx->op_stats_ids[op_env.get()] = {op_env, entry_id, generation};
+  return entry_id;
+}
+
+int64_t VirtualMachine::Warmup(VMContext ctx, int num_threads) {
+  // The walk skips the ops, so the shapes computed by them at runtime would be garbage.
+  for (const auto& func : exec_->functions) {
+    for (const auto& instr : func.instructions) {
+      bool is_dynamic = instr.op == Opcode::InferType ||
+                        (instr.op == Opcode::InvokeJit && !instr.invoke_jit.is_static);
+      CHECK(!is_dynamic) << "ValueError: Warmup only supports the executables with static shapes, "
+                         << "but function " << func.name << " has dynamic shapes";
+    }
+  }
+  // Walk the function without executing the ops to collect the ops to be dispatched.
+  // The walk state is kept in the context, so the runs of other contexts are not affected.
+  std::vector<WarmupTask> collected;
+  ctx->warmup_tasks = &collected;
+  try {
+    Run(ctx);
+  } catch (...) {
+    ctx->warmup_tasks = nullptr;
+    throw;
+  }
+  ctx->warmup_tasks = nullptr;
+
+  // An instruction in a loop may be collected multiple times. The instructions of the same kernel,
+  // e.g., in repeated layers, may be dispatched concurrently, which is safe because the kernel
+  // caches keep the kernel added first.
+  std::vector<WarmupTask> tasks;
+  std::unordered_set<std::string> seen;
+  for (auto& task : collected) {
+    std::ostringstream os;
+    os << task.func_index << "/" << task.pc << "/" << task.key;
+    if (seen.insert(os.str()).second) {
+      tasks.push_back(std::move(task));
+    }
+  }
+  if (tasks.empty()) {
+    return 0;
+  }
+
+  // Dispatch the ops concurrently. Each worker enters a copy of the current pass context, because
+  // the pass context is thread local and may be modified by the kernel builders.
+  if (num_threads <= 0) {
+    num_threads = std::max(1U, std::thread::hardware_concurrency());
+  }
+  num_threads = std::min<int>(num_threads, tasks.size());
+  pass::PassContext pass_ctx = pass::PassContext::Current();
+  std::vector<OpEnvPtr> op_envs(tasks.size());
+  std::vector<std::exception_ptr> errors(num_threads);
+  std::atomic<size_t> next_task{0};
+  auto worker = [&](int tid) {
+    try {
+      pass::PassContext local_ctx(
+          make_object<tvm::transform::PassContextNode>(*pass_ctx.operator->()));
+      tvm::With<pass::PassContext> scope(local_ctx);
+      for (size_t i = next_task++; i < tasks.size(); i = next_task++) {
+        op_envs[i] = Dispatch(tasks[i].call);
+      }
+    } catch (...) {
+      errors[tid] = std::current_exception();
+    }
+  };
+  std::vector<std::thread> threads;
+  for (int i = 1; i < num_threads; ++i) {
+    threads.emplace_back(worker, i);
+  }
+  worker(0);
+  for (auto& thread : threads) {
+    thread.join();
+  }
+  for (const auto& error : errors) {
+    if (error) {
+      std::rethrow_exception(error);
+    }
+  }
+
+  // Bind the OpEnvs in the VM thread.
+  for (size_t i = 0; i < tasks.size(); ++i) {
+    const auto& task = tasks[i];
+    CHECK(op_envs[i] != nullptr) << "ValueError: Cannot dispatch "
+                                 << utils::CalleeName(task.call->callee) << " @"
+                                 << task.call->device.c_str();
+    CacheOpEnv(ctx, task.func_index, task.pc, task.is_static, task.key, op_envs[i]);
   }
-  return std::make_tuple(op_env, std::move(inputs), std::move(output), op_env_cache_key);
+  return tasks.size();
 }
 
 tvm::runtime::Module CreateVirtualMachine(const Executable* exec, bool enable_cuda_graph,
@@ -85,9 +85,13 @@ void VMDebugger::HandleInvokeJit(VMContext& ctx, const Instruction& instr) {
   OpEnvPtr op_env;
   std::vector<Value> inputs;
   Value output;
-  std::string op_env_cache_key;
 
-  std::tie(op_env, inputs, output, op_env_cache_key) = PrepareOpEnv(ctx, instr);
+  std::tie(op_env, inputs, output) = PrepareOpEnv(ctx, instr);
+  if (op_env == nullptr) {
+    // The op is to be dispatched by Warmup.
+    ctx->pc++;
+    return;
+  }
   op_env->Execute(inputs, output);
   ctx->pc++;
 
@@ -0,0 +1,413 @@
+/*
+ * Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+ * SPDX-License-Identifier: Apache-2.0
+ */
+
+/*!
+ * \file src/memory_pool/caching_pool/caching_pool.cc
+ * \brief A caching memory pool with size-binned free lists, block splitting and coalescing.
+ */
+#include <array>
+#include <mutex>
+#include <set>
+#include <unordered_set>
+#include "raf/device_api.h"
+#include "raf/memory_pool.h"
+#include "raf/registry.h"
+
+namespace raf {
+namespace memory_pool {
+namespace caching_pool {
+
+using device_api::DeviceAPI;
+
+/*! \brief All block sizes and offsets are multiples of this value. */
+constexpr int64_t kBlockAlignment = 512;
+/*! \brief Requests up to this size are served from small segments. */
+constexpr int64_t kSmallRequest = 1 << 20;
+/*! \brief The size of a small segment. */
+constexpr int64_t kSmallSegment = 2 << 20;
+/*! \brief Large segments are rounded up to a multiple of this size. */
+constexpr int64_t kLargeSegmentUnit = 2 << 20;
+/*! \brief The alignment of segments allocated from the device. */
+constexpr int64_t kSegmentAlignment = 4096;
+/*! \brief The number of free lists. Free list i holds blocks of size [2^i, 2^(i+1)). */
+constexpr int kNumBins = 64;
+
+inline int64_t RoundUp(int64_t nbytes, int64_t unit) {
+  return (nbytes + unit - 1) / unit * unit;
+}
+
+/*!
+ * \brief A block of memory inside a segment. Blocks of the same segment form a doubly linked
+ * list ordered by address, so that adjacent free blocks can be coalesced. The first block of a
+ * segment always stays at the beginning of the segment and owns the device memory.
+ */
+struct Block {
+  Block(char* ptr, int64_t nbytes) : ptr(ptr), nbytes(nbytes) {
+  }
+  /*! \brief The start address. */
+  char* ptr;
+  /*! \brief The size in bytes. */
+  int64_t nbytes;
+  /*! \brief Whether the block is in use. */
+  bool allocated = false;
+  /*! \brief The previous block in the same segment. */
+  Block* prev = nullptr;
+  /*! \brief The next block in the same segment. */
+  Block* next = nullptr;
+};
+
+/*! \brief Order blocks by size then address, so lower_bound finds the best fit. */
+struct BlockComparator {
+  bool operator()(const Block* lhs, const Block* rhs) const {
+    if (lhs->nbytes != rhs->nbytes) {
+      return lhs->nbytes < rhs->nbytes;
+    }
+    return lhs->ptr < rhs->ptr;
+  }
+};
+
+/*!
+ * \brief The allocator state shared by the pool and all memory chunks allocated from it, so that
+ * the chunks can still be returned after the pool is removed from the device.
+ */
+class CachingAllocator {
+ public:
+  CachingAllocator(const Device& dev, int64_t pool_limit, int64_t release_threshold)
+      : device_(dev),
+        api_(DeviceAPI::Get(dev.device_type())),
+        max_pool_size_(pool_limit),
+        release_threshold_(release_threshold) {
+  }
+
+  ~CachingAllocator() {
+    for (Block* head : segments_) {
+      CHECK(head->next == nullptr && !head->allocated) << "Memory is still in use";
+      api_->FreeMemory(head->ptr);
+      delete head;
+    }
+  }
+
+  /*!
+   * \brief Allocate a block of at least nbytes whose address is a multiple of alignment.
+   * \param nbytes The requested bytes, which must be a multiple of kBlockAlignment.
+   * \param alignment The requested alignment.
+   * \return The allocated block.
+   */
+  Block* Alloc(int64_t nbytes, int64_t alignment) {
+    CHECK_EQ(alignment & (alignment - 1), 0) << "Alignment must be a power of 2";
+    // The worst-case padding to align the start address of a free block.
+    int64_t padding = alignment > kBlockAlignment ? alignment - kBlockAlignment : 0;
+
+    std::lock_guard<std::mutex> lock(mu_);
+    Block* block = FindFreeBlock(nbytes + padding);
+    if (block == nullptr) {
+      block = AllocSegment(nbytes + padding);
+    }
+    RemoveFreeBlock(block);
+
+    // Split the leading bytes for alignment and the trailing bytes as free blocks.
+    int64_t offset = RoundUp(reinterpret_cast<int64_t>(block->ptr), alignment) -
+                     reinterpret_cast<int64_t>(block->ptr);
+    if (offset > 0) {
+      Block* aligned = Split(block, offset);
+      InsertFreeBlock(block);
+      block = aligned;
+    }
+    if (block->nbytes - nbytes >= kBlockAlignment) {
+      InsertFreeBlock(Split(block, nbytes));
+    }
+    block->allocated = true;
+    allocated_bytes_ += block->nbytes;
+    return block;
+  }
+
+  /*! \brief Return a block to the pool and coalesce it with the adjacent free blocks. */
+  void Free(Block* block) {
+    std::lock_guard<std::mutex> lock(mu_);
+    CHECK(block->allocated);
+    block->allocated = false;
+    allocated_bytes_ -= block->nbytes;
+    if (block->next != nullptr && !block->next->allocated) {
+      RemoveFreeBlock(block->next);
+      Merge(block, block->next);
+    }
+    if (block->prev != nullptr && !block->prev->allocated) {
+      Block* prev = block->prev;
+      RemoveFreeBlock(prev);
+      Merge(prev, block);
+      block = prev;
+    }
+    InsertFreeBlock(block);
+    // Release the entire free segment back to the device if too much memory is cached.
+    if (release_threshold_ > 0 && block->prev == nullptr && block->next == nullptr &&
+        reserved_bytes_ - allocated_bytes_ > release_threshold_) {
+      ReleaseSegment(block);
+    }
+  }
+
+  /*! \brief Release all free segments to the device and return the released bytes. */
+  int64_t ReleaseFreeSegments() {
+    std::lock_guard<std::mutex> lock(mu_);
+    return ReleaseFreeSegmentsImpl();
+  }
+
+  /*! \brief Return (allocated bytes, reserved bytes). */
+  std::pair<int64_t, int64_t> GetPoolSize() {
+    std::lock_guard<std::mutex> lock(mu_);
+    return {allocated_bytes_, reserved_bytes_};
+  }
+
+ private:
+  inline static int BinIndex(int64_t nbytes) {
+    int idx = 0;
+    while ((nbytes >>= 1) > 0) {
+      ++idx;
+    }
+    return std::min(idx, kNumBins - 1);
+  }
+
+  inline void InsertFreeBlock(Block* block) {
+    free_bins_[BinIndex(block->nbytes)].insert(block);
+  }
+
+  inline void RemoveFreeBlock(Block* block) {
+    free_bins_[BinIndex(block->nbytes)].erase(block);
+  }
+
+  /*! \brief Find the smallest free block with at least nbytes. */
+  inline Block* FindFreeBlock(int64_t nbytes) {
+    Block key(nullptr, nbytes);
+    for (int idx = BinIndex(nbytes); idx < kNumBins; ++idx) {
+      auto it = free_bins_[idx].lower_bound(&key);
+      if (it != free_bins_[idx].end()) {
+        return *it;
+      }
+    }
+    return nullptr;
+  }
+
+  /*! \brief Split the block at offset. The block keeps the head part and the tail is returned. */
+  inline Block* Split(Block* block, int64_t offset) {
+    Block* tail = new Block(block->ptr + offset, block->nbytes - offset);
+    tail->prev = block;
+    tail->next = block->next;
+    if (block->next != nullptr) {
+      block->next->prev = tail;
+    }
+    block->next = tail;
+    block->nbytes = offset;
+    return tail;
+  }
+
+  /*! \brief Merge the next adjacent block into the block. */
+  inline void Merge(Block* block, Block* next) {
+    block->nbytes += next->nbytes;
+    block->next = next->next;
+    if (next->next != nullptr) {
+      next->next->prev = block;
+    }
+    delete next;
+  }
+
+  inline void* AllocDeviceMemory(int64_t nbytes) {
+    try {
+      return api_->AllocMemory(nbytes, kSegmentAlignment);
+    } catch (const std::exception& e) {
+      return nullptr;
+    }
+  }
+
+  /*! \brief Allocate a new segment from the device and insert it as a free block. */
+  inline Block* AllocSegment(int64_t nbytes) {
+    int64_t segment_bytes =
+        nbytes <= kSmallRequest ? kSmallSegment : RoundUp(nbytes, kLargeSegmentUnit);
+    void* data = nullptr;
+    if (max_pool_size_ == 0 || reserved_bytes_ + segment_bytes <= max_pool_size_) {
+      data = AllocDeviceMemory(segment_bytes);
+    }
+    if (data == nullptr) {
+      // Out of memory or exceed the user-specified limitation, release the cached segments.
+      int64_t free_nbytes = ReleaseFreeSegmentsImpl();
+      DLOG(WARNING) << "Failed to allocate " << segment_bytes / 1048576.0
+                    << " MBs. Released " << free_nbytes / 1048576.0 << " MBs of cached segments";
+      data = AllocDeviceMemory(segment_bytes);
+    }
+    if (data == nullptr) {
+      LOG(FATAL) << "Out-Of-Memory. Tried to allocate " << segment_bytes / 1048576.0
+                 << " MBs; Already reserved " << reserved_bytes_ / 1048576.0
+                 << " MBs and allocated " << allocated_bytes_ / 1048576.0 << " MBs";
+      throw;
+    }
+    reserved_bytes_ += segment_bytes;
+    Block* head = new Block(static_cast<char*>(data), segment_bytes);
+    segments_.insert(head);
+    InsertFreeBlock(head);
+    return head;
+  }
+
+  /*! \brief Release a free segment, which must be a single free block. */
+  inline void ReleaseSegment(Block* head) {
+    RemoveFreeBlock(head);
+    segments_.erase(head);
+    reserved_bytes_ -= head->nbytes;
+    api_->FreeMemory(head->ptr);
+    delete head;
+  }
+
+  inline int64_t ReleaseFreeSegmentsImpl() {
+    std::vector<Block*> free_segments;
+    for (Block* head : segments_) {
+      if (!head->allocated && head->next == nullptr) {
+        free_segments.push_back(head);
+      }
+    }
+    int64_t total_free = 0;
+    for (Block* head : free_segments) {
+      total_free += head->nbytes;
+      ReleaseSegment(head);
+    }
+    return total_free;
+  }
+
+  /*! \brief The device of this allocator. */
+  Device device_;
+  /*! \brief The pointer to the DeviceAPI which determines the context of memory. */
+  std::shared_ptr<DeviceAPI> api_;
+  /*! \brief The maximum allowed reserved bytes. 0 means no limit. */
+  int64_t max_pool_size_ = 0;
+  /*! \brief Free segments are released when the cached bytes exceed this value. 0 means never. */
+  int64_t release_threshold_ = 0;
+  /*! \brief The bytes of allocated blocks. */
+  int64_t allocated_bytes_ = 0;
+  /*! \brief The bytes of segments allocated from the device. */
+  int64_t reserved_bytes_ = 0;
+  /*! \brief The first block of each segment. */
+  std::unordered_set<Block*> segments_;
+  /*! \brief The size-binned free lists. */
+  std::array<std::set<Block*, BlockComparator>, kNumBins> free_bins_;
+  /*! \brief The thread-safe lock. */
+  std::mutex mu_;
+};
+
+/*!
+ * \brief A wrapper which holds a block allocated from the caching allocator, and returns the
+ * block to the allocator when it is destructed.
+ */
+class CachedMemory final : public Memory {
+ public:
+  explicit CachedMemory(Block* block, const Device& dev,
+                        std::shared_ptr<CachingAllocator> allocator)
+      : block_(block), allocator_(std::move(allocator)) {
+    this->data = block == nullptr ? nullptr : block->ptr;
+    this->device = dev;
+  }
+
+  ~CachedMemory() {
+    if (block_ != nullptr) {
+      allocator_->Free(block_);
+    }
+  }
+
+ private:
+  /*! \brief The allocated block. */
+  Block* block_;
+  /*! \brief The allocator that owns the block. */
+  std::shared_ptr<CachingAllocator> allocator_;
+};
+
+/*!
+ * \brief A memory pool that caches device memory as segments and serves requests with blocks
+ * split from the segments.
+ *
+ * Requests are rounded up to 512 bytes. Free blocks are kept in free lists binned by the power of
+ * 2 of their sizes and ordered by size, so the best-fit block is found in logarithmic time. A
+ * free block larger than the request is split, and the remainder is returned to the free lists.
+ * When a block is freed, it is coalesced with its free neighbors in the same segment, which
+ * keeps the fragmentation low under dynamic shapes. Requests up to 1 MB share 2 MB segments, and
+ * larger requests get their own segments rounded up to 2 MB.
+ *
+ * Segments are cached until the process exits, unless the following environment variables are
+ * set:
+ * - RAF_MEMORY_POOL_SIZE_LIMIT: The maximum bytes reserved from the device. When it would be
+ *   exceeded, or the device runs out of memory, all free segments are released first.
+ * - RAF_MEMORY_POOL_RELEASE_THRESHOLD: When the bytes cached but not allocated exceed this
+ *   value, a segment is released to the device as soon as it becomes entirely free.
+ *
+ * \sa CachingAllocator
+ */
+class CachingPool final : public MemoryPool {
+ public:
+  explicit CachingPool(Device dev, int64_t pool_limit = 0, int64_t release_threshold = 0) {
+    this->device = dev;
+    this->allocator = std::make_shared<CachingAllocator>(dev, pool_limit, release_threshold);
+
+    if (dev.device_type() == DevType::kCUDA()) {
+      DeviceAPI::Get(dev.device_type())->SetDevice(dev.device_id());
+    }
+  }
+
+  std::string GetName() {
+    return "caching_pool";
+  }
+
+  int64_t GetAllocBytes(int64_t nbytes) override {
+    return RoundUp(nbytes, kBlockAlignment);
+  }
+
+  std::shared_ptr<Memory> Alloc(int64_t nbytes, int64_t alignment) override {
+    CHECK_GE(nbytes, 0);
+    Block* block = nullptr;
+    if (nbytes > 0) {
+      block = allocator->Alloc(GetAllocBytes(nbytes), alignment);
+    }
+    return std::make_shared<CachedMemory>(block, device, allocator);
+  }
+
+  std::shared_ptr<Memory> AllocAsync(int64_t nbytes, void* stream,
+                                     int64_t alignment = kDefaultMemoryAlignment) override {
+    LOG(FATAL) << "Please use NoPool to use AllocAsync.";
+    throw;
+  }
+
+  std::vector<std::shared_ptr<Memory>> AllocBatch(const std::vector<int64_t>& nbytes,
+                                                  int64_t alignment) override {
+    std::vector<std::shared_ptr<Memory>> ret;
+    ret.reserve(nbytes.size());
+    for (int64_t bytes : nbytes) {
+      ret.emplace_back(Alloc(bytes, alignment));
+    }
+    return ret;
+  }
+
+  std::pair<float, float> GetPoolSize() override {
+    auto ret = allocator->GetPoolSize();
+    return {BytesToMegaBytes(ret.first), BytesToMegaBytes(ret.second)};
+  }
+
+ public:
+  static void* make(const Device& dev) {
+    int64_t max_pool_limit = 0;
+    if (const char* val = getenv("RAF_MEMORY_POOL_SIZE_LIMIT")) {
+      max_pool_limit = atol(val);
+    }
+    int64_t release_threshold = 0;
+    if (const char* val = getenv("RAF_MEMORY_POOL_RELEASE_THRESHOLD")) {
+      release_threshold = atol(val);
+    }
+    return new CachingPool(dev, max_pool_limit, release_threshold);
+  }
+
+  Device device;
+  /*! \brief The allocator shared with the allocated memory chunks. */
+  std::shared_ptr<CachingAllocator> allocator;
+};
+
+RAF_REGISTER_GLOBAL("raf.memory_pool._make.caching_pool").set_body_typed([](const Device& dev) {
+  return CachingPool::make(dev);
+});
+
+}  // namespace caching_pool
+}  // namespace memory_pool
+}  // namespace raf
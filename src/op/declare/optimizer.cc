@@ -41,7 +41,7 @@ RAF_OP_DECLARE("raf.op.sgd", [](const CallValues& call) {
       /*shape=*/std::vector<int64_t>(dx->shape, dx->shape + dx->ndim));
   call->out = TupleValue::make(tvm::Array<Value>({v1, x1}));
   call->device = dx->device;
-});
+}).set_attr<TRAFInplaceUpdate>("TRAFInplaceUpdate", {{0, 1}, {2, 0}});
 
 void LansDecl(const CallValues& call) {
   const auto* args = call->args.as<LansArgs>();
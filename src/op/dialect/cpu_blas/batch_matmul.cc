@@ -0,0 +1,122 @@
+/*
+ * Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+ * SPDX-License-Identifier: Apache-2.0
+ */
+
+/*!
+ * \file src/op/dialect/cpu_blas/batch_matmul.cc
+ * \brief batch_matmul operators implemented by the CPU BLAS library
+ */
+#include "raf/op.h"
+#include "./cpu_blas_utils.h"
+#include "../../schema/ufunc.h"
+
+namespace raf {
+namespace op {
+namespace cpu_blas {
+namespace manual {
+
+using namespace raf::value;
+
+template <typename T>
+void GemmBatched(bool transpose_a, bool transpose_b, int batch_count, int m, int n, int k,
+                 const T* a, int64_t stride_a, const T* b, int64_t stride_b, T* c) {
+  // Each GEMM is parallelized by the BLAS library, which performs better than parallelizing the
+  // batch when the matrices are not tiny, as in the attention of transformers.
+  for (int i = 0; i < batch_count; ++i) {
+    Gemm<T>(transpose_a, transpose_b, m, n, k, a + i * stride_a, b + i * stride_b,
+            c + static_cast<int64_t>(i) * m * n);
+  }
+}
+
+void GemmBatchedImpl(DLTensor* a, bool transpose_a, DLTensor* b, bool transpose_b, DLTensor* c) {
+  CHECK(a->shape[0] == c->shape[0] || b->shape[0] == c->shape[0])
+      << "Batch size of tensor and output are mismatched";
+  int batch_count = c->shape[0];
+  int m = c->shape[1];
+  int n = c->shape[2];
+  int k = a->shape[transpose_a ? 1 : 2];
+
+  // Set the stride of the broadcast tensor to 0.
+  int64_t stride_a = a->shape[0] == 1 ? 0 : static_cast<int64_t>(m) * k;
+  int64_t stride_b = b->shape[0] == 1 ? 0 : static_cast<int64_t>(n) * k;
+
+  if (c->dtype.bits == 32) {
+    GemmBatched<float>(transpose_a, transpose_b, batch_count, m, n, k,
+                       static_cast<const float*>(a->data), stride_a,
+                       static_cast<const float*>(b->data), stride_b, static_cast<float*>(c->data));
+  } else {
+    GemmBatched<double>(transpose_a, transpose_b, batch_count, m, n, k,
+                        static_cast<const double*>(a->data), stride_a,
+                        static_cast<const double*>(b->data), stride_b,
+                        static_cast<double*>(c->data));
+  }
+}
+
+template <bool transpose_a, bool transpose_b>
+class BatchMatmulImpl : public raf::op::OpEnv {
+  std::string env_name_;
+
+ public:
+  explicit BatchMatmulImpl(const CallValues& cv) {
+    static auto fschema_index =
+        ir::Op::GetAttrMap<op::FRAFSchemaFieldIndex>("FRAFSchemaFieldIndex");
+    auto op = ir::Op::Get("raf.op.batch_matmul");
+    this->arg_indices = {
+        fschema_index[op]("x1"),
+        fschema_index[op]("x2"),
+    };
+    auto args = cv->args.as<op::schema::BinaryArgs>();
+    CHECK(args != nullptr);
+    std::string op_name = "raf.op.cpu_blas.batch_matmul";
+    if (transpose_a || transpose_b) {
+      op_name += "_";
+      op_name += (transpose_a) ? "t" : "n";
+      op_name += (transpose_b) ? "t" : "n";
+    }
+    env_name_ = TruncateName(GetUniqueName(op_name));
+    const DLTensor* x1 = args->x1;
+    const DLTensor* x2 = args->x2;
+    const DLTensor* out = cv->out;
+    CheckGemmTensors(this, {x1, x2, out}, 3);
+  }
+
+  std::string name() const override {
+    return env_name_;
+  }
+
+  void Execute(const CallValues& cv) override {
+    auto args = cv->args.as<op::schema::BinaryArgs>();
+    GemmBatchedImpl(args->x1, transpose_a, args->x2, transpose_b, cv->out);
+  }
+
+  void Execute(const std::vector<Value>& inputs, Value output) override {
+    DLTensor* x1 = ir::Downcast<TensorValue>(inputs[0]);
+    DLTensor* x2 = ir::Downcast<TensorValue>(inputs[1]);
+    DLTensor* out = ir::Downcast<TensorValue>(output);
+    GemmBatchedImpl(x1, transpose_a, x2, transpose_b, out);
+  }
+
+  static OpEnv* make(const CallValues& cv) {
+    return new BatchMatmulImpl<transpose_a, transpose_b>(cv);
+  }
+};
+
+using BatchMatmulNN = BatchMatmulImpl<false, false>;
+using BatchMatmulNT = BatchMatmulImpl<false, true>;
+using BatchMatmulTN = BatchMatmulImpl<true, false>;
+using BatchMatmulTT = BatchMatmulImpl<true, true>;
+
+RAF_REGISTER_DIALECT_OP(cpu_blas, batch_matmul, 15);
+RAF_REGISTER_DIALECT_OP(cpu_blas, batch_matmul_nt, 15);
+RAF_REGISTER_DIALECT_OP(cpu_blas, batch_matmul_tn, 15);
+RAF_REGISTER_DIALECT_OP(cpu_blas, batch_matmul_tt, 15);
+RAF_OP_ENV_MAKER("raf.op.cpu_blas.batch_matmul", BatchMatmulNN::make);
+RAF_OP_ENV_MAKER("raf.op.cpu_blas.batch_matmul_nt", BatchMatmulNT::make);
+RAF_OP_ENV_MAKER("raf.op.cpu_blas.batch_matmul_tn", BatchMatmulTN::make);
+RAF_OP_ENV_MAKER("raf.op.cpu_blas.batch_matmul_tt", BatchMatmulTT::make);
+
+}  // namespace manual
+}  // namespace cpu_blas
+}  // namespace op
+}  // namespace raf
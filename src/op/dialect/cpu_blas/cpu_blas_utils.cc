@@ -0,0 +1,20 @@
+/*
+ * Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+ * SPDX-License-Identifier: Apache-2.0
+ */
+
+/*!
+ * \file src/op/dialect/cpu_blas/cpu_blas_utils.cc
+ * \brief Helper functions for the CPU BLAS library
+ */
+#include "./cpu_blas_utils.h"
+
+namespace raf {
+namespace op {
+namespace cpu_blas {
+
+RAF_REGISTER_DIALECT("cpu_blas").set_enable(DevType::kCPU());
+
+}  // namespace cpu_blas
+}  // namespace op
+}  // namespace raf
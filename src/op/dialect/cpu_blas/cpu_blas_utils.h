@@ -0,0 +1,74 @@
+/*
+ * Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+ * SPDX-License-Identifier: Apache-2.0
+ */
+
+/*!
+ * \file src/op/dialect/cpu_blas/cpu_blas_utils.h
+ * \brief Helper functions for the CPU BLAS library
+ */
+#pragma once
+#ifdef RAF_CPU_BLAS_USE_MKL
+#include <mkl_cblas.h>
+#else
+#include <cblas.h>
+#endif
+#include <string>
+#include <vector>
+#include "raf/device.h"
+#include "raf/op.h"
+
+namespace raf {
+namespace op {
+namespace cpu_blas {
+
+/*!
+ * \brief Row-major GEMM C = op(A) * op(B), where C is m x n and op(A) is m x k.
+ * \param a The m x k matrix, or the k x m matrix if transpose_a is true.
+ * \param b The k x n matrix, or the n x k matrix if transpose_b is true.
+ */
+template <typename T>
+void Gemm(bool transpose_a, bool transpose_b, int m, int n, int k, const T* a, const T* b, T* c);
+
+template <>
+inline void Gemm<float>(bool transpose_a, bool transpose_b, int m, int n, int k, const float* a,
+                        const float* b, float* c) {
+  cblas_sgemm(CblasRowMajor, transpose_a ? CblasTrans : CblasNoTrans,
+              transpose_b ? CblasTrans : CblasNoTrans, m, n, k, 1.0f, a, transpose_a ? m : k, b,
+              transpose_b ? k : n, 0.0f, c, n);
+}
+
+template <>
+inline void Gemm<double>(bool transpose_a, bool transpose_b, int m, int n, int k, const double* a,
+                         const double* b, double* c) {
+  cblas_dgemm(CblasRowMajor, transpose_a ? CblasTrans : CblasNoTrans,
+              transpose_b ? CblasTrans : CblasNoTrans, m, n, k, 1.0, a, transpose_a ? m : k, b,
+              transpose_b ? k : n, 0.0, c, n);
+}
+
+/*!
+ * \brief Check whether the GEMM of the given tensors can be offloaded to BLAS, which only
+ * supports float32 and float64, and report the reason to the op env otherwise, so that the
+ * dispatcher falls back to the next dialect.
+ */
+inline bool CheckGemmTensors(OpEnv* env, const std::vector<const DLTensor*>& tensors, int ndim) {
+  DLDataType dtype = tensors[0]->dtype;
+  for (auto tensor : tensors) {
+    if (tensor->ndim != ndim) {
+      env->error_msgs.push_back("[CPU BLAS] Expected " + std::to_string(ndim) +
+                                "D tensors, but got " + std::to_string(tensor->ndim) + "D");
+      return false;
+    }
+    if (tensor->dtype.code != kDLFloat || (tensor->dtype.bits != 32 && tensor->dtype.bits != 64) ||
+        tensor->dtype.bits != dtype.bits || tensor->dtype.lanes != 1) {
+      env->error_msgs.push_back(std::string("[CPU BLAS] Unsupported dtype: ") +
+                                DType(tensor->dtype).c_str());
+      return false;
+    }
+  }
+  return true;
+}
+
+}  // namespace cpu_blas
+}  // namespace op
+}  // namespace raf
@@ -0,0 +1,101 @@
+/*
+ * Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+ * SPDX-License-Identifier: Apache-2.0
+ */
+
+/*!
+ * \file src/op/dialect/cpu_blas/matmul.cc
+ * \brief matmul and dense operators implemented by the CPU BLAS library
+ */
+#include "raf/op.h"
+#include "./cpu_blas_utils.h"
+#include "../../schema/ufunc.h"
+
+namespace raf {
+namespace op {
+namespace cpu_blas {
+namespace manual {
+
+using namespace raf::value;
+
+void GemmImpl(DLTensor* a, bool transpose_a, DLTensor* b, bool transpose_b, DLTensor* c) {
+  int m = c->shape[0];
+  int n = c->shape[1];
+  int k = a->shape[transpose_a ? 0 : 1];
+  if (c->dtype.bits == 32) {
+    Gemm<float>(transpose_a, transpose_b, m, n, k, static_cast<const float*>(a->data),
+                static_cast<const float*>(b->data), static_cast<float*>(c->data));
+  } else {
+    Gemm<double>(transpose_a, transpose_b, m, n, k, static_cast<const double*>(a->data),
+                 static_cast<const double*>(b->data), static_cast<double*>(c->data));
+  }
+}
+
+template <bool transpose_a, bool transpose_b>
+class MatmulImpl : public raf::op::OpEnv {
+  std::string env_name_;
+
+ public:
+  explicit MatmulImpl(const CallValues& cv) {
+    auto op = ir::Op::Get("raf.op.matmul");
+    static auto fschema_index = op::GetOpAttr<op::FRAFSchemaFieldIndex>(op, "FRAFSchemaFieldIndex");
+    this->arg_indices = {
+        fschema_index("x1"),
+        fschema_index("x2"),
+    };
+    auto args = cv->args.as<op::schema::BinaryArgs>();
+    CHECK(args != nullptr);
+    std::string op_name = "raf.op.cpu_blas.matmul";
+    if (transpose_a || transpose_b) {
+      op_name += "_";
+      op_name += (transpose_a) ? "t" : "n";
+      op_name += (transpose_b) ? "t" : "n";
+    }
+    env_name_ = TruncateName(GetUniqueName(op_name));
+    const DLTensor* x1 = args->x1;
+    const DLTensor* x2 = args->x2;
+    const DLTensor* out = cv->out;
+    CheckGemmTensors(this, {x1, x2, out}, 2);
+  }
+
+  std::string name() const override {
+    return env_name_;
+  }
+
+  void Execute(const CallValues& cv) override {
+    auto args = cv->args.as<op::schema::BinaryArgs>();
+    GemmImpl(args->x1, transpose_a, args->x2, transpose_b, cv->out);
+  }
+
+  void Execute(const std::vector<Value>& inputs, Value output) override {
+    DLTensor* x1 = ir::Downcast<TensorValue>(inputs[0]);
+    DLTensor* x2 = ir::Downcast<TensorValue>(inputs[1]);
+    DLTensor* out = ir::Downcast<TensorValue>(output);
+    GemmImpl(x1, transpose_a, x2, transpose_b, out);
+  }
+
+  static OpEnv* make(const CallValues& cv) {
+    return new MatmulImpl<transpose_a, transpose_b>(cv);
+  }
+};
+
+using MatmulNN = MatmulImpl<false, false>;
+using MatmulNT = MatmulImpl<false, true>;
+using MatmulTN = MatmulImpl<true, false>;
+using MatmulTT = MatmulImpl<true, true>;
+
+RAF_REGISTER_DIALECT_OP(cpu_blas, matmul, 15);
+RAF_REGISTER_DIALECT_OP(cpu_blas, matmul_nt, 15);
+RAF_REGISTER_DIALECT_OP(cpu_blas, matmul_tn, 15);
+RAF_REGISTER_DIALECT_OP(cpu_blas, matmul_tt, 15);
+RAF_REGISTER_DIALECT_OP(cpu_blas, dense, 15);
+RAF_OP_ENV_MAKER("raf.op.cpu_blas.matmul", MatmulNN::make);
+RAF_OP_ENV_MAKER("raf.op.cpu_blas.matmul_nt", MatmulNT::make);
+RAF_OP_ENV_MAKER("raf.op.cpu_blas.matmul_tn", MatmulTN::make);
+RAF_OP_ENV_MAKER("raf.op.cpu_blas.matmul_tt", MatmulTT::make);
+RAF_OP_ENV_MAKER("raf.op.cpu_blas.dense", MatmulNT::make);
+
+}  // namespace manual
+}  // namespace cpu_blas
+}  // namespace op
+}  // namespace raf
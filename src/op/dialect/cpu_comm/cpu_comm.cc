@@ -0,0 +1,520 @@
+/*
+ * Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+ * SPDX-License-Identifier: Apache-2.0
+ */
+
+/*!
+ * \file src/op/dialect/cpu_comm/cpu_comm.cc
+ * \brief Communication operators implmentated by the CPU communicator
+ */
+#include <cstring>
+#include <vector>
+#include "raf/op_utils.h"
+#include "raf/cpu_communicator.h"
+#include "../../schema/communication.h"
+
+namespace raf {
+namespace op {
+namespace communication {
+namespace cpu_comm {
+using namespace distributed;
+using namespace distributed::communicator;
+using common::shape_utils::BytesCompactTensor;
+
+RAF_REGISTER_DIALECT("cpu_comm").set_enable(DevType::kCPU());
+
+inline CPUCommunicatorObj* GetCPUCommunicator(void* communicator) {
+  return reinterpret_cast<CPUCommunicatorObj*>(communicator);
+}
+
+/*! \brief Copy the tensors of the tuple to the fused buffer back to back. */
+inline void FuseTensors(const value::TupleValue& tv, const std::vector<size_t>& tuple_sizes,
+                        void* fused_data) {
+  size_t offset = 0;
+  for (int i = 0; i < tv->fields.size(); ++i) {
+    DLTensor* x = tv->fields[i];
+    std::memcpy(reinterpret_cast<uint8_t*>(fused_data) + offset, x->data, tuple_sizes[i]);
+    offset += tuple_sizes[i];
+  }
+}
+
+/*! \brief Copy the fused buffer back to the tensors of the tuple. */
+inline void UnfuseTensors(const void* fused_data, const std::vector<size_t>& tuple_sizes,
+                          value::TupleValue out) {
+  size_t offset = 0;
+  for (int i = 0; i < out->fields.size(); ++i) {
+    DLTensor* x = out->fields[i];
+    std::memcpy(x->data, reinterpret_cast<const uint8_t*>(fused_data) + offset, tuple_sizes[i]);
+    offset += tuple_sizes[i];
+  }
+}
+
+class CPUAllReduce : public raf::op::OpEnv {
+  void* communicator;
+  void* fused_data;
+  size_t total_size = 0;
+  std::vector<size_t> tuple_sizes;
+  DType dtype;
+  CPUReduceOp compute;
+
+  explicit CPUAllReduce(const CallValues& cv) {
+    auto op = ir::Op::Get("raf.op._allreduce");
+    auto fschema_index = ir::Op::GetAttrMap<op::FRAFSchemaFieldIndex>("FRAFSchemaFieldIndex");
+    auto args = cv->args.as<raf::op::schema::AllreduceArgs>();
+    this->arg_indices = {fschema_index[op]("x")};
+    RequestDistributed(&communicator, "cpu_comm", args->rank_list);
+    compute = ParseCPUReduceOp(args->computation);
+
+    auto& tv = args->x;
+    for (int i = 0; i < tv.size(); ++i) {
+      DLTensor* x = tv[i];
+      size_t size = BytesCompactTensor(*x);
+      tuple_sizes.push_back(size);
+      total_size += size;
+      CHECK(i == 0 || dtype == DType(x->dtype))
+          << "AllReduce requires tensors to be the same type.";
+      dtype = x->dtype;
+    }
+    if (tv.size() > 1) {
+      RequestWorkspace(&fused_data, cv->device, total_size);
+    }
+  }
+
+ public:
+  ~CPUAllReduce() {
+  }
+
+  std::string name() const override {
+    return TruncateName(GetUniqueName("raf.op.cpu_comm._allreduce"));
+  }
+
+  void Execute(const CallValues& cv) override {
+    auto args = cv->args.as<raf::op::schema::AllreduceArgs>();
+    Execute({TupleValue::make(ir::Array<Value>(args->x.begin(), args->x.end()))}, cv->out);
+  }
+
+  void Execute(const std::vector<value::Value>& inputs, value::Value output) override {
+    auto comm = GetCPUCommunicator(communicator);
+    auto tv = Downcast<value::TupleValue>(inputs[0]);
+    int64_t count = total_size / GetSizeInBytes(dtype);
+    if (tv->fields.size() == 1) {
+      DLTensor* x = tv->fields[0];
+      DLTensor* out = output;
+      comm->AllReduce(x->data, out->data, count, dtype, compute);
+    } else {
+      FuseTensors(tv, tuple_sizes, fused_data);
+      comm->AllReduce(fused_data, fused_data, count, dtype, compute);
+      UnfuseTensors(fused_data, tuple_sizes, Downcast<value::TupleValue>(output));
+    }
+  }
+
+  static OpEnv* make(const CallValues& cv) {
+    return new CPUAllReduce(cv);
+  }
+};
+
+RAF_REGISTER_DIALECT_OP(cpu_comm, _allreduce, 10);
+RAF_OP_ENV_MAKER("raf.op.cpu_comm._allreduce", CPUAllReduce::make);
+
+class CPUAllGather : public raf::op::OpEnv {
+  void* communicator;
+  explicit CPUAllGather(const CallValues& cv) {
+    auto op = ir::Op::Get("raf.op._allgather");
+    auto fschema_index = ir::Op::GetAttrMap<op::FRAFSchemaFieldIndex>("FRAFSchemaFieldIndex");
+    auto args = cv->args.as<raf::op::schema::AllgatherArgs>();
+    this->arg_indices = {fschema_index[op]("x")};
+    RequestDistributed(&communicator, "cpu_comm", args->rank_list);
+  }
+
+ public:
+  ~CPUAllGather() {
+  }
+
+  std::string name() const override {
+    return TruncateName(GetUniqueName("raf.op.cpu_comm._allgather"));
+  }
+
+  void Execute(const CallValues& cv) override {
+    auto args = cv->args.as<raf::op::schema::AllgatherArgs>();
+    Execute({args->x}, cv->out);
+  }
+
+  void Execute(const std::vector<value::Value>& inputs, value::Value output) override {
+    DLTensor* x = inputs[0];
+    DLTensor* out = output;
+    GetCPUCommunicator(communicator)->AllGather(x->data, out->data, BytesCompactTensor(*x));
+  }
+
+  static OpEnv* make(const CallValues& cv) {
+    return new CPUAllGather(cv);
+  }
+};
+
+RAF_REGISTER_DIALECT_OP(cpu_comm, _allgather, 10);
+RAF_OP_ENV_MAKER("raf.op.cpu_comm._allgather", CPUAllGather::make);
+
+class CPUGroupAllGather : public raf::op::OpEnv {
+  void* communicator;
+  explicit CPUGroupAllGather(const CallValues& cv) {
+    auto op = ir::Op::Get("raf.op._group_allgather");
+    auto fschema_index = ir::Op::GetAttrMap<op::FRAFSchemaFieldIndex>("FRAFSchemaFieldIndex");
+    this->arg_indices = {fschema_index[op]("tensor_list")};
+    RequestDistributed(&communicator, "cpu_comm", NullValue<Value>());
+  }
+
+ public:
+  ~CPUGroupAllGather() {
+  }
+
+  std::string name() const override {
+    return TruncateName(GetUniqueName("raf.op.cpu_comm._group_allgather"));
+  }
+
+  void Execute(const CallValues& cv) override {
+    auto args = cv->args.as<raf::op::schema::GroupAllgatherArgs>();
+    Execute(
+        {TupleValue::make(ir::Array<Value>(args->tensor_list.begin(), args->tensor_list.end()))},
+        cv->out);
+  }
+
+  void Execute(const std::vector<value::Value>& inputs, value::Value output) override {
+    auto comm = GetCPUCommunicator(communicator);
+    auto tv = Downcast<value::TupleValue>(inputs[0]);
+    auto out = Downcast<value::TupleValue>(output);
+    for (int i = 0; i < tv->fields.size(); ++i) {
+      DLTensor* x = tv->fields[i];
+      DLTensor* ot = out->fields[i];
+      comm->AllGather(x->data, ot->data, BytesCompactTensor(*x));
+    }
+  }
+
+  static OpEnv* make(const CallValues& cv) {
+    return new CPUGroupAllGather(cv);
+  }
+};
+
+RAF_REGISTER_DIALECT_OP(cpu_comm, _group_allgather, 10);
+RAF_OP_ENV_MAKER("raf.op.cpu_comm._group_allgather", CPUGroupAllGather::make);
+
+class CPUReduceScatter : public raf::op::OpEnv {
+  void* communicator;
+  void* in_buffer;
+  size_t size_in_bytes;
+  size_t size;
+  CPUReduceOp compute;
+
+  explicit CPUReduceScatter(const CallValues& cv) {
+    auto op = ir::Op::Get("raf.op._reduce_scatter");
+    auto fschema_index = ir::Op::GetAttrMap<op::FRAFSchemaFieldIndex>("FRAFSchemaFieldIndex");
+    this->arg_indices = {fschema_index[op]("x")};
+    RequestDistributed(&communicator, "cpu_comm", NullValue<Value>());
+    auto args = cv->args.as<raf::op::schema::ReduceScatterArgs>();
+    compute = ParseCPUReduceOp(args->computation);
+
+    const DLTensor* out = cv->out;
+    size_in_bytes = BytesCompactTensor(*out);
+    size = size_in_bytes / GetSizeInBytes(out->dtype);
+    if (args->x.size() > 1) {
+      RequestWorkspace(&in_buffer, cv->device, size_in_bytes * args->x.size());
+    }
+  }
+
+ public:
+  ~CPUReduceScatter() {
+  }
+
+  std::string name() const override {
+    return TruncateName(GetUniqueName("raf.op.cpu_comm._reduce_scatter"));
+  }
+
+  void Execute(const CallValues& cv) override {
+    auto args = cv->args.as<raf::op::schema::ReduceScatterArgs>();
+    Execute({TupleValue::make(ir::Array<Value>(args->x.begin(), args->x.end()))}, cv->out);
+  }
+
+  void Execute(const std::vector<value::Value>& inputs, value::Value output) override {
+    auto comm = GetCPUCommunicator(communicator);
+    auto tv = Downcast<value::TupleValue>(inputs[0]);
+    DLTensor* out = output;
+    if (tv->fields.size() == 1) {
+      DLTensor* x = tv->fields[0];
+      comm->ReduceScatter(x->data, out->data, size, out->dtype, compute);
+    } else {
+      FuseTensors(tv, std::vector<size_t>(tv->fields.size(), size_in_bytes), in_buffer);
+      comm->ReduceScatter(in_buffer, out->data, size, out->dtype, compute);
+    }
+  }
+
+  static OpEnv* make(const CallValues& cv) {
+    return new CPUReduceScatter(cv);
+  }
+};
+
+RAF_REGISTER_DIALECT_OP(cpu_comm, _reduce_scatter, 10);
+RAF_OP_ENV_MAKER("raf.op.cpu_comm._reduce_scatter", CPUReduceScatter::make);
+
+class CPUGroupReduceScatter : public raf::op::OpEnv {
+  void* communicator;
+  std::vector<size_t> sizes;
+  CPUReduceOp compute;
+
+  explicit CPUGroupReduceScatter(const CallValues& cv) {
+    auto op = ir::Op::Get("raf.op._group_reduce_scatter");
+    auto fschema_index = ir::Op::GetAttrMap<op::FRAFSchemaFieldIndex>("FRAFSchemaFieldIndex");
+    this->arg_indices = {fschema_index[op]("tensor_list")};
+    RequestDistributed(&communicator, "cpu_comm", NullValue<Value>());
+    auto args = cv->args.as<raf::op::schema::GroupReduceScatterArgs>();
+    compute = ParseCPUReduceOp(args->computation);
+
+    auto out = Downcast<value::TupleValue>(cv->out);
+    for (auto tv : out->fields) {
+      const DLTensor* ot = tv;
+      sizes.push_back(BytesCompactTensor(*ot) / GetSizeInBytes(ot->dtype));
+    }
+  }
+
+ public:
+  ~CPUGroupReduceScatter() {
+  }
+
+  std::string name() const override {
+    return TruncateName(GetUniqueName("raf.op.cpu_comm._group_reduce_scatter"));
+  }
+
+  void Execute(const CallValues& cv) override {
+    auto args = cv->args.as<raf::op::schema::GroupReduceScatterArgs>();
+    Execute(
+        {TupleValue::make(ir::Array<Value>(args->tensor_list.begin(), args->tensor_list.end()))},
+        cv->out);
+  }
+
+  void Execute(const std::vector<value::Value>& inputs, value::Value output) override {
+    auto comm = GetCPUCommunicator(communicator);
+    auto tv = Downcast<value::TupleValue>(inputs[0]);
+    auto out = Downcast<value::TupleValue>(output);
+    for (int i = 0; i < tv->fields.size(); ++i) {
+      DLTensor* x = tv->fields[i];
+      DLTensor* ot = out->fields[i];
+      comm->ReduceScatter(x->data, ot->data, sizes[i], x->dtype, compute);
+    }
+  }
+
+  static OpEnv* make(const CallValues& cv) {
+    return new CPUGroupReduceScatter(cv);
+  }
+};
+
+RAF_REGISTER_DIALECT_OP(cpu_comm, _group_reduce_scatter, 10);
+RAF_OP_ENV_MAKER("raf.op.cpu_comm._group_reduce_scatter", CPUGroupReduceScatter::make);
+
+class CPUBroadcast : public raf::op::OpEnv {
+  void* communicator;
+  void* fused_data;
+  size_t total_size = 0;
+  std::vector<size_t> tuple_sizes;
+  int root;
+
+  explicit CPUBroadcast(const CallValues& cv) {
+    auto op = ir::Op::Get("raf.op._broadcast");
+    auto fschema_index = ir::Op::GetAttrMap<op::FRAFSchemaFieldIndex>("FRAFSchemaFieldIndex");
+    this->arg_indices = {fschema_index[op]("x")};
+    auto args = cv->args.as<raf::op::schema::BroadcastArgs>();
+    RequestDistributed(&communicator, "cpu_comm", NullValue<Value>());
+    auto& tv = args->x;
+    root = args->root;
+    for (int i = 0; i < tv.size(); ++i) {
+      DLTensor* x = tv[i];
+      size_t size = BytesCompactTensor(*x);
+      tuple_sizes.push_back(size);
+      total_size += size;
+    }
+    if (tv.size() > 1) {
+      RequestWorkspace(&fused_data, cv->device, total_size);
+    }
+  }
+
+ public:
+  ~CPUBroadcast() {
+  }
+
+  std::string name() const override {
+    return TruncateName(GetUniqueName("raf.op.cpu_comm._broadcast"));
+  }
+
+  void Execute(const CallValues& cv) override {
+    auto args = cv->args.as<raf::op::schema::BroadcastArgs>();
+    Execute({TupleValue::make(ir::Array<Value>(args->x.begin(), args->x.end()))}, cv->out);
+  }
+
+  void Execute(const std::vector<value::Value>& inputs, value::Value output) override {
+    auto comm = GetCPUCommunicator(communicator);
+    auto tv = Downcast<value::TupleValue>(inputs[0]);
+    if (tv->fields.size() == 1) {
+      DLTensor* x = tv->fields[0];
+      DLTensor* out = output;
+      comm->Broadcast(x->data, out->data, total_size, root);
+    } else {
+      FuseTensors(tv, tuple_sizes, fused_data);
+      comm->Broadcast(fused_data, fused_data, total_size, root);
+      UnfuseTensors(fused_data, tuple_sizes, Downcast<value::TupleValue>(output));
+    }
+  }
+
+  static OpEnv* make(const CallValues& cv) {
+    return new CPUBroadcast(cv);
+  }
+};
+
+RAF_REGISTER_DIALECT_OP(cpu_comm, _broadcast, 10);
+RAF_OP_ENV_MAKER("raf.op.cpu_comm._broadcast", CPUBroadcast::make);
+
+class CPUSend : public raf::op::OpEnv {
+  void* communicator;
+  int peer;
+
+  explicit CPUSend(const CallValues& cv) {
+    auto op = ir::Op::Get("raf.op._send");
+    auto fschema_index = ir::Op::GetAttrMap<op::FRAFSchemaFieldIndex>("FRAFSchemaFieldIndex");
+    this->arg_indices = {fschema_index[op]("x")};
+    RequestDistributed(&communicator, "cpu_comm", NullValue<Value>());
+    const auto* args = cv->args.as<raf::op::schema::SendArgs>();
+    CHECK(args);
+    peer = args->peer;
+  }
+
+ public:
+  ~CPUSend() {
+  }
+
+  std::string name() const override {
+    return TruncateName(GetUniqueName("raf.op.cpu_comm._send"));
+  }
+
+  void Execute(const CallValues& cv) override {
+    const auto* args = cv->args.as<raf::op::schema::SendArgs>();
+    CHECK(args);
+    Execute({args->x}, cv->out);
+  }
+
+  void Execute(const std::vector<value::Value>& inputs, value::Value output) override {
+    const DLTensor* x = inputs[0];
+    GetCPUCommunicator(communicator)->Send(x->data, BytesCompactTensor(*x), peer);
+  }
+
+  static OpEnv* make(const CallValues& cv) {
+    return new CPUSend(cv);
+  }
+};
+
+RAF_REGISTER_DIALECT_OP(cpu_comm, _send, 10);
+RAF_OP_ENV_MAKER("raf.op.cpu_comm._send", CPUSend::make);
+
+class CPURecv : public raf::op::OpEnv {
+  void* communicator;
+  int peer;
+
+  explicit CPURecv(const CallValues& cv) {
+    RequestDistributed(&communicator, "cpu_comm", NullValue<Value>());
+    const auto* args = cv->args.as<raf::op::schema::RecvArgs>();
+    CHECK(args);
+    peer = args->peer;
+  }
+
+ public:
+  ~CPURecv() {
+  }
+
+  std::string name() const override {
+    return TruncateName(GetUniqueName("raf.op.cpu_comm._recv"));
+  }
+
+  void Execute(const CallValues& cv) override {
+    Execute({}, cv->out);
+  }
+
+  void Execute(const std::vector<value::Value>& inputs, value::Value output) override {
+    DLTensor* out = output;
+    GetCPUCommunicator(communicator)->Recv(out->data, BytesCompactTensor(*out), peer);
+  }
+
+  static OpEnv* make(const CallValues& cv) {
+    return new CPURecv(cv);
+  }
+};
+
+RAF_REGISTER_DIALECT_OP(cpu_comm, _recv, 10);
+RAF_OP_ENV_MAKER("raf.op.cpu_comm._recv", CPURecv::make);
+
+class CPUReduce : public raf::op::OpEnv {
+  void* communicator;
+  void* fused_data;
+  CPUReduceOp compute;
+  int root;
+  DType dtype;
+  size_t total_size = 0;
+  std::vector<size_t> tuple_sizes;
+
+  explicit CPUReduce(const CallValues& cv) {
+    auto op = ir::Op::Get("raf.op._reduce");
+    auto fschema_index = ir::Op::GetAttrMap<op::FRAFSchemaFieldIndex>("FRAFSchemaFieldIndex");
+    this->arg_indices = {fschema_index[op]("x")};
+    RequestDistributed(&communicator, "cpu_comm", NullValue<Value>());
+    auto args = cv->args.as<raf::op::schema::CommReduceArgs>();
+    root = args->root;
+    compute = ParseCPUReduceOp(args->computation);
+
+    auto& tv = args->x;
+    for (int i = 0; i < tv.size(); ++i) {
+      DLTensor* x = tv[i];
+      size_t size = BytesCompactTensor(*x);
+      tuple_sizes.push_back(size);
+      total_size += size;
+      CHECK(i == 0 || dtype == DType(x->dtype))
+          << "Reduce requires tensors to be the same type.";
+      dtype = x->dtype;
+    }
+    if (tv.size() > 1) {
+      RequestWorkspace(&fused_data, cv->device, total_size);
+    }
+  }
+
+ public:
+  ~CPUReduce() {
+  }
+
+  std::string name() const override {
+    return TruncateName(GetUniqueName("raf.op.cpu_comm._reduce"));
+  }
+
+  void Execute(const CallValues& cv) override {
+    auto args = cv->args.as<raf::op::schema::CommReduceArgs>();
+    Execute({TupleValue::make(ir::Array<Value>(args->x.begin(), args->x.end()))}, cv->out);
+  }
+
+  void Execute(const std::vector<value::Value>& inputs, value::Value output) override {
+    auto comm = GetCPUCommunicator(communicator);
+    auto tv = Downcast<value::TupleValue>(inputs[0]);
+    int64_t count = total_size / GetSizeInBytes(dtype);
+    if (tv->fields.size() == 1) {
+      DLTensor* x = tv->fields[0];
+      DLTensor* out = output;
+      comm->Reduce(x->data, out->data, count, dtype, compute, root);
+    } else {
+      FuseTensors(tv, tuple_sizes, fused_data);
+      comm->Reduce(fused_data, fused_data, count, dtype, compute, root);
+      UnfuseTensors(fused_data, tuple_sizes, Downcast<value::TupleValue>(output));
+    }
+  }
+
+  static OpEnv* make(const CallValues& cv) {
+    return new CPUReduce(cv);
+  }
+};
+
+RAF_REGISTER_DIALECT_OP(cpu_comm, _reduce, 10);
+RAF_OP_ENV_MAKER("raf.op.cpu_comm._reduce", CPUReduce::make);
+
+}  // namespace cpu_comm
+}  // namespace communication
+}  // namespace op
+}  // namespace raf
@@ -54,7 +54,7 @@ class CuDNNConvAlgoCacheEntry {
     return CuDNNConvAlgoCacheEntry(algo_perf);
   }
 
-  bool Save(const std::string& path) {
+  bool Save(const std::string& path) const {
     std::string data;
     dmlc::MemoryStringStream writer(&data);
     dmlc::SeekStream* stream = &writer;
@@ -107,7 +107,7 @@ cudnnConvolutionFwdAlgoPerf_t FindcudnnConvolutionFwdAlgoPerf_tExWrapper(
     const std::vector<uint8_t>& key, const cudnnTensorDescriptor_t xDesc, const void* x,
     const cudnnFilterDescriptor_t wDesc, const void* w, const cudnnConvolutionDescriptor_t convDesc,
     const cudnnTensorDescriptor_t yDesc, void* y, const Device& device) {
-  if (auto* val = CacheCudnnConvFwdAlgoPerf.Get(key)) {
+  if (auto val = CacheCudnnConvFwdAlgoPerf.Get(key)) {
     return val->Value();
   }
   static const cudnnConvolutionFwdAlgo_t algos[] = {
@@ -143,7 +143,7 @@ cudnnConvolutionFwdAlgoPerf_t FindcudnnConvolutionFwdAlgoPerf_tExWrapper(
                << cudnnGetErrorString(res[0].status);
     throw;
   }
-  CacheCudnnConvFwdAlgoPerf.Set(key,
+  CacheCudnnConvFwdAlgoPerf.Add(key,
                                 CuDNNConvAlgoCacheEntry<cudnnConvolutionFwdAlgoPerf_t>(res[0]));
   // debug information
   auto best_algo = res[0].algo;
@@ -167,7 +167,7 @@ cudnnConvolutionBwdDataAlgoPerf_t FindcudnnConvolutionBwdDataAlgoPerf_tExWrapper
     const cudnnTensorDescriptor_t dyDesc, const void* dy,
     const cudnnConvolutionDescriptor_t convDesc, const cudnnTensorDescriptor_t dxDesc, void* dx,
     const Device& device) {
-  if (auto* val = CacheCudnnConvBwdDataAlgoPerf.Get(key)) {
+  if (auto val = CacheCudnnConvBwdDataAlgoPerf.Get(key)) {
     return val->Value();
   }
   static const cudnnConvolutionBwdDataAlgo_t algos[] = {
@@ -200,7 +200,7 @@ cudnnConvolutionBwdDataAlgoPerf_t FindcudnnConvolutionBwdDataAlgoPerf_tExWrapper
     throw;
   }
   auto best_algo = res[0].algo;
-  CacheCudnnConvBwdDataAlgoPerf.Set(
+  CacheCudnnConvBwdDataAlgoPerf.Add(
       key, CuDNNConvAlgoCacheEntry<cudnnConvolutionBwdDataAlgoPerf_t>(res[0]));
   // debug information
   DLOG(INFO) << "CUDNN Found " << cnt << " conv2d_dx algorithms , choosing "
@@ -223,7 +223,7 @@ cudnnConvolutionBwdFilterAlgoPerf_t FindcudnnConvolutionBwdFilterAlgoPerf_tExWra
     const cudnnTensorDescriptor_t dyDesc, const void* dy,
     const cudnnConvolutionDescriptor_t convDesc, const cudnnFilterDescriptor_t dwDesc, void* dw,
     const Device& device) {
-  if (auto* val = CacheCudnnConvBwdFilterAlgoPerf.Get(key)) {
+  if (auto val = CacheCudnnConvBwdFilterAlgoPerf.Get(key)) {
     return val->Value();
   }
   static const cudnnConvolutionBwdFilterAlgo_t algos[] = {
@@ -255,7 +255,7 @@ cudnnConvolutionBwdFilterAlgoPerf_t FindcudnnConvolutionBwdFilterAlgoPerf_tExWra
                << cudnnGetErrorString(res[0].status);
     throw;
   }
-  CacheCudnnConvBwdFilterAlgoPerf.Set(
+  CacheCudnnConvBwdFilterAlgoPerf.Add(
       key, CuDNNConvAlgoCacheEntry<cudnnConvolutionBwdFilterAlgoPerf_t>(res[0]));
   // debug information
   auto best_algo = res[0].algo;
@@ -49,7 +49,7 @@ class CUTLASSConfigCacheEntry {
     throw;
   }
 
-  bool Save(const std::string& path) {
+  bool Save(const std::string& path) const {
     // Not support serialization yet.
     return false;
   }
@@ -72,7 +72,7 @@ OpEnv* Tune(const op::CallValues& call, OpEnv* op_env) {
   auto key = HashFusedFunc(Downcast<ClosureValue>(call->callee)->func);
   std::shared_ptr<TunableConfig> best;
 
-  if (const auto* compiled = CacheConfig.Get(key.byte_vector)) {
+  if (auto compiled = CacheConfig.Get(key.byte_vector)) {
     CUTLASSConfigCacheEntry entry = *compiled;
     best = entry.GetConfig();
   } else {
@@ -91,7 +91,7 @@ OpEnv* Tune(const op::CallValues& call, OpEnv* op_env) {
         best = config;
       }
     }
-    CacheConfig.Set(key.byte_vector, CUTLASSConfigCacheEntry(best));
+    CacheConfig.Add(key.byte_vector, CUTLASSConfigCacheEntry(best));
   }
 
   env->SetTunableConfig(best);
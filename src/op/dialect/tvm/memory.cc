@@ -0,0 +1,52 @@
+/*
+ * Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+ * SPDX-License-Identifier: Apache-2.0
+ */
+
+/*!
+ * \file ./src/op/dialect/tvm/memory.cc
+ * \brief Tensor fusion and defusion operators bridged from TVM.
+ */
+#include <vector>
+#include "./tvm_utils.h"
+#include "./tvm_attrs.h"
+#include "../../schema/memory.h"
+
+namespace raf {
+namespace op {
+namespace tvm_dialect {
+
+using namespace raf::ir;
+using namespace raf::value;
+using namespace raf::op::schema;
+
+std::vector<Value> FuseTensorSchema2Args(const FuseTensorArgs* args) {
+  std::vector<Value> ret;
+  for (auto v : args->data) {
+    ret.push_back(v);
+  }
+  return ret;
+}
+
+std::vector<std::string> FuseTensorSchemaArgNames(const op::CallValues& call) {
+  return {"data"};
+}
+
+std::vector<Value> DefuseTensorSchema2Args(const DefuseTensorArgs* args) {
+  return {args->data};
+}
+
+std::vector<std::string> DefuseTensorSchemaArgNames(const op::CallValues& call) {
+  return {"data"};
+}
+
+// The CUDA dialect copies tensors with asynchronous memcpy, so these are mainly for CPU. The output
+// shapes are carried by the output type, so the generic attrs and hasher are sufficient.
+RAF_TVM_PLEVEL(fuse_tensor, FuseTensor, FuseTensorArgs, FuseTensorSchema2Args,
+               FuseTensorSchemaArgNames, GenericAttrs, GenericHasher, kInjective, 5);
+RAF_TVM_PLEVEL(defuse_tensor, DefuseTensor, DefuseTensorArgs, DefuseTensorSchema2Args,
+               DefuseTensorSchemaArgNames, GenericAttrs, GenericHasher, kInjective, 5);
+
+}  // namespace tvm_dialect
+}  // namespace op
+}  // namespace raf
@@ -15,10 +15,13 @@
 #include "raf/pass.h"
 #include "tvm/ir/type_functor.h"
 #include "tvm/auto_scheduler/compute_dag.h"
+#include "tvm/relay/attrs/nn.h"
 #include "relay/backend/te_compiler.h"
 #include "relay/backend/te_compiler_cache.h"
+#include "relay/transforms/auto_scheduler_layout_rewrite.h"
 #include "./tvm_utils.h"
 #include "../../../common/shape_utils.h"
+#include <mutex>
 
 namespace raf {
 namespace op {
@@ -179,6 +182,18 @@ class RAF2TVM : public ExprMutator {
       : func_(Downcast<ClosureValue>(call->callee)->func),
         call_values_getter_(call),
         device_type_(dev_type) {
+    auto param_index = func_->GetAttr<Integer>(kRewrittenParam);
+    if (param_index.defined()) {
+      // The pre-packed weight is passed to the kernel in its packed shape.
+      rewritten_param_ = func_->params[param_index.value()->value];
+      rewritten_layout_ = func_->GetAttr<String>(kRewrittenLayout).value();
+      auto shape = func_->GetAttr<Array<Integer>>(kRewrittenShape).value();
+      const auto* ttype = rewritten_param_->checked_type().as<TensorTypeNode>();
+      CHECK(ttype != nullptr);
+      Type packed_type = TensorType({shape.begin(), shape.end()}, ttype->dtype);
+      packed_param_ = MakeVar(rewritten_param_->name_hint(), packed_type);
+      packed_param_->checked_type_ = packed_type;
+    }
   }
 
   Expr operator()() {
@@ -189,12 +204,17 @@ class RAF2TVM : public ExprMutator {
 
   Expr VisitExpr(const Expr& expr) override {
     auto ret = ExprMutator::VisitExpr(expr);
-    ret->checked_type_ = expr->checked_type();
+    if (!ret.same_as(packed_param_)) {
+      ret->checked_type_ = expr->checked_type();
+    }
     return ret;
   }
 
   Expr VisitExpr_(const VarNode* node) override {
     input_.insert(GetRef<Var>(node));
+    if (rewritten_param_.get() == node) {
+      return packed_param_;
+    }
     return GetRef<Var>(node);
   }
 
@@ -206,6 +226,9 @@ class RAF2TVM : public ExprMutator {
     auto farg_indices = GetOpAttr<FRAFArgIndices>(op, "FRAFArgIndices");
     auto fattr = GetOpAttr<FRAFAttr>(op, "FRAFAttr");
     Attrs op_tvm_attr = fattr(op_call_values);
+    if (node->args.size() > 1 && node->args[1].same_as(rewritten_param_)) {
+      op_tvm_attr = WithRewrittenLayout(op_tvm_attr, rewritten_layout_);
+    }
     Array<IntImm> arg_indices = farg_indices(op_call_values);
     std::vector<Expr> inputs;
     for (const auto& i : arg_indices) {
@@ -226,7 +249,7 @@ class RAF2TVM : public ExprMutator {
       const Var& param = node->params[i];
       if (input_.find(param) != input_.end()) {
         // param is a tensor input
-        new_params.push_back(param);
+        new_params.push_back(param.same_as(rewritten_param_) ? packed_param_ : param);
         arg_indices.push_back(i);
       }
     }
@@ -241,6 +264,25 @@ class RAF2TVM : public ExprMutator {
   std::string func_name;
 
  private:
+  /*! \brief Set the layout requested by the auto-scheduler to a copy of the op attrs. */
+  static Attrs WithRewrittenLayout(const Attrs& attrs, const std::string& layout) {
+    if (const auto* dense = attrs.as<tvm::relay::DenseAttrs>()) {
+      auto n = make_object<tvm::relay::DenseAttrs>(*dense);
+      n->auto_scheduler_rewritten_layout = layout;
+      return Attrs(n);
+    } else if (const auto* bmm = attrs.as<tvm::relay::BatchMatmulAttrs>()) {
+      auto n = make_object<tvm::relay::BatchMatmulAttrs>(*bmm);
+      n->auto_scheduler_rewritten_layout = layout;
+      return Attrs(n);
+    } else if (const auto* conv = attrs.as<tvm::relay::Conv2DAttrs>()) {
+      auto n = make_object<tvm::relay::Conv2DAttrs>(*conv);
+      n->auto_scheduler_rewritten_layout = layout;
+      return Attrs(n);
+    }
+    LOG(FATAL) << "NotImplementedError: cannot rewrite the layout of " << attrs->GetTypeKey();
+    throw;
+  }
+
   /*! \brief convert CallNode to CallValues */
   CallValuesGetter call_values_getter_;
   /*! \brief params that are tvm op inputs, instead of attrs */
@@ -249,11 +291,21 @@ class RAF2TVM : public ExprMutator {
   Function func_;
   /*! \brief The device type */
   DevType device_type_;
+  /*! \brief The param that is pre-packed, if any */
+  Var rewritten_param_;
+  /*! \brief The param in the packed shape that replaces rewritten_param_ */
+  Var packed_param_;
+  /*! \brief The layout of the pre-packed param */
+  std::string rewritten_layout_;
 };
 
 HashKey HashFusedFunc(const Function& func) {
   HashKey key;
   key << raf::ir::AsText(func, true);
+  auto layout = func->GetAttr<String>(kRewrittenLayout);
+  if (layout.defined()) {
+    key << std::string(layout.value());
+  }
   return key;
 }
 
@@ -282,29 +334,39 @@ OpEnv* FusedFuncBuild(const op::CallValues& call) {
 
   auto key = HashFusedFunc(Downcast<ClosureValue>(call->callee)->func);
   TVMModuleCacheEntry entry;
-  if (const auto* compiled = cache->Get(key.byte_vector)) {
+  if (auto compiled = cache->Get(key.byte_vector)) {
     entry = *compiled;
   } else {
     te_compiler->Clear();
     try {
       auto cached_key = tvm::relay::tec::CCacheKey(func, target);
-      auto cached_func = te_compiler->Lower(cached_key, [](String name) { return name; });
+      auto cached_func = te_compiler->Lower(
+          cached_key, [&](String name) { return String(MangleKernelName(name, func)); });
       auto mod = tvm::build(cached_func->funcs, cached_key->target, Target(nullptr));
-      entry = TVMModuleCacheEntry(mod, cached_func->prim_fn_var->name_hint);
-      cache->Set(key.byte_vector, entry);
+      // Keep the kernel built by another thread concurrently, e.g., in VirtualMachine::Warmup.
+      entry = *cache->Add(key.byte_vector,
+                          TVMModuleCacheEntry(mod, cached_func->prim_fn_var->name_hint));
     } catch (const dmlc::Error& e) {
       if (!AllowJitFailure()) {
         LOG(FATAL) << "Failed to build a fused op " << env->env_name << ": " << e.what();
       }
     }
   }
+  RecordKernel(cache, key.byte_vector, entry);
 
   env->f = entry.GetFunction();
   env->arg_indices = raf_to_tvm.arg_indices;
   Array<Value> args = GetListArgs(call->args);
+  const auto& callee = Downcast<ClosureValue>(call->callee)->func;
+  auto rewritten_param = callee->GetAttr<Integer>(kRewrittenParam);
   for (const int& i : env->arg_indices) {
+    if (rewritten_param.defined() && rewritten_param.value()->value == i) {
+      auto shape = callee->GetAttr<Array<Integer>>(kRewrittenShape).value();
+      env->input_shapes[env->inputs.size()] = raf::common::shape_utils::MakeShape<int64_t>(shape);
+    }
     GetDLTensor(args[i], &env->inputs);
   }
+  env->OverrideInputShapes(&env->inputs);
   GetDLTensor(call->out, &env->outputs);
   return env.release();
 }
@@ -345,6 +407,45 @@ float CalcFuncGFLOPS(const op::CallValues& call, const Array<Type>& param_types,
   return -1;
 }
 
+std::pair<std::string, std::string> GetRewrittenLayout(const op::CallValues& call) {
+  using tvm::relay::AutoSchedulerLayoutRewriter;
+  static const auto f_enter = registry::GetPackedFunc("auto_scheduler.enter_layout_rewrite");
+  static const auto f_exit = registry::GetPackedFunc("auto_scheduler.exit_layout_rewrite");
+  ForceEnableAutoScheduler();
+  tvm::relay::tec::TECompiler compiler;
+  RAF2TVM raf_to_tvm(call, call->device.device_type());
+  Function tvm_func = Downcast<Function>(raf_to_tvm());
+  auto cache_key = tvm::relay::tec::CCacheKey(tvm_func, call->device.tvm_target());
+
+  // Lowering the function in the layout rewrite mode queries the tuned schedule, which pushes the
+  // layouts it requests for the layout free placeholders, i.e., the weights, to the queues. The
+  // queues are process-wide, so the queries are serialized.
+  static std::mutex mu;
+  std::lock_guard<std::mutex> lock(mu);
+  auto& ori_layouts = AutoSchedulerLayoutRewriter::global_ori_layouts_queue;
+  auto& new_layouts = AutoSchedulerLayoutRewriter::global_new_layouts_queue;
+  ori_layouts.clear();
+  new_layouts.clear();
+  f_enter();
+  try {
+    compiler->Lower(cache_key, "mod_layout_rewrite");
+  } catch (const dmlc::Error& e) {
+    DLOG(WARNING) << "Failed to query the layout of " << raf_to_tvm.func_name << ": " << e.what();
+    ori_layouts.clear();
+    new_layouts.clear();
+  }
+  f_exit();
+
+  std::pair<std::string, std::string> ret;
+  // Only a single weight per function is pre-packed.
+  if (ori_layouts.size() == 1 && new_layouts.size() == 1) {
+    ret = {ori_layouts.front(), new_layouts.front()};
+  }
+  ori_layouts.clear();
+  new_layouts.clear();
+  return ret;
+}
+
 RAF_OP_ENV_MAKER("raf.op.tvm._fused_op", FusedFuncBuild);
 
 }  // namespace tvm_dialect
@@ -7,6 +7,11 @@
  * \file ./src/op/dialect/tvm/tvm_utils.cc
  * \brief Implementation of utility methods for TVM dialect.
  */
+#include <iomanip>
+#include <mutex>
+#include <sstream>
+#include <unordered_set>
+
 #include "raf/value.h"
 #include "raf/registry.h"
 #include "./tvm_utils.h"
@@ -107,15 +112,18 @@ void TVMOpEnv::Execute(const op::CallValues& call) {
 }
 
 void TVMOpEnv::Execute(const std::vector<Value>& inputs, Value output) {
-  this->inputs.clear();
-  this->outputs.clear();
+  // Use local tensors instead of the members, so that the VM can run the same OpEnv for
+  // different contexts concurrently.
+  std::vector<DLTensor> in_tensors;
+  std::vector<DLTensor> out_tensors;
   for (auto val : inputs) {
-    GetDLTensor(val, &this->inputs);
+    GetDLTensor(val, &in_tensors);
   }
-  GetDLTensor(output, &this->outputs);
+  OverrideInputShapes(&in_tensors);
+  GetDLTensor(output, &out_tensors);
   std::vector<TVMValue> values;
   std::vector<int> codes;
-  SetArgs(&this->inputs, &this->outputs, &values, &codes);
+  SetArgs(&in_tensors, &out_tensors, &values, &codes);
   TVMArgs targs(values.data(), codes.data(), values.size());
   TVMRetValue rv;
 
@@ -128,27 +136,151 @@ void TVMOpEnv::Execute(const std::vector<Value>& inputs, Value output) {
   f.CallPacked(targs, &rv);
 }
 
-PackedMetricMap DumpTVMCacheMetric(const std::string& cache_name) {
+void TVMOpEnv::OverrideInputShapes(std::vector<DLTensor>* tensors) {
+  for (auto& kv : input_shapes) {
+    CHECK_LT(kv.first, static_cast<int>(tensors->size()));
+    DLTensor& dlt = tensors->at(kv.first);
+    // The pre-packed tensors are compact, so the strides of the original shape no longer apply.
+    dlt.ndim = kv.second.size();
+    dlt.shape = kv.second.data();
+    dlt.strides = nullptr;
+  }
+}
+
+MetaCacheMetric* GetTVMCache(const std::string& cache_name) {
   static std::unordered_map<std::string, MetaCacheMetric*> name_to_cache = {
       {"tvm_cpu", &CacheBuildCpu},
       {"tvm_cuda", &CacheBuildCuda},
       {"tvm_lower", &CacheLoweredFunc},
   };
+  auto it = name_to_cache.find(cache_name);
+  return it == name_to_cache.end() ? nullptr : it->second;
+}
 
+PackedMetricMap DumpTVMCacheMetric(const std::string& cache_name) {
   PackedMetricMap ret;
-  if (name_to_cache.count(cache_name) == 0) {
+  auto cache = GetTVMCache(cache_name);
+  if (cache == nullptr) {
     LOG(WARNING) << "Cannot find cache " << cache_name << " for dumping metric";
     return ret;
   }
 
-  auto metrics = name_to_cache[cache_name]->GetMetric();
+  auto metrics = cache->GetMetric();
   for (const auto& it : metrics) {
     ret.Set(it.first, it.second);
   }
   return ret;
 }
 
+void SetTVMCacheLimit(const std::string& cache_name, int64_t max_entries, int64_t max_disk_bytes,
+                      const std::string& policy) {
+  auto cache = GetTVMCache(cache_name);
+  CHECK(cache != nullptr) << "Cannot find cache " << cache_name;
+  CHECK(max_entries >= 0 && max_disk_bytes >= 0)
+      << "ValueError: Cache limits must be non-negative";
+  cache->SetLimit(max_entries, max_disk_bytes, policy);
+}
+
+int64_t CollectTVMCacheGarbage(const std::string& cache_name) {
+  auto cache = GetTVMCache(cache_name);
+  CHECK(cache != nullptr) << "Cannot find cache " << cache_name;
+  return cache->CollectGarbage();
+}
+
+std::string MangleKernelName(const std::string& name, const ir::Function& func) {
+  std::ostringstream os;
+  os << name << "_" << std::hex << std::setw(16) << std::setfill('0')
+     << static_cast<uint64_t>(tvm::StructuralHash()(func));
+  return os.str();
+}
+
+/*! \brief The kernels recorded for ahead-of-time packaging. */
+struct KernelRecorder {
+  /*! \brief Whether the recording is enabled. */
+  bool enabled{false};
+  /*! \brief The recorded (cache name, cache key) pairs, used to skip duplications. */
+  std::unordered_set<std::string> seen;
+  /*! \brief The recorded kernels, each of which is (cache name, cache key, module, func name). */
+  Array<Array<ObjectRef>> kernels;
+  /*! \brief The mutex of the recorder. */
+  std::mutex mu;
+
+  static KernelRecorder* Get() {
+    static KernelRecorder inst;
+    return &inst;
+  }
+};
+
+void RecordKernel(const MetaPersistCache<TVMModuleCacheEntry>* cache,
+                  const std::vector<uint8_t>& key, const TVMModuleCacheEntry& entry) {
+  auto* recorder = KernelRecorder::Get();
+  std::lock_guard<std::mutex> lock(recorder->mu);
+  if (!recorder->enabled || !entry.GetModule().defined()) {
+    return;
+  }
+  std::string cache_name = cache == &CacheBuildCuda ? "tvm_cuda" : "tvm_cpu";
+  std::string key_str(key.begin(), key.end());
+  if (!recorder->seen.insert(cache_name + "/" + key_str).second) {
+    return;
+  }
+  recorder->kernels.push_back(
+      {String(cache_name), String(key_str), entry.GetModule(), String(entry.GetFuncName())});
+}
+
+void StartKernelRecording() {
+  auto* recorder = KernelRecorder::Get();
+  std::lock_guard<std::mutex> lock(recorder->mu);
+  CHECK(!recorder->enabled) << "Kernel recording has been started";
+  recorder->enabled = true;
+  recorder->seen.clear();
+  recorder->kernels = Array<Array<ObjectRef>>();
+}
+
+Array<Array<ObjectRef>> StopKernelRecording() {
+  auto* recorder = KernelRecorder::Get();
+  std::lock_guard<std::mutex> lock(recorder->mu);
+  recorder->enabled = false;
+  recorder->seen.clear();
+  Array<Array<ObjectRef>> ret = recorder->kernels;
+  recorder->kernels = Array<Array<ObjectRef>>();
+  return ret;
+}
+
+int64_t PreloadTVMKernels(Array<String> cache_names, Array<String> keys, tvm::runtime::Module lib,
+                          Array<String> func_names) {
+  CHECK_EQ(cache_names.size(), keys.size());
+  CHECK_EQ(cache_names.size(), func_names.size());
+  int64_t num_loaded = 0;
+  for (size_t i = 0; i < cache_names.size(); ++i) {
+    MetaPersistCache<TVMModuleCacheEntry>* cache;
+    if (cache_names[i] == "tvm_cpu") {
+      cache = &CacheBuildCpu;
+    } else if (cache_names[i] == "tvm_cuda") {
+      cache = &CacheBuildCuda;
+    } else {
+      LOG(WARNING) << "Skip the kernel of unknown cache " << cache_names[i];
+      continue;
+    }
+    if (lib->GetFunction(func_names[i], /*query_imports=*/true) == nullptr) {
+      LOG(WARNING) << "Cannot find kernel " << func_names[i] << " in the library";
+      continue;
+    }
+    // Only fill the in-memory cache, because the kernels are already persisted in the library.
+    // Keep the cached kernels, which may be built by JIT or loaded by another executable.
+    bool added = false;
+    cache->MetaCache<TVMModuleCacheEntry>::Add(keys[i], TVMModuleCacheEntry(lib, func_names[i]),
+                                               &added);
+    num_loaded += added;
+  }
+  return num_loaded;
+}
+
+RAF_REGISTER_GLOBAL("raf.cache.StartKernelRecording").set_body_typed(StartKernelRecording);
+RAF_REGISTER_GLOBAL("raf.cache.StopKernelRecording").set_body_typed(StopKernelRecording);
+RAF_REGISTER_GLOBAL("raf.cache.PreloadTVMKernels").set_body_typed(PreloadTVMKernels);
 RAF_REGISTER_GLOBAL("raf.cache.DumpTVMCacheMetric").set_body_typed(DumpTVMCacheMetric);
+RAF_REGISTER_GLOBAL("raf.cache.SetTVMCacheLimit").set_body_typed(SetTVMCacheLimit);
+RAF_REGISTER_GLOBAL("raf.cache.CollectTVMCacheGarbage").set_body_typed(CollectTVMCacheGarbage);
 
 RAF_REGISTER_DIALECT("tvm").set_enable(DevType::kCPU()).set_enable(DevType::kCUDA());
 TVM_REGISTER_PASS_CONFIG_OPTION("raf.tvm.allow_jit_failure", tvm::Bool);
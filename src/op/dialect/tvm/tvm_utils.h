@@ -40,12 +40,30 @@ ir::Function LowerOp(const ir::Op& op, const ir::Attrs& attrs,
 float CalcFuncGFLOPS(const op::CallValues& call, const Array<Type>& param_types,
                      const Type& ret_type, const Device& device);
 
+/*! \brief The function attribute of the index of the param that is pre-packed. */
+constexpr const char* kRewrittenParam = "RewrittenParam";
+/*! \brief The function attribute of the layout that the param is pre-packed to. */
+constexpr const char* kRewrittenLayout = "RewrittenLayout";
+/*! \brief The function attribute of the shape of the pre-packed param. */
+constexpr const char* kRewrittenShape = "RewrittenShape";
+
+/*!
+ * \brief Query the layout that the tuned auto-scheduler schedule of a TVM primitive function
+ * requests for its weight, i.e., the second argument of its conv2d, dense or batch_matmul.
+ * \param call The call values, which callee is a ClosureValue that includes the target function.
+ * \return The original layout and the requested layout of the weight, or empty strings if the
+ * schedule does not rewrite the layout.
+ */
+std::pair<std::string, std::string> GetRewrittenLayout(const op::CallValues& call);
+
 class TVMOpEnv : public op::OpEnv {
  public:
   std::string env_name;
   std::vector<DLTensor> inputs;
   std::vector<DLTensor> outputs;
   registry::PackedFunc f{nullptr};
+  /*! \brief The shapes overriding the ones of the inputs, e.g., the pre-packed weights. */
+  std::unordered_map<int, std::vector<int64_t>> input_shapes;
 
   TVMOpEnv() = default;
   virtual ~TVMOpEnv() = default;
@@ -54,6 +72,8 @@ class TVMOpEnv : public op::OpEnv {
   }
   void Execute(const op::CallValues& call) override;
   void Execute(const std::vector<Value>& inputs, Value outputs) override;
+  /*! \brief Override the shapes of the inputs with input_shapes. */
+  void OverrideInputShapes(std::vector<DLTensor>* tensors);
 };
 
 /*! \brief The persist cache entry of TVM modules. */
@@ -78,10 +98,18 @@ class TVMModuleCacheEntry {
   }
 
   registry::PackedFunc GetFunction() {
-    return mod_->GetFunction(func_name_);
+    return mod_->GetFunction(func_name_, /*query_imports=*/true);
+  }
+
+  const tvm::runtime::Module& GetModule() const {
+    return mod_;
+  }
+
+  const std::string& GetFuncName() const {
+    return func_name_;
   }
 
-  bool Save(const std::string& path) {
+  bool Save(const std::string& path) const {
     static auto f_export = registry::GetPackedFunc("raf._tvm_op.utils.export_library");
     auto bin_path = path + "/" + MOD_SO_FILE;
     bool success = f_export(mod_, bin_path);
@@ -135,7 +163,7 @@ class RelayFuncCacheEntry {
     return RelayFuncCacheEntry(func);
   }
 
-  bool Save(const std::string& path) {
+  bool Save(const std::string& path) const {
     auto json_str = ir::serialization::SaveJSON(func_);
     std::ofstream ofs(path + "/" + FUNC_FILE, std::ios::out);
     if (!ofs.is_open()) {
@@ -196,6 +224,30 @@ extern MetaPersistCache<TVMModuleCacheEntry> CacheBuildCpu;
 extern MetaPersistCache<TVMModuleCacheEntry> CacheBuildCuda;
 extern MetaPersistCache<RelayFuncCacheEntry> CacheLoweredFunc;
 
+/*!
+ * \brief Append the structural hash of the lowered function to a kernel name, so that kernels of
+ * different shapes or attributes can be linked into one library without symbol conflicts.
+ * \param name The kernel name generated by the TE compiler.
+ * \param func The lowered function.
+ * \return The unique kernel name.
+ */
+std::string MangleKernelName(const std::string& name, const ir::Function& func);
+
+/*!
+ * \brief Record a kernel that is looked up or built in the given cache if the kernel recording is
+ * enabled. The recorded kernels are packaged into VM executables ahead of time.
+ * \param cache The cache holding the kernel.
+ * \param key The cache key.
+ * \param entry The kernel.
+ */
+void RecordKernel(const MetaPersistCache<TVMModuleCacheEntry>* cache,
+                  const std::vector<uint8_t>& key, const TVMModuleCacheEntry& entry);
+
+/*! \brief Lowered functions are not kernels, so there is nothing to record. */
+inline void RecordKernel(const MetaPersistCache<RelayFuncCacheEntry>* cache,
+                         const std::vector<uint8_t>& key, const RelayFuncCacheEntry& entry) {
+}
+
 }  // namespace tvm_dialect
 }  // namespace op
 }  // namespace raf
@@ -228,13 +280,14 @@ extern MetaPersistCache<RelayFuncCacheEntry> CacheLoweredFunc;
     RType ret;                                                                                     \
     HashKey key;                                                                                   \
     key << #OP << HASH(param_types, ret_type, schema);                                             \
-    if (const auto* compiled = cache->Get(key.byte_vector)) {                                      \
+    if (auto compiled = cache->Get(key.byte_vector)) {                                            \
       ret = *compiled;                                                                             \
     } else {                                                                                       \
       auto lowered = LowerOp(op, attrs, param_types, ret_type);                                    \
       ret = f_post_lower(lowered);                                                                 \
-      cache->Set(key.byte_vector, ret);                                                            \
+      ret = *cache->Add(key.byte_vector, ret);                                                     \
     }                                                                                              \
+    RecordKernel(cache, key.byte_vector, ret);                                                     \
     return ret;                                                                                    \
   }                                                                                                \
   OpEnv* FUNC##Build(const op::CallValues call) {                                                  \
@@ -264,7 +317,8 @@ extern MetaPersistCache<RelayFuncCacheEntry> CacheLoweredFunc;
         [&](const ir::Function& f) {                                                               \
           te_compiler->Clear();                                                                    \
           auto key = tvm::relay::tec::CCacheKey(f, target);                                        \
-          auto cached_func = te_compiler->Lower(key, [](String name) { return name; });            \
+          auto cached_func = te_compiler->Lower(                                                   \
+              key, [&](String name) { return String(MangleKernelName(name, f)); });                \
           auto mod = tvm::build(cached_func->funcs, key->target, Target(nullptr));                 \
           return TVMModuleCacheEntry(mod, cached_func->prim_fn_var->name_hint);                    \
         });                                                                                        \
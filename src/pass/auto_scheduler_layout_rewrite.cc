@@ -0,0 +1,239 @@
+/*
+ * Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+ * SPDX-License-Identifier: Apache-2.0
+ */
+
+/*!
+ * \file auto_scheduler_layout_rewrite.cc
+ * \brief Pre-pack the constant weights of the TVM ops to the layouts requested by their tuned
+ * auto-scheduler schedules.
+ */
+#include <numeric>
+#include "raf/op.h"
+#include "raf/ir.h"
+#include "raf/pass.h"
+#include "raf/value.h"
+#include "raf/registry.h"
+#include "./common.h"
+#include "../common/shape_utils.h"
+#include "../op/dialect/tvm/tvm_utils.h"
+
+namespace raf {
+namespace pass {
+namespace auto_scheduler_layout_rewrite {
+
+using namespace raf::ir;
+using namespace raf::op;
+using namespace raf::value;
+
+/*!
+ * \brief Return the index of the param of a TVM primitive function that is only used as the weight
+ * of a conv2d, dense or batch_matmul, or -1 if there is no such param.
+ */
+int FindWeightParam(const Function& func) {
+  static const std::unordered_set<std::string> anchors = {
+      "raf.op.tvm.conv2d", "raf.op.tvm.dense", "raf.op.tvm.batch_matmul_nt"};
+  std::unordered_map<const Object*, int> uses;
+  const Object* weight = nullptr;
+  int num_anchors = 0;
+  PostOrderVisit(func->body, [&](const Expr& expr) {
+    if (const auto* call = expr.as<CallNode>()) {
+      for (const auto& arg : call->args) {
+        ++uses[arg.get()];
+      }
+      const auto* op = call->op.as<OpNode>();
+      if (op != nullptr && anchors.count(op->name) && call->args.size() > 1) {
+        ++num_anchors;
+        weight = call->args[1].get();
+      }
+    } else if (const auto* tuple = expr.as<TupleNode>()) {
+      for (const auto& field : tuple->fields) {
+        ++uses[field.get()];
+      }
+    }
+  });
+  if (num_anchors != 1 || uses[weight] != 1) {
+    return -1;
+  }
+  for (int i = 0, n = func->params.size(); i < n; ++i) {
+    if (func->params[i].get() == weight) {
+      return i;
+    }
+  }
+  return -1;
+}
+
+class LayoutRewriter : public ExprMutator {
+ public:
+  explicit LayoutRewriter(const Device& device) : device_(device) {
+  }
+
+  Expr VisitExpr_(const LetNode* let) final {
+    auto pre_visit = [this](const LetNode* op) {
+      if (op->value->IsInstance<ConstantNode>()) {
+        let_consts_[op->var.get()] = op->value;
+      }
+      this->Mutate(op->value);
+    };
+    auto post_visit = [this](const LetNode* op) {
+      Expr expr = GetRef<Expr>(op);
+      Expr value = this->Mutate(op->value);
+      Expr body = this->Mutate(op->body);
+      if (value.same_as(op->value) && body.same_as(op->body)) {
+        this->memo_[expr] = expr;
+      } else {
+        this->memo_[expr] = Let(op->var, value, body);
+      }
+    };
+    ExpandANormalForm(let, pre_visit, post_visit);
+    return memo_[GetRef<Expr>(let)];
+  }
+
+  Expr VisitExpr_(const FunctionNode* node) final {
+    // Skip the primitive functions, which are rewritten along with their calls.
+    if (node->HasNonzeroAttr(attr::kPrimitive)) {
+      return GetRef<Function>(node);
+    }
+    return ExprMutator::VisitExpr_(node);
+  }
+
+  Expr VisitExpr_(const CallNode* node) final {
+    Call call = Downcast<Call>(ExprMutator::VisitExpr_(node));
+    Function func;
+    if (const auto* fn = call->op.as<FunctionNode>()) {
+      auto dialect = fn->GetAttr<String>(attr::kDialect);
+      auto rewritten = fn->GetAttr<Integer>(tvm_dialect::kRewrittenParam);
+      if (!fn->HasNonzeroAttr(attr::kPrimitive) || !dialect.defined() ||
+          dialect.value() != "tvm" || rewritten.defined()) {
+        return call;
+      }
+      func = GetRef<Function>(fn);
+    } else if (const auto* op = call->op.as<OpNode>()) {
+      if (!IsDialectOp(GetRef<Op>(op)) || GetDialect(GetRef<Op>(op)) != "tvm") {
+        return call;
+      }
+      func = WrapOp(call);
+    } else {
+      return call;
+    }
+
+    int index = FindWeightParam(func);
+    if (index < 0) {
+      return call;
+    }
+    Expr weight = call->args[index];
+    if (let_consts_.count(weight.get())) {
+      weight = let_consts_.at(weight.get());
+    }
+    const auto* constant = weight.as<ConstantNode>();
+    if (constant == nullptr || !constant->value->IsInstance<TensorValueObj>()) {
+      return call;
+    }
+
+    CallValues call_values = CallValues::make();
+    Array<Value> arg_values;
+    for (const auto& arg : call->args) {
+      arg_values.push_back(GetValue(arg));
+    }
+    call_values->args = MakeListArgs(arg_values);
+    call_values->callee = ClosureValue::make({}, func);
+    call_values->device = device_;
+    auto layouts = tvm_dialect::GetRewrittenLayout(call_values);
+    if (layouts.second.empty() || layouts.first == layouts.second) {
+      return call;
+    }
+
+    Expr packed;
+    Array<Integer> packed_shape;
+    std::tie(packed, packed_shape) = Pack(weight, layouts.first, layouts.second);
+    if (!packed.defined()) {
+      return call;
+    }
+    func = WithAttr(std::move(func), tvm_dialect::kRewrittenParam, Integer(index));
+    func = WithAttr(std::move(func), tvm_dialect::kRewrittenLayout, String(layouts.second));
+    func = WithAttr(std::move(func), tvm_dialect::kRewrittenShape, packed_shape);
+    Array<Expr> args = call->args;
+    args.Set(index, packed);
+    return Call(func, args, call->attrs);
+  }
+
+ private:
+  /*! \brief Wrap a single TVM op call into a primitive function. */
+  static Function WrapOp(const Call& call) {
+    Array<Var> params;
+    Array<Type> param_types;
+    for (int i = 0, n = call->args.size(); i < n; ++i) {
+      const auto& type = call->args[i]->checked_type();
+      auto var = MakeVar("p" + std::to_string(i), type);
+      var->checked_type_ = type;
+      params.push_back(var);
+      param_types.push_back(type);
+    }
+    auto body = Call(call->op, {params.begin(), params.end()}, call->attrs);
+    body->checked_type_ = call->checked_type();
+    auto func = Function(params, body, call->checked_type(), {});
+    func->checked_type_ = FuncType(param_types, call->checked_type(), {}, {});
+    func = WithAttr(std::move(func), attr::kPrimitive, Integer(1));
+    return WithAttr(std::move(func), attr::kDialect, String("tvm"));
+  }
+
+  /*!
+   * \brief Transform a constant weight to the given layout on the host. The packed weight is viewed
+   * in the original shape, so that the types of the program remain unchanged, and the packed shape
+   * is returned along with it. Return an undefined expression if the packed weight cannot be viewed
+   * in the original shape, e.g., it is padded.
+   */
+  std::pair<Expr, Array<Integer>> Pack(const Expr& weight, const std::string& src_layout,
+                                       const std::string& dst_layout) {
+    static const auto f_transform =
+        registry::GetPackedFunc("raf._tvm_op.utils.auto_scheduler_layout_transform");
+    auto key = std::make_pair(weight.get(), dst_layout);
+    auto it = packed_.find(key);
+    if (it != packed_.end()) {
+      return it->second;
+    }
+    auto value = Downcast<TensorValue>(weight.as<ConstantNode>()->value);
+    const DLTensor* tensor = value;
+    tvm::runtime::NDArray packed = f_transform(value->tensor, src_layout, dst_layout);
+    std::vector<int64_t> shape(tensor->shape, tensor->shape + tensor->ndim);
+    std::vector<int64_t> packed_shape(packed.Shape().begin(), packed.Shape().end());
+    auto product = [](const std::vector<int64_t>& v) {
+      return std::accumulate(v.begin(), v.end(), int64_t(1), std::multiplies<int64_t>());
+    };
+    std::pair<Expr, Array<Integer>> ret;
+    if (product(packed_shape) == product(shape)) {
+      auto view = tensor::Tensor(packed).CreateView(shape);
+      ret.first = MakeConstant(TensorValue::make(view));
+      ret.first->checked_type_ = weight->checked_type_;
+      ret.second = raf::common::shape_utils::StdVector2Array(packed_shape);
+    }
+    packed_[key] = ret;
+    return ret;
+  }
+
+  /*! \brief The device to compile for. */
+  Device device_;
+  /*! \brief Maps from the let-bound vars to the constants. */
+  std::unordered_map<const Object*, Expr> let_consts_;
+  /*! \brief Maps from the constant and the layout to the packed constant and its shape. */
+  std::map<std::pair<const Object*, std::string>, std::pair<Expr, Array<Integer>>> packed_;
+};
+
+}  // namespace auto_scheduler_layout_rewrite
+
+Pass AutoSchedulerLayoutRewrite() {
+  TypedPackedFunc<Function(Function, IRModule, PassContext)> pass_func = [=](Function f, IRModule m,
+                                                                             PassContext pc) {
+    auto device = Device::Current(/*allow_default=*/false);
+    return Downcast<Function>(auto_scheduler_layout_rewrite::LayoutRewriter(device).Mutate(f));
+  };
+  Pass func_pass = CreateRAFFunctionPass(pass_func, 1, "AutoSchedulerLayoutRewrite", {});
+  PassInfo pass_info(1, "AutoSchedulerLayoutRewrite", {});
+  return RAFSequential({InferType(), func_pass, DeadCodeElimination()}, pass_info);
+}
+
+RAF_REGISTER_GLOBAL("raf.pass_.AutoSchedulerLayoutRewrite")
+    .set_body_typed(AutoSchedulerLayoutRewrite);
+
+}  // namespace pass
+}  // namespace raf
@@ -8,6 +8,7 @@
  * \brief Optimized allocated memory in the IR.
  */
 #include <algorithm>
+#include <numeric>
 #include <random>
 #include <vector>
 
@@ -202,6 +203,155 @@ class TensorGroups {
   VSet dummy_out_vars_;
 };
 
+/*! \brief A static memory arena. The planned tensor groups are placed at fixed byte offsets of
+ * one storage, so that the function only needs a single allocation for them.
+ */
+struct MemoryArena {
+  /*! \brief The binded variable for the arena storage, which reuses the storage var of the
+   * first planned group.
+   */
+  Var storage;
+  /*! \brief The arena size in bytes. */
+  int64_t size = 0;
+  /*! \brief The alignment of the arena, which is the maximum alignment of the planned groups. */
+  int64_t alignment = 1;
+  /*! \brief The total size of the planned groups in bytes, i.e., the size without reuse. */
+  int64_t total_group_size = 0;
+  /*! \brief The map from the planned group ID to its offset in the arena. */
+  std::unordered_map<int, int64_t> offsets;
+};
+
+/*!
+ * \brief Plan a static memory arena for the tensor groups. Groups with a static size that do not
+ * hold final outputs are placed in the arena. Each group lives from its first tensor definition to
+ * the last let-binding whose live-in set contains one of its tensors, and the groups are packed by
+ * greedy-by-size: from the largest group, each group takes the lowest aligned offset that does
+ * not overlap with the placed groups whose lifetimes intersect with it.
+ * \param func The function to be planned.
+ * \param analyzer The liveness analyzer.
+ * \param tensor_groups The tensor groups.
+ * \return The arena, or an arena with an undefined storage if there is nothing to be planned.
+ */
+MemoryArena PlanArena(const Function& func, liveness_analysis::LivenessAnalyzer* analyzer,
+                      TensorGroups* tensor_groups) {
+  static const Op& alloc_storage_op = Op::Get("raf.op.vm.alloc_storage");
+  MemoryArena arena;
+  auto ell = ExplicitLetList::make(func);
+  const auto& vars = ell->vars;
+  const auto& exprs = ell->exprs;
+
+  // The arena only handles straight-line functions.
+  StdMap<int> let_index;
+  for (size_t i = 0; i < vars.size(); ++i) {
+    if (exprs[i]->IsInstance<IfNode>()) {
+      return arena;
+    }
+    let_index[vars[i]] = i;
+  }
+
+  // Collect the groups to be planned and the devices of their storages.
+  std::vector<int> group_ids;
+  std::vector<std::pair<int, int>> lifetimes;
+  Expr device_type, device_id;
+  for (size_t j = 0; j < tensor_groups->groups.size(); ++j) {
+    const auto& group = tensor_groups->groups[j];
+    if (group.size <= 0 || group.members.empty() || tensor_groups->HasOutputTensor(j) ||
+        let_index.count(group.storage) == 0) {
+      continue;
+    }
+    auto storage_call = exprs[let_index[group.storage]].as<CallNode>();
+    CHECK(storage_call && storage_call->op.same_as(alloc_storage_op));
+    if (!device_type.defined()) {
+      device_type = storage_call->args[2];
+      device_id = storage_call->args[3];
+    } else if (!tvm::StructuralEqual()(device_type, storage_call->args[2]) ||
+               !tvm::StructuralEqual()(device_id, storage_call->args[3])) {
+      // Storages on different devices cannot share an arena.
+      return MemoryArena();
+    }
+    int start = vars.size(), end = 0;
+    for (const auto& member : group.members) {
+      CHECK_GT(let_index.count(member.second.first), 0U);
+      int def = let_index[member.second.first];
+      start = std::min(start, def);
+      end = std::max(end, def);
+    }
+    group_ids.push_back(j);
+    lifetimes.emplace_back(start, end);
+  }
+  if (group_ids.size() < 2) {
+    return arena;
+  }
+
+  // Extend the lifetimes to the last let-bindings that the tensors are live at.
+  for (size_t i = 0; i < vars.size(); ++i) {
+    auto live_in_vars = analyzer->GetLiveVars(vars[i]);
+    for (size_t k = 0; k < group_ids.size(); ++k) {
+      if (static_cast<int>(i) <= lifetimes[k].second) {
+        continue;
+      }
+      for (const auto& member : tensor_groups->groups[group_ids[k]].members) {
+        if (live_in_vars.count(member.first) > 0) {
+          lifetimes[k].second = i;
+          break;
+        }
+      }
+    }
+  }
+
+  // Greedy-by-size packing.
+  std::vector<size_t> order(group_ids.size());
+  std::iota(order.begin(), order.end(), 0);
+  std::sort(order.begin(), order.end(), [&](size_t a, size_t b) {
+    const auto& ga = tensor_groups->groups[group_ids[a]];
+    const auto& gb = tensor_groups->groups[group_ids[b]];
+    return ga.size != gb.size ? ga.size > gb.size : lifetimes[a].first < lifetimes[b].first;
+  });
+  auto align = [](int64_t offset, int64_t alignment) {
+    return (offset + alignment - 1) / alignment * alignment;
+  };
+  std::vector<size_t> placed;
+  std::vector<int64_t> offsets(group_ids.size(), 0);
+  for (size_t k : order) {
+    const auto& group = tensor_groups->groups[group_ids[k]];
+    // The placed groups that are alive at the same time, sorted by their offsets.
+    std::vector<size_t> conflicts;
+    for (size_t p : placed) {
+      if (lifetimes[p].first <= lifetimes[k].second && lifetimes[k].first <= lifetimes[p].second) {
+        conflicts.push_back(p);
+      }
+    }
+    std::sort(conflicts.begin(), conflicts.end(),
+              [&](size_t a, size_t b) { return offsets[a] < offsets[b]; });
+    int64_t offset = 0;
+    for (size_t p : conflicts) {
+      if (offset + group.size <= offsets[p]) {
+        break;
+      }
+      offset = std::max(offset,
+                        align(offsets[p] + tensor_groups->groups[group_ids[p]].size,
+                              group.alignment));
+    }
+    offsets[k] = offset;
+    placed.push_back(k);
+    arena.size = std::max(arena.size, offset + group.size);
+    arena.alignment = std::max(arena.alignment, group.alignment);
+    arena.total_group_size += group.size;
+    arena.offsets[group_ids[k]] = offset;
+  }
+
+  // The arena reuses the storage that is allocated first.
+  int first_let = vars.size();
+  for (int group_id : group_ids) {
+    const auto& storage = tensor_groups->groups[group_id].storage;
+    if (let_index[storage] < first_let) {
+      first_let = let_index[storage];
+      arena.storage = storage;
+    }
+  }
+  return arena;
+}
+
 /*! \brief A mutator to perform the following tasks:
  * 1. Run tensor grouper to group the tensors generated by alloc_tensor according to
  *    the liveness analysis. All tensors in a tensor group will use the same storage.
@@ -213,18 +363,32 @@ class TensorGroups {
  */
 class MemoryPlanner : public ExprMutator {
  public:
-  MemoryPlanner(const Function& func, liveness_analysis::LivenessAnalyzer* analyzer)
+  MemoryPlanner(const Function& func, liveness_analysis::LivenessAnalyzer* analyzer,
+                bool use_arena = false, bool dump_stat = false)
       : func_(func), analyzer_(analyzer), tensor_groups_(Group()) {
     scopes_.emplace_back(new LetList);
+    if (use_arena) {
+      arena_ = PlanArena(func_, analyzer_, &tensor_groups_);
+      num_live_arena_groups_ = arena_.offsets.size();
+      if (dump_stat && arena_.storage.defined()) {
+        LOG(INFO) << "Memory arena: " << arena_.offsets.size() << " tensor groups, "
+                  << arena_.size << " bytes in the arena vs. " << arena_.total_group_size
+                  << " bytes in total";
+      }
+    }
   }
 
   Expr Run() {
     DLOG(INFO) << "Tensor groups:";
     DLOG(INFO) << tensor_groups_.DebugDumpGroups();
 
-    // List storage vars that will be used by one or more tensors.
-    for (const auto& group : tensor_groups_.groups) {
-      if (group.members.size() > 0) {
+    // List storage vars that will be used by one or more tensors. The groups in the arena
+    // share the arena storage.
+    for (size_t j = 0; j < tensor_groups_.groups.size(); ++j) {
+      const auto& group = tensor_groups_.groups[j];
+      if (arena_.offsets.count(j) > 0) {
+        used_storages_.insert(arena_.storage);
+      } else if (group.members.size() > 0) {
         used_storages_.insert(group.storage);
       }
     }
@@ -256,10 +420,15 @@ class MemoryPlanner : public ExprMutator {
             // should hold the memory pointer.
             tensor_groups_.RemoveFromGroup(group_id, *it);
 
-            // Free allocated storages that will not be used anymore.
+            // Free allocated storages that will not be used anymore. The arena is freed
+            // after all its groups are dead.
             auto group = tensor_groups_.groups[group_id];
             if (group.members.size() == 0) {
-              scope->Push(MakeFreeMemory(group.storage));
+              if (arena_.offsets.count(group_id) == 0) {
+                scope->Push(MakeFreeMemory(group.storage));
+              } else if (--num_live_arena_groups_ == 0) {
+                scope->Push(MakeFreeMemory(arena_.storage));
+              }
             }
           }
           it = live_tensors_.erase(it);
@@ -300,7 +469,22 @@ class MemoryPlanner : public ExprMutator {
     const auto* op_node = node->op.as<OpNode>();
 
     auto call = GetRef<Call>(node);
-    if (op_node && GetRef<Op>(op_node) == alloc_storage_op) {
+    if (op_node && GetRef<Op>(op_node) == alloc_storage_op && arena_.storage.defined() &&
+        curr_let_ == arena_.storage) {
+      // Allocate the whole arena.
+      Array<Expr> new_args;
+      for (auto& arg : call->args) {
+        new_args.push_back(VisitExpr(arg));
+      }
+      new_args.Set(0, MakeConstant(ScalarValue::make(arena_.size)));
+      new_args.Set(1, MakeConstant(ScalarValue::make(arena_.alignment)));
+      if (new_args.size() == 5) {
+        new_args.push_back(MakeConstant(BoolValue::make(true)));
+      } else {
+        new_args.Set(5, MakeConstant(BoolValue::make(true)));
+      }
+      return Call(alloc_storage_op, new_args);
+    } else if (op_node && GetRef<Op>(op_node) == alloc_storage_op) {
       // Mutate the size of alloc_storage indicated by the tensor group.
 
       auto group_id = tensor_groups_.FindGroupIdByStorageVar(curr_let_);
@@ -335,7 +519,10 @@ class MemoryPlanner : public ExprMutator {
       CHECK_NE(group_id, -1) << "Internal error: output tensor of " << curr_let_->name_hint()
                              << " does not belong to any tensor group";
       auto storage_var = Downcast<Var>(call->args[0]);
-      if (tensor_groups_.groups[group_id].storage != storage_var) {
+      if (arena_.offsets.count(group_id) > 0) {
+        // Place the tensor at the offset of its group in the arena.
+        new_args.Set(0, arena_.storage);
+      } else if (tensor_groups_.groups[group_id].storage != storage_var) {
         DLOG(INFO) << "Assign " << curr_let_->name_hint() << " to "
                    << tensor_groups_.groups[group_id].storage->name_hint() << " from "
                    << storage_var->name_hint();
@@ -349,6 +536,14 @@ class MemoryPlanner : public ExprMutator {
       } else {
         new_args.Set(4, own);
       }
+      if (arena_.offsets.count(group_id) > 0) {
+        auto offset = MakeConstant(ScalarValue::make(arena_.offsets[group_id]));
+        if (new_args.size() == 5) {
+          new_args.push_back(offset);
+        } else {
+          new_args.Set(5, offset);
+        }
+      }
 
       return Call(alloc_tensor_op, new_args);
     } else if (op_node && GetRef<Op>(op_node) == reshape_tensor_op) {
@@ -386,6 +581,10 @@ class MemoryPlanner : public ExprMutator {
   VSet used_storages_;
   /*! \brief Current live tensor vars. */
   VSet live_tensors_;
+  /*! \brief The static memory arena, if enabled. */
+  MemoryArena arena_;
+  /*! \brief The number of groups in the arena that still have live tensors. */
+  size_t num_live_arena_groups_ = 0;
 };
 
 /*! \brief A visitor to group tensors generated by alloc_tensor according to
@@ -496,10 +695,12 @@ TensorGroups MemoryPlanner::Group() {
 }  // namespace memory_plan
 
 TVM_REGISTER_PASS_CONFIG_OPTION("raf.memory_plan.dump_liveness_stat", Bool);
+TVM_REGISTER_PASS_CONFIG_OPTION("raf.memory_plan.arena", Bool);
 
 Pass MemoryPlan() {
   PassContext pass_ctx = PassContext::Current();
   Bool dump_stat = pass_ctx->GetConfig("raf.memory_plan.dump_liveness_stat", Bool(false)).value();
+  Bool use_arena = pass_ctx->GetConfig("raf.memory_plan.arena", Bool(false)).value();
   TypedPackedFunc<Function(Function, IRModule, PassContext)> pass_func = [=](Function f, IRModule m,
                                                                              PassContext pc) {
     auto func = f;
@@ -523,7 +724,8 @@ Pass MemoryPlan() {
       LOG(WARNING) << "Memory planning is disabled because liveness analysis was failed";
       return func;
     }
-    return Downcast<ir::Function>(memory_plan::MemoryPlanner(func, &analyzer).Run());
+    return Downcast<ir::Function>(
+        memory_plan::MemoryPlanner(func, &analyzer, use_arena, dump_stat).Run());
   };
   return CreateRAFFunctionPass(pass_func, 2, "MemoryPlan", {});
 }
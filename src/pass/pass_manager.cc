@@ -8,11 +8,17 @@
  * \brief Infrastructure for transformation passes.
  */
 
+#include <sys/resource.h>
+#include <unistd.h>
+#include <fstream>
+#include <sstream>
 #include <tvm/ir/transform.h>
 #include <tvm/node/repr_printer.h>
+#include <tvm/relay/expr_functor.h>
 
 #include "raf/pass.h"
 #include "raf/pass_manager.h"
+#include "raf/profiler.h"
 #include "raf/registry.h"
 
 namespace raf {
@@ -98,6 +104,125 @@ inline Pass GetPass(const String& pass_name) {
   return (*f)();
 }
 
+/*! \brief Count the let-bindings and calls in a module. */
+class IRSizeCounter : public tvm::relay::MixedModeVisitor {
+ public:
+  void VisitExpr_(const LetNode* op) final {
+    auto pre_visit = [this](const LetNode* op) {
+      this->VisitExpr(op->var);
+      this->VisitExpr(op->value);
+    };
+    auto post_visit = [this](const LetNode* op) {
+      this->VisitExpr(op->body);
+      this->visit_counter_[op] += 1;
+      num_lets++;
+    };
+    ExpandANormalForm(op, pre_visit, post_visit);
+  }
+
+  void VisitExpr_(const CallNode* op) final {
+    num_calls++;
+    MixedModeVisitor::VisitExpr_(op);
+  }
+
+  void Count(const IRModule& mod) {
+    for (const auto& kv : mod->functions) {
+      if (kv.second->IsInstance<FunctionNode>()) {
+        VisitExpr(Downcast<Function>(kv.second));
+      }
+    }
+  }
+
+  int64_t num_lets = 0;
+  int64_t num_calls = 0;
+};
+
+/*! \brief Get the current and the peak resident set size of this process in KB. */
+static std::pair<int64_t, int64_t> GetRSS() {
+  int64_t rss_kb = 0;
+  std::ifstream statm("/proc/self/statm");
+  int64_t total_pages, rss_pages;
+  if (statm >> total_pages >> rss_pages) {
+    rss_kb = rss_pages * (sysconf(_SC_PAGESIZE) / 1024);
+  }
+  struct rusage usage;
+  getrusage(RUSAGE_SELF, &usage);
+  return {rss_kb, static_cast<int64_t>(usage.ru_maxrss)};
+}
+
+PassProfiler* PassProfiler::Get() {
+  static PassProfiler profiler;
+  return &profiler;
+}
+
+bool PassProfiler::IsProfiling(const PassContext& pass_ctx) {
+  return enabled_ || pass_ctx->GetConfig("raf.pass_manager.profile", Bool(false)).value();
+}
+
+std::string PassProfiler::GetProfile() {
+  std::lock_guard<std::mutex> lock(mu_);
+  std::ostringstream os;
+  os << "[";
+  for (size_t i = 0; i < entries_.size(); ++i) {
+    const auto& e = entries_[i];
+    os << (i > 0 ? ",\n" : "\n") << "  {\"name\": \"" << e.name << "\", \"depth\": " << e.depth
+       << ", \"start_us\": " << e.start_us << ", \"end_us\": " << e.end_us
+       << ", \"lets_before\": " << e.lets_before << ", \"lets_after\": " << e.lets_after
+       << ", \"calls_before\": " << e.calls_before << ", \"calls_after\": " << e.calls_after
+       << ", \"rss_kb\": " << e.rss_kb << ", \"peak_rss_kb\": " << e.peak_rss_kb << "}";
+  }
+  os << "\n]";
+  return os.str();
+}
+
+/*! \brief Run one pass, and profile it if the pass profiler is enabled. */
+static IRModule RunPass(const Pass& pass, IRModule mod, const PassContext& pass_ctx) {
+  // The nesting depth of RAFSequential.
+  static thread_local int depth = 0;
+  auto pass_profiler = PassProfiler::Get();
+  if (!pass_profiler->IsProfiling(pass_ctx)) {
+    return pass(std::move(mod), pass_ctx);
+  }
+
+  PassProfileEntry entry;
+  entry.name = pass->Info()->name;
+  entry.depth = depth;
+  IRSizeCounter before;
+  before.Count(mod);
+  entry.lets_before = before.num_lets;
+  entry.calls_before = before.num_calls;
+
+  depth++;
+  entry.start_us = profiler::ProfileStat::NowInMicrosec();
+  try {
+    mod = pass(std::move(mod), pass_ctx);
+  } catch (...) {
+    depth--;
+    throw;
+  }
+  entry.end_us = profiler::ProfileStat::NowInMicrosec();
+  depth--;
+
+  IRSizeCounter after;
+  after.Count(mod);
+  entry.lets_after = after.num_lets;
+  entry.calls_after = after.num_calls;
+  std::tie(entry.rss_kb, entry.peak_rss_kb) = GetRSS();
+
+  // Merge with the traces of the base profiler.
+  auto base_profiler = profiler::Profiler::Get();
+  if (base_profiler->IsProfiling(1)) {
+    base_profiler->AddNewProfileStat(
+        "Pass", entry.name, entry.start_us, entry.end_us,
+        {"lets: " + std::to_string(entry.lets_before) + " -> " + std::to_string(entry.lets_after),
+         "calls: " + std::to_string(entry.calls_before) + " -> " +
+             std::to_string(entry.calls_after),
+         "peak_rss_kb: " + std::to_string(entry.peak_rss_kb)});
+  }
+  pass_profiler->AddEntry(std::move(entry));
+  return mod;
+}
+
 // TODO(zhiics): we currenlty only sequentially execute each pass in
 // a RAFSequential without the consideration of their orders. The phase
 // ordering problem needs to be handled in the future.
@@ -108,9 +233,9 @@ IRModule RAFSequentialNode::operator()(IRModule mod, const PassContext& pass_ctx
     if (!pass_ctx.PassEnabled(pass_info)) continue;
     // resolve dependencies
     for (const auto& it : pass_info->required) {
-      mod = GetPass(it)(std::move(mod), pass_ctx);
+      mod = RunPass(GetPass(it), std::move(mod), pass_ctx);
     }
-    mod = pass(std::move(mod), pass_ctx);
+    mod = RunPass(pass, std::move(mod), pass_ctx);
   }
   return mod;
 }
@@ -263,6 +388,20 @@ RAF_REGISTER_GLOBAL("raf.pass_.RAFSequential").set_body([](TVMArgs args, TVMRetV
   *ret = RAFSequential(passes, pass_info);
 });
 
+RAF_REGISTER_GLOBAL("raf.pass_.EnablePassProfiler").set_body_typed([](bool enabled) {
+  PassProfiler::Get()->SetEnabled(enabled);
+});
+
+RAF_REGISTER_GLOBAL("raf.pass_.ResetPassProfiler").set_body_typed([]() {
+  PassProfiler::Get()->Reset();
+});
+
+RAF_REGISTER_GLOBAL("raf.pass_.GetPassProfile").set_body_typed([]() {
+  return PassProfiler::Get()->GetProfile();
+});
+
+TVM_REGISTER_PASS_CONFIG_OPTION("raf.pass_manager.profile", Bool);
+
 TVM_STATIC_IR_FUNCTOR(ReprPrinter, vtable)
     .set_dispatch<RAFSequentialNode>([](const ObjectRef& ref, ReprPrinter* p) {
       auto* node = static_cast<const RAFSequentialNode*>(ref.get());
@@ -8,6 +8,7 @@
  * \brief Type inference pass
  */
 
+#include <algorithm>
 #include <tvm/ir/module.h>
 #include <tvm/ir/type_functor.h>
 #include <tvm/tir/op.h>
@@ -43,7 +44,7 @@ class TypeInferencer : public ExprMutator {
   RAF_NODE_NOT_IMPL(RefCreateNode)
 
  public:
-  TypeInferencer(IRModule& mod) : mod_(mod) {
+  TypeInferencer(IRModule& mod, bool incremental = false) : mod_(mod), incremental_(incremental) {
   }
 
   Type GetValueType(const Value& v) {
@@ -62,6 +63,9 @@ class TypeInferencer : public ExprMutator {
       } else {
         var->checked_type_ = IncompleteType(kType);
       }
+      if (incremental_) {
+        changed_vars_.insert(var.get());
+      }
     }
     return var;
   }
@@ -121,10 +125,7 @@ class TypeInferencer : public ExprMutator {
     // they have already been evaluated/constant-folded.
     // Therefore it is essential to deal with both cases in their declare functions.
 
-    // TODO(@hgt312): refactor concatenate_dx be a base op and only use types
-    static std::unordered_set<std::string> shape_list{
-        "raf.op.shape", "raf.op.get_reduce_axis", "raf.op.get_kept_dims", "raf.op.concatenate_dx"};
-    if (opn && shape_list.count(opn->name)) {
+    if (opn && IsShapeOp(opn)) {
       CallValues call_values = SchemaToValue(args, GetRef<Op>(opn));
       declare_op[GetRef<Op>(opn)](call_values);
       if (call_values->out.defined()) {
@@ -327,6 +328,15 @@ class TypeInferencer : public ExprMutator {
       // caller.
       auto fn_node = value.as<FunctionNode>();
       bool infer_body = !fn_node || !fn_node->HasNonzeroAttr(attr::kPrimitive);
+
+      // In the incremental mode, keep the checked types of the bindings that are not changed.
+      if (incremental_ && infer_body && IsTypeClean(var, ovalue)) {
+        this->memo_[ovalue] = ovalue;
+        const VarNode* v = ovalue.as<VarNode>();
+        var_value_map_[var.get()] = (v && var_value_map_.count(v)) ? var_value_map_[v] : ovalue;
+        return;
+      }
+
       if (infer_body) {
         value = VisitExpr(ovalue);
       }
@@ -345,6 +355,11 @@ class TypeInferencer : public ExprMutator {
 
       // If the binded primitive function has not been inferred, then it does not have the type yet.
       if (infer_body) {
+        // The dependants of a var have to be re-inferred if its type is changed.
+        if (incremental_ && (!var->checked_type_.defined() ||
+                             !tvm::StructuralEqual()(var->checked_type_, value->checked_type()))) {
+          changed_vars_.insert(var.get());
+        }
         var->checked_type_ = value->checked_type();
       }
     };
@@ -430,7 +445,63 @@ class TypeInferencer : public ExprMutator {
   }
 
  private:
+  /*! \brief Whether the op folds shape-related values into constants during type inference. */
+  static bool IsShapeOp(const OpNode* op) {
+    // TODO(@hgt312): refactor concatenate_dx be a base op and only use types
+    static std::unordered_set<std::string> shape_list{
+        "raf.op.shape", "raf.op.get_reduce_axis", "raf.op.get_kept_dims", "raf.op.concatenate_dx"};
+    return shape_list.count(op->name) > 0;
+  }
+
+  /*!
+   * \brief Check whether the checked type of a let binding is still valid, i.e., the binding
+   * itself has been typed, and none of the vars it uses has been (re-)typed in this run. Passes
+   * declare the changed bindings by leaving their checked_type_ undefined, which is the case for
+   * all newly created nodes. Only the simple bindings of the ANF are kept. Others, such as
+   * closures and control flows, are always re-inferred.
+   * \param var The let var.
+   * \param value The bound value.
+   * \return Whether the types of the binding can be kept.
+   */
+  bool IsTypeClean(const Var& var, const Expr& value) {
+    static const Op& invoke_op = Op::Get("raf.op.vm.invoke_op");
+    auto is_typed = [](const Expr& expr) {
+      return expr->checked_type_.defined() &&
+             !expr->checked_type_->IsInstance<IncompleteTypeNode>();
+    };
+    if (!is_typed(var) || !is_typed(value)) {
+      return false;
+    }
+    auto is_clean_arg = [this, &is_typed](const Expr& arg) {
+      if (arg->IsInstance<RelayConstantNode>()) {
+        return is_typed(arg);
+      } else if (const auto* var_node = arg.as<VarNode>()) {
+        return is_typed(arg) && changed_vars_.count(var_node) == 0 &&
+               closure_param_map_.count(GetRef<Var>(var_node)) == 0;
+      }
+      return false;
+    };
+    if (const auto* call = value.as<CallNode>()) {
+      const auto* opn = call->op.as<OpNode>();
+      if (!opn || GetRef<Op>(opn) == invoke_op || IsShapeOp(opn)) {
+        return false;
+      }
+      return std::all_of(call->args.begin(), call->args.end(), is_clean_arg);
+    } else if (const auto* tuple = value.as<TupleNode>()) {
+      return std::all_of(tuple->fields.begin(), tuple->fields.end(), is_clean_arg);
+    } else if (const auto* tgi = value.as<TupleGetItemNode>()) {
+      return is_clean_arg(tgi->tuple);
+    } else if (value->IsInstance<VarNode>()) {
+      return is_clean_arg(value);
+    }
+    return false;
+  }
+
   IRModule mod_;
+  /*! \brief Whether to keep the checked types of unchanged bindings. */
+  bool incremental_;
+  /*! \brief The vars whose types are (re-)inferred in this run. */
+  std::unordered_set<const VarNode*> changed_vars_;
   /*! \brief The var_value_map_ is used to track Let binding Expr.
    * E.g. Let %a = %b; Let %c = some_op(%a). The var_value_map_ will map %b to some_op.
    */
@@ -612,12 +683,16 @@ void AddGlobalTypes(ir::IRModule mod) {
 }
 
 Pass InferType() {
+  return InferType(false);
+}
+
+Pass InferType(bool incremental) {
   return CreateModulePass(
       [=](IRModule mod, const PassContext& pass_ctx) {
         DLOG(INFO) << "pass::InferType";
         ir::IRModule updated_mod = ir::IRModule(mod->functions);
         AddGlobalTypes(updated_mod);
-        auto ti = type_infer::TypeInferencer(updated_mod);
+        auto ti = type_infer::TypeInferencer(updated_mod, incremental);
         for (auto kv : updated_mod->functions) {
           if (kv.second.as<ir::FunctionNode>()) {
             auto func = tvm::runtime::Downcast<ir::Function>(ti.VisitExpr(kv.second));
@@ -675,7 +750,11 @@ Expr InferTypeWithModule(const Expr& expr, const IRModule& m) {
   return ret;
 }
 
-RAF_REGISTER_GLOBAL("raf.pass_.InferType").set_body_typed([]() { return InferType(); });
+RAF_REGISTER_GLOBAL("raf.pass_.InferType")
+    .set_body([](tvm::runtime::TVMArgs args, tvm::runtime::TVMRetValue* ret) {
+      bool incremental = (args.size() >= 1) ? args[0] : false;
+      *ret = InferType(incremental);
+    });
 
 }  // namespace pass
 }  // namespace raf
@@ -12,23 +12,43 @@
 #include "raf/ir.h"
 #include "../op/dialect/tvm/tvm_utils.h"
 #include "../requests.h"
+#include <tvm/runtime/ndarray.h>
+#include <tvm/runtime/threading_backend.h>
 #include <chrono>
+#include <fstream>
+#include <iomanip>
+#include <sstream>
 
 namespace raf {
 namespace op_profiler {
 
+using namespace raf::ir;
 using namespace raf::op;
 using namespace raf::value;
 
+/*! \brief The header of the on-disk latency database. */
+static const char* kDBHeader = "raf-op-latency-db";
+
+/*! \brief Attach the database specified by RAF_OP_PROFILER_DB, if any, to the profiler. */
+static OpProfiler* AttachEnvDB(OpProfiler* profiler) {
+  const char* path = getenv("RAF_OP_PROFILER_DB");
+  if (path != nullptr && strlen(path) > 0) {
+    profiler->AttachDB(path);
+  }
+  return profiler;
+}
+
 OpProfiler* OpProfiler::Get(const Device& device) {
   CHECK_EQ(device.device_id(), 0) << "Multi-device profiling is not supported yet";
   if (device.device_type() == DevType::kCPU()) {
     static CPUOpProfiler profiler = CPUOpProfiler(device);
-    return &profiler;
+    static OpProfiler* ret = AttachEnvDB(&profiler);
+    return ret;
   } else if (device.device_type() == DevType::kCUDA()) {
 #ifdef RAF_USE_CUDA
     static CUDAOpProfiler profiler = CUDAOpProfiler(device);
-    return &profiler;
+    static OpProfiler* ret = AttachEnvDB(&profiler);
+    return ret;
 #else
     LOG(FATAL) << "CUDA is not enabled";
 #endif
@@ -110,7 +130,8 @@ std::pair<std::vector<float>, float> OpProfiler::ProfileOpGroup(const std::vecto
                                                                 int32_t warmup, int32_t exec_number,
                                                                 int32_t repeat) {
   // Check cache and skip profiling if hit.
-  auto key = HashKeyToStr(HashGroup(ops, stream_ids) << warmup << exec_number << repeat);
+  auto key = HashKeyToStr(HashGroup(ops, stream_ids) << DeviceSignature() << warmup << exec_number
+                                                      << repeat);
 
   // Directly return the profiled latency if cache hit.
   if (latency_and_workspace_size_cache_.count(key) > 0) {
@@ -136,6 +157,7 @@ std::pair<std::vector<float>, float> OpProfiler::ProfileOpGroup(const std::vecto
   // Add the result to the cache.
   latency_and_workspace_size_cache_[key] =
       std::move(std::make_pair(std::move(cost), total_workspace_size));
+  AppendToDB(key);
   return latency_and_workspace_size_cache_[key];
 }
 
@@ -146,7 +168,8 @@ std::pair<std::vector<float>, float> OpProfiler::ProfileOp(const Expr& op, int32
     auto call = GetRef<Call>(call_node);
     auto call_hash_key = HashCall(call);
     auto call_key_str = HashKeyToStr(call_hash_key);
-    auto key = HashKeyToStr(call_hash_key << warmup << exec_number << repeat);
+    auto key =
+        HashKeyToStr(call_hash_key << DeviceSignature() << warmup << exec_number << repeat);
 
     // Directly return the profiled latency if cache hit.
     if (latency_and_workspace_size_cache_.count(key) > 0) {
@@ -167,6 +190,7 @@ std::pair<std::vector<float>, float> OpProfiler::ProfileOp(const Expr& op, int32
     // Add the profiled cost to the cache.
     latency_and_workspace_size_cache_[key] =
         std::move(std::make_pair(std::move(cost), workspace_size));
+    AppendToDB(key);
     return latency_and_workspace_size_cache_[key];
   }
 
@@ -175,6 +199,239 @@ std::pair<std::vector<float>, float> OpProfiler::ProfileOp(const Expr& op, int32
   return std::make_pair(std::vector<float>(repeat, 0.0), 0.0f);
 }
 
+/*! \brief Encode a byte string cache key to a hex string. */
+static std::string EncodeKey(const std::string& key) {
+  std::ostringstream os;
+  os << std::hex << std::setfill('0');
+  for (unsigned char c : key) {
+    os << std::setw(2) << static_cast<int>(c);
+  }
+  return os.str();
+}
+
+/*! \brief Decode a hex string to a byte string cache key. Return false if it is malformed. */
+static bool DecodeKey(const std::string& hex, std::string* key) {
+  if (hex.size() % 2 != 0) {
+    return false;
+  }
+  key->clear();
+  for (size_t i = 0; i < hex.size(); i += 2) {
+    char* end = nullptr;
+    std::string byte = hex.substr(i, 2);
+    long val = strtol(byte.c_str(), &end, 16);  // NOLINT(runtime/int)
+    if (*end != '\0') {
+      return false;
+    }
+    key->push_back(static_cast<char>(val));
+  }
+  return true;
+}
+
+/*!
+ * \brief Format one entry of the database. Each line is
+ * "<hex key>\t<workspace size>\t<latency 0>,<latency 1>,...".
+ */
+static std::string FormatEntry(const std::string& key,
+                               const std::pair<std::vector<float>, int64_t>& entry) {
+  std::ostringstream os;
+  os << EncodeKey(key) << "\t" << entry.second << "\t";
+  os << std::setprecision(9);
+  for (size_t i = 0; i < entry.first.size(); ++i) {
+    os << (i > 0 ? "," : "") << entry.first[i];
+  }
+  return os.str();
+}
+
+/*! \brief Parse one entry of the database. Return false if it is malformed. */
+static bool ParseEntry(const std::string& line, std::string* key,
+                       std::pair<std::vector<float>, int64_t>* entry) {
+  std::istringstream is(line);
+  std::string hex, workspace, latencies;
+  if (!std::getline(is, hex, '\t') || !std::getline(is, workspace, '\t') ||
+      !std::getline(is, latencies) || !DecodeKey(hex, key)) {
+    return false;
+  }
+  try {
+    entry->second = std::stoll(workspace);
+    entry->first.clear();
+    std::istringstream lat_is(latencies);
+    std::string lat;
+    while (std::getline(lat_is, lat, ',')) {
+      entry->first.push_back(std::stof(lat));
+    }
+  } catch (const std::exception& e) {
+    return false;
+  }
+  return true;
+}
+
+/*!
+ * \brief Check the header of the database.
+ * \return 1 if the version matches, 0 if the file is empty or does not exist, and -1 otherwise.
+ */
+static int CheckDBHeader(std::istream& is, const std::string& path) {
+  std::string header;
+  if (!std::getline(is, header)) {
+    return 0;
+  }
+  std::string expected = std::string(kDBHeader) + " " + std::to_string(kOpProfilerDBVersion);
+  if (header != expected) {
+    LOG(WARNING) << "The op latency database " << path << " has header \"" << header
+                 << "\", but expected \"" << expected << "\". It is invalidated.";
+    return -1;
+  }
+  return 1;
+}
+
+int OpProfiler::ImportDB(const std::string& path, bool overwrite) {
+  std::lock_guard<std::mutex> lock(db_mu_);
+  std::ifstream ifs(path);
+  if (!ifs.good() || CheckDBHeader(ifs, path) != 1) {
+    return 0;
+  }
+  int num_loaded = 0;
+  std::string line, key;
+  std::pair<std::vector<float>, int64_t> entry;
+  while (std::getline(ifs, line)) {
+    if (line.empty()) {
+      continue;
+    }
+    if (!ParseEntry(line, &key, &entry)) {
+      // A partially written line, e.g., the process was killed while appending.
+      LOG(WARNING) << "Skip a malformed entry in the op latency database " << path;
+      continue;
+    }
+    if (overwrite || latency_and_workspace_size_cache_.count(key) == 0) {
+      latency_and_workspace_size_cache_[key] = entry;
+      num_loaded++;
+    }
+  }
+  return num_loaded;
+}
+
+int OpProfiler::ExportDB(const std::string& path) {
+  std::lock_guard<std::mutex> lock(db_mu_);
+  std::ofstream ofs(path, std::ios::out | std::ios::trunc);
+  CHECK(ofs.good()) << "Failed to open " << path << " to export the op latency database";
+  ofs << kDBHeader << " " << kOpProfilerDBVersion << "\n";
+  for (const auto& kv : latency_and_workspace_size_cache_) {
+    ofs << FormatEntry(kv.first, kv.second) << "\n";
+  }
+  return latency_and_workspace_size_cache_.size();
+}
+
+int OpProfiler::AttachDB(const std::string& path) {
+  int num_loaded = 0;
+  if (!path.empty()) {
+    std::ifstream ifs(path);
+    if (!ifs.good() || CheckDBHeader(ifs, path) != 1) {
+      // Create the database, or overwrite the one with a mismatched version.
+      std::lock_guard<std::mutex> lock(db_mu_);
+      std::ofstream ofs(path, std::ios::out | std::ios::trunc);
+      CHECK(ofs.good()) << "Failed to create the op latency database " << path;
+      ofs << kDBHeader << " " << kOpProfilerDBVersion << "\n";
+    } else {
+      num_loaded = ImportDB(path);
+    }
+  }
+  std::lock_guard<std::mutex> lock(db_mu_);
+  db_path_ = path;
+  return num_loaded;
+}
+
+void OpProfiler::AppendToDB(const std::string& key) {
+  std::lock_guard<std::mutex> lock(db_mu_);
+  if (db_path_.empty()) {
+    return;
+  }
+  // Write each entry with a single call so that entries appended by concurrent processes
+  // are not interleaved. Duplicated entries are harmless because they are deduplicated on load.
+  std::ofstream ofs(db_path_, std::ios::out | std::ios::app);
+  if (!ofs.good()) {
+    LOG(WARNING) << "Failed to append to the op latency database " << db_path_;
+    return;
+  }
+  ofs << FormatEntry(key, latency_and_workspace_size_cache_[key]) + "\n";
+}
+
+void OpProfiler::HashConstant(HashKey* key, const ObjectRef& value) {
+  if (value.as<TensorValueObj>()) {
+    Value cpu_value = CopyTo(Downcast<Value>(value), Device(DevType::kCPU(), 0));
+    const DLTensor* dlt = Downcast<TensorValue>(cpu_value);
+    CHECK(tvm::runtime::IsContiguous(*dlt)) << "Cannot hash a non-contiguous constant";
+    *key << dlt->dtype << std::vector<int64_t>(dlt->shape, dlt->shape + dlt->ndim);
+    // Hash the bytes with FNV-1a, so that the hash does not depend on the process.
+    const uint8_t* data = static_cast<const uint8_t*>(dlt->data) + dlt->byte_offset;
+    uint64_t nbytes = tvm::runtime::GetDataSize(*dlt);
+    uint64_t hash = 14695981039346656037ULL;
+    for (uint64_t i = 0; i < nbytes; ++i) {
+      hash = (hash ^ data[i]) * 1099511628211ULL;
+    }
+    *key << hash;
+  } else if (const auto* tup = value.as<TupleValueObj>()) {
+    *key << static_cast<int64_t>(tup->fields.size());
+    for (const auto& field : tup->fields) {
+      HashConstant(key, field);
+    }
+  } else {
+    *key << static_cast<uint64_t>(tvm::StructuralHash()(value));
+  }
+}
+
+/*!
+ * \brief Replace the constants in a function by null constants, and collect the replaced ones in
+ * the visiting order.
+ */
+class ConstantExtractor : public ExprMutator {
+ public:
+  Expr VisitExpr_(const RelayConstantNode* node) final {
+    constants.push_back(node->value);
+    return MakeNull();
+  }
+
+  /*! \brief The extracted constant values. */
+  std::vector<ObjectRef> constants;
+};
+
+void OpProfiler::HashFunction(HashKey* key, const Function& func) {
+  ConstantExtractor extractor;
+  Expr stripped = extractor.Mutate(func);
+  *key << static_cast<uint64_t>(tvm::StructuralHash()(stripped));
+  for (const auto& value : extractor.constants) {
+    HashConstant(key, value);
+  }
+}
+
+/*! \brief Return the host CPU model, which determines the ISA of the generated kernels. */
+static std::string HostCPUModel() {
+  // The CPU name that LLVM generates code for, e.g., "skylake-avx512".
+  if (const auto* f = tvm::runtime::Registry::Get("target.llvm_get_system_cpu")) {
+    std::string mcpu = (*f)();
+    if (!mcpu.empty()) {
+      return mcpu;
+    }
+  }
+  std::ifstream ifs("/proc/cpuinfo");
+  std::string line;
+  while (std::getline(ifs, line)) {
+    if (line.compare(0, 10, "model name") == 0) {
+      return line.substr(line.find(':') + 2);
+    }
+  }
+  return "unknown";
+}
+
+std::string CPUOpProfiler::DeviceSignature() {
+  if (device_signature_.empty()) {
+    // The latencies depend on the target options (e.g., -mcpu and -mattr), the CPU model,
+    // and the number of threads that the kernels run with.
+    device_signature_ = "cpu " + std::string(device_.tvm_target()->str()) + " " +
+                        HostCPUModel() + " threads=" +
+                        std::to_string(tvm::runtime::threading::MaxConcurrency());
+  }
+  return device_signature_;
+}
+
 std::vector<float> CPUOpProfiler::RunOp(const OpWithDataPtr& op_with_data, int32_t warmup,
                                         int32_t exec_number, int32_t repeat) {
   if (!op_with_data->profilable()) {
@@ -235,6 +492,16 @@ std::vector<float> CPUOpProfiler::RunOpGroup(const std::vector<OpWithDataPtr>& o
 }
 
 #ifdef RAF_USE_CUDA
+std::string CUDAOpProfiler::DeviceSignature() {
+  if (device_signature_.empty()) {
+    cudaDeviceProp prop;
+    CUDA_CALL(cudaGetDeviceProperties(&prop, device_.device_id()));
+    device_signature_ = "cuda " + std::string(prop.name) + " sm_" + std::to_string(prop.major) +
+                        std::to_string(prop.minor);
+  }
+  return device_signature_;
+}
+
 // Run the op on the CUDA device, return the profiled execution time in microseconds
 std::vector<float> CUDAOpProfiler::RunOp(const OpWithDataPtr& op_with_data, int32_t warmup,
                                          int32_t exec_number, int32_t repeat) {
@@ -386,6 +653,21 @@ RAF_REGISTER_GLOBAL("raf.op_profiler.ResetCache").set_body_typed([](const Device
   return profiler->Reset();
 });
 
+RAF_REGISTER_GLOBAL("raf.op_profiler.ImportDB")
+    .set_body_typed([](const Device& device, const std::string& path, bool overwrite) {
+      return OpProfiler::Get(device)->ImportDB(path, overwrite);
+    });
+
+RAF_REGISTER_GLOBAL("raf.op_profiler.ExportDB")
+    .set_body_typed([](const Device& device, const std::string& path) {
+      return OpProfiler::Get(device)->ExportDB(path);
+    });
+
+RAF_REGISTER_GLOBAL("raf.op_profiler.AttachDB")
+    .set_body_typed([](const Device& device, const std::string& path) {
+      return OpProfiler::Get(device)->AttachDB(path);
+    });
+
 RAF_REGISTER_GLOBAL("raf.op_profiler.GetCacheSize").set_body_typed([](const Device& device) {
   auto profiler = OpProfiler::Get(device);
   return profiler->GetLatencyCacheSize();
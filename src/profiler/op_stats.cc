@@ -0,0 +1,208 @@
+/*
+ * Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+ * SPDX-License-Identifier: Apache-2.0
+ */
+
+/*!
+ * \file src/profiler/op_stats.cc
+ * \brief Aggregated per-op statistics.
+ */
+#include <algorithm>
+#include <cmath>
+#include <sstream>
+#include <thread>
+#include "raf/registry.h"
+#include "raf/op_stats.h"
+
+namespace raf {
+namespace profiler {
+
+int LatencyHistogram::BucketIndex(uint64_t latency_ns) {
+  if (latency_ns < kSubBuckets) {
+    return static_cast<int>(latency_ns);
+  }
+  int exponent = 63 - __builtin_clzll(latency_ns);
+  if (exponent >= kMaxExponent) {
+    return kNumBuckets - 1;
+  }
+  int sub = static_cast<int>((latency_ns >> (exponent - kSubBucketBits)) & (kSubBuckets - 1));
+  return (exponent - kSubBucketBits + 1) * kSubBuckets + sub;
+}
+
+uint64_t LatencyHistogram::BucketLowerBound(int index) {
+  if (index < kSubBuckets) {
+    return index;
+  }
+  int exponent = index / kSubBuckets + kSubBucketBits - 1;
+  uint64_t sub = index % kSubBuckets;
+  return (1ULL << exponent) + (sub << (exponent - kSubBucketBits));
+}
+
+void LatencyHistogram::Add(uint64_t latency_ns) {
+  counts_[BucketIndex(latency_ns)]++;
+  total_count_++;
+}
+
+uint64_t LatencyHistogram::Percentile(double p) const {
+  if (total_count_ == 0) {
+    return 0;
+  }
+  uint64_t rank = static_cast<uint64_t>(std::ceil(p / 100.0 * total_count_));
+  rank = std::min(std::max(rank, static_cast<uint64_t>(1)), total_count_);
+  uint64_t seen = 0;
+  for (int i = 0; i < kNumBuckets; ++i) {
+    seen += counts_[i];
+    if (seen >= rank) {
+      uint64_t lower = BucketLowerBound(i);
+      uint64_t width = (i + 1 < kNumBuckets) ? BucketLowerBound(i + 1) - lower : 0;
+      return lower + width / 2;
+    }
+  }
+  return BucketLowerBound(kNumBuckets - 1);
+}
+
+OpStats::OpStats() {
+}
+
+OpStats* OpStats::Get() {
+  static OpStats stats;
+  return &stats;
+}
+
+void OpStats::SetEnabled(bool enabled) {
+  std::lock_guard<std::mutex> lock(mu_);
+  if (enabled && ring_ == nullptr) {
+    ring_.reset(new Slot[kCapacity]);
+    for (size_t i = 0; i < kCapacity; ++i) {
+      ring_[i].seq.store(i, std::memory_order_relaxed);
+    }
+  }
+  // The release store publishes the ring buffer to the threads that observe the flag.
+  enabled_.store(enabled, std::memory_order_release);
+}
+
+int OpStats::Register(const std::string& name, const std::string& shape_key,
+                      int64_t bytes_per_call) {
+  std::lock_guard<std::mutex> lock(mu_);
+  std::string key = name + "|" + shape_key;
+  auto it = entry_ids_.find(key);
+  if (it != entry_ids_.end()) {
+    return it->second;
+  }
+  int entry_id = entries_.size();
+  entries_.emplace_back();
+  entries_.back().name = name;
+  entries_.back().shape_key = shape_key;
+  entries_.back().bytes_per_call = bytes_per_call;
+  entry_ids_.emplace(std::move(key), entry_id);
+  return entry_id;
+}
+
+void OpStats::Record(int entry_id, uint64_t latency_ns) {
+  // A bounded multi-producer queue: a slot is free for position pos when its sequence is pos, and
+  // holds a committed record when its sequence is pos + 1.
+  uint64_t pos = head_.load(std::memory_order_relaxed);
+  while (true) {
+    Slot& slot = ring_[pos & (kCapacity - 1)];
+    uint64_t seq = slot.seq.load(std::memory_order_acquire);
+    int64_t diff = static_cast<int64_t>(seq) - static_cast<int64_t>(pos);
+    if (diff == 0) {
+      if (head_.compare_exchange_weak(pos, pos + 1, std::memory_order_relaxed)) {
+        slot.entry_id = entry_id;
+        slot.latency_ns = latency_ns;
+        slot.seq.store(pos + 1, std::memory_order_release);
+        return;
+      }
+    } else if (diff < 0) {
+      // The ring buffer is full. Aggregate the committed records to make room.
+      {
+        std::lock_guard<std::mutex> lock(mu_);
+        Drain();
+      }
+      std::this_thread::yield();
+      pos = head_.load(std::memory_order_relaxed);
+    } else {
+      pos = head_.load(std::memory_order_relaxed);
+    }
+  }
+}
+
+void OpStats::Drain() {
+  if (ring_ == nullptr) {
+    return;
+  }
+  while (true) {
+    Slot& slot = ring_[tail_ & (kCapacity - 1)];
+    if (slot.seq.load(std::memory_order_acquire) != tail_ + 1) {
+      // The record is not committed yet.
+      break;
+    }
+    if (slot.entry_id >= 0 && slot.entry_id < static_cast<int>(entries_.size())) {
+      auto& entry = entries_[slot.entry_id];
+      entry.count++;
+      entry.total_ns += slot.latency_ns;
+      entry.min_ns = std::min(entry.min_ns, slot.latency_ns);
+      entry.max_ns = std::max(entry.max_ns, slot.latency_ns);
+      entry.histogram.Add(slot.latency_ns);
+    } else {
+      num_dropped_.fetch_add(1, std::memory_order_relaxed);
+    }
+    slot.seq.store(tail_ + kCapacity, std::memory_order_release);
+    tail_++;
+  }
+}
+
+void OpStats::Reset() {
+  std::lock_guard<std::mutex> lock(mu_);
+  Drain();
+  entries_.clear();
+  entry_ids_.clear();
+  num_dropped_.store(0, std::memory_order_relaxed);
+  generation_.fetch_add(1, std::memory_order_acq_rel);
+}
+
+std::string OpStats::GetStats() {
+  std::lock_guard<std::mutex> lock(mu_);
+  Drain();
+  auto to_us = [](uint64_t ns) { return ns / 1000.0; };
+  std::ostringstream os;
+  os << "{\"dropped\": " << num_dropped() << ", \"entries\": [";
+  bool first = true;
+  for (size_t i = 0; i < entries_.size(); ++i) {
+    const auto& entry = entries_[i];
+    if (entry.count == 0) {
+      continue;
+    }
+    // Clamp the bucket midpoints to the observed range.
+    auto p50 = std::min(std::max(entry.histogram.Percentile(50), entry.min_ns), entry.max_ns);
+    auto p99 = std::min(std::max(entry.histogram.Percentile(99), entry.min_ns), entry.max_ns);
+    if (!first) {
+      os << ", ";
+    }
+    first = false;
+    os << "{\"name\": \"" << entry.name << "\", \"shape_key\": \"" << entry.shape_key
+       << "\", \"count\": " << entry.count << ", \"total_us\": " << to_us(entry.total_ns)
+       << ", \"mean_us\": " << to_us(entry.total_ns) / entry.count
+       << ", \"min_us\": " << to_us(entry.min_ns) << ", \"max_us\": " << to_us(entry.max_ns)
+       << ", \"p50_us\": " << to_us(p50) << ", \"p99_us\": " << to_us(p99)
+       << ", \"bytes\": " << entry.bytes_per_call * static_cast<int64_t>(entry.count) << "}";
+  }
+  os << "]}";
+  return os.str();
+}
+
+RAF_REGISTER_GLOBAL("raf.profiler.EnableOpStats").set_body_typed([]() {
+  OpStats::Get()->SetEnabled(true);
+});
+RAF_REGISTER_GLOBAL("raf.profiler.DisableOpStats").set_body_typed([]() {
+  OpStats::Get()->SetEnabled(false);
+});
+RAF_REGISTER_GLOBAL("raf.profiler.ResetOpStats").set_body_typed([]() {
+  OpStats::Get()->Reset();
+});
+RAF_REGISTER_GLOBAL("raf.profiler.GetOpStats").set_body_typed([]() {
+  return OpStats::Get()->GetStats();
+});
+
+}  // namespace profiler
+}  // namespace raf
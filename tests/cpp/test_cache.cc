@@ -0,0 +1,83 @@
+/*
+ * Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+ * SPDX-License-Identifier: Apache-2.0
+ */
+
+#include <gtest/gtest.h>
+
+#include <raf/cache.h>
+
+using raf::op::CacheEvictPolicy;
+using raf::op::MetaCache;
+
+TEST(MetaCache, Unbounded) {
+  MetaCache<int> cache;
+  for (int i = 0; i < 100; ++i) {
+    cache.Set(std::to_string(i), i);
+  }
+  ASSERT_EQ(cache.Size(), 100);
+  ASSERT_EQ(cache.NumEvicted(), 0);
+  ASSERT_EQ(*cache.Get("42"), 42);
+
+  // Bounding the cache afterwards evicts the least recently used entries.
+  cache.SetLimit(10);
+  ASSERT_EQ(cache.Size(), 10);
+  ASSERT_EQ(cache.NumEvicted(), 90);
+  ASSERT_TRUE(cache.Has("42"));
+  ASSERT_TRUE(cache.Has("99"));
+  ASSERT_FALSE(cache.Has("89"));
+}
+
+TEST(MetaCache, LRU) {
+  MetaCache<int> cache;
+  cache.SetLimit(2, CacheEvictPolicy::kLRU);
+  cache.Set("a", 1);
+  cache.Set("b", 2);
+  ASSERT_EQ(*cache.Get("a"), 1);
+  cache.Set("c", 3);
+  ASSERT_TRUE(cache.Has("a"));
+  ASSERT_FALSE(cache.Has("b"));
+  ASSERT_TRUE(cache.Has("c"));
+  ASSERT_EQ(cache.NumEvicted(), 1);
+}
+
+TEST(MetaCache, LFU) {
+  MetaCache<int> cache;
+  cache.SetLimit(2, CacheEvictPolicy::kLFU);
+  cache.Set("a", 1);
+  cache.Get("a");
+  cache.Get("a");
+  cache.Set("b", 2);
+  cache.Get("b");
+  // The newly added entry is never evicted by itself.
+  cache.Set("c", 3);
+  ASSERT_TRUE(cache.Has("a"));
+  ASSERT_FALSE(cache.Has("b"));
+  ASSERT_TRUE(cache.Has("c"));
+  cache.Set("d", 4);
+  ASSERT_TRUE(cache.Has("a"));
+  ASSERT_FALSE(cache.Has("c"));
+  ASSERT_TRUE(cache.Has("d"));
+}
+
+TEST(MetaCache, Add) {
+  MetaCache<int> cache;
+  bool added = false;
+  ASSERT_EQ(*cache.Add("a", 1, &added), 1);
+  ASSERT_TRUE(added);
+  // The existing value is kept and returned.
+  ASSERT_EQ(*cache.Add("a", 2, &added), 1);
+  ASSERT_FALSE(added);
+  ASSERT_EQ(cache.Size(), 1);
+}
+
+TEST(MetaCache, GetAfterEviction) {
+  MetaCache<std::string> cache;
+  cache.SetLimit(1);
+  cache.Set("a", "value of a");
+  auto val = cache.Get("a");
+  // The value outlives its entry.
+  cache.Set("b", "value of b");
+  ASSERT_FALSE(cache.Has("a"));
+  ASSERT_EQ(*val, "value of a");
+}
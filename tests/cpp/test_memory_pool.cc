@@ -63,6 +63,47 @@ TEST(PageUnitPool, CPU) {
   Memory::RemovePool(dev);
 }
 
+TEST(CachingPool, CPU) {
+  Device dev{DevType::kCPU(), 0};
+  Memory::InitPool(dev, "caching_pool");
+  {
+    std::shared_ptr<Memory> result = Memory::Alloc(dev, 0);
+    ASSERT_EQ(result.use_count(), 1);
+    ASSERT_EQ(result->data, nullptr);
+  }
+  for (int memory : {11, 19, 2019, 1024124}) {
+    for (int align : {16, (int)kDefaultMemoryAlignment, 512, 1024, 4096}) {
+      std::shared_ptr<Memory> result = Memory::Alloc(dev, memory, align);
+      ASSERT_EQ(result.use_count(), 1);
+      int64_t address = (int64_t)result->data;
+      ASSERT_EQ(address % align, 0);
+    }
+  }
+  auto pool_size = Memory::GetPoolSize(dev);
+  ASSERT_EQ(pool_size.first, 0);  // No block is used.
+  ASSERT_EQ(pool_size.second, 2);  // All small requests are served by one 2 MB segment.
+
+  // Adjacent blocks are split from the same segment.
+  std::shared_ptr<Memory> a = Memory::Alloc(dev, 1000, 64);
+  std::shared_ptr<Memory> b = Memory::Alloc(dev, 1000, 64);
+  ASSERT_EQ((int64_t)b->data - (int64_t)a->data, 1024);
+  pool_size = Memory::GetPoolSize(dev);
+  ASSERT_EQ(pool_size.first * 1048576.0, 2048);
+
+  // Freed blocks are coalesced, so a larger request reuses their memory.
+  void* addr = a->data;
+  a.reset();
+  b.reset();
+  std::shared_ptr<Memory> c = Memory::Alloc(dev, 2048, 64);
+  ASSERT_EQ(c->data, addr);
+  c.reset();
+
+  // The memory can be released after the pool is removed.
+  std::shared_ptr<Memory> d = Memory::Alloc(dev, 4096, 64);
+  Memory::RemovePool(dev);
+  d.reset();
+}
+
 int main(int argc, char** argv) {
   ::testing::InitGoogleTest(&argc, argv);
   return RUN_ALL_TESTS();
@@ -0,0 +1,140 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+# pylint: disable=protected-access,unused-argument,redefined-outer-name
+import numpy as np
+import pytest
+import raf
+from raf._op import dialect
+from raf.testing import check, randint, randn, with_dialect
+
+
+@pytest.fixture
+def dispatch_decisions():
+    mode = dialect.get_dispatch_mode()
+    cache_limit = raf._ffi.executor.GetInterpreterOpEnvCacheLimit()
+    dialect.clear_dispatch_decisions()
+    # Dispatch every call instead of reusing the OpEnvs cached by the interpreter.
+    raf._ffi.executor.SetInterpreterOpEnvCacheSize(0)
+    yield
+    raf._ffi.executor.SetInterpreterOpEnvCacheSize(cache_limit)
+    dialect.set_dispatch_mode(mode)
+    dialect.clear_dispatch_decisions()
+
+
+def get_decisions(op):
+    return [x for x in dialect.get_dispatch_decisions() if x["op"] == op]
+
+
+def test_cache(dispatch_decisions):
+    dialect.set_dispatch_mode("cache")
+    for _ in range(3):
+        m_x, n_x = randn((4, 4))
+        check(raf.relu(m_x), np.maximum(n_x, 0))
+    decisions = get_decisions("raf.op.relu")
+    assert len(decisions) == 1
+    assert decisions[0]["dialect_op"] == "raf.op.tvm.relu"
+    assert decisions[0]["device"] == "cpu(0)"
+    assert not decisions[0]["latency"]
+
+    # Different shapes.
+    m_x, n_x = randn((2, 3))
+    check(raf.relu(m_x), np.maximum(n_x, 0))
+    assert len(get_decisions("raf.op.relu")) == 2
+
+
+def test_off(dispatch_decisions):
+    dialect.set_dispatch_mode("off")
+    m_x, n_x = randn((4, 4))
+    check(raf.relu(m_x), np.maximum(n_x, 0))
+    assert not get_decisions("raf.op.relu")
+
+    with pytest.raises(ValueError):
+        dialect.set_dispatch_mode("fastest")
+
+
+@pytest.mark.skipif(not raf.build.with_cpu_blas(), reason="CPU BLAS is not enabled")
+@with_dialect(["cpu_blas", "tvm"])
+def test_failed_dialect(dispatch_decisions, tmp_path):
+    dialect.set_dispatch_mode("cache")
+    # CPU BLAS does not support integers, so it is recorded as failed and skipped afterward.
+    for _ in range(2):
+        m_x, n_x = randint((4, 4), low=-8, high=8, dtype="int32")
+        m_y, n_y = randint((4, 4), low=-8, high=8, dtype="int32")
+        check(raf.matmul(m_x, m_y), np.matmul(n_x, n_y))
+    decisions = get_decisions("raf.op.matmul")
+    assert len(decisions) == 1
+    assert decisions[0]["dialect_op"] == "raf.op.tvm.matmul"
+    assert decisions[0]["failed"] == ["raf.op.cpu_blas.matmul"]
+
+    # The failures may be transient, so they are not written to files.
+    path = str(tmp_path / "decisions.db")
+    dialect.export_dispatch_decisions(path)
+    dialect.clear_dispatch_decisions()
+    dialect.import_dispatch_decisions(path)
+    decisions = get_decisions("raf.op.matmul")
+    assert decisions[0]["dialect_op"] == "raf.op.tvm.matmul"
+    assert not decisions[0]["failed"]
+
+
+@pytest.mark.skipif(not raf.build.with_cpu_blas(), reason="CPU BLAS is not enabled")
+def test_measure(dispatch_decisions):
+    dialect.set_dispatch_mode("measure")
+    m_x, n_x = randn((32, 32))
+    m_y, n_y = randn((32, 32))
+    for _ in range(2):
+        check(raf.matmul(m_x, m_y), np.matmul(n_x, n_y), rtol=1e-4, atol=1e-4)
+    decisions = get_decisions("raf.op.matmul")
+    assert len(decisions) == 1
+    latency = decisions[0]["latency"]
+    assert decisions[0]["measured"]
+    assert set(latency.keys()) == {"raf.op.cpu_blas.matmul", "raf.op.tvm.matmul"}
+    assert decisions[0]["dialect_op"] == min(latency, key=latency.get)
+
+
+def test_measure_once(dispatch_decisions):
+    dialect.set_dispatch_mode("measure")
+    # A call is marked as measured even if there is nothing to measure, so that the later calls do
+    # not make the OpEnvs of all dialect ops again.
+    m_x, n_x = randn((4, 4))
+    check(raf.relu(m_x), np.maximum(n_x, 0))
+    expected = get_decisions("raf.op.relu")
+    assert len(expected) == 1
+    assert expected[0]["measured"]
+    check(raf.relu(m_x), np.maximum(n_x, 0))
+    assert get_decisions("raf.op.relu") == expected
+
+
+def test_export_import(dispatch_decisions, tmp_path):
+    dialect.set_dispatch_mode("cache")
+    m_x, n_x = randn((4, 4))
+    check(raf.relu(m_x), np.maximum(n_x, 0))
+    expected = dialect.get_dispatch_decisions()
+    path = str(tmp_path / "decisions.db")
+    assert dialect.export_dispatch_decisions(path) == len(expected)
+
+    dialect.clear_dispatch_decisions()
+    assert not dialect.get_dispatch_decisions()
+    assert dialect.import_dispatch_decisions(path) == len(expected)
+    key = lambda x: x["key"]
+    assert sorted(dialect.get_dispatch_decisions(), key=key) == sorted(expected, key=key)
+    assert dialect.import_dispatch_decisions(path) == 0
+    assert dialect.import_dispatch_decisions(path, overwrite=True) == len(expected)
+
+
+def test_attach_db(dispatch_decisions, tmp_path):
+    dialect.set_dispatch_mode("cache")
+    path = str(tmp_path / "decisions.db")
+    assert dialect.attach_dispatch_db(path) == 0
+    m_x, n_x = randn((4, 4))
+    check(raf.relu(m_x), np.maximum(n_x, 0))
+    dialect.attach_dispatch_db("")
+
+    # The new decisions are appended to the attached database.
+    dialect.clear_dispatch_decisions()
+    assert dialect.import_dispatch_decisions(path) >= 1
+    assert get_decisions("raf.op.relu")
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -1,4 +1,43 @@
 # Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
 # SPDX-License-Identifier: Apache-2.0
 
+import json
+import subprocess
+import sys
+
+import pytest
 import raf  # pylint: disable=unused-import
+
+
+def loaded_modules(stmt):
+    """Run the statement in a fresh process, and return the names of the loaded modules."""
+    stmt += "; import json, sys; print(json.dumps(sorted(sys.modules)))"
+    proc = subprocess.run(
+        [sys.executable, "-c", stmt], stdout=subprocess.PIPE, check=True, universal_newlines=True
+    )
+    return set(json.loads(proc.stdout.splitlines()[-1]))
+
+
+def test_lazy_import():
+    lazy_modules = ["raf.optim", "raf.frontend.pytorch", "raf.utils.tuner", "raf.utils.visualizer"]
+    modules = loaded_modules("import raf")
+    assert "raf" in modules
+    for name in lazy_modules + ["torch", "mxnet"]:
+        assert name not in modules, "%s is imported by `import raf`" % name
+
+    # The lazy submodules are still accessible as attributes.
+    modules = loaded_modules("import raf; raf.optim.SGD; raf.frontend.FrameworkModel")
+    assert "raf.optim" in modules
+    assert "torch" not in modules
+
+
+def test_lazy_schedule_loading():
+    stmt = (
+        "import raf; from tvm import auto_scheduler; "
+        "assert not auto_scheduler.DispatchContext.current.loaded"
+    )
+    subprocess.run([sys.executable, "-c", stmt], check=True)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,51 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+# pylint: disable=protected-access
+import numpy as np
+import pytest
+import raf
+from raf.testing import check, randn
+
+
+@pytest.fixture
+def op_env_cache():
+    raf._ffi.executor.SetInterpreterOpEnvCacheSize(0)
+    raf._ffi.executor.SetInterpreterOpEnvCacheSize(16)
+    yield
+    raf._ffi.executor.SetInterpreterOpEnvCacheSize(1024)
+
+
+def test_op_env_cache(op_env_cache):  # pylint: disable=unused-argument,redefined-outer-name
+    get_size = raf._ffi.executor.GetInterpreterOpEnvCacheSize
+    # The cached OpEnv must run on the new inputs.
+    for _ in range(3):
+        m_x, n_x = randn((4, 4))
+        m_y, n_y = randn((4, 4))
+        check(raf.add(m_x, m_y), n_x + n_y)
+    assert get_size() == 1
+
+    # Different shapes.
+    m_x, n_x = randn((2, 3))
+    m_y, n_y = randn((2, 3))
+    check(raf.add(m_x, m_y), n_x + n_y)
+    assert get_size() == 2
+
+    # Different attributes with the same input and output types.
+    m_x, n_x = randn((4, 4))
+    for _ in range(2):
+        check(raf.transpose(m_x, (0, 1)), n_x)
+        check(raf.transpose(m_x, (1, 0)), np.transpose(n_x, (1, 0)))
+    assert get_size() == 4
+
+
+def test_op_env_cache_bounded(op_env_cache):  # pylint: disable=unused-argument,redefined-outer-name
+    raf._ffi.executor.SetInterpreterOpEnvCacheSize(2)
+    for n in range(1, 5):
+        m_x, n_x = randn((n, 3))
+        check(raf.relu(m_x), np.maximum(n_x, 0))
+    assert raf._ffi.executor.GetInterpreterOpEnvCacheSize() == 2
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,70 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+# pylint: disable=attribute-defined-outside-init,no-self-use
+import numpy as np
+import pytest
+import raf
+from raf._core.device import Device
+from raf._ffi.memory_pool import GetPoolSize, InitPool, RemovePool
+from raf.testing import check, randn, with_seed
+
+
+class MLP(raf.Model):
+    def build(self, num_hiddens):
+        self.w1, _ = randn((num_hiddens, num_hiddens))
+        self.w2, _ = randn((num_hiddens, num_hiddens))
+
+    @raf.model.trace
+    def forward(self, x):
+        y = raf.relu(raf.matmul(x, self.w1))
+        y = raf.relu(raf.matmul(y, self.w2))
+        return raf.add(y, x)
+
+
+def _ref_mlp(model, n_x):
+    n_y = np.maximum(n_x @ model.w1.numpy(), 0)
+    n_y = np.maximum(n_y @ model.w2.numpy(), 0)
+    return n_y + n_x
+
+
+def get_pool_size(device):
+    """Return the sizes in MBs of the used chunks and the pool."""
+    return [x.value for x in GetPoolSize(Device(device))]
+
+
+@pytest.mark.parametrize("pool_name", ["no_pool", "page_unit_pool", "caching_pool"])
+@with_seed(0)
+def test_dynamic_shape_allocation(pool_name):
+    """Run a model with varying batch sizes, which is allocation-heavy because buffers of
+    different sizes are requested and released on every run."""
+    device = "cpu"
+    InitPool(Device(device), pool_name)
+    try:
+        num_hiddens = 256
+        model = MLP(num_hiddens)
+        model.infer_mode()
+        batch_sizes = np.random.randint(1, 64, size=20)
+
+        def run():
+            for batch_size in batch_sizes:
+                m_x, n_x = randn((batch_size, num_hiddens), device=device)
+                check(model(m_x), _ref_mlp(model, n_x), rtol=1e-4, atol=1e-4)
+
+        used, _ = get_pool_size(device)
+        run()
+        # All the buffers of the runs are released.
+        assert get_pool_size(device)[0] == used
+        if pool_name == "caching_pool":
+            # The released buffers are cached, so the same runs do not grow the pool.
+            _, reserved = get_pool_size(device)
+            assert reserved > used
+            run()
+            assert get_pool_size(device) == [used, reserved]
+    finally:
+        # Switch back to the default pool.
+        RemovePool(Device(device))
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -37,6 +37,34 @@ def test_move_device():
     np.testing.assert_allclose(np.array([1, 2, 3], dtype="float32"), a.numpy())
 
 
+@pytest.mark.parametrize("dtype", ["float32", "float16", "int32"])
+def test_cast_dtype(dtype):
+    n_x = np.array([1, 2, 3], dtype="float32")
+    a = raf.array(n_x)
+    a.requires_grad = True
+    b = a.to(dtype=dtype)
+    assert b.dtype == dtype
+    assert b.device == a.device
+    assert b.requires_grad
+    np.testing.assert_allclose(n_x.astype(dtype), b.numpy())
+
+    # The result is a new array even if nothing changes.
+    c = a.to(device="cpu", dtype="float32")
+    assert c._ndarray__value.data != a._ndarray__value.data  # pylint: disable=protected-access
+    np.testing.assert_allclose(n_x, c.numpy())
+
+
+@pytest.mark.skipif(not raf.build.with_cuda(), reason="CUDA is not enabled")
+def test_move_device_and_cast():
+    a = raf.array([1, 2, 3], dtype="float32")
+    b = a.to(device="cuda", dtype="float16")
+    assert b.device.startswith("cuda")
+    assert b.dtype == "float16"
+    c = b.to(device="cpu")
+    assert c.device == "cpu"
+    np.testing.assert_allclose(np.array([1, 2, 3], dtype="float16"), c.numpy())
+
+
 def test_bf16_ndarray():
     def np_float2np_bf16(arr):
         """Convert a numpy array of float to a numpy array
@@ -20,6 +20,47 @@ def test_raf_array_cuda():
     assert np.all(array == [1, 2, 3])
 
 
+def test_numpy_no_copy():
+    m_x = raf.array([1, 2, 3], dtype="float32", device="cpu")
+    n_x = m_x.numpy()
+    n_y = m_x.numpy(copy=False)
+    raf.add(m_x, m_x, out=m_x)
+    # The copied array keeps the old values, and the shared one sees the in-place update.
+    np.testing.assert_allclose(n_x, [1, 2, 3])
+    if hasattr(np, "from_dlpack"):
+        np.testing.assert_allclose(n_y, [2, 4, 6])
+    else:
+        np.testing.assert_allclose(n_y, [1, 2, 3])
+
+
+def test_dlpack_numpy():
+    n_x = np.arange(6, dtype="float32").reshape((2, 3))
+    m_x = raf.from_dlpack(n_x)
+    assert m_x.shape == (2, 3)
+    assert m_x.dtype == "float32"
+    # The data is shared with the NumPy array.
+    n_x[0, 0] = 10
+    np.testing.assert_allclose(m_x.numpy(), n_x)
+
+    if hasattr(np, "from_dlpack"):
+        n_y = np.from_dlpack(m_x)
+        n_y[1, 1] = 20
+        np.testing.assert_allclose(m_x.numpy(), n_y)
+        np.testing.assert_allclose(n_x, n_y)
+
+
+def test_dlpack_torch():
+    torch = pytest.importorskip("torch")
+    t_x = torch.arange(6, dtype=torch.float32).reshape((2, 3))
+    m_x = raf.from_dlpack(t_x)
+    t_x[0, 0] = 10
+    np.testing.assert_allclose(m_x.numpy(), t_x.numpy())
+
+    t_y = torch.from_dlpack(m_x) if hasattr(torch, "from_dlpack") else None
+    if t_y is not None:
+        t_y[1, 1] = 20
+        np.testing.assert_allclose(m_x.numpy(), t_y.numpy())
+
+
 if __name__ == "__main__":
-    test_raf_array_cpu()
-    test_raf_array_cuda()
+    pytest.main([__file__])
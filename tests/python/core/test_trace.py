@@ -202,5 +202,89 @@ def test_mutate_grad():
     assert len(ret_type.fields) == 2
 
 
+def test_trace_cache_by_signature():
+    class Model(raf.Model):
+        def build(self):
+            pass
+
+        @raf.model.trace(cache_size=2)
+        def forward(self, x):  # pylint: disable=no-self-use
+            return raf.relu(x)
+
+    def get_cache(model):
+        return raf._core.cacher.get_cache(
+            model, "trace@" + raf._core.core_utils.get_func_name(Model.forward.__wrapped__), None
+        )
+
+    model = Model()
+    for shape in [(2, 3), (4, 3), (2, 3)]:
+        m_x, n_x = randn(shape)
+        check(model(m_x), np.maximum(n_x, 0))
+    cache = get_cache(model)
+    assert len(cache) == 2
+    # The trace of the least recently used signature is evicted.
+    m_x, n_x = randn((8, 3))
+    check(model(m_x), np.maximum(n_x, 0))
+    shapes = [key[0][1][1] for key in cache.records.keys()]
+    assert shapes == [(2, 3), (8, 3)]
+    # Different dtypes are traced separately.
+    m_x, n_x = randn((8, 3), dtype="float64")
+    check(model(m_x), np.maximum(n_x, 0))
+    assert len(cache) == 2
+    # Mutating the model drops all traces.
+    model.infer_mode()
+    assert get_cache(model) is None
+
+
+def test_trace_shape_bucketing():
+    class Model(raf.Model):
+        def build(self):
+            pass
+
+        @raf.model.trace(bucket=raf.model.pow2_bucket(axes=(0,)))
+        def forward(self, x):  # pylint: disable=no-self-use
+            return raf.relu(x)
+
+    assert raf.model.pow2_bucket(axes=(0, 1))((5, 3, 7)) == (8, 4, 7)
+    model = Model()
+    for batch_size in [5, 6, 7, 8]:
+        m_x, n_x = randn((batch_size, 3))
+        # The outputs are sliced back to the real batch size.
+        m_y = model(m_x)
+        assert m_y.shape == (batch_size, 3)
+        check(m_y, np.maximum(n_x, 0))
+    cache = raf._core.cacher.get_cache(
+        model, "trace@" + raf._core.core_utils.get_func_name(Model.forward.__wrapped__), None
+    )
+    assert len(cache) == 1
+
+    # The compiled executables are bucketed in the same way.
+    model.infer_mode()
+    model.compile("cpu")
+    for batch_size in [5, 6]:
+        m_x, n_x = randn((batch_size, 3))
+        m_y = model(m_x)
+        assert m_y.shape == (batch_size, 3)
+        check(m_y, np.maximum(n_x, 0))
+    cache = raf._core.cacher.get_cache(
+        model, "trace@" + raf._core.core_utils.get_func_name(Model.forward.__wrapped__), None
+    )
+    assert len(cache.executors) == 1
+
+
+def test_trace_shape_bucketing_conflict():
+    class Model(raf.Model):
+        def build(self):
+            pass
+
+        @raf.model.trace(bucket=raf.model.pow2_bucket(axes=(0,)))
+        def forward(self, x, y):  # pylint: disable=no-self-use
+            return raf.add(x, y)
+
+    # Both inputs are padded to 8 rows, so the real batch size of the outputs is ambiguous.
+    with pytest.raises(ValueError):
+        Model()(randn((5, 3))[0], randn((6, 3))[0])
+
+
 if __name__ == "__main__":
     pytest.main([__file__])
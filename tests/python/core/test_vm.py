@@ -1,10 +1,12 @@
 # Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
 # SPDX-License-Identifier: Apache-2.0
 
+import threading
+
 import pytest
 import numpy as np
 import raf
-from raf._core.executor import VMExecutor
+from raf._core.executor import VMExecutor, BatchingExecutor
 from raf.testing import check, compile_vm_model, run_vm_model, get_arr_addr, randn
 from raf.testing import get_testable_devices
 
@@ -218,5 +220,254 @@ def test_reshape():
     check(out, ref_out)
 
 
+def test_static_invoke_jit():
+    # pylint: disable=protected-access, no-self-use
+    class StaticModel(raf.Model):
+        def build(self):
+            pass
+
+        @raf.model.trace
+        def forward(self, x):
+            y = raf.relu(x)
+            return raf.add(y, x)
+
+    class DynamicModel(raf.Model):
+        def build(self):
+            pass
+
+        @raf.model.trace
+        def forward(self, x):
+            y = raf.argwhere(x)
+            y = raf.split(y, 2)
+            y = raf.add(y[0], y[1])
+            return raf.abs(y)
+
+    device = "cpu"
+    m_x, _ = randn((3, 4), device=device)
+    with raf.ir.PassContext(disabled_pass=["FuseTVM", "FuseDialect"]):
+        bytecode = compile_vm_model(StaticModel(), device, [m_x])
+    assert bytecode.count("invoke_jit") == 2
+    assert bytecode.count("(static)") == 2
+
+    model = DynamicModel()
+    m_x = raf.array(np.ones((2, 2)).astype("float32"), device=device)
+    with raf.ir.PassContext(disabled_pass=["FuseTVM", "FuseDialect"]):
+        bytecode = compile_vm_model(model, device, [m_x])
+    assert bytecode.count("(static)") < bytecode.count("invoke_jit")
+
+    # The OpEnvs of the dynamic instructions are looked up by the input shapes.
+    mod = model._internal(m_x).mod
+    with raf.ir.PassContext(disabled_pass=["FuseTVM", "FuseDialect"]):
+        executor = VMExecutor(mod, device)
+    vm = executor.make_executor()
+    for n_x in [[[1, 1], [1, 1]], [[1, 0], [0, 1]], [[1, 1], [1, 1]]]:
+        m_x = raf.array(np.array(n_x).astype("float32"), device=device)
+        check(vm(m_x), model(m_x))
+
+
+@pytest.mark.parametrize("num_threads", [1, 4])
+def test_warmup(num_threads):
+    # pylint: disable=protected-access, no-self-use
+    class Model(raf.Model):
+        def build(self):
+            pass
+
+        @raf.model.trace
+        def forward(self, x):
+            y = raf.matmul(x, x)
+            y = raf.relu(y)
+            y = raf.softmax(y)
+            return raf.add(y, x)
+
+    device = "cpu"
+    model = Model()
+    # Use a distinct shape for each case so that the kernels are not in the cache.
+    shape = (11 + num_threads, 11 + num_threads)
+    m_x, _ = randn(shape, device=device)
+    mod = model._internal(m_x).mod
+    with raf.ir.PassContext(disabled_pass=["FuseTVM", "FuseDialect"]):
+        executor = VMExecutor(mod, device)
+        assert executor.precompile(m_x, num_threads=num_threads) == 4
+        # The OpEnvs are cached, so there is nothing to dispatch.
+        assert executor.precompile(m_x, num_threads=num_threads) == 0
+        num_miss = raf._ffi.cache.DumpTVMCacheMetric("tvm_cpu")["CacheMiss"]
+        m_y = executor.make_executor()(m_x)
+        assert raf._ffi.cache.DumpTVMCacheMetric("tvm_cpu")["CacheMiss"] == num_miss
+    check(m_y, model(m_x))
+
+
+def test_warmup_dynamic_shape():
+    # pylint: disable=protected-access, no-self-use
+    class Model(raf.Model):
+        def build(self):
+            pass
+
+        @raf.model.trace
+        def forward(self, x):
+            return raf.abs(raf.argwhere(x))
+
+    device = "cpu"
+    model = Model()
+    m_x = raf.array(np.ones((2, 2)).astype("float32"), device=device)
+    mod = model._internal(m_x).mod
+    with raf.ir.PassContext(disabled_pass=["FuseTVM", "FuseDialect"]):
+        executor = VMExecutor(mod, device)
+        # The walk cannot compute the dynamic shapes without executing the ops.
+        with pytest.raises(ValueError):
+            executor.precompile(m_x)
+        check(executor.make_executor()(m_x), model(m_x))
+
+
+def test_warmup_repeated_layers():
+    # pylint: disable=protected-access, no-self-use
+    num_layers = 8
+
+    class Model(raf.Model):
+        def build(self):
+            pass
+
+        @raf.model.trace
+        def forward(self, x):
+            for _ in range(num_layers):
+                x = raf.softmax(raf.matmul(x, x))
+            return x
+
+    device = "cpu"
+    model = Model()
+    # The identical layers share the kernels, which are built concurrently by the threads.
+    m_x, _ = randn((9, 9), device=device)
+    mod = model._internal(m_x).mod
+    with raf.ir.PassContext(opt_level=3):
+        executor = VMExecutor(mod, device)
+        assert executor.precompile(m_x, num_threads=4) >= num_layers
+        assert executor.precompile(m_x, num_threads=4) == 0
+        num_miss = raf._ffi.cache.DumpTVMCacheMetric("tvm_cpu")["CacheMiss"]
+        m_y = executor.make_executor()(m_x)
+        assert raf._ffi.cache.DumpTVMCacheMetric("tvm_cpu")["CacheMiss"] == num_miss
+    check(m_y, model(m_x), rtol=1e-4, atol=1e-4)
+
+
+@pytest.mark.parametrize("example", [False, True])
+def test_context_pool(example):
+    # pylint: disable=protected-access, no-self-use
+    class Model(raf.Model):
+        def build(self):
+            pass
+
+        @raf.model.trace
+        def forward(self, x):
+            y = raf.matmul(x, x)
+            y = raf.relu(y)
+            return raf.add(y, x)
+
+    device = "cpu"
+    model = Model()
+    m_xs = [randn((16, 16), device=device)[0] for _ in range(8)]
+    mod = model._internal(m_xs[0]).mod
+    executor = VMExecutor(mod, device)
+    pool = executor.vm.create_pool(2, *([m_xs[0]] if example else []))
+
+    results = [None] * len(m_xs)
+
+    def serve(idx):
+        results[idx] = pool.run(m_xs[idx])
+
+    threads = [threading.Thread(target=serve, args=(i,)) for i in range(len(m_xs))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    for m_x, m_y in zip(m_xs, results):
+        check(m_y, model(m_x))
+
+    # The outputs of the previous runs are still alive, so they must not be overwritten.
+    m_y = pool.run(m_xs[0])
+    check(m_y, model(m_xs[0]))
+    for m_x, m_y in zip(m_xs, results):
+        check(m_y, model(m_x))
+
+
+@pytest.mark.parametrize("buckets", [None, [3, 8]])
+def test_batching_executor(buckets):
+    # pylint: disable=attribute-defined-outside-init, no-self-use
+    class Model(raf.Model):
+        def build(self):
+            self.w = raf.array(np.random.randn(4, 6).astype("float32"))
+
+        @raf.model.trace
+        def forward(self, x):
+            y = raf.matmul(x, self.w)
+            return raf.relu(y), raf.sum(x, axis=1)
+
+    model = Model()
+    model.infer_mode()
+    m_xs = [randn((1 + i % 2, 4))[0] for i in range(10)]
+    with BatchingExecutor(model, "cpu", max_batch_size=8, max_wait_ms=50, buckets=buckets) as ex:
+        futures = [ex.submit(m_x) for m_x in m_xs]
+        results = [future.result() for future in futures]
+        stats = ex.stats()
+    for m_x, (m_y, m_s) in zip(m_xs, results):
+        ref_y, ref_s = model(m_x)
+        check(m_y, ref_y)
+        check(m_s, ref_s)
+    assert stats["num_requests"] == len(m_xs)
+    # The requests are submitted at once, so they are served in batches.
+    assert stats["num_batches"] < len(m_xs)
+    assert 0 < stats["fill_ratio"] <= 1
+
+    with pytest.raises(ValueError):
+        ex.submit(randn((9, 4))[0])
+
+
+def test_batching_executor_close():
+    # pylint: disable=attribute-defined-outside-init, no-self-use
+    class Model(raf.Model):
+        def build(self):
+            pass
+
+        @raf.model.trace
+        def forward(self, x):
+            return raf.relu(x)
+
+    model = Model()
+    model.infer_mode()
+    m_xs = [randn((1, 4))[0] for _ in range(3)]
+    # Close before the batching window expires, so the close is received in the middle of a batch.
+    ex = BatchingExecutor(model, "cpu", max_batch_size=8, max_wait_ms=10000)
+    futures = [ex.submit(m_x) for m_x in m_xs]
+    closer = threading.Thread(target=ex.close, daemon=True)
+    closer.start()
+    closer.join(timeout=60)
+    assert not closer.is_alive()
+    for m_x, future in zip(m_xs, futures):
+        check(future.result(timeout=0), model(m_x))
+    with pytest.raises(RuntimeError):
+        ex.submit(m_xs[0])
+
+    # Every request submitted concurrently with close is either served or rejected.
+    ex = BatchingExecutor(model, "cpu", max_batch_size=8, max_wait_ms=1)
+    futures = []
+
+    def submit_all():
+        for m_x in m_xs * 10:
+            try:
+                futures.append(ex.submit(m_x))
+            except RuntimeError:
+                return
+
+    submitters = [threading.Thread(target=submit_all, daemon=True) for _ in range(4)]
+    for thread in submitters:
+        thread.start()
+    ex.close()
+    for thread in submitters:
+        thread.join(timeout=60)
+        assert not thread.is_alive()
+    for future in futures:
+        try:
+            future.result(timeout=60)
+        except RuntimeError:
+            pass
+
+
 if __name__ == "__main__":
     pytest.main([__file__])
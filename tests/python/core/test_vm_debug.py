@@ -52,10 +52,10 @@ def test_vm_debugger(device, shape):
 
 
 @pytest.mark.parametrize("device", get_testable_devices())
-@pytest.mark.parametrize("pool_name", ["no_pool", "page_unit_pool"])
+@pytest.mark.parametrize("pool_name", ["no_pool", "page_unit_pool", "caching_pool"])
 def test_vm_memory_profiler(device, pool_name):
     # pylint: disable=protected-access
-    if device == "cuda" and pool_name == "page_unit_pool" and float(raf.build.with_cuda()) >= 11.3:
+    if device == "cuda" and pool_name != "no_pool" and float(raf.build.with_cuda()) >= 11.3:
         pytest.skip(
             "Skip this because VM will use cudaAllocAsync to allocate memory. The "
             "underlying cuda memory pool is not compatible with raf page_unit_pool"
@@ -98,7 +98,7 @@ def test_vm_memory_profiler(device, pool_name):
     buffer_size = (32 * 3 * 224 * 224) * 4 / 1048576
 
     if device == "cuda":
-        if pool_name == "page_unit_pool" or float(raf.build.with_cuda()) >= 11.3:
+        if pool_name != "no_pool" or float(raf.build.with_cuda()) >= 11.3:
             # Peak memory should have 2 tensors, but CuDNN Conv2D has workspace memory that
             # depends on the Conv2D algorithm selected by CuDNN.
             assert peak_memory >= 2 * buffer_size, "%.2f vs. %.2f" % (peak_memory, 2 * buffer_size)
@@ -109,6 +109,11 @@ def test_vm_memory_profiler(device, pool_name):
     else:
         if pool_name == "page_unit_pool":
             check(peak_memory, 2 * buffer_size, rtol=1e-1, atol=1e-1)
+        elif pool_name == "caching_pool":
+            # Each buffer gets a segment rounded up to 2 MBs, and small buffers may take
+            # another 2 MB segment.
+            upper_bound = 2 * (buffer_size + 2) + 2
+            assert 2 * buffer_size <= peak_memory <= upper_bound, "%.2f" % peak_memory
         else:
             assert peak_memory == 0
 
@@ -2,6 +2,10 @@
 # SPDX-License-Identifier: Apache-2.0
 
 # pylint: disable=invalid-name,protected-access,attribute-defined-outside-init
+import os
+import subprocess
+import sys
+
 import pytest
 import numpy as np
 import raf
@@ -115,5 +119,104 @@ def test_tuple(fuse):
         check(t, ref_t)
 
 
+def test_external_constant():
+    shape = (3, 5)
+    n_konst = np.random.randn(64, 5).astype("float32")
+    konst1 = raf.ir.const(n_konst[:1])
+    konst2 = raf.ir.const(n_konst)
+    x = raf.ir.var("x", shape=shape)
+    y = raf.ir.op.add(x, konst1)
+    y = raf.ir.op.matmul_nt(y, konst2)
+    mod = raf.ir.IRModule()
+    mod["main"] = relay.Function([x], y)
+    mod = raf._ffi.pass_.ToANormalForm()(mod)
+
+    with raf.ir.PassContext(opt_level=1):
+        executor = VMExecutor(mod, "cpu")
+    m_x, _ = randn(shape)
+    ref_y = executor.make_executor()(m_x)
+
+    tmp = tvm.contrib.utils.tempdir()
+    const_path = tmp.relpath("const.bin")
+    code, _ = executor.executable.save(const_path)
+    code = bytearray(code)
+    # The tensor data is in the constant file, each at a page-aligned offset.
+    assert len(code) < n_konst.nbytes
+    assert os.path.getsize(const_path) >= 4096 + n_konst.nbytes
+    loaded_exe = Executable.load_exec(code, None, const_path)
+    check(run_exec(loaded_exe, [m_x]), ref_y)
+
+    with pytest.raises(tvm.TVMError):
+        Executable.load_exec(code, None)
+
+
+def test_packaged_kernels():
+    class Model(raf.Model):
+        def build(self):
+            pass
+
+        @raf.model.trace
+        def forward(self, x):  # pylint: disable=no-self-use
+            y = raf.matmul(x, x)
+            y = raf.relu(y)
+            return raf.softmax(y)
+
+    model = Model()
+    model.infer_mode()
+    m_x, _ = randn((16, 16), device="cpu")
+    mod = model._internal(m_x).mod
+    with raf.ir.PassContext(opt_level=3):
+        executor = VMExecutor(mod, "cpu")
+    ref_y = executor.make_executor()(m_x).numpy()
+
+    exe = executor.executable
+    num_kernels = exe.package_kernels("cpu", m_x)
+    assert num_kernels > 0
+    code, lib = exe.save()
+    tmp = tvm.contrib.utils.tempdir()
+    lib.export_library(tmp.relpath("lib.so"))
+    with open(tmp.relpath("code.ro"), "wb") as fo:
+        fo.write(code)
+    np.save(tmp.relpath("x.npy"), m_x.numpy())
+    np.save(tmp.relpath("ref.npy"), ref_y)
+
+    # The kernels were built by the run above, so loading keeps the cached ones.
+    loaded_lib = tvm.runtime.load_module(tmp.relpath("lib.so"))
+    for _ in range(2):
+        loaded_exe = Executable.load_exec(bytearray(code), loaded_lib)
+        assert loaded_exe.num_preloaded_kernels == 0
+        check(run_exec(loaded_exe, [m_x]), ref_y)
+
+    # Load and run the executable twice in a fresh process, which has no kernel in the cache.
+    script = """
+import numpy as np
+import raf
+import tvm
+from raf._core.vm import Executable, VirtualMachine
+from raf.testing import check
+
+tmp = "{tmp}"
+code = bytearray(open(tmp + "/code.ro", "rb").read())
+lib = tvm.runtime.load_module(tmp + "/lib.so")
+num_preloaded = []
+for _ in range(2):
+    exe = Executable.load_exec(code, lib)
+    num_preloaded.append(exe.num_preloaded_kernels)
+    out = VirtualMachine(exe, "cpu").run(np.load(tmp + "/x.npy"))
+    check(out, np.load(tmp + "/ref.npy"))
+assert num_preloaded == [{num_kernels}, 0], num_preloaded
+metric = raf._ffi.cache.DumpTVMCacheMetric("tvm_cpu")
+assert "CacheMiss" not in metric, metric
+""".format(
+        tmp=tmp.temp_dir, num_kernels=num_kernels
+    )
+    env = dict(os.environ)
+    env.pop("RAF_PERSIST_CACHE", None)
+    proc = subprocess.run(
+        [sys.executable, "-c", script], env=env, stdout=subprocess.PIPE, stderr=subprocess.PIPE
+    )
+    assert proc.returncode == 0, proc.stderr.decode()
+
+
 if __name__ == "__main__":
     pytest.main([__file__])
@@ -0,0 +1,132 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+# pylint: disable=protected-access
+"""Test collective communication operators on CPU. Each test launches the ranks as processes on
+this host, which use the void communicator to set their ranks.
+"""
+import os
+import subprocess
+import sys
+
+import pytest
+
+WORKER = """
+import sys
+import numpy as np
+import raf
+from raf import distributed as dist
+from raf.testing import check, run_vm_model
+
+rank, size, transport = int(sys.argv[1]), int(sys.argv[2]), sys.argv[3]
+comm = dist.get_communicator()
+comm.size = size
+comm.rank = rank
+comm.local_size = size
+comm.local_rank = rank
+dist.set_cpu_comm_transport(transport)
+
+
+class Allreduce(raf.Model):
+    def build(self, computation):
+        self.computation = computation
+
+    @raf.model.trace
+    def forward(self, x, y):
+        return raf.allreduce([x, y], computation=self.computation)
+
+
+class Allgather(raf.Model):
+    def build(self):
+        pass
+
+    @raf.model.trace
+    def forward(self, x):
+        return raf.allgather(x, axis=1)
+
+
+class ReduceScatter(raf.Model):
+    def build(self):
+        pass
+
+    @raf.model.trace
+    def forward(self, x, y, z):
+        return raf.reduce_scatter([x, y, z][:size])
+
+
+class Broadcast(raf.Model):
+    def build(self):
+        pass
+
+    @raf.model.trace
+    def forward(self, x):
+        return raf.broadcast(x, root=1)
+
+
+def run(model, *args):
+    out = model(*args)
+    out_vm = run_vm_model(model, "cpu", list(args))
+    if isinstance(out, (list, tuple)):
+        for lhs, rhs in zip(out, out_vm):
+            check(lhs, rhs)
+    else:
+        check(out, out_vm)
+    return out
+
+
+# An odd number of elements exercises the uneven ring segments.
+n_x = np.arange(35, dtype="float32").reshape((5, 7)) + rank
+n_y = np.full((3,), rank + 1, dtype="float32")
+m_x, m_y = raf.array(n_x), raf.array(n_y)
+all_x = [np.arange(35, dtype="float32").reshape((5, 7)) + r for r in range(size)]
+all_y = [np.full((3,), r + 1, dtype="float32") for r in range(size)]
+
+out = run(Allreduce("sum"), m_x, m_y)
+check(out[0], np.sum(all_x, axis=0))
+check(out[1], np.sum(all_y, axis=0))
+out = run(Allreduce("avg"), m_x, m_y)
+check(out[0], np.mean(all_x, axis=0))
+out = run(Allreduce("max"), m_x, m_y)
+check(out[1], np.full((3,), size, dtype="float32"))
+
+check(run(Allgather(), m_x), np.concatenate(all_x, axis=1))
+
+parts = [raf.array(np.full((2, 3), rank + i, dtype="float32")) for i in range(3)]
+out = run(ReduceScatter(), *parts)
+check(out, np.full((2, 3), sum(r + rank for r in range(size)), dtype="float32"))
+
+check(run(Broadcast(), m_x), all_x[1])
+
+# A message larger than the shared memory buffer exercises the chunking.
+n_big = np.random.RandomState(rank).randn(1 << 19).astype("float32")
+n_ref = np.sum([np.random.RandomState(r).randn(1 << 19).astype("float32") for r in range(size)], 0)
+m_big = raf.array(n_big)
+check(run(Allreduce("sum"), m_big, m_y)[0], n_ref, rtol=1e-4, atol=1e-4)
+print("ok")
+"""
+
+
+@pytest.mark.parametrize("transport", ["shm", "tcp"])
+@pytest.mark.parametrize("size", [2, 3])
+def test_cpu_collectives(transport, size, tmp_path):
+    env = dict(os.environ)
+    env["RAF_CPU_COMM_ID"] = "test_%d_%s_%d" % (os.getpid(), transport, size)
+    env["RAF_CPU_COMM_BUFFER_SIZE"] = str(1 << 20)
+    env["RAF_FILE_STORE_PATH"] = str(tmp_path)
+    procs = [
+        subprocess.Popen(
+            [sys.executable, "-c", WORKER, str(rank), str(size), transport],
+            env=env,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            universal_newlines=True,
+        )
+        for rank in range(size)
+    ]
+    for rank, proc in enumerate(procs):
+        out, _ = proc.communicate(timeout=600)
+        assert proc.returncode == 0 and out.strip().endswith("ok"), "rank %d:\n%s" % (rank, out)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -79,6 +79,25 @@ def test_block_vm_multi_stream(block_name, policy, fuse):
     check(y_1, y_2, rtol=1e-5, atol=1e-5)
 
 
+@pytest.mark.parametrize("block_name", ["c"])
+@pytest.mark.parametrize("fuse", [False, True])
+@pytest.mark.parametrize("policy", ["wavefront", "asap"])
+def test_block_vm_multi_stream_cpu(block_name, policy, fuse):
+    # On CPU, the ops on different streams are executed by the worker threads of the VM.
+    device = "cpu"
+    (model, x, _), _ = inception.get_block_and_input(block_name=block_name, device=device)
+    model.infer_mode()
+
+    y_1 = run_vm_model(
+        model, device, [x], disable_fusion=not fuse, stream_schedule_policy="sequential"
+    )
+    for _ in range(2):
+        y_2 = run_vm_model(
+            model, device, [x], disable_fusion=not fuse, stream_schedule_policy=policy
+        )
+        check(y_1, y_2, rtol=1e-5, atol=1e-5)
+
+
 @pytest.mark.skipif(True, reason="Skip to save the CI time")
 @pytest.mark.skipif(
     raf.build.with_cuda() and float(raf.build.with_cuda()) <= 11.2,
@@ -0,0 +1,158 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+# pylint: disable=protected-access, attribute-defined-outside-init
+import time
+
+import numpy as np
+import pytest
+import tvm
+from tvm import auto_scheduler
+
+import raf
+from raf._core import cacher
+from raf._core.vm import VMCompiler
+from raf.testing import check, get_testable_devices, randn
+from raf.utils.tuner import extract_tuning_tasks
+
+
+class MatmulModel(raf.Model):
+    def build(self, shape):
+        self.w, _ = randn(shape)
+
+    @raf.model.trace
+    def forward(self, x):
+        y = raf.matmul(x, self.w)
+        return raf.relu(y), y
+
+
+class DenseModel(raf.Model):
+    def build(self, shape):
+        self.w, _ = randn(shape)
+
+    @raf.model.trace
+    def forward(self, x):
+        return raf.relu(raf.dense(x, self.w))
+
+
+@pytest.mark.parametrize("device", get_testable_devices())
+def test_compile(device):
+    model = MatmulModel((4, 4))
+    model.to(device=device)
+    model.infer_mode()
+    m_x, _ = randn((3, 4), device=device)
+    ref_relu, ref_y = model(m_x)
+
+    assert model.compile(device) is model
+    out_relu, out_y = model(m_x)
+    check(out_relu, ref_relu)
+    check(out_y, ref_y)
+    cache = cacher.get_cache(model, "trace@forward", None)
+    assert len(cache.executors) == 1
+
+    # The executable is reused for the same input signature.
+    m_x, n_x = randn((3, 4), device=device)
+    model(m_x)
+    assert len(cache.executors) == 1
+
+    # A new input signature compiles a new executable.
+    m_x, n_x = randn((2, 4), device=device)
+    n_w = model.w.numpy()
+    check(model(m_x)[1], np.matmul(n_x, n_w))
+    assert len(cache.executors) == 2
+
+    # Mutating the model invalidates the executables.
+    model.w, n_w = randn((4, 4), device=device)
+    assert cacher.get_cache(model, "trace@forward", None) is None
+    check(model(m_x)[1], np.matmul(n_x, n_w))
+
+    # Training mode runs with the interpreter.
+    model.train_mode()
+    check(model(m_x)[1], np.matmul(n_x, n_w))
+    assert not cacher.get_cache(model, "trace@forward", None).executors
+
+    model.infer_mode()
+    model.compile(enable=False)
+    check(model(m_x)[1], np.matmul(n_x, n_w))
+    assert not cacher.get_cache(model, "trace@forward", None).executors
+
+
+def test_compile_pre_pack_weights():
+    model = MatmulModel((4, 4))
+    model.infer_mode()
+    m_x, n_x = randn((3, 4))
+    n_w = model.w.numpy()
+    ref_relu, ref_y = model(m_x)
+
+    # Without tuned schedules, the weights are bound as constants and kept in their layouts.
+    model.compile("cpu", pre_pack_weights=True)
+    out_relu, out_y = model(m_x)
+    check(out_relu, ref_relu)
+    check(out_y, ref_y)
+    # The weights are bound to a copy of the traced module.
+    record = model._internal(m_x)
+    assert len(record.mod["main"].params) == 2
+
+    # The bound weights are refreshed when the model is mutated.
+    model.w, n_w = randn((4, 4))
+    check(model(m_x)[1], np.matmul(n_x, n_w))
+
+
+def write_tuned_record(model, args, sch_file):
+    """Write a schedule that splits the output columns of the dense, so that it requests a blocked
+    layout for the weight. The schedule is not measured, but is the only one in the file."""
+    tasks, _ = extract_tuning_tasks(model, args, "cpu", fusion=True)
+    assert len(tasks) == 1
+    task = tasks[0]
+    state = task.compute_dag.get_init_state()
+    # The dense stage has the i, j and k loops.
+    stage_id = [i for i, stage in enumerate(state.stages) if len(stage.iters) == 3][0]
+    state.split(stage_id, state.stages[stage_id].iters[1], [4])
+    inp = auto_scheduler.MeasureInput(task, state)
+    res = auto_scheduler.MeasureResult([0.1], 0, "", 0.1, time.time())
+    auto_scheduler.save_records(sch_file, [inp], [res])
+
+
+def test_compile_pre_pack_weights_tuned(tmp_path):
+    model = DenseModel((16, 16))
+    model.infer_mode()
+    m_x, n_x = randn((8, 16))
+    n_w = model.w.numpy()
+    sch_file = str(tmp_path / "dense.json")
+    write_tuned_record(model, [m_x], sch_file)
+
+    # The weight is packed to the layout requested by the schedule at compile time.
+    record = model._internal(m_x)
+    main = record.mod["main"]
+    params = main.params[1:]
+    assert len(params) == len(record.named_params) == 1
+    values = list(record.named_params.values())
+    main = tvm.relay.bind(main, {var: raf.ir.const(val) for var, val in zip(params, values)})
+    with auto_scheduler.ApplyHistoryBest(sch_file, include_compatible=True):
+        with tvm.transform.PassContext(
+            config={
+                "relay.backend.use_auto_scheduler": True,
+                "raf.vm.optimize.pre_pack_weights": True,
+            },
+        ):
+            mod, _ = VMCompiler().optimize(tvm.IRModule.from_expr(main), "cpu")
+    rewritten = []
+
+    def fvisit(expr):
+        if isinstance(expr, tvm.relay.Function) and expr.attrs is not None:
+            if "RewrittenLayout" in expr.attrs.keys():
+                rewritten.append(expr)
+
+    tvm.relay.analysis.post_order_visit(mod["main"], fvisit)
+    assert len(rewritten) == 1
+    packed_shape = [int(x) for x in rewritten[0].attrs["RewrittenShape"]]
+    assert packed_shape != [16, 16]
+    assert int(np.prod(packed_shape)) == 16 * 16
+
+    # The kernel runs on the packed weight.
+    model.compile("cpu", sch_file=sch_file, pre_pack_weights=True)
+    check(model(m_x), np.maximum(np.matmul(n_x, n_w.T), 0), rtol=1e-4, atol=1e-4)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -210,6 +210,37 @@ def test_log_softmax(device, shape, disable_fusion):
     check(m_x.grad, t_x.grad)
 
 
+@with_dialect("tvm")
+@pytest.mark.parametrize("shape", [[2, 4, 16, 64], [3, 33]])
+@pytest.mark.parametrize("axis", [-1, 1, 0])
+@pytest.mark.parametrize("op", ["softmax", "log_softmax"])
+def test_softmax_cpu(shape, axis, op):
+    # The CPU schedule vectorizes the rows of 64 elements, and computes the reductions at the
+    # root if there are no rows to parallelize, i.e., axis=0.
+    device = "cpu"
+
+    class Model(raf.Model):
+        def build(self):
+            pass
+
+        @raf.model.trace
+        def forward(self, x):
+            return getattr(raf._op.sym, op)(x, axis=axis)
+
+    model = Model()
+    m_x, t_x = randn_torch(shape, device=device, requires_grad=True)
+    m_y = model(m_x)
+    v_y = run_vm_model(model, device, [m_x])
+    t_y = getattr(torch, op)(t_x, dim=axis)
+    check(m_y, t_y, rtol=1e-5, atol=1e-5)
+    check(v_y, t_y, rtol=1e-5, atol=1e-5)
+
+    m_dy, t_dy = randn_torch(shape, device=device)
+    t_y.backward(t_dy)
+    m_y.backward(m_dy)
+    check(m_x.grad, t_x.grad, rtol=1e-5, atol=1e-5)
+
+
 # pylint: disable=too-many-arguments
 @with_dialect("tvm")
 @with_seed(0)
@@ -821,7 +852,7 @@ def test_raf_dropout(dropout, device):
 
 
 @with_seed(0)
-@pytest.mark.parametrize("shape", [(1, 2, 4)])
+@pytest.mark.parametrize("shape", [(1, 2, 4), (2, 8, 64)])
 @pytest.mark.parametrize("device", get_testable_devices())
 @pytest.mark.parametrize("dtype", ["float32"])
 def test_layer_norm_train(shape, device, dtype):
@@ -1151,5 +1151,42 @@ def test_group_cast(shape, device, itype, otype):
     check(group_out[2], out[2])
 
 
+@pytest.mark.parametrize("device", get_testable_devices())
+@pytest.mark.parametrize("shapes", [[(3, 4), (5,), ()], [(2, 3, 4)]])
+@pytest.mark.parametrize("dtype", ["float32", "float16"])
+def test_fuse_defuse_tensor(shapes, dtype, device):
+    sizes = [int(np.prod(shape)) for shape in shapes]
+    flat_shapes = [dim for shape in shapes for dim in shape]
+    shape_indices = [int(idx) for idx in np.cumsum([len(shape) for shape in shapes])]
+
+    class FuseTensor(raf.Model):
+        def build(self):
+            pass
+
+        @raf.model.trace
+        def forward(self, *args):
+            return raf.fuse_tensor(list(args))
+
+    class DefuseTensor(raf.Model):
+        def build(self):
+            pass
+
+        @raf.model.trace
+        def forward(self, x):
+            return raf.defuse_tensor(x, sizes, flat_shapes, shape_indices)
+
+    m_xs, n_xs = zip(*[randn(shape, dtype=dtype, device=device) for shape in shapes])
+    m_y = FuseTensor()(*m_xs)
+    v_y = run_vm_model(FuseTensor(), device, m_xs)
+    n_y = np.concatenate([n_x.ravel() for n_x in n_xs])
+    check(m_y, n_y)
+    check(v_y, n_y)
+    m_outs = DefuseTensor()(m_y)
+    v_outs = run_vm_model(DefuseTensor(), device, [m_y])
+    for m_out, v_out, n_x in zip(m_outs, v_outs, n_xs):
+        check(m_out, n_x)
+        check(v_out, n_x)
+
+
 if __name__ == "__main__":
     pytest.main([__file__])
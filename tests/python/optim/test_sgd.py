@@ -125,6 +125,51 @@ def test_sgd(config):
         check(m_model.bn1.b, t_model.bn1.bias, rtol=1e-4, atol=1e-4)
 
 
+@with_seed(0)
+@pytest.mark.parametrize("device", get_testable_devices())
+@pytest.mark.parametrize("bucket_size", [None, 1000])
+def test_fused_sgd(device, bucket_size):
+    # pylint: disable=too-many-locals
+    shape, n_classes = 8, 10
+    ref_model = RAFTest(shape, n_classes)
+    fused_model = RAFTest(shape, n_classes)
+    for layer, attr in [("conv1", "w"), ("conv1", "b"), ("linear1", "w"), ("linear1", "b")]:
+        param = getattr(getattr(ref_model, layer), attr)
+        setattr(getattr(fused_model, layer), attr, raf.array(param.numpy()))
+    models = []
+    for m_model, fused in [(ref_model, False), (fused_model, True)]:
+        m_model.to(device=device)
+        m_model.train_mode()
+        params = [m_model.conv1.w, m_model.conv1.b, m_model.linear1.w, m_model.linear1.b]
+        for param in params:
+            param.requires_grad = True
+        optimizer = raf.optim.SGD(params, 0.1, 0.01, fused=fused, bucket_size=bucket_size)
+        models.append((m_model, optimizer))
+
+    # pylint: disable=protected-access
+    fused_params = [fused_model.conv1.w, fused_model.conv1.b, fused_model.linear1.w]
+    fused_params.append(fused_model.linear1.b)
+    bound_values = [param._ndarray__value for param in fused_params]
+    for _ in range(3):
+        m_x, _ = randn_torch([1, 3, shape, shape], device=device)
+        m_y, _ = one_hot_torch(batch_size=1, num_classes=n_classes, device=device)
+        for m_model, optimizer in models:
+            m_loss = m_model(m_x, m_y)
+            m_loss.backward()
+            optimizer.step()
+        check(fused_model.conv1.w, ref_model.conv1.w, rtol=1e-5, atol=1e-5)
+        check(fused_model.conv1.b, ref_model.conv1.b, rtol=1e-5, atol=1e-5)
+        check(fused_model.linear1.w, ref_model.linear1.w, rtol=1e-5, atol=1e-5)
+        check(fused_model.linear1.b, ref_model.linear1.b, rtol=1e-5, atol=1e-5)
+        # The flat buffers are updated in place, so the parameters are never rebound.
+        for param, value in zip(fused_params, bound_values):
+            assert param._ndarray__value.same_as(value)
+
+    # Parameters share the flat buffer, so each bucket is updated as a whole.
+    n_buckets = len(models[1][1]._buckets)
+    assert n_buckets == (1 if bucket_size is None else 3)
+
+
 class TorchSimpleTest(nn.Module):  # pylint: disable=abstract-method
     def __init__(self, shape):
         super(TorchSimpleTest, self).__init__()
@@ -148,7 +193,8 @@ class RAFSimpleTest(raf.Model):
 
 
 @pytest.mark.parametrize("device", get_testable_devices())
-def test_traced_sgd_simple(device):
+@pytest.mark.parametrize("fused", [False, True])
+def test_traced_sgd_simple(device, fused):
     # pylint: disable=attribute-defined-outside-init
     shape = (2, 2)
     batch_size = 32
@@ -159,7 +205,7 @@ def test_traced_sgd_simple(device):
     m_model.x = t2m_param(t_model.x, device=device)
     m_model.train_mode()
     t_model.train()
-    m_optimizer = raf.optim.sgd.with_sgd(learning_rate=0.1, momentum=0.01)(m_model)
+    m_optimizer = raf.optim.sgd.with_sgd(learning_rate=0.1, momentum=0.01, fused=fused)(m_model)
     t_optimizer = torch.optim.SGD(t_model.parameters(), lr=0.1, momentum=0.01)
     for i in range(batch_size):
         m_dy, t_dy = randn_torch(shape, device=device, requires_grad=False)
@@ -212,7 +258,8 @@ def test_traced_sgd(config):
 
 @with_seed(0)
 @pytest.mark.parametrize("device", get_testable_devices())
-def test_mxnet_model(device):
+@pytest.mark.parametrize("fused", [False, True])
+def test_mxnet_model(device, fused):
     net = gluon.nn.HybridSequential()
     with net.name_scope():
         net.add(gluon.nn.Dense(128, activation="relu"))
@@ -228,7 +275,7 @@ def test_mxnet_model(device):
     model = raf.frontend.from_mxnet(net, ["x"])
     model.train_mode()
     model.to(device=device)
-    trainer = raf.optim.sgd.with_sgd(learning_rate=0.1, momentum=0.01)(model)
+    trainer = raf.optim.sgd.with_sgd(learning_rate=0.1, momentum=0.01, fused=fused)(model)
     with mx.autograd.record():
         mx_loss = net(mx_x)
     mx_loss.backward(mx_dy)
@@ -9,9 +9,11 @@ import tvm
 import raf
 from raf._core.ndarray import Symbol
 from raf._core.module import IRModule
+from raf._core.vm import VMCompiler
 from raf._core.ir_ext import extended_var
 from raf._ffi.pass_ import AutoDiff, ExtractBinding, FromRelay, InferType, LambdaLift
 from raf._op import sym as op
+from raf.ir import ScopeBuilder
 from raf.testing import check, randn, run_infer_type
 from tvm import relay
 
@@ -505,5 +507,89 @@ def test_multi_functions():
     assert mod["main"].checked_type == expected_ty
 
 
+def test_incremental():
+    x = extended_var("x", shape=(2, 3))
+    sb = ScopeBuilder()
+    a_1 = sb.let("a1", raf.ir.op.reshape(x, (3, 2)))
+    a_2 = sb.let("a2", raf.ir.op.relu(a_1))
+    a_3 = sb.let("a3", raf.ir.op.tanh(x))
+    a_4 = sb.let("a4", relay.Tuple([a_2, a_3]))
+    sb.ret(a_4)
+    mod = IRModule.from_expr(relay.Function([x], sb.get()))
+    func = InferType(True)(mod)["main"]
+    assert_has_type(
+        func,
+        relay.FuncType(
+            [relay.TensorType((2, 3))],
+            relay.TupleType([relay.TensorType((3, 2)), relay.TensorType((2, 3))]),
+        ),
+    )
+
+    # Replace the value of a1, so a1 and its dependants (a2 and a4) have to be re-inferred.
+    lets = []
+    body = func.body
+    while isinstance(body, relay.Let):
+        lets.append([body.var, body.value])
+        body = body.body
+    lets[0][1] = raf.ir.op.reshape(x, (6,))
+    a_3_value = lets[2][1]
+    for var, value in reversed(lets):
+        body = relay.Let(var, value, body)
+    mod = IRModule.from_expr(relay.Function(func.params, body))
+    func = InferType(True)(mod)["main"]
+
+    body = func.body
+    assert_has_type(body.var, relay.TensorType((6,)))
+    assert_has_type(body.body.var, relay.TensorType((6,)))
+    # The unchanged binding is kept as is.
+    assert body.body.body.value.same_as(a_3_value)
+    assert_has_type(body.body.body.var, relay.TensorType((2, 3)))
+    assert_has_type(
+        func.ret_type, relay.TupleType([relay.TensorType((6,)), relay.TensorType((2, 3))])
+    )
+
+
+def test_incremental_vm_optimize():
+    class Model(raf.Model):
+        def build(self):
+            self.w1, _ = randn((16, 8))
+            self.w2, _ = randn((8, 4))
+
+        @raf.model.trace
+        def forward(self, x):
+            y = raf.relu(raf.matmul(x, self.w1))
+            y = raf.reshape(raf.matmul(y, self.w2), (-1,))
+            return raf.softmax(y), raf.add(y, y)
+
+    model = Model()
+    model.infer_mode()
+    m_x, _ = randn((2, 16))
+    mod = model._internal(m_x).mod
+
+    def optimize(incremental):
+        with raf.ir.PassContext(config={"raf.vm.optimize.incremental_type_infer": incremental}):
+            return VMCompiler().optimize(mod, "cpu")[0]
+
+    def get_let_types(opt_mod):
+        types = []
+
+        def fvisit(expr):
+            if isinstance(expr, relay.Let):
+                types.append(expr.var.checked_type)
+
+        relay.analysis.post_order_visit(opt_mod["main"], fvisit)
+        return types
+
+    # The incremental mode infers the same types as the full one.
+    full = optimize(False)
+    incremental = optimize(True)
+    assert tvm.ir.structural_equal(incremental, full)
+    full_types = get_let_types(full)
+    incremental_types = get_let_types(incremental)
+    assert len(incremental_types) == len(full_types) > 0
+    for inc_type, full_type in zip(incremental_types, full_types):
+        assert tvm.ir.structural_equal(inc_type, full_type)
+
+
 if __name__ == "__main__":
     pytest.main([__file__])
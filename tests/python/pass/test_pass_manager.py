@@ -14,7 +14,7 @@ from tvm.ir.transform import module_pass
 from tvm.relay.transform import function_pass, FunctionPass
 from raf._ffi import pass_
 from raf._ffi.pass_ import FromRelay
-from raf.ir import RAFSequential
+from raf.ir import RAFSequential, PassProfiler
 
 
 def get_var_func():
@@ -156,5 +156,40 @@ def test_sequential_pass():
     assert isinstance(ret_mod["mySub"].body.checked_type, tvm.ir.TensorType)
 
 
+def test_pass_profiler():
+    shape = (10,)
+    tp = relay.TensorType(shape, "float32")
+    x = relay.var("x", tp)
+    y = relay.var("y", tp)
+    mod = FromRelay()(tvm.IRModule.from_expr(relay.Function([x, y], relay.subtract(x, y))))
+    passes = [pass_.ToANormalForm(), pass_.InferType()]
+    sequential = RAFSequential(passes=passes, opt_level=1, name="seq")
+
+    with PassProfiler() as prof:
+        sequential(mod)
+    assert [record["name"] for record in prof.records] == ["ToANormalForm", "InferType"]
+    assert prof.records[0]["lets_before"] == 0
+    assert prof.records[0]["lets_after"] == 1
+    assert prof.records[1]["lets_before"] == prof.records[1]["lets_after"] == 1
+    for record in prof.records:
+        assert record["calls_before"] == record["calls_after"] == 1
+        assert record["time_ms"] >= 0
+        assert record["peak_rss_kb"] > 0
+    assert "ToANormalForm" in prof.table(sort_by="time_ms")
+    assert len(prof.chrome_trace()["traceEvents"]) == 2
+
+    # The profiler is disabled after exiting the scope.
+    with PassProfiler() as prof_2:
+        pass
+    sequential(mod)
+    assert not prof_2.records
+
+    # The profiler can also be enabled by the pass context.
+    pass_.ResetPassProfiler()
+    with PassContext(config={"raf.pass_manager.profile": True}):
+        sequential(mod)
+    assert "InferType" in pass_.GetPassProfile()
+
+
 if __name__ == "__main__":
     pytest.main([__file__])
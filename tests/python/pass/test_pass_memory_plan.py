@@ -9,12 +9,13 @@ from raf._lib import tvm
 from raf.testing import get_testable_devices, randn, check, run_vm_model
 
 
-def optimize(mod, device, fusion=False):
+def optimize(mod, device, fusion=False, arena=False):
     device_name = device if device != "cpu" else "llvm"
     disabled_pass = []
     if not fusion:
         disabled_pass = ["FuseDialect", "FuseTVM"]
-    with tvm.transform.PassContext(opt_level=3, disabled_pass=disabled_pass):
+    config = {"raf.memory_plan.arena": arena}
+    with tvm.transform.PassContext(opt_level=3, config=config, disabled_pass=disabled_pass):
         opt_mod, _ = raf._core.vm.VMCompiler().optimize(mod, device=device_name, params={})
     return opt_mod
 
@@ -167,5 +168,43 @@ def test_set_shape():
     verify_correctness(model, "cpu", args, fusion=False)
 
 
+@pytest.mark.parametrize("device", get_testable_devices())
+def test_memory_arena(device):
+    class Model(raf.Model):
+        def build(self):
+            pass
+
+        @raf.model.trace
+        def forward(self, a, b, c, d):
+            t0 = raf.add(a, a)
+            t1 = raf.add(t0, b)
+            t2 = raf.add(t1, c)
+            t3 = raf.add(t2, t0)
+            t4 = raf.add(t3, d)
+            return t4
+
+    shape = (5, 5)
+    model = Model()
+    model.infer_mode()
+    args = [randn(shape, device=device)[0] for _ in range(4)]
+    mod = model._internal(*args).mod
+
+    func = optimize(mod, device, arena=True)["main"]
+    lines = raf.ir.AsText(func).split("\n")
+    storages = [line for line in lines if "raf.op.vm.alloc_storage" in line]
+    tensors = [line for line in lines if "raf.op.vm.alloc_tensor" in line]
+    frees = [line for line in lines if "raf.op.vm.free" in line]
+    # One arena for t0-t3, and one storage for the output t4.
+    assert len(storages) == 2
+    assert len(tensors) == 5
+    assert len(frees) == 1
+    arena_size = max(int(line[line.find("int64(") + 6 : line.find(")")]) for line in storages)
+    # t1 and t3 are not alive at the same time, so they share the same offset.
+    assert arena_size < 4 * 100
+
+    outs = run_vm_model(model, device, args, disable_fusion=True, memory_arena=True)
+    check(model(*args), outs)
+
+
 if __name__ == "__main__":
     pytest.main([__file__])
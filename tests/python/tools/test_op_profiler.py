@@ -2,6 +2,9 @@
 # SPDX-License-Identifier: Apache-2.0
 
 # pylint: disable=no-self-use,protected-access
+import os
+
+import numpy as np
 import pytest
 
 import raf
@@ -152,5 +155,71 @@ def test_default_stream():
     assert GetCacheSize(device) == 1
 
 
+def test_latency_db(tmp_path):
+    device = raf.Device("cpu")
+    data = raf.ir.var("x", shape=(16, 16))
+    expr = run_infer_type(raf.ir.op.softmax(data)).body
+    expr_axis0 = run_infer_type(raf.ir.op.softmax(data, 0)).body
+    db_path = str(tmp_path / "latency.db")
+
+    # Different attributes should be profiled separately.
+    ResetCache(device)
+    lat = Profile(expr, device)["latency"][0].value
+    Profile(expr_axis0, device)
+    assert GetCacheSize(device) == 2
+    assert raf.utils.export_latency_db(db_path, device) == 2
+
+    # Import to a clean cache and the latency should be reused.
+    ResetCache(device)
+    assert raf.utils.import_latency_db(db_path, device) == 2
+    assert GetCacheSize(device) == 2
+    assert Profile(expr, device)["latency"][0].value == lat
+    assert GetCacheSize(device) == 2
+
+    # Existing entries are kept unless overwrite is specified.
+    assert raf.utils.import_latency_db(db_path, device) == 0
+    assert raf.utils.import_latency_db(db_path, device, overwrite=True) == 2
+
+    # Newly profiled entries are appended to the attached database.
+    attached_path = str(tmp_path / "attached.db")
+    ResetCache(device)
+    assert raf.utils.attach_latency_db(attached_path, device) == 0
+    Profile(expr, device, 1, 1, 2)
+    raf.utils.attach_latency_db(None, device)
+    ResetCache(device)
+    assert raf.utils.import_latency_db(attached_path, device) == 1
+
+    # Databases with a mismatched version are invalidated.
+    with open(db_path, "r") as db_file:
+        lines = db_file.readlines()
+    lines[0] = "raf-op-latency-db 0\n"
+    with open(db_path, "w") as db_file:
+        db_file.writelines(lines)
+    ResetCache(device)
+    assert raf.utils.import_latency_db(db_path, device) == 0
+    assert raf.utils.attach_latency_db(db_path, device) == 0
+    raf.utils.attach_latency_db(None, device)
+    assert os.path.getsize(db_path) == len("raf-op-latency-db 2\n")
+
+
+def test_tensor_constant_key():
+    device = raf.Device("cpu")
+    data = raf.ir.var("x", shape=(16, 16))
+    weight = np.random.randn(16, 16).astype("float32")
+
+    def make_expr(value):
+        return run_infer_type(raf.ir.op.add(data, raf.ir.const(value))).body
+
+    ResetCache(device)
+    Profile(make_expr(weight), device)
+    assert GetCacheSize(device) == 1
+
+    # Tensor constants are hashed by their bytes instead of their buffers.
+    Profile(make_expr(weight.copy()), device)
+    assert GetCacheSize(device) == 1
+    Profile(make_expr(weight + 1), device)
+    assert GetCacheSize(device) == 2
+
+
 if __name__ == "__main__":
     pytest.main([__file__])
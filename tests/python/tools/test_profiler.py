@@ -7,7 +7,7 @@ import numpy as np
 import raf
 from raf._op import sym
 from raf.utils import profiler
-from raf.testing import randn
+from raf.testing import randn, run_vm_model
 
 
 class TestNet(raf.Model):
@@ -95,5 +95,31 @@ def test_profiler_without_cuda(i):
     assert op_count > 0
 
 
+def test_op_stats():
+    shape = (4, 4)
+    model = TestCuda()
+    m_a, _ = randn(shape)
+    m_b, _ = randn(shape)
+
+    profiler.reset_op_stats()
+    profiler.start_op_stats()
+    for _ in range(10):
+        run_vm_model(model, "cpu", [m_a, m_b])
+    profiler.stop_op_stats()
+    stats = profiler.get_op_stats()
+    profiler.reset_op_stats()
+
+    matmul = [entry for entry in stats if "matmul" in entry["name"]]
+    assert len(matmul) == 1
+    entry = matmul[0]
+    assert entry["count"] == 10
+    # The output bytes, plus the workspace if any.
+    assert entry["bytes"] >= 10 * 4 * 4 * 4
+    assert entry["min_us"] <= entry["p50_us"] <= entry["p99_us"] <= entry["max_us"]
+    assert entry["total_us"] >= entry["count"] * entry["min_us"]
+    assert "matmul" in profiler.op_stats_summary()
+    assert not profiler.get_op_stats()
+
+
 if __name__ == "__main__":
     pytest.main([__file__])